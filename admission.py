@@ -0,0 +1,176 @@
+"""
+요청 admission control (동시 처리 수 / 대기열 길이 제한)
+
+버스트가 오면 모든 요청이 한꺼번에 느려지고 디코딩된 이미지가 메모리에 쌓이므로,
+동시에 파이프라인에 들어가는 요청 수(max_in_flight)와 대기열 길이(max_queue)를 제한하고
+넘치는 요청은 바로 거절해서 클라이언트가 Retry-After 후 재시도하게 합니다.
+
+- 대기열이 가득 참 / 대기 시간 초과: 503 + Retry-After
+- 클라이언트별 대기 한도 초과: 429 + Retry-After
+- 공정성: 대기열은 클라이언트 키별로 나뉘고 빈 슬롯은 키 사이를 round-robin으로 넘겨줌
+  (한 테넌트의 대량 업로드가 다른 테넌트의 요청을 굶기지 않음)
+
+asyncio 이벤트 루프 안에서만 사용 (thread-safe 아님)
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+
+
+class AdmissionRejected(Exception):
+    """포화 상태로 요청을 받을 수 없을 때 (status_code: 429 또는 503)"""
+
+    def __init__(self, status_code: int, reason: str, retry_after: float):
+        super().__init__(f"Request rejected ({reason})")
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_in_flight: int = 16,
+        max_queue: int = 64,
+        queue_timeout: float = 30.0,
+        max_queue_per_client: int = 0,
+        retry_after: float = 2.0,
+    ):
+        """
+        Args:
+            max_in_flight: 동시에 처리 중일 수 있는 요청 수
+            max_queue: 전체 대기열 최대 길이 (0이면 대기 없이 바로 거절)
+            queue_timeout: 대기열에서 기다리는 최대 시간 (초)
+            max_queue_per_client: 클라이언트 키 하나가 대기열에 올릴 수 있는 최대 요청 수 (0이면 제한 없음)
+            retry_after: 거절 응답의 Retry-After (초)
+        """
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.max_queue = max(0, int(max_queue))
+        self.queue_timeout = float(queue_timeout)
+        self.max_queue_per_client = max(0, int(max_queue_per_client))
+        self.retry_after = float(retry_after)
+
+        self._in_flight = 0
+        self._queued = 0
+        self._waiters = OrderedDict()   # client key -> deque[Future]
+
+        self.admitted = 0
+        self.queued_total = 0
+        self.rejected = {"queue_full": 0, "client_limit": 0, "timeout": 0}
+        self._total_wait = 0.0
+        self._waited_admissions = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queued
+
+    @asynccontextmanager
+    async def admit(self, client_key: str = ""):
+        """
+        슬롯을 얻을 때까지 대기 후 진입 (블록이 끝나면 슬롯 반환)
+
+        Yields:
+            대기열에서 기다린 시간 (초)
+
+        Raises:
+            AdmissionRejected: 대기열 포화 / 클라이언트 한도 초과 / 대기 시간 초과
+        """
+        waited = await self._acquire(client_key)
+        try:
+            yield waited
+        finally:
+            self._release()
+
+    def _reject(self, status_code, reason):
+        self.rejected[reason] += 1
+        raise AdmissionRejected(status_code, reason, self.retry_after)
+
+    async def _acquire(self, key) -> float:
+        if self._in_flight < self.max_in_flight and self._queued == 0:
+            self._in_flight += 1
+            self.admitted += 1
+            return 0.0
+
+        if self._queued >= self.max_queue:
+            self._reject(503, "queue_full")
+        queue = self._waiters.get(key)
+        if self.max_queue_per_client and queue is not None and len(queue) >= self.max_queue_per_client:
+            self._reject(429, "client_limit")
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, deque()).append(future)
+        self._queued += 1
+        self.queued_total += 1
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not future.done():
+                self._remove(key, future)
+                self._reject(503, "timeout")
+        except asyncio.CancelledError:
+            # 클라이언트 연결 종료 등: 이미 슬롯을 넘겨받았으면 반환
+            if future.done():
+                self._release()
+            else:
+                self._remove(key, future)
+            raise
+
+        waited = time.monotonic() - start
+        self.admitted += 1
+        self._waited_admissions += 1
+        self._total_wait += waited
+        return waited
+
+    def _remove(self, key, future):
+        queue = self._waiters.get(key)
+        if queue is None:
+            return
+        try:
+            queue.remove(future)
+        except ValueError:
+            return
+        self._queued -= 1
+        if not queue:
+            del self._waiters[key]
+
+    def _release(self):
+        """슬롯 반환. 대기 중인 요청이 있으면 다음 클라이언트 키(round-robin)에게 슬롯을 그대로 넘김"""
+        while self._waiters:
+            key, queue = next(iter(self._waiters.items()))
+            future = queue.popleft()
+            self._queued -= 1
+            if queue:
+                self._waiters.move_to_end(key)
+            else:
+                del self._waiters[key]
+            if not future.done():
+                future.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "queue_timeout_s": self.queue_timeout,
+            "max_queue_per_client": self.max_queue_per_client,
+            "in_flight": self._in_flight,
+            "queue_depth": self._queued,
+            "queued_clients": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "queued_admissions": self._waited_admissions,
+            "avg_queue_wait_ms": round(self._total_wait / self._waited_admissions * 1000.0, 2) if self._waited_admissions else 0.0,
+        }
@@ -0,0 +1,108 @@
+"""
+다중 이미지 업로드(zip/tar 아카이브) 처리 유틸리티
+
+아카이브 전체를 메모리에 풀지 않고 멤버를 하나씩 읽어서 (이름, 바이트, 오류)로 넘겨줍니다.
+멤버 하나가 깨졌거나 너무 크면 그 항목만 오류로 넘기고 다음 멤버를 계속 읽습니다.
+"""
+
+import os
+import tarfile
+import zipfile
+import zlib
+
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz")
+ARCHIVE_CONTENT_TYPES = (
+    "application/zip",
+    "application/x-zip-compressed",
+    "application/x-tar",
+    "application/gzip",
+    "application/x-gzip",
+)
+
+# 아카이브 자체를 더 읽을 수 없는 오류 (목록/헤더 손상, 스트림 중간 잘림)
+ARCHIVE_ERRORS = (tarfile.TarError, zipfile.BadZipFile, EOFError, zlib.error)
+# 멤버 하나를 읽다가 나는 오류 (CRC 불일치, 압축 데이터 손상, 지원하지 않는 압축/암호화)
+MEMBER_ERRORS = ARCHIVE_ERRORS + (NotImplementedError, RuntimeError, OSError)
+
+
+def is_archive(filename, content_type) -> bool:
+    """업로드 파일이 zip/tar 아카이브인지 판단"""
+    name = (filename or "").lower()
+    if name.endswith(ARCHIVE_EXTENSIONS):
+        return True
+    return (content_type or "").lower() in ARCHIVE_CONTENT_TYPES
+
+
+def _skip_member(name: str) -> bool:
+    # macOS 메타데이터, 숨김 파일은 무시
+    base = os.path.basename(name)
+    return not base or base.startswith(".") or name.startswith("__MACOSX/")
+
+
+def _too_large(size: int, max_bytes: int):
+    if max_bytes and size > max_bytes:
+        return f"File exceeds the {max_bytes / 1024 / 1024:g}MB per-file limit"
+    return None
+
+
+def iter_archive_images(fileobj, max_files: int, max_bytes: int = 0):
+    """
+    아카이브 멤버를 순서대로 읽어서 (name, bytes, error)를 yield
+
+    멤버 하나를 읽지 못하거나 max_bytes를 넘으면 (name, None, 오류 메시지)를 yield하고 계속 진행
+    (압축 해제 전 헤더 크기로 판단하므로 zip bomb 멤버를 메모리에 풀지 않음)
+
+    Args:
+        fileobj: seek 가능한 아카이브 파일 객체 (UploadFile.file)
+        max_files: 최대 처리 파일 수 (초과분은 무시)
+        max_bytes: 멤버 하나의 최대 크기 (0이면 제한 없음)
+
+    Raises:
+        ARCHIVE_ERRORS: 아카이브 자체가 손상되어 더 읽을 수 없을 때
+    """
+    fileobj.seek(0)
+    count = 0
+
+    if zipfile.is_zipfile(fileobj):
+        fileobj.seek(0)
+        with zipfile.ZipFile(fileobj) as zf:
+            for info in zf.infolist():
+                if info.is_dir() or _skip_member(info.filename):
+                    continue
+                if count >= max_files:
+                    return
+                count += 1
+                error = _too_large(info.file_size, max_bytes)
+                if error:
+                    yield info.filename, None, error
+                    continue
+                try:
+                    data = zf.read(info)
+                except MEMBER_ERRORS as e:
+                    yield info.filename, None, f"Corrupt archive member: {type(e).__name__}"
+                    continue
+                yield info.filename, data, None
+        return
+
+    fileobj.seek(0)
+    # 'r|*' 스트림 모드: 멤버를 앞에서부터 순차적으로 읽음
+    with tarfile.open(fileobj=fileobj, mode="r|*") as tf:
+        for member in tf:
+            if not member.isfile() or _skip_member(member.name):
+                continue
+            if count >= max_files:
+                return
+            count += 1
+            error = _too_large(member.size, max_bytes)
+            if error:
+                # 스트림 모드라 다음 멤버로 넘어갈 때 건너뛴 데이터는 읽어서 버림 (메모리에 쌓지 않음)
+                yield member.name, None, error
+                continue
+            extracted = tf.extractfile(member)
+            try:
+                data = extracted.read() if extracted is not None else b""
+            except MEMBER_ERRORS as e:
+                # 스트림이 잘린 경우 다음 멤버를 읽을 때 ARCHIVE_ERRORS로 끝남
+                yield member.name, None, f"Corrupt archive member: {type(e).__name__}"
+                continue
+            yield member.name, data, None
@@ -0,0 +1,172 @@
+"""
+CPU 최적화 추론 백엔드 선택 (PyTorch / ONNX Runtime / OpenVINO)
+
+Lambda에는 GPU가 없으므로 best.pt를 ONNX 또는 OpenVINO로 export한 모델을 사용할 수 있게 합니다.
+export/compile은 한 번만 수행하고 EXPORT_DIR(/tmp/exports)에 캐시합니다.
+어떤 백엔드를 쓰든 Ultralytics YOLO 래퍼가 같은 Results 객체를 반환하므로 응답 스키마는 동일합니다.
+
+사용법 (Docker 빌드 시 미리 export 해두면 cold start에서 export 비용이 없음):
+    python backends.py export --backend onnx --model best.pt --export-dir ./exports
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("pytorch", "onnx", "openvino")
+
+# 백엔드별 필요한 추가 패키지 (requirements.txt에는 포함하지 않음)
+BACKEND_REQUIREMENTS = {
+    "onnx": ("onnxruntime",),
+    "openvino": ("openvino",),
+}
+
+
+def weights_digest(model_path: str) -> str:
+    """가중치 파일 sha256 (앞 12자리) - export 캐시 키로 사용"""
+    h = hashlib.sha256()
+    with open(model_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()[:12]
+
+
+def check_backend(backend: str):
+    """백엔드 이름과 필요한 패키지 설치 여부 확인"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}' (expected one of {', '.join(BACKENDS)})")
+    for package in BACKEND_REQUIREMENTS.get(backend, ()):
+        if importlib.util.find_spec(package) is None:
+            raise RuntimeError(
+                f"Inference backend '{backend}' requires the '{package}' package. "
+                f"Add it to requirements.txt or use INFERENCE_BACKEND=pytorch."
+            )
+
+
+def _artifact_name(model_path: str, backend: str) -> str:
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    if backend == "onnx":
+        return f"{stem}.onnx"
+    return f"{stem}_openvino_model"
+
+
+def export_cache_dir(model_path: str, backend: str, export_dir: str, imgsz: int) -> str:
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    return os.path.join(export_dir, f"{stem}-{weights_digest(model_path)}-{backend}-{imgsz}")
+
+
+def export_model(model_path: str, backend: str, export_dir: str, imgsz: int = 640, **export_kwargs) -> str:
+    """
+    best.pt를 backend 형식으로 export (이미 캐시되어 있으면 그대로 반환)
+
+    Lambda의 코드 디렉토리는 read-only이므로 가중치를 임시 디렉토리로 복사한 뒤 export하고,
+    완료된 결과만 캐시 디렉토리로 원자적으로 옮깁니다.
+
+    Returns:
+        YOLO()에 넘길 수 있는 export 결과 경로 (.onnx 파일 또는 OpenVINO 모델 디렉토리)
+    """
+    cache_dir = export_cache_dir(model_path, backend, export_dir, imgsz)
+    artifact = os.path.join(cache_dir, _artifact_name(model_path, backend))
+    if os.path.exists(artifact):
+        logger.info(f"Using cached {backend} export: {artifact}")
+        return artifact
+
+    from ultralytics import YOLO
+
+    os.makedirs(export_dir, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix="export-", dir=export_dir)
+    try:
+        local_weights = os.path.join(work_dir, os.path.basename(model_path))
+        shutil.copy2(model_path, local_weights)
+
+        logger.info(f"Exporting {model_path} to {backend} (imgsz={imgsz})...")
+        export_start = time.time()
+        # dynamic=True: 마이크로 배칭/배치 엔드포인트의 가변 배치 크기 지원
+        exported = YOLO(local_weights).export(
+            format=backend,
+            imgsz=imgsz,
+            dynamic=True,
+            **export_kwargs,
+        )
+        logger.info(f"Export to {backend} completed in {time.time() - export_start:.2f} seconds")
+
+        os.remove(local_weights)
+        try:
+            os.replace(work_dir, cache_dir)
+        except OSError:
+            # 다른 프로세스가 먼저 export를 끝낸 경우
+            if not os.path.exists(artifact):
+                raise
+        else:
+            work_dir = None
+        if not os.path.exists(artifact):
+            raise RuntimeError(f"Export finished but artifact not found: {exported}")
+        return artifact
+    finally:
+        if work_dir is not None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def check_precision(backend: str, precision: str):
+    """INT8 양자화 모델은 ONNX Runtime 백엔드에서만 지원"""
+    if precision == "fp32":
+        return
+    from quantize import PRECISIONS, check_quantization_available
+
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown model precision '{precision}' (expected one of {', '.join(PRECISIONS)})")
+    if backend != "onnx":
+        raise ValueError(f"MODEL_PRECISION={precision} requires INFERENCE_BACKEND=onnx (got '{backend}')")
+    check_quantization_available()
+
+
+def resolve_model_path(model_path: str, backend: str, export_dir: str, imgsz: int = 640, precision: str = "fp32") -> str:
+    """백엔드/정밀도에 맞는 모델 경로 반환 (pytorch이거나 이미 export된 파일이면 그대로)"""
+    check_backend(backend)
+    check_precision(backend, precision)
+    if backend == "pytorch" or not model_path.endswith(".pt"):
+        return model_path
+
+    exported = export_model(model_path, backend, export_dir, imgsz=imgsz)
+    if precision != "fp32":
+        from quantize import resolve_quantized_model
+        return resolve_quantized_model(exported, precision, imgsz=imgsz)
+    return exported
+
+
+def load_backend_model(model_path: str, backend: str, export_dir: str, imgsz: int = 640, precision: str = "fp32"):
+    """백엔드에 맞는 YOLO 모델 로딩"""
+    from ultralytics import YOLO
+
+    resolved = resolve_model_path(model_path, backend, export_dir, imgsz=imgsz, precision=precision)
+    # export된 모델은 task를 추론하지 못할 수 있으므로 segmentation 명시
+    return YOLO(resolved, task="segment")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export best.pt for CPU inference backends")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="export and cache a backend model")
+    export_parser.add_argument("--backend", choices=[b for b in BACKENDS if b != "pytorch"], required=True)
+    export_parser.add_argument("--model", default=os.environ.get("MODEL_PATH", "best.pt"))
+    export_parser.add_argument("--export-dir", default=os.environ.get("EXPORT_DIR", "/tmp/exports"))
+    export_parser.add_argument("--imgsz", type=int, default=int(os.environ.get("MODEL_IMGSZ", "640")))
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    check_backend(args.backend)
+    artifact = export_model(args.model, args.backend, args.export_dir, imgsz=args.imgsz)
+    print(artifact)
+
+
+if __name__ == "__main__":
+    main()
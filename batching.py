@@ -0,0 +1,175 @@
+"""
+동적 마이크로 배칭 스케줄러
+
+짧은 시간 안에 들어온 /detect-crack 요청들의 이미지를 모아서
+한 번의 배치 YOLO 호출로 실행하고, 이미지별 Results를 각 요청에 돌려줍니다.
+
+- 최대 배치 크기(max_batch_size) 또는 최대 대기 시간(max_wait_ms) 중 먼저 도달하는 쪽에서 실행
+- 트래픽이 없을 때(idle) 들어온 요청은 기다리지 않고 배치 크기 1로 바로 실행
+- 모델이 이전 배치를 실행하는 동안 쌓인 요청은 다음 배치로 즉시 묶임
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchTiming:
+    """요청 하나의 배치 처리 지연 시간 기록"""
+    queue_wait: float = 0.0   # 큐에 들어와서 배치 실행 시작까지 (초)
+    inference: float = 0.0    # 배치 모델 호출 시간 (초)
+    batch_size: int = 1
+
+
+@dataclass
+class _PendingRequest:
+    image: object
+    future: asyncio.Future
+    enqueued_at: float
+    idle: bool
+    timing: BatchTiming = field(default_factory=BatchTiming)
+
+
+class BatchScheduler:
+    """요청 단위 submit()을 배치 예측 호출로 묶어주는 스케줄러"""
+
+    def __init__(self, executor, predict_fn, max_batch_size: int = 8, max_wait_ms: float = 15.0):
+        """
+        Args:
+            executor: 배치 예측을 실행할 InferenceExecutor
+            predict_fn: 이미지 리스트를 받아 이미지별 결과 리스트를 반환하는 함수
+            max_batch_size: 한 번에 모델에 넣을 최대 이미지 수
+            max_wait_ms: 배치를 채우기 위해 기다리는 최대 시간 (ms)
+        """
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._executor = executor
+        self._predict_fn = predict_fn
+        self._queue = []
+        self._full = None
+        self._loop = None
+        self._drain_task = None
+        self._last_arrival = 0.0
+
+        # 통계
+        self._batches = 0
+        self._requests = 0
+        self._max_observed = 0
+        self._total_queue_wait = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    async def submit(self, image):
+        """
+        이미지 하나를 배치 큐에 넣고 해당 이미지의 결과를 기다림
+
+        Returns:
+            (result, BatchTiming)
+        """
+        loop = asyncio.get_running_loop()
+        now = time.perf_counter()
+
+        # 큐가 비어 있고 배치 실행 중도 아니며 최근 도착도 없으면 idle
+        idle = (
+            not self._queue
+            and self._drain_task is None
+            and (now - self._last_arrival) > self.max_wait
+        )
+        self._last_arrival = now
+
+        pending = _PendingRequest(
+            image=image,
+            future=loop.create_future(),
+            enqueued_at=now,
+            idle=idle,
+        )
+        self._queue.append(pending)
+
+        # Mangum/TestClient처럼 이벤트 루프가 바뀌는 환경 대응
+        if self._loop is not loop:
+            self._loop = loop
+            self._full = asyncio.Event()
+        if len(self._queue) >= self.max_batch_size:
+            self._full.set()
+
+        if self._drain_task is None:
+            self._drain_task = loop.create_task(self._drain())
+
+        result = await pending.future
+        return result, pending.timing
+
+    async def _drain(self):
+        try:
+            while self._queue:
+                head = self._queue[0]
+                if len(self._queue) < self.max_batch_size and not head.idle:
+                    # 동시 요청이 들어오는 중이면 가장 오래된 요청 기준 max_wait까지 모음
+                    remaining = self.max_wait - (time.perf_counter() - head.enqueued_at)
+                    if remaining > 0:
+                        self._full.clear()
+                        try:
+                            await asyncio.wait_for(self._full.wait(), timeout=remaining)
+                        except asyncio.TimeoutError:
+                            pass
+
+                batch = self._queue[:self.max_batch_size]
+                del self._queue[:self.max_batch_size]
+                await self._run_batch(batch)
+        finally:
+            self._drain_task = None
+
+    async def _run_batch(self, batch):
+        batch_start = time.perf_counter()
+        for pending in batch:
+            pending.timing.queue_wait = batch_start - pending.enqueued_at
+            pending.timing.batch_size = len(batch)
+
+        try:
+            results = await self._executor.submit(self._predict_fn, [p.image for p in batch])
+        except Exception as e:
+            logger.error(f"Batch inference failed (batch_size={len(batch)}): {str(e)}", exc_info=True)
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+
+        inference_time = time.perf_counter() - batch_start
+        logger.debug("Batch inference completed: batch_size=%d, took %.3fs", len(batch), inference_time)
+
+        self._batches += 1
+        self._requests += len(batch)
+        self._max_observed = max(self._max_observed, len(batch))
+
+        # 🔥 결과가 모자라면 남은 요청도 예외로 끝냄 (zip으로 버리면 핸들러가 영원히 대기)
+        results = list(results)
+        if len(results) != len(batch):
+            logger.error("Batch inference returned %d result(s) for batch_size=%d", len(results), len(batch))
+        for i, pending in enumerate(batch):
+            pending.timing.inference = inference_time
+            self._total_queue_wait += pending.timing.queue_wait
+            if pending.future.done():
+                continue
+            if i < len(results):
+                pending.future.set_result(results[i])
+            else:
+                pending.future.set_exception(RuntimeError(
+                    f"Batch inference returned no result for image {i + 1} of {len(batch)}"
+                ))
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "queue_depth": len(self._queue),
+            "batches": self._batches,
+            "requests": self._requests,
+            "avg_batch_size": round(self._requests / self._batches, 2) if self._batches else 0.0,
+            "max_observed_batch_size": self._max_observed,
+            "avg_queue_wait_ms": round(self._total_queue_wait / self._requests * 1000.0, 2) if self._requests else 0.0,
+        }
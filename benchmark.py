@@ -0,0 +1,322 @@
+"""
+탐지 파이프라인 오프라인 벤치마크 (in-process, main.app 직접 호출)
+
+서버를 띄우지 않고 ASGI로 main.app에 요청을 보내 업로드 → decode → 배치 추론 → 후처리 → 저장 전체를 측정합니다.
+여러 해상도 / crack 밀도의 합성 이미지를 만들고, 시나리오별 처리량과 p50/p95/p99,
+Server-Timing 헤더의 단계별 시간을 JSON으로 저장해 CI에서 기준(baseline)과 비교할 수 있습니다.
+
+--model stub 을 쓰면 가중치 없이 결정적인(deterministic) 마스크를 반환하는 stub 모델로
+후처리/인코딩/저장 성능만 추적할 수 있습니다.
+
+사용법:
+    python benchmark.py --model stub --output bench.json
+    python benchmark.py --model best.pt --resolutions 2016x1512,4032x3024 --densities 0,4 --concurrency 8
+    python benchmark.py --model stub --baseline bench_baseline.json --max-regression 0.2   # 회귀 시 exit code 1
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+
+class _Array:
+    """torch.Tensor 대신 .cpu().numpy()만 흉내 내는 래퍼 (stub 모델에 torch 불필요)"""
+
+    def __init__(self, data):
+        self.data = data
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.data
+
+    def __len__(self):
+        return len(self.data)
+
+
+class _Masks:
+    def __init__(self, data):
+        self.data = _Array(data)
+
+
+class _Boxes:
+    def __init__(self, conf):
+        self.conf = _Array(conf)
+
+
+class StubResult:
+    def __init__(self, masks, confidences, speed):
+        self.masks = _Masks(masks) if len(masks) else None
+        self.boxes = _Boxes(confidences)
+        self.speed = speed
+
+
+class StubSegModel:
+    """
+    YOLO segmentation 모델 대신 쓰는 결정적 stub
+
+    이미지마다 cracks_per_image 개의 얇은 polyline 마스크를 모델 입력(letterbox) 해상도로 반환.
+    같은 이미지 크기/설정이면 항상 같은 마스크를 만듦.
+    """
+
+    def __init__(self, cracks_per_image: int = 2, imgsz: int = 640, latency_ms: float = 0.0, seed: int = 0):
+        self.cracks_per_image = cracks_per_image
+        self.imgsz = imgsz
+        self.latency_ms = latency_ms
+        self.seed = seed
+
+    def _mask_shape(self, h, w):
+        r = self.imgsz / max(h, w)
+        return int(np.ceil(h * r / 32) * 32), int(np.ceil(w * r / 32) * 32)
+
+    def _predict_one(self, img):
+        h, w = img.shape[:2]
+        mh, mw = self._mask_shape(h, w)
+        rng = np.random.default_rng((self.seed, h, w, self.cracks_per_image))
+        masks = np.zeros((self.cracks_per_image, mh, mw), dtype=np.float32)
+        for i in range(self.cracks_per_image):
+            start = rng.integers([0, 0], [mw, mh])
+            pts = np.cumsum(rng.integers(-mh // 12, mh // 12 + 1, (10, 2)), axis=0) + start
+            pts = pts.clip([0, 0], [mw - 1, mh - 1]).astype(np.int32)
+            cv2.polylines(masks[i], [pts], False, 1.0, int(rng.integers(1, 4)))
+        confidences = np.round(rng.uniform(0.3, 0.95, self.cracks_per_image), 3).astype(np.float32)
+        return masks, confidences
+
+    def __call__(self, source, **kwargs):
+        images = source if isinstance(source, list) else [source]
+        start = time.perf_counter()
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms * len(images) / 1000.0)
+        outputs = [self._predict_one(img) for img in images]
+        per_image_ms = (time.perf_counter() - start) * 1000.0 / len(images)
+        speed = {"preprocess": 0.0, "inference": per_image_ms, "postprocess": 0.0}
+        return [StubResult(masks, conf, speed) for masks, conf in outputs]
+
+
+def synthetic_image(width: int, height: int, cracks: int, seed: int = 0) -> bytes:
+    """콘크리트 벽 비슷한 노이즈 배경 + 어두운 crack polyline JPEG"""
+    rng = np.random.default_rng((seed, width, height, cracks))
+    base = np.full((height, width, 3), int(rng.integers(110, 200)), dtype=np.int16)
+    noise = rng.integers(-20, 20, (height, width, 1), dtype=np.int16)
+    img = cv2.GaussianBlur((base + noise).clip(0, 255).astype(np.uint8), (5, 5), 0)
+    step = max(width, height) // 30
+    for _ in range(cracks):
+        start = rng.integers([0, 0], [width, height])
+        pts = (np.cumsum(rng.integers(-step, step + 1, (16, 2)), axis=0) + start).astype(np.int32)
+        cv2.polylines(img, [pts], False, (30, 30, 30), int(rng.integers(2, 6)))
+    ok, encoded = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 90])
+    return encoded.tobytes()
+
+
+def parse_server_timing(header: str) -> dict:
+    """'decode;dur=12.3, forward;dur=80.1' → {'decode': 12.3, 'forward': 80.1} (ms)"""
+    stages = {}
+    for entry in (header or "").split(","):
+        parts = [p.strip() for p in entry.split(";")]
+        for part in parts[1:]:
+            if part.startswith("dur="):
+                stages[parts[0]] = float(part[4:])
+    return stages
+
+
+def percentiles(values) -> dict:
+    if not values:
+        return {"mean": None, "p50": None, "p95": None, "p99": None}
+    arr = np.asarray(values, dtype=np.float64)
+    return {
+        "mean": round(float(arr.mean()), 2),
+        "p50": round(float(np.percentile(arr, 50)), 2),
+        "p95": round(float(np.percentile(arr, 95)), 2),
+        "p99": round(float(np.percentile(arr, 99)), 2),
+    }
+
+
+async def run_scenario(client, images, requests_count, concurrency, endpoint):
+    """images를 돌아가며 requests_count번 업로드 (동시 concurrency개). 지연 시간/단계별 시간 수집"""
+    latencies, stage_samples, failures = [], {}, 0
+    counter = iter(range(requests_count))
+    lock = asyncio.Lock()
+
+    async def worker():
+        nonlocal failures
+        while True:
+            async with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            data = images[i % len(images)]
+            start = time.perf_counter()
+            response = await client.post(endpoint, files={"file": (f"bench_{i}.jpg", data, "image/jpeg")})
+            latencies.append((time.perf_counter() - start) * 1000.0)
+            if response.status_code != 200:
+                failures += 1
+                continue
+            for stage, ms in parse_server_timing(response.headers.get("server-timing")).items():
+                stage_samples.setdefault(stage, []).append(ms)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_start
+    return {
+        "requests": requests_count,
+        "failures": failures,
+        "throughput_rps": round(requests_count / wall, 2) if wall > 0 else None,
+        "latency_ms": percentiles(latencies),
+        "stages_ms": {stage: percentiles(v) for stage, v in sorted(stage_samples.items())},
+    }
+
+
+def configure_environment(args):
+    """main import 전에 환경변수 설정 (결과 캐시는 꺼서 매 요청이 전체 파이프라인을 타게 함)"""
+    os.environ["SAVE_DIR"] = args.save_dir or tempfile.mkdtemp(prefix="bench-result-")
+    os.environ["RESULT_CACHE_ENABLED"] = "0"
+    if args.model != "stub":
+        os.environ["MODEL_PATH"] = args.model
+    if args.render_mode:
+        os.environ["RESULT_RENDER_MODE"] = args.render_mode
+
+
+async def run_benchmark(args) -> dict:
+    import httpx
+    import main
+
+    stub = None
+    if args.model == "stub":
+        stub = StubSegModel(imgsz=main.MODEL_IMGSZ, latency_ms=args.stub_latency_ms, seed=args.seed)
+        main.inference_executor.set_model(stub)
+
+    endpoint = "/detect-crack?tiled=true" if args.tiled else "/detect-crack"
+    transport = httpx.ASGITransport(app=main.app)
+    report = {
+        "model": args.model,
+        "backend": main.INFERENCE_BACKEND,
+        "precision": main.MODEL_PRECISION,
+        "tiled": args.tiled,
+        "render_mode": main.RESULT_RENDER_MODE,
+        "requests_per_scenario": args.requests,
+        "concurrency": args.concurrency,
+        "scenarios": {},
+    }
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        # cold start (모델 로딩 + 첫 호출) 는 시나리오와 분리해서 기록
+        cold_image = synthetic_image(*args.resolutions[0], args.densities[0], seed=args.seed)
+        start = time.perf_counter()
+        response = await client.post(endpoint, files={"file": ("cold.jpg", cold_image, "image/jpeg")})
+        report["cold_start_ms"] = round((time.perf_counter() - start) * 1000.0, 2)
+        if response.status_code != 200:
+            raise RuntimeError(f"Warm-up request failed: {response.status_code} {response.text}")
+
+        for width, height in args.resolutions:
+            for density in args.densities:
+                name = f"{width}x{height}-d{density}"
+                if stub is not None:
+                    stub.cracks_per_image = density
+                images = [
+                    synthetic_image(width, height, density, seed=args.seed + k)
+                    for k in range(args.images_per_scenario)
+                ]
+                result = await run_scenario(client, images, args.requests, args.concurrency, endpoint)
+                result["upload_kb"] = round(sum(len(b) for b in images) / len(images) / 1024, 1)
+                report["scenarios"][name] = result
+                lat = result["latency_ms"]
+                print(
+                    f"{name:<16} {result['throughput_rps']:>8.2f} {lat['p50']:>9.2f} {lat['p95']:>9.2f} "
+                    f"{lat['p99']:>9.2f} {result['failures']:>5}",
+                    flush=True,
+                )
+
+    main.result_store.flush()
+    return report
+
+
+def compare_to_baseline(report: dict, baseline: dict, max_regression: float, metric: str = "p95"):
+    """
+    시나리오별 latency 지표를 기준과 비교
+
+    Returns:
+        (비교 결과 dict, 회귀 메시지 리스트)
+    """
+    comparison, regressions = {}, []
+    for name, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        before, after = previous["latency_ms"].get(metric), current["latency_ms"].get(metric)
+        if not before or after is None:
+            continue
+        change = (after - before) / before
+        comparison[name] = {"metric": metric, "baseline_ms": before, "current_ms": after, "change": round(change, 4)}
+        if change > max_regression:
+            regressions.append(f"{name}: {metric} {before:.1f}ms -> {after:.1f}ms (+{change * 100:.1f}%)")
+    return comparison, regressions
+
+
+def parse_resolutions(value: str):
+    resolutions = []
+    for item in value.split(","):
+        width, height = item.lower().strip().split("x")
+        resolutions.append((int(width), int(height)))
+    return resolutions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process benchmark of the crack detection pipeline")
+    parser.add_argument("--model", default="stub", help="'stub' for the deterministic stub model, or a weights path (e.g. best.pt)")
+    parser.add_argument("--resolutions", default="640x480,2016x1512,4032x3024", type=parse_resolutions)
+    parser.add_argument("--densities", default="0,2,8", type=lambda v: [int(x) for x in v.split(",")], help="cracks per image")
+    parser.add_argument("--requests", type=int, default=30, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--images-per-scenario", type=int, default=3)
+    parser.add_argument("--tiled", action="store_true", help="benchmark /detect-crack?tiled=true")
+    parser.add_argument("--render-mode", choices=["eager", "lazy"], help="override RESULT_RENDER_MODE")
+    parser.add_argument("--stub-latency-ms", type=float, default=0.0, help="simulated forward time per image for the stub model")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save-dir", help="result image directory (default: a fresh temp dir)")
+    parser.add_argument("--output", help="write JSON report to this path")
+    parser.add_argument("--baseline", help="baseline JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed relative p95 increase vs baseline")
+    args = parser.parse_args()
+
+    configure_environment(args)
+    # main 모듈의 요청별 로그는 벤치마크 출력을 가리므로 경고 이상만 표시
+    logging.disable(logging.INFO)
+
+    header = f"{'scenario':<16} {'req/s':>8} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'fail':>5}"
+    print(header)
+    print("-" * len(header))
+    report = asyncio.run(run_benchmark(args))
+    print(f"\nCold start (first request): {report['cold_start_ms']:.1f} ms")
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        comparison, regressions = compare_to_baseline(report, baseline, args.max_regression)
+        report["baseline_comparison"] = comparison
+        if regressions:
+            print(f"❌ Latency regression vs {args.baseline}:")
+            for message in regressions:
+                print(f"   {message}")
+            exit_code = 1
+        else:
+            print(f"✅ No p95 regression above {args.max_regression * 100:.0f}% vs {args.baseline}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""
+체크인 ↔ 체크아웃 사진 비교 (ORB 특징 정렬 + crack 마스크 대조)
+
+체크아웃 사진은 한 번만 추론하고, 체크인 사진은 reference_index에 저장된 탐지 결과/마스크/특징점을 재사용합니다.
+
+1. 체크아웃 사진의 ORB 특징점을 참조와 매칭 (Lowe ratio test) → RANSAC homography (체크아웃 → 체크인 원본 좌표)
+   inlier가 부족하거나 변환이 비정상이면 이미지 크기 비율만 맞춘 변환으로 대체하고 aligned=false 표시
+2. 참조 crack 마스크를 체크아웃 마스크 해상도로 warp, 정렬 오차만큼(tolerance) 팽창
+3. 체크아웃 crack마다 참조 crack으로 설명되는 비율(overlap)로 분류
+   - overlap < min_overlap → new
+   - 참조 밖으로 뻗은 비율 ≥ growth_extension 또는 면적 비율 ≥ growth_ratio → grown
+   - 그 외 → unchanged
+   체크아웃 사진 안에 보이지만 대응하는 crack이 없는 참조 crack은 missing (수리/가림/미탐지)
+"""
+
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+from mask_encoding import rle_decode, rle_encode
+from postprocess import binarize_masks
+from reference_index import DESCRIPTOR_BYTES, Reference
+
+NEW = "new"
+GROWN = "grown"
+UNCHANGED = "unchanged"
+
+DEFAULT_MAX_FEATURES = 1000
+DEFAULT_MIN_INLIERS = 15
+DEFAULT_TOLERANCE = 0.01
+DEFAULT_MIN_OVERLAP = 0.3
+DEFAULT_GROWTH_RATIO = 1.5
+DEFAULT_GROWTH_EXTENSION = 0.25
+MATCH_RATIO = 0.75
+RANSAC_REPROJ_FRACTION = 0.005   # RANSAC 재투영 허용 오차 (참조 이미지 대각선 대비)
+
+
+def extract_features(image, scale_x: float = 1.0, scale_y: float = 1.0, max_features: int = DEFAULT_MAX_FEATURES):
+    """
+    BGR 이미지 → ORB keypoint(원본 좌표) / descriptor
+
+    scale_x/scale_y: 원본 좌표 / image 좌표 비율 (축소 디코딩된 이미지)
+
+    Returns:
+        ((N, 2) float32, (N, 32) uint8)
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    orb = cv2.ORB_create(nfeatures=max(1, int(max_features)))
+    keypoints, descriptors = orb.detectAndCompute(gray, None)
+    if descriptors is None or not keypoints:
+        return np.zeros((0, 2), dtype=np.float32), np.zeros((0, DESCRIPTOR_BYTES), dtype=np.uint8)
+    points = np.array([kp.pt for kp in keypoints], dtype=np.float32)
+    points *= np.array([scale_x, scale_y], dtype=np.float32)
+    return points, descriptors
+
+
+def build_reference(decoded, masks, detections, max_features: int = DEFAULT_MAX_FEATURES) -> Reference:
+    """
+    체크인 사진의 탐지 결과 → 인덱스에 저장할 Reference
+
+    Args:
+        decoded: DecodedImage
+        masks: (N, h, w) 모델 마스크 (탐지가 없으면 None)
+        detections: masks_to_detections() 결과 (det["index"]가 masks 순서)
+    """
+    keypoints, descriptors = extract_features(decoded.image, decoded.scale_x, decoded.scale_y, max_features)
+    cracks = []
+    if masks is not None and detections:
+        encoded = rle_encode(binarize_masks(np.asarray(masks)[[det["index"] for det in detections]]))
+        for det, rle in zip(detections, encoded):
+            cracks.append({
+                **{key: det[key] for key in ("x", "y", "width", "height", "area")},
+                "confidence": round(float(det["confidence"]), 4),
+                "rle": rle,
+            })
+    return Reference(
+        width=decoded.original_width,
+        height=decoded.original_height,
+        keypoints=keypoints,
+        descriptors=descriptors,
+        cracks=cracks,
+    )
+
+
+@dataclass
+class Alignment:
+    """체크아웃 원본 좌표 → 체크인 원본 좌표 변환"""
+    homography: np.ndarray
+    aligned: bool       # False면 특징 정렬 실패로 크기 비율만 맞춘 변환
+    matches: int = 0
+    inliers: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "aligned": self.aligned,
+            "matches": self.matches,
+            "inliers": self.inliers,
+            "homography": [[round(float(v), 6) for v in row] for row in self.homography],
+        }
+
+
+def scale_homography(src_size, dst_size) -> np.ndarray:
+    """(W, H) → (W, H) 크기 비율만 맞춘 변환 (정렬 실패 시 대체)"""
+    return np.diag([dst_size[0] / src_size[0], dst_size[1] / src_size[1], 1.0])
+
+
+def _plausible(homography, src_size, dst_size) -> bool:
+    """체크아웃 이미지 모서리가 볼록 사각형으로, 적당한 크기로 옮겨지는지 (퇴화/뒤집힌 변환 제외)"""
+    W, H = src_size
+    corners = np.array([[[0, 0]], [[W, 0]], [[W, H]], [[0, H]]], dtype=np.float32)
+    projected = cv2.perspectiveTransform(corners, homography)
+    if not np.isfinite(projected).all() or not cv2.isContourConvex(projected):
+        return False
+    area_ratio = cv2.contourArea(projected) / float(dst_size[0] * dst_size[1])
+    return 0.05 <= area_ratio <= 20.0
+
+
+def align(keypoints, descriptors, size, reference: Reference, min_inliers: int = DEFAULT_MIN_INLIERS) -> Alignment:
+    """
+    체크아웃 특징점(keypoints/descriptors, 원본 좌표)을 참조에 정렬
+
+    Args:
+        size: 체크아웃 원본 (W, H)
+    """
+    ref_size = (reference.width, reference.height)
+    fallback = Alignment(scale_homography(size, ref_size), aligned=False)
+    if len(descriptors) < 2 or len(reference.descriptors) < 2:
+        return fallback
+
+    pairs = cv2.BFMatcher(cv2.NORM_HAMMING).knnMatch(descriptors, reference.descriptors, k=2)
+    good = [p[0] for p in pairs if len(p) == 2 and p[0].distance < MATCH_RATIO * p[1].distance]
+    fallback.matches = len(good)
+    if len(good) < max(4, min_inliers):
+        return fallback
+
+    src = keypoints[[m.queryIdx for m in good]].reshape(-1, 1, 2)
+    dst = reference.keypoints[[m.trainIdx for m in good]].reshape(-1, 1, 2)
+    threshold = RANSAC_REPROJ_FRACTION * float(np.hypot(*ref_size))
+    homography, inlier_mask = cv2.findHomography(src, dst, cv2.RANSAC, max(threshold, 1.0))
+    inliers = int(inlier_mask.sum()) if inlier_mask is not None else 0
+    fallback.inliers = inliers
+    if homography is None or inliers < min_inliers or not _plausible(homography, size, ref_size):
+        return fallback
+    return Alignment(homography, aligned=True, matches=len(good), inliers=inliers)
+
+
+def _dilate(mask, radius: int):
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (2 * radius + 1, 2 * radius + 1))
+    return cv2.dilate(mask.astype(np.uint8), kernel) > 0
+
+
+def warp_reference_masks(reference: Reference, homography, size, mask_shape):
+    """
+    참조 crack 마스크 → 체크아웃 마스크 해상도 (K, h, w) bool
+
+    homography는 체크아웃 원본 좌표 → 참조 원본 좌표이므로 WARP_INVERSE_MAP으로 체크아웃 격자에서 샘플링
+    """
+    h, w = mask_shape
+    warped = np.zeros((len(reference.cracks), h, w), dtype=bool)
+    for k, crack in enumerate(reference.cracks):
+        ref_mask = rle_decode(crack["rle"])
+        ref_h, ref_w = ref_mask.shape
+        # 체크아웃 마스크 픽셀 → 체크아웃 원본 → 참조 원본 → 참조 마스크 픽셀
+        to_ref_mask = (
+            np.diag([ref_w / reference.width, ref_h / reference.height, 1.0])
+            @ homography
+            @ np.diag([size[0] / w, size[1] / h, 1.0])
+        )
+        warped[k] = cv2.warpPerspective(
+            ref_mask.astype(np.uint8), to_ref_mask, (w, h),
+            flags=cv2.INTER_NEAREST | cv2.WARP_INVERSE_MAP, borderValue=0,
+        ) > 0
+    return warped
+
+
+def compare_cracks(masks, detections, size, reference: Reference, homography,
+                   tolerance: float = DEFAULT_TOLERANCE, min_overlap: float = DEFAULT_MIN_OVERLAP,
+                   growth_ratio: float = DEFAULT_GROWTH_RATIO, growth_extension: float = DEFAULT_GROWTH_EXTENSION):
+    """
+    체크아웃 crack들을 참조 crack과 대조
+
+    Args:
+        masks: 체크아웃 (N, h, w) 모델 마스크 (탐지가 없으면 None)
+        detections: 체크아웃 masks_to_detections() 결과 (원본 좌표)
+        size: 체크아웃 원본 (W, H)
+        homography: align()의 체크아웃 → 참조 변환
+        tolerance: 정렬 오차 허용 반경 (마스크 대각선 대비 비율)
+
+    Returns:
+        dict: "new" / "grown" / "unchanged" (체크아웃 좌표 crack 목록),
+              "missing" (대응 crack이 없는 참조 crack, 참조 좌표), "out_of_view" (사진 밖 참조 crack 수)
+    """
+    result = {NEW: [], GROWN: [], UNCHANGED: [], "missing": [], "out_of_view": 0}
+    if masks is not None and len(masks):
+        mask_shape = np.asarray(masks).shape[1:]
+    elif reference.cracks:
+        mask_shape = tuple(reference.cracks[0]["rle"]["size"])
+    else:
+        return result
+
+    h, w = mask_shape
+    radius = max(1, int(round(tolerance * np.hypot(w, h))))
+    warped = warp_reference_masks(reference, homography, size, mask_shape)
+    warped_area = warped.reshape(len(warped), -1).sum(axis=1)
+    dilated = [_dilate(m, radius) if area else m for m, area in zip(warped, warped_area)]
+
+    new_union = np.zeros(mask_shape, dtype=bool)
+    if detections:
+        new_masks = binarize_masks(np.asarray(masks)[[det["index"] for det in detections]])
+        for det, mask in zip(detections, new_masks):
+            new_union |= mask
+            area = int(mask.sum())
+            hits = [k for k in range(len(dilated)) if warped_area[k] and (mask & dilated[k]).any()]
+            explained = (mask & np.logical_or.reduce([dilated[k] for k in hits])).sum() if hits else 0
+            overlap = explained / area if area else 0.0
+            growth = area / float(warped_area[hits].sum()) if hits else None
+            if overlap < min_overlap:
+                status = NEW
+            elif 1.0 - overlap >= growth_extension or growth >= growth_ratio:
+                status = GROWN
+            else:
+                status = UNCHANGED
+            result[status].append({
+                **{key: det[key] for key in ("x", "y", "width", "height", "area")},
+                "confidence": det["confidence"],
+                "overlap": round(float(overlap), 3),
+                "growth": round(growth, 3) if growth is not None else None,
+                "reference_cracks": hits,
+            })
+
+    covered = _dilate(new_union, radius) if new_union.any() else new_union
+    for k, crack in enumerate(reference.cracks):
+        if not warped_area[k]:
+            result["out_of_view"] += 1
+        elif (warped[k] & covered).sum() / warped_area[k] < min_overlap:
+            result["missing"].append({
+                "reference_crack": k,
+                **{key: crack[key] for key in ("x", "y", "width", "height", "area", "confidence")},
+            })
+    return result
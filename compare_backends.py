@@ -0,0 +1,233 @@
+"""
+추론 백엔드 비교 스크립트 (PyTorch / ONNX Runtime / OpenVINO)
+
+고정 이미지 세트에 대해 백엔드별 추론 지연 시간과, 기준 백엔드(첫 번째) 대비
+bounding box / 마스크 일치도를 측정합니다. 서비스와 같은 디코딩(decode_upload)과
+후처리(masks_to_detections)를 사용하므로 응답에 나가는 bbox 기준으로 비교됩니다.
+
+사용법:
+    python compare_backends.py --images ./samples --backends pytorch,onnx,openvino
+    python compare_backends.py --synthetic 20 --backends pytorch,onnx --output report.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("YOLO_VERBOSE", "False")
+os.environ.setdefault("YOLO_CONFIG_DIR", "/tmp/Ultralytics")
+
+import cv2
+import numpy as np
+
+from backends import BACKENDS, check_backend, load_backend_model
+from decode import decode_upload
+from postprocess import binarize_masks, masks_to_detections
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+def load_image_set(images_dir=None, synthetic=0, seed=0):
+    """
+    비교에 사용할 (이름, JPEG 바이트) 리스트
+
+    images_dir가 없으면 seed 고정 합성 crack 이미지를 생성 (항상 같은 세트)
+    """
+    items = []
+    if images_dir:
+        for path in sorted(glob.glob(os.path.join(images_dir, "*"))):
+            if path.lower().endswith(IMAGE_EXTENSIONS):
+                with open(path, "rb") as f:
+                    items.append((os.path.basename(path), f.read()))
+
+    rng = np.random.default_rng(seed)
+    for i in range(synthetic):
+        h, w = (1536, 2048) if i % 2 == 0 else (2048, 1536)
+        img = np.full((h, w, 3), rng.integers(110, 200), dtype=np.uint8)
+        img = cv2.GaussianBlur(
+            (img.astype(np.int16) + rng.integers(-20, 20, (h, w, 3))).clip(0, 255).astype(np.uint8), (5, 5), 0
+        )
+        for _ in range(int(rng.integers(1, 5))):
+            pts = np.cumsum(rng.integers(-40, 40, (12, 2)), axis=0) + [w // 2, h // 2]
+            cv2.polylines(img, [pts.astype(np.int32)], False, (30, 30, 30), int(rng.integers(2, 6)))
+        ok, encoded = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        items.append((f"synthetic_{i:03d}.jpg", encoded.tobytes()))
+    return items
+
+
+def run_detections(model, decoded, conf):
+    """모델 1회 실행 후 (detections, 이진화 마스크) 반환"""
+    results = model(decoded.image, save=False, verbose=False, conf=conf)
+    r = results[0]
+    if r.masks is None:
+        return [], np.zeros((0, 1, 1), dtype=bool)
+
+    masks = r.masks.data.cpu().numpy()
+    confidences = r.boxes.conf.cpu().numpy() if r.boxes is not None else np.zeros(len(masks))
+    detections = masks_to_detections(masks, confidences, decoded.original_width, decoded.original_height)
+    return detections, binarize_masks(masks)
+
+
+def bbox_iou(a, b) -> float:
+    ax2, ay2 = a["x"] + a["width"], a["y"] + a["height"]
+    bx2, by2 = b["x"] + b["width"], b["y"] + b["height"]
+    iw = max(0, min(ax2, bx2) - max(a["x"], b["x"]))
+    ih = max(0, min(ay2, by2) - max(a["y"], b["y"]))
+    inter = iw * ih
+    union = a["width"] * a["height"] + b["width"] * b["height"] - inter
+    return inter / union if union > 0 else float(a == b)
+
+
+def mask_iou(a, b) -> float:
+    if a.shape != b.shape:
+        b = cv2.resize(b.astype(np.uint8), (a.shape[1], a.shape[0]), interpolation=cv2.INTER_NEAREST).astype(bool)
+    union = np.logical_or(a, b).sum()
+    return float(np.logical_and(a, b).sum() / union) if union else 1.0
+
+
+def match_detections(reference, candidate, iou_threshold=0.5):
+    """
+    신뢰도 순 greedy bbox IoU 매칭
+
+    Returns:
+        [(ref_idx, cand_idx, bbox_iou), ...]
+    """
+    pairs = []
+    used = set()
+    ref_order = sorted(range(len(reference)), key=lambda i: -reference[i]["confidence"])
+    for ri in ref_order:
+        best, best_iou = None, iou_threshold
+        for ci, cand in enumerate(candidate):
+            if ci in used:
+                continue
+            iou = bbox_iou(reference[ri], cand)
+            if iou >= best_iou:
+                best, best_iou = ci, iou
+        if best is not None:
+            used.add(best)
+            pairs.append((ri, best, best_iou))
+    return pairs
+
+
+def agreement(reference_runs, candidate_runs, iou_threshold=0.5) -> dict:
+    """
+    기준 결과 대비 일치도 (이미지별 [(detections, masks), ...] 리스트 두 개)
+
+    recall: 기준 탐지 중 후보에서도 찾은 비율 (crack recall 유지 여부)
+    precision: 후보 탐지 중 기준과 일치하는 비율
+    """
+    matched = ref_total = cand_total = 0
+    bbox_ious, mask_ious = [], []
+    for (ref_dets, ref_masks), (cand_dets, cand_masks) in zip(reference_runs, candidate_runs):
+        pairs = match_detections(ref_dets, cand_dets, iou_threshold)
+        matched += len(pairs)
+        ref_total += len(ref_dets)
+        cand_total += len(cand_dets)
+        for ri, ci, iou in pairs:
+            bbox_ious.append(iou)
+            mask_ious.append(mask_iou(ref_masks[ref_dets[ri]["index"]], cand_masks[cand_dets[ci]["index"]]))
+
+    recall = matched / ref_total if ref_total else 1.0
+    precision = matched / cand_total if cand_total else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if (precision + recall) else 0.0
+    return {
+        "reference_detections": ref_total,
+        "candidate_detections": cand_total,
+        "matched": matched,
+        "recall": round(recall, 4),
+        "precision": round(precision, 4),
+        "f1": round(f1, 4),
+        "mean_bbox_iou": round(float(np.mean(bbox_ious)), 4) if bbox_ious else None,
+        "mean_mask_iou": round(float(np.mean(mask_ious)), 4) if mask_ious else None,
+    }
+
+
+def latency_summary(latencies) -> dict:
+    arr = np.asarray(latencies) * 1000.0
+    return {
+        "mean_ms": round(float(arr.mean()), 2),
+        "p50_ms": round(float(np.percentile(arr, 50)), 2),
+        "p95_ms": round(float(np.percentile(arr, 95)), 2),
+    }
+
+
+def benchmark_model(model, images, runs, conf, target_size):
+    """이미지 세트에 대해 (이미지별 결과, 추론 지연 시간 리스트) 측정"""
+    decoded_images = [decode_upload(data, target_size=target_size) for _, data in images]
+    # warm-up (첫 호출의 초기화 비용 제외)
+    run_detections(model, decoded_images[0], conf)
+
+    outputs, latencies = [], []
+    for decoded in decoded_images:
+        for _ in range(runs):
+            start = time.perf_counter()
+            output = run_detections(model, decoded, conf)
+            latencies.append(time.perf_counter() - start)
+        outputs.append(output)
+    return outputs, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare inference backends for best.pt")
+    parser.add_argument("--model", default=os.environ.get("MODEL_PATH", "best.pt"))
+    parser.add_argument("--backends", default="pytorch,onnx", help=f"comma separated, first one is the reference ({', '.join(BACKENDS)})")
+    parser.add_argument("--images", help="directory with sample images")
+    parser.add_argument("--synthetic", type=int, default=0, help="number of seeded synthetic images to add")
+    parser.add_argument("--runs", type=int, default=3, help="timed runs per image")
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--iou-threshold", type=float, default=0.5)
+    parser.add_argument("--imgsz", type=int, default=int(os.environ.get("MODEL_IMGSZ", "640")))
+    parser.add_argument("--export-dir", default=os.environ.get("EXPORT_DIR", "/tmp/exports"))
+    parser.add_argument("--output", help="write JSON report to this path")
+    args = parser.parse_args()
+
+    backends = [b.strip().lower() for b in args.backends.split(",") if b.strip()]
+    for backend in backends:
+        check_backend(backend)
+
+    images = load_image_set(args.images, args.synthetic if (args.images or args.synthetic) else 10)
+    if not images:
+        print("No images found", file=sys.stderr)
+        return 1
+
+    print(f"Comparing {', '.join(backends)} on {len(images)} image(s), {args.runs} run(s) each\n")
+
+    report = {"model": args.model, "images": len(images), "runs": args.runs, "backends": {}}
+    reference_outputs = None
+    for backend in backends:
+        load_start = time.perf_counter()
+        model = load_backend_model(args.model, backend, args.export_dir, imgsz=args.imgsz)
+        load_time = time.perf_counter() - load_start
+
+        outputs, latencies = benchmark_model(model, images, args.runs, args.conf, args.imgsz)
+        entry = {"load_s": round(load_time, 2), **latency_summary(latencies)}
+        if reference_outputs is None:
+            reference_outputs = outputs
+            entry["agreement"] = None
+        else:
+            entry["agreement"] = agreement(reference_outputs, outputs, args.iou_threshold)
+        report["backends"][backend] = entry
+
+    header = f"{'backend':<10} {'load(s)':>8} {'mean(ms)':>9} {'p50(ms)':>8} {'p95(ms)':>8} {'recall':>7} {'prec':>6} {'bboxIoU':>8} {'maskIoU':>8}"
+    print(header)
+    print("-" * len(header))
+    for backend, entry in report["backends"].items():
+        agr = entry["agreement"] or {}
+        fmt = lambda v: "ref" if not agr else ("-" if v is None else f"{v:.3f}")
+        print(
+            f"{backend:<10} {entry['load_s']:>8.2f} {entry['mean_ms']:>9.2f} {entry['p50_ms']:>8.2f} {entry['p95_ms']:>8.2f} "
+            f"{fmt(agr.get('recall')):>7} {fmt(agr.get('precision')):>6} {fmt(agr.get('mean_bbox_iou')):>8} {fmt(agr.get('mean_mask_iou')):>8}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,378 @@
+"""
+컨테이너 CPU 할당량 감지 + torch / OpenMP / OpenCV 스레드 수 설정
+
+torch, OpenMP(MKL/OpenBLAS), OpenCV는 각자 호스트 CPU 수만큼 스레드를 만들기 때문에
+Lambda(예: 3GB ≈ 2 vCPU)나 cgroup으로 제한된 컨테이너에서는 서로 CPU를 빼앗으며 느려집니다.
+
+- detect_cpu_quota(): sched_getaffinity, cgroup v2(cpu.max) / v1(cfs_quota_us), AWS_LAMBDA_FUNCTION_MEMORY_SIZE 중 가장 작은 값
+- resolve_thread_settings(): 환경 변수(TORCH_NUM_THREADS 등) > 튜닝 파일(THREAD_TUNING_PATH) > 할당량 기준 자동값
+- configure_threads(): OMP/MKL/OpenBLAS 환경 변수 + cv2.setNumThreads (numpy/torch import 전에 호출해야 환경 변수가 적용됨)
+- apply_torch_threads(): torch intra-op / inter-op 스레드 수 (모델 로딩 직전)
+
+튜닝:
+    python cpu_tuning.py tune --model best.pt --output thread_tuning.json
+조합마다 별도 프로세스에서 (torch inter-op 스레드 수는 프로세스당 한 번만 설정 가능)
+디코딩 + 추론 시간을 재고 가장 빠른 설정을 파일로 저장합니다. 서비스는 부팅 시 이 파일을 읽습니다
+(튜닝한 CPU 할당량과 현재 할당량이 다르면 무시하고 자동값 사용).
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import math
+import os
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+
+logger = logging.getLogger(__name__)
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+# Lambda: 메모리 1,769MB당 vCPU 1개 (최대 6 vCPU)
+LAMBDA_MB_PER_VCPU = 1769
+LAMBDA_MAX_VCPUS = 6
+OBJECTIVES = ("latency", "throughput")
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+
+@dataclass
+class CpuQuota:
+    cpus: float        # 사용할 수 있는 CPU (소수 가능, 예: 1.69)
+    threads: int       # 스레드 수 기준 (cpus 반올림, 최소 1)
+    source: str        # 가장 작은 값을 준 출처: affinity / cgroup / lambda
+    host_cpus: int     # os.cpu_count()
+
+
+@dataclass
+class ThreadSettings:
+    torch_threads: int
+    torch_interop_threads: int
+    cv2_threads: int
+    source: str = "auto"     # auto / tuned / env
+
+    def split(self, processes: int) -> "ThreadSettings":
+        """모델 프로세스 여러 개가 할당량을 나눠 쓸 때 프로세스당 설정"""
+        processes = max(1, int(processes))
+        return ThreadSettings(
+            torch_threads=max(1, self.torch_threads // processes),
+            torch_interop_threads=self.torch_interop_threads,
+            cv2_threads=max(1, self.cv2_threads // processes),
+            source=self.source,
+        )
+
+
+def _read(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_limit(root: str = CGROUP_ROOT):
+    """cgroup CPU 할당량 (CPU 수, 제한 없으면 None)"""
+    # cgroup v2: "<quota> <period>" 또는 "max <period>"
+    value = _read(os.path.join(root, "cpu.max"))
+    if value:
+        quota, _, period = value.partition(" ")
+        if quota != "max" and period:
+            return int(quota) / int(period)
+        return None
+    # cgroup v1: quota -1이면 제한 없음
+    for directory in ("cpu", "cpu,cpuacct"):
+        quota = _read(os.path.join(root, directory, "cpu.cfs_quota_us"))
+        period = _read(os.path.join(root, directory, "cpu.cfs_period_us"))
+        if quota and period:
+            return int(quota) / int(period) if int(quota) > 0 else None
+    return None
+
+
+def lambda_cpu_limit(env=None):
+    """AWS_LAMBDA_FUNCTION_MEMORY_SIZE(MB) → vCPU 수 (Lambda가 아니면 None)"""
+    env = os.environ if env is None else env
+    memory_mb = env.get("AWS_LAMBDA_FUNCTION_MEMORY_SIZE")
+    if not memory_mb:
+        return None
+    return min(LAMBDA_MAX_VCPUS, max(int(memory_mb), 128) / LAMBDA_MB_PER_VCPU)
+
+
+def affinity_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def detect_cpu_quota(cgroup_root: str = CGROUP_ROOT, env=None) -> CpuQuota:
+    """affinity / cgroup / Lambda 메모리 기준 CPU 수 중 가장 작은 값"""
+    candidates = [(float(affinity_cpus()), "affinity")]
+    for source, limit in (("cgroup", cgroup_cpu_limit(cgroup_root)), ("lambda", lambda_cpu_limit(env))):
+        if limit is not None and limit > 0:
+            candidates.append((limit, source))
+    cpus, source = min(candidates, key=lambda c: c[0])
+    return CpuQuota(
+        cpus=round(cpus, 3),
+        threads=max(1, int(math.floor(cpus + 0.5))),
+        source=source,
+        host_cpus=os.cpu_count() or 1,
+    )
+
+
+def auto_thread_settings(quota: CpuQuota) -> ThreadSettings:
+    """할당량 기준 기본값: torch는 할당량만큼, inter-op은 1 (요청 병렬성은 배치/executor가 담당)"""
+    return ThreadSettings(torch_threads=quota.threads, torch_interop_threads=1, cv2_threads=quota.threads)
+
+
+def load_tuning(path: str, quota: CpuQuota):
+    """
+    튜닝 파일의 설정 (없거나 다른 CPU 할당량에서 튜닝한 파일이면 None)
+    """
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        tuning = json.load(f)
+    if tuning.get("threads") != quota.threads:
+        logger.warning(
+            f"Ignoring {path}: tuned for {tuning.get('threads')} thread(s), current CPU quota is {quota.threads}"
+        )
+        return None
+    return ThreadSettings(**{**tuning["settings"], "source": "tuned"})
+
+
+def resolve_thread_settings(tuning_path: str = None, env=None, cgroup_root: str = CGROUP_ROOT):
+    """
+    Returns:
+        (CpuQuota, ThreadSettings) - 환경 변수 > 튜닝 파일 > 자동값 (항목별로 환경 변수가 우선)
+    """
+    env = os.environ if env is None else env
+    quota = detect_cpu_quota(cgroup_root, env)
+    if tuning_path is None:
+        tuning_path = env.get("THREAD_TUNING_PATH", "thread_tuning.json")
+    settings = load_tuning(tuning_path, quota) or auto_thread_settings(quota)
+
+    overrides = {
+        field: int(env[name])
+        for field, name in (
+            ("torch_threads", "TORCH_NUM_THREADS"),
+            ("torch_interop_threads", "TORCH_INTEROP_THREADS"),
+            ("cv2_threads", "CV2_NUM_THREADS"),
+        )
+        if env.get(name)
+    }
+    if overrides:
+        settings = ThreadSettings(**{**asdict(settings), **overrides, "source": "env"})
+    return quota, settings
+
+
+def configure_threads(settings: ThreadSettings):
+    """
+    OpenMP/MKL/OpenBLAS 환경 변수와 OpenCV 스레드 수 설정
+
+    🔥 OMP 계열 환경 변수는 라이브러리가 처음 import될 때 읽히므로 numpy/torch import 전에 호출
+    (이미 설정된 환경 변수는 그대로 둠)
+    """
+    for name in THREAD_ENV_VARS:
+        os.environ.setdefault(name, str(settings.torch_threads))
+    import cv2
+
+    cv2.setNumThreads(settings.cv2_threads)
+
+
+def apply_torch_threads(settings: ThreadSettings):
+    """torch intra-op / inter-op 스레드 수 (inter-op은 병렬 작업이 시작되기 전에만 변경 가능)"""
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(settings.torch_threads)
+    if torch.get_num_interop_threads() != settings.torch_interop_threads:
+        try:
+            torch.set_num_interop_threads(settings.torch_interop_threads)
+        except RuntimeError as e:
+            logger.warning(f"Could not set torch inter-op threads: {e}")
+
+
+def load_model_with_threads(settings: ThreadSettings, loader):
+    """설정을 적용한 뒤 모델 로딩 (spawn된 모델 프로세스용, pickle 가능)"""
+    configure_threads(settings)
+    apply_torch_threads(settings)
+    return loader()
+
+
+def candidate_settings(quota: CpuQuota):
+    """튜닝에서 비교할 조합 (할당량을 넘는 스레드 수는 제외)"""
+    threads = quota.threads
+    torch_threads = sorted({1, max(1, threads // 2), threads} | ({threads - 1} if threads > 2 else set()))
+    interop = (1, 2) if threads > 1 else (1,)
+    cv2_threads = sorted({1, threads})
+    return [
+        ThreadSettings(t, i, c, source="tuned")
+        for t, i, c in itertools.product(torch_threads, interop, cv2_threads)
+    ]
+
+
+def best_setting(measurements, objective: str = "latency"):
+    """측정 결과 중 objective 기준 가장 빠른 항목 (실패한 조합 제외)"""
+    key = "latency_ms" if objective == "latency" else "throughput_ms_per_image"
+    valid = [m for m in measurements if m.get(key) is not None]
+    return min(valid, key=lambda m: m[key]) if valid else None
+
+
+def _sample_images(path: str, count: int):
+    if path:
+        names = sorted(n for n in os.listdir(path) if n.lower().endswith((".jpg", ".jpeg", ".png")))[:count]
+        images = []
+        for name in names:
+            with open(os.path.join(path, name), "rb") as f:
+                images.append(f.read())
+        return images
+    from benchmark import synthetic_image
+
+    return [synthetic_image(2016, 1512, 3, seed=i) for i in range(count)]
+
+
+def measure(args):
+    """(하위 프로세스) 설정 하나로 디코딩 + 추론 시간 측정 후 JSON 한 줄 출력"""
+    settings = ThreadSettings(args.torch_threads, args.torch_interop_threads, args.cv2_threads, source="tuned")
+    configure_threads(settings)
+    apply_torch_threads(settings)
+    from backends import load_backend_model
+    from decode import decode_upload
+
+    model = load_backend_model(args.model, args.backend, args.export_dir, imgsz=args.imgsz)
+    images = _sample_images(args.images, max(args.batch_size, 1))
+
+    def run(batch):
+        start = time.perf_counter()
+        frames = [decode_upload(data, target_size=args.imgsz).image for data in batch]
+        model(frames, imgsz=args.imgsz, save=False, verbose=False)
+        return time.perf_counter() - start
+
+    run(images[:1])   # warm-up
+    latency = [run(images[i % len(images):i % len(images) + 1]) for i in range(args.repeats)]
+    batch = images[:args.batch_size]
+    run(batch)
+    throughput = [run(batch) / len(batch) for _ in range(max(1, args.repeats // 2))]
+    print(json.dumps({
+        **asdict(settings),
+        "latency_ms": round(statistics.median(latency) * 1000, 2),
+        "throughput_ms_per_image": round(statistics.median(throughput) * 1000, 2),
+    }))
+    return 0
+
+
+def tune(args):
+    quota = detect_cpu_quota()
+    candidates = candidate_settings(quota)
+    print(
+        f"CPU quota: {quota.cpus} ({quota.source}, host {quota.host_cpus}) -> {quota.threads} thread(s), "
+        f"{len(candidates)} combination(s)\n"
+    )
+    header = f"{'torch':>6} {'interop':>8} {'cv2':>5} {'latency(ms)':>12} {'batch(ms/img)':>14}"
+    print(header)
+    print("-" * len(header))
+
+    measurements = []
+    for settings in candidates:
+        command = [
+            sys.executable, os.path.abspath(__file__), "measure",
+            "--model", args.model, "--backend", args.backend, "--export-dir", args.export_dir,
+            "--imgsz", str(args.imgsz), "--batch-size", str(args.batch_size), "--repeats", str(args.repeats),
+            "--torch-threads", str(settings.torch_threads),
+            "--torch-interop-threads", str(settings.torch_interop_threads),
+            "--cv2-threads", str(settings.cv2_threads),
+        ]
+        if args.images:
+            command += ["--images", args.images]
+        # 하위 프로세스의 OMP 계열 스레드 수도 조합에 맞춤 (부모 환경 변수를 물려받지 않도록)
+        env = {**os.environ, **{name: str(settings.torch_threads) for name in THREAD_ENV_VARS}}
+        completed = subprocess.run(command, capture_output=True, text=True, env=env)
+        lines = completed.stdout.strip().splitlines()
+        if completed.returncode != 0 or not lines:
+            print(f"  {asdict(settings)} failed: {completed.stderr.strip().splitlines()[-1:]}", file=sys.stderr)
+            continue
+        result = json.loads(lines[-1])
+        measurements.append(result)
+        print(
+            f"{result['torch_threads']:>6} {result['torch_interop_threads']:>8} {result['cv2_threads']:>5} "
+            f"{result['latency_ms']:>12.1f} {result['throughput_ms_per_image']:>14.1f}"
+        )
+
+    best = best_setting(measurements, args.objective)
+    if best is None:
+        print("\nNo combination could be measured")
+        return 1
+    auto = auto_thread_settings(quota)
+    baseline = next(
+        (m for m in measurements
+         if (m["torch_threads"], m["torch_interop_threads"], m["cv2_threads"])
+         == (auto.torch_threads, auto.torch_interop_threads, auto.cv2_threads)),
+        None,
+    )
+    settings = {key: best[key] for key in ("torch_threads", "torch_interop_threads", "cv2_threads")}
+    print(f"\nBest ({args.objective}): {settings}" + (
+        f" vs auto {baseline['latency_ms']:.1f}ms / {baseline['throughput_ms_per_image']:.1f}ms per image"
+        if baseline else ""
+    ))
+
+    tuning = {
+        "threads": quota.threads,
+        "cpus": quota.cpus,
+        "objective": args.objective,
+        "settings": settings,
+        "model": args.model,
+        "backend": args.backend,
+        "imgsz": args.imgsz,
+        "created_at": time.time(),
+        "measurements": measurements,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(tuning, f, indent=2)
+    print(f"Tuning written to {args.output} (loaded at boot via THREAD_TUNING_PATH)")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU thread tuning for the inference service")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_model_args(sub):
+        sub.add_argument("--model", default=os.environ.get("MODEL_PATH", "best.pt"))
+        sub.add_argument("--backend", default=os.environ.get("INFERENCE_BACKEND", "pytorch"))
+        sub.add_argument("--export-dir", default=os.environ.get("EXPORT_DIR", "/tmp/exports"))
+        sub.add_argument("--imgsz", type=int, default=int(os.environ.get("MODEL_IMGSZ", "640")))
+        sub.add_argument("--images", help="folder of sample images (default: synthetic 3MP images)")
+        sub.add_argument("--batch-size", type=int, default=int(os.environ.get("BATCH_MAX_SIZE", "8")))
+        sub.add_argument("--repeats", type=int, default=6)
+
+    subparsers.add_parser("detect", help="print detected CPU quota and the settings that would be applied")
+    tune_parser = subparsers.add_parser("tune", help="sweep thread settings and write the fastest to a file")
+    add_model_args(tune_parser)
+    tune_parser.add_argument("--objective", choices=OBJECTIVES, default="latency",
+                             help="latency: single image, throughput: per image in a full batch")
+    tune_parser.add_argument("--output", default=os.environ.get("THREAD_TUNING_PATH", "thread_tuning.json"))
+    measure_parser = subparsers.add_parser("measure", help=argparse.SUPPRESS)
+    add_model_args(measure_parser)
+    measure_parser.add_argument("--torch-threads", type=int, required=True)
+    measure_parser.add_argument("--torch-interop-threads", type=int, required=True)
+    measure_parser.add_argument("--cv2-threads", type=int, required=True)
+    args = parser.parse_args()
+
+    os.environ.setdefault("YOLO_VERBOSE", "False")
+    os.environ.setdefault("YOLO_CONFIG_DIR", "/tmp/Ultralytics")
+    if args.command == "detect":
+        quota, settings = resolve_thread_settings()
+        print(json.dumps({"quota": asdict(quota), "settings": asdict(settings)}, indent=2))
+        return 0
+    if args.command == "tune":
+        return tune(args)
+    if args.command == "measure":
+        return measure(args)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
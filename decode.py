@@ -0,0 +1,189 @@
+"""
+업로드 이미지 디코딩
+
+YOLO는 입력을 어차피 모델 입력 크기(640px)로 줄이므로, 큰 JPEG는 헤더에서 크기만 읽고
+IMREAD_REDUCED_COLOR_2/4/8 (libjpeg DCT 단계 축소)로 필요한 만큼만 디코딩합니다.
+12MP 사진 기준 디코딩 픽셀 수가 1/4~1/16로 줄어듭니다.
+
+- EXIF orientation은 cv2.imdecode가 적용하므로, 원본 크기도 회전 후 기준으로 계산
+- bounding box는 항상 원본(회전 적용된 전체 해상도) 좌표로 보고해야 하므로
+  DecodedImage에 원본 크기를 함께 보관
+"""
+
+import struct
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+# 축소 배율별 imdecode 플래그
+REDUCED_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+# SOF 마커 (DHT/JPG/DAC 제외)
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+@dataclass
+class JpegHeader:
+    width: int
+    height: int
+    orientation: int = 1
+
+    @property
+    def oriented_size(self):
+        """EXIF orientation 적용 후 (width, height)"""
+        if self.orientation in (5, 6, 7, 8):
+            return self.height, self.width
+        return self.width, self.height
+
+
+@dataclass
+class DecodedImage:
+    image: np.ndarray        # 디코딩된 BGR 이미지 (축소되었을 수 있음)
+    original_width: int      # 원본 이미지 너비 (EXIF 회전 적용 후)
+    original_height: int     # 원본 이미지 높이 (EXIF 회전 적용 후)
+    reduction: int = 1       # 디코딩 축소 배율 (1, 2, 4, 8)
+
+    @property
+    def scale_x(self) -> float:
+        """디코딩 이미지 좌표 → 원본 좌표 배율"""
+        return self.original_width / self.image.shape[1]
+
+    @property
+    def scale_y(self) -> float:
+        return self.original_height / self.image.shape[0]
+
+
+def _parse_exif_orientation(segment: bytes) -> int:
+    """APP1 Exif 세그먼트에서 orientation(0x0112) 태그 값 추출"""
+    if not segment.startswith(b"Exif\x00\x00"):
+        return 1
+    tiff = segment[6:]
+    if len(tiff) < 8:
+        return 1
+
+    if tiff[:2] == b"II":
+        endian = "<"
+    elif tiff[:2] == b"MM":
+        endian = ">"
+    else:
+        return 1
+
+    ifd_offset = struct.unpack(endian + "I", tiff[4:8])[0]
+    if ifd_offset + 2 > len(tiff):
+        return 1
+    entry_count = struct.unpack(endian + "H", tiff[ifd_offset:ifd_offset + 2])[0]
+
+    for i in range(entry_count):
+        entry = ifd_offset + 2 + i * 12
+        if entry + 12 > len(tiff):
+            break
+        tag, field_type = struct.unpack(endian + "HH", tiff[entry:entry + 4])
+        if tag == 0x0112 and field_type == 3:   # SHORT
+            value = struct.unpack(endian + "H", tiff[entry + 8:entry + 10])[0]
+            return value if 1 <= value <= 8 else 1
+    return 1
+
+
+def read_jpeg_header(data: bytes):
+    """
+    JPEG 헤더에서 크기와 EXIF orientation만 읽음 (픽셀 디코딩 없음)
+
+    Returns:
+        JpegHeader 또는 JPEG가 아니거나 파싱 실패 시 None
+    """
+    if len(data) < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+
+    orientation = 1
+    pos = 2
+    size = len(data)
+    while pos + 4 <= size:
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        # 패딩 0xFF
+        if marker == 0xFF:
+            pos += 1
+            continue
+        # 길이 필드가 없는 마커
+        if marker in (0x01,) or 0xD0 <= marker <= 0xD7:
+            pos += 2
+            continue
+        # SOS 이후는 엔트로피 코딩 데이터 → SOF를 못 찾았으면 실패
+        if marker == 0xDA:
+            return None
+
+        length = struct.unpack(">H", data[pos + 2:pos + 4])[0]
+        segment_start = pos + 4
+        segment_end = pos + 2 + length
+        if length < 2 or segment_end > size:
+            return None
+
+        if marker == 0xE1:
+            orientation = _parse_exif_orientation(data[segment_start:segment_end])
+        elif marker in _SOF_MARKERS:
+            if length < 7:
+                return None
+            height, width = struct.unpack(">HH", data[segment_start + 1:segment_start + 5])
+            if width == 0 or height == 0:
+                return None
+            return JpegHeader(width=width, height=height, orientation=orientation)
+
+        pos = segment_end
+    return None
+
+
+def choose_reduction(width: int, height: int, target_size: int) -> int:
+    """
+    디코딩 후 긴 변이 target_size 이상 유지되는 가장 큰 축소 배율 선택
+
+    target_size가 0 이하이면 축소하지 않음
+    """
+    if target_size <= 0:
+        return 1
+    long_side = max(width, height)
+    for factor in (8, 4, 2):
+        if long_side // factor >= target_size:
+            return factor
+    return 1
+
+
+def decode_upload(contents: bytes, target_size: int = 640):
+    """
+    업로드 바이트를 디코딩. JPEG이면 target_size 기준으로 축소 디코딩.
+
+    Returns:
+        DecodedImage 또는 디코딩 실패 시 None
+    """
+    nparr = np.frombuffer(contents, np.uint8)
+    header = read_jpeg_header(contents)
+
+    reduction = 1
+    if header is not None:
+        reduction = choose_reduction(header.width, header.height, target_size)
+
+    img = cv2.imdecode(nparr, REDUCED_FLAGS[reduction])
+    if img is None:
+        return None
+
+    if header is not None and reduction > 1:
+        original_width, original_height = header.oriented_size
+        # EXIF 회전이 실제로 적용되지 않은 경우(비정상 EXIF 등) 디코딩 결과 방향을 따름
+        img_h, img_w = img.shape[:2]
+        if (img_w > img_h) != (original_width > original_height) and original_width != original_height:
+            original_width, original_height = original_height, original_width
+    else:
+        original_height, original_width = img.shape[:2]
+
+    return DecodedImage(
+        image=img,
+        original_width=original_width,
+        original_height=original_height,
+        reduction=reduction,
+    )
@@ -0,0 +1,131 @@
+"""
+추론 전용 executor
+
+YOLO 모델을 소유하고 decode → 추론 → 후처리 → 인코딩 같은 CPU 작업을
+이벤트 루프 밖의 고정 크기 스레드 풀에서 실행합니다.
+async 핸들러는 업로드 읽기/응답 같은 I/O만 담당하므로, 추론이 밀려 있어도
+/health, /result/{file_id} 요청은 바로 응답할 수 있습니다.
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceExecutor:
+    """모델을 소유하는 bounded 추론 스레드 풀"""
+
+    def __init__(self, model_loader, max_workers: int = 1):
+        """
+        Args:
+            model_loader: 모델을 로딩해서 반환하는 함수 (첫 추론 시 워커 스레드에서 호출)
+            max_workers: 동시에 파이프라인을 실행할 워커 스레드 수
+        """
+        self.max_workers = max(1, int(max_workers))
+        self._model_loader = model_loader
+        self._model = None
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="inference",
+        )
+        # Ultralytics predictor는 thread-safe 하지 않으므로 로딩/예측은 직렬화
+        self._model_lock = threading.Lock()
+        self._pending = 0
+        self._active = 0
+        self._counter_lock = threading.Lock()
+
+    @property
+    def model_loaded(self) -> bool:
+        return self._model is not None
+
+    @property
+    def pending(self) -> int:
+        """스레드 풀에 제출되었지만 아직 끝나지 않은 작업 수 (실행 중 포함)"""
+        return self._pending
+
+    @property
+    def active(self) -> int:
+        """현재 워커 스레드에서 실행 중인 작업 수"""
+        return self._active
+
+    def get_model(self):
+        """모델 반환 (필요 시 로딩). 워커 스레드에서 호출해야 합니다."""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = self._model_loader()
+        return self._model
+
+    def set_model(self, model):
+        """이미 로딩된(또는 stub) 모델로 교체 - 벤치마크/테스트용"""
+        with self._model_lock:
+            self._model = model
+
+    def unload(self, blocking: bool = True) -> bool:
+        """
+        모델 해제 (메모리 회수용, 다음 예측에서 다시 지연 로딩)
+
+        blocking=False면 로딩/예측 중일 때 기다리지 않고 False 반환
+
+        Returns:
+            실제로 해제했는지 여부
+        """
+        if not self._model_lock.acquire(blocking=blocking):
+            return False
+        try:
+            loaded = self._model is not None
+            self._model = None
+            return loaded
+        finally:
+            self._model_lock.release()
+
+    def predict(self, source, **kwargs):
+        """모델 예측을 직렬화해서 실행"""
+        current_model = self.get_model()
+        with self._model_lock:
+            return current_model(source, **kwargs)
+
+    def submit_background(self, fn, *args, **kwargs):
+        """
+        이벤트 루프 없이 fn을 워커 스레드에 제출 (import 시점 모델 warm-up 등)
+
+        Returns:
+            concurrent.futures.Future
+        """
+        return self._pool.submit(self._run, fn, args, kwargs)
+
+    def _run(self, fn, args, kwargs):
+        with self._counter_lock:
+            self._active += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._counter_lock:
+                self._active -= 1
+
+    async def submit(self, fn, *args, **kwargs):
+        """fn(*args, **kwargs)를 추론 스레드 풀에서 실행하고 결과를 await"""
+        loop = asyncio.get_running_loop()
+        self._pending += 1
+        try:
+            return await loop.run_in_executor(
+                self._pool,
+                functools.partial(self._run, fn, args, kwargs),
+            )
+        finally:
+            self._pending -= 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "pending": self._pending,
+            "active": self._active,
+        }
+
+    def shutdown(self, wait: bool = True):
+        logger.info("Shutting down inference executor...")
+        self._pool.shutdown(wait=wait)
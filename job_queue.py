@@ -0,0 +1,393 @@
+"""
+비동기 탐지 작업(job) 큐 (SQLite 기반, 프로세스 재시작 후에도 유지)
+
+POST /jobs 는 업로드 바이트를 큐에 넣고 job id만 바로 돌려주고,
+워커(JobWorkerPool)가 큐에서 작업을 하나씩 꺼내 /detect-crack 과 같은 파이프라인으로 처리합니다.
+
+- 작업을 꺼낼 때 lease(lease_seconds)와 lease token을 잡음: 워커/프로세스가 죽어서 lease가 만료되면 다른 워커가 다시 가져감
+- 처리 중에는 heartbeat로 lease를 연장하고, 결과 기록은 token이 일치할 때만 반영 (lease를 잃은 늦은 워커는 무시)
+- 실패 시 max_attempts 까지 재시도, 그 이후에는 failed
+- 끝난 작업(done/failed)은 result_ttl 초 뒤 삭제 (조회 시 404)
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    filename TEXT,
+    tiled INTEGER NOT NULL DEFAULT 0,
+    payload BLOB,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_until REAL,
+    lease_token TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    finished_at REAL,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+
+
+@dataclass
+class Job:
+    """워커가 꺼낸 작업 하나"""
+    id: str
+    payload: bytes
+    tiled: bool
+    filename: str
+    attempts: int
+    lease: str      # claim()마다 새로 발급되는 lease token (complete/fail/renew에 필요)
+
+
+class JobQueue:
+    """SQLite 파일 하나로 된 영속 작업 큐 (thread-safe)"""
+
+    def __init__(self, path: str, result_ttl: float = 3600.0, lease_seconds: float = 300.0, max_attempts: int = 3):
+        """
+        Args:
+            path: SQLite 파일 경로 (":memory:" 이면 프로세스 안에서만 유지)
+            result_ttl: 끝난 작업 결과를 보관하는 시간 (초)
+            lease_seconds: 워커가 작업을 잡고 있을 수 있는 시간 (초과 시 crash로 보고 재시도)
+            max_attempts: 작업 하나의 최대 실행 횟수
+        """
+        self.path = path
+        self.result_ttl = float(result_ttl)
+        self.lease_seconds = float(lease_seconds)
+        self.max_attempts = max(1, int(max_attempts))
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "lease_token" not in columns:
+            # lease token 도입 전에 만든 큐 파일
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN lease_token TEXT")
+
+    def submit(self, payload: bytes, filename: str = None, tiled: bool = False) -> str:
+        """작업 추가 후 job id 반환"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, filename, tiled, payload, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, filename, int(bool(tiled)), sqlite3.Binary(payload), now, now),
+            )
+        return job_id
+
+    def claim(self):
+        """
+        가장 오래된 대기 작업(또는 lease가 만료된 실행 중 작업)을 꺼내 lease를 잡음
+
+        Returns:
+            Job 또는 None (처리할 작업이 없을 때)
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # lease 만료 + 재시도 소진 → failed (워커가 계속 죽는 작업)
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, payload = NULL, lease_token = NULL, finished_at = ?, "
+                    "updated_at = ? WHERE status = ? AND lease_until < ? AND attempts >= ?",
+                    (FAILED, "Worker crashed while processing the job", now, now, RUNNING, now, self.max_attempts),
+                )
+                row = self._conn.execute(
+                    "SELECT id, payload, tiled, filename, attempts FROM jobs "
+                    "WHERE status = ? OR (status = ? AND lease_until < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (QUEUED, RUNNING, now),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                if row["attempts"] > 0:
+                    logger.warning(f"Retrying job {row['id']} (attempt {row['attempts'] + 1}/{self.max_attempts})")
+                lease = uuid.uuid4().hex
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_until = ?, lease_token = ?, "
+                    "updated_at = ? WHERE id = ?",
+                    (RUNNING, now + self.lease_seconds, lease, now, row["id"]),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return Job(
+            id=row["id"],
+            payload=bytes(row["payload"]),
+            tiled=bool(row["tiled"]),
+            filename=row["filename"],
+            attempts=row["attempts"] + 1,
+            lease=lease,
+        )
+
+    # 🔥 아래 쓰기는 모두 "아직 이 lease를 가진 워커"일 때만 반영 (0행이면 no-op, False 반환)
+    _HOLDS_LEASE = f"WHERE id = ? AND status = '{RUNNING}' AND lease_token = ?"
+
+    def renew(self, job: Job) -> bool:
+        """heartbeat - lease를 lease_seconds 만큼 연장 (이미 lease를 잃었으면 False)"""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE jobs SET lease_until = ?, updated_at = ? {self._HOLDS_LEASE}",
+                (now + self.lease_seconds, now, job.id, job.lease),
+            )
+        return cursor.rowcount > 0
+
+    def complete(self, job: Job, result: dict) -> bool:
+        """작업 성공 - 결과 저장, 업로드 바이트 삭제"""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = NULL, payload = NULL, lease_until = NULL, "
+                f"lease_token = NULL, finished_at = ?, updated_at = ? {self._HOLDS_LEASE}",
+                (DONE, json.dumps(result), now, now, job.id, job.lease),
+            )
+        return cursor.rowcount > 0
+
+    def fail(self, job: Job, error: str, retry: bool = True) -> bool:
+        """
+        작업 실패 기록
+
+        Args:
+            retry: True면 남은 시도 횟수가 있을 때 다시 대기열로 (False면 바로 failed)
+        """
+        now = time.time()
+        with self._lock:
+            if retry and job.attempts < self.max_attempts:
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, lease_until = NULL, lease_token = NULL, "
+                    f"updated_at = ? {self._HOLDS_LEASE}",
+                    (QUEUED, error, now, job.id, job.lease),
+                )
+            else:
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, payload = NULL, lease_until = NULL, lease_token = NULL, "
+                    f"finished_at = ?, updated_at = ? {self._HOLDS_LEASE}",
+                    (FAILED, error, now, now, job.id, job.lease),
+                )
+        return cursor.rowcount > 0
+
+    def release(self, jobs) -> int:
+        """
+        실행 중 작업을 실패로 세지 않고 다시 대기열로 (워커가 처리 도중 버려진 경우, lease 만료를 기다리지 않음)
+
+        Returns:
+            대기열로 돌린 작업 수
+        """
+        now = time.time()
+        released = 0
+        with self._lock:
+            for job in jobs:
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = MAX(attempts - 1, 0), lease_until = NULL, "
+                    f"lease_token = NULL, updated_at = ? {self._HOLDS_LEASE}",
+                    (QUEUED, now, job.id, job.lease),
+                )
+                released += cursor.rowcount
+        return released
+
+    def get(self, job_id: str):
+        """작업 상태 조회 (없거나 만료되었으면 None)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, filename, tiled, attempts, created_at, updated_at, finished_at, result, error "
+                "FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        if row["finished_at"] is not None and time.time() - row["finished_at"] > self.result_ttl:
+            return None
+        return {
+            "job_id": row["id"],
+            "status": row["status"],
+            "filename": row["filename"],
+            "tiled": bool(row["tiled"]),
+            "attempts": row["attempts"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "finished_at": row["finished_at"],
+            "result": json.loads(row["result"]) if row["result"] is not None else None,
+            "error": row["error"],
+        }
+
+    def purge_expired(self) -> int:
+        """result_ttl 이 지난 완료/실패 작업 삭제, 삭제한 수 반환"""
+        cutoff = time.time() - self.result_ttl
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (DONE, FAILED, cutoff),
+            )
+        return cursor.rowcount
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        counts.update({row["status"]: row["n"] for row in rows})
+        return {
+            "path": self.path,
+            "result_ttl_s": self.result_ttl,
+            "lease_s": self.lease_seconds,
+            "max_attempts": self.max_attempts,
+            **counts,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JobWorkerPool:
+    """
+    이벤트 루프 위에서 JobQueue를 비우는 워커 태스크 묶음
+
+    handler(job)는 결과 dict를 반환하는 async 함수이며, permanent_errors에 해당하는 예외는
+    재시도하지 않고 바로 failed 처리합니다 (예: 디코딩할 수 없는 이미지).
+    """
+
+    def __init__(self, queue: JobQueue, handler, workers: int = 2, poll_interval: float = 1.0,
+                 permanent_errors=(), purge_interval: float = 60.0):
+        self.queue = queue
+        self.workers = max(1, int(workers))
+        self.poll_interval = float(poll_interval)
+        self.purge_interval = float(purge_interval)
+        self._handler = handler
+        self._permanent_errors = tuple(permanent_errors)
+        self._loop = None
+        self._tasks = []
+        self._wakeup = None
+        self._last_purge = 0.0
+        self._claimed = {}   # 이 풀의 워커가 꺼내서 아직 결과를 기록하지 않은 작업 (job id -> Job)
+        self.processed = 0
+        self.errors = 0
+
+    def ensure_started(self):
+        """
+        현재 이벤트 루프에서 워커가 돌고 있지 않으면 시작 (Mangum/TestClient처럼 루프가 바뀌는 환경 대응)
+
+        이전 루프의 워커가 처리 중이던 작업은 lease 만료(lease_seconds)를 기다리지 않고 바로 대기열로 돌림
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and not all(task.done() for task in self._tasks):
+            return
+        abandoned, self._claimed = self._claimed, {}
+        if abandoned:
+            released = self.queue.release(abandoned.values())
+            logger.warning(f"Re-queued {released} job(s) abandoned by previous job workers")
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._tasks = [loop.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Started {self.workers} job worker(s)")
+
+    def notify(self):
+        """새 작업이 들어왔음을 대기 중인 워커에게 알림"""
+        if self._wakeup is not None and self._loop is asyncio.get_running_loop():
+            self._wakeup.set()
+
+    async def _worker(self, index):
+        while True:
+            try:
+                await self._maybe_purge()
+                job = await asyncio.to_thread(self._claim)
+            except Exception as e:
+                logger.error(f"Job worker {index} could not read the queue: {str(e)}", exc_info=True)
+                job = None
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    def _claim(self):
+        # 워커 스레드에서 꺼내는 즉시 기록 (루프가 중간에 버려져도 ensure_started()가 되돌릴 수 있게)
+        job = self.queue.claim()
+        if job is not None:
+            self._claimed[job.id] = job
+        return job
+
+    async def _run(self, job):
+        logger.info(f"Job {job.id} started (attempt {job.attempts}/{self.queue.max_attempts}, tiled={job.tiled})")
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            result = await self._handler(job)
+        except self._permanent_errors as e:
+            heartbeat.cancel()
+            self.errors += 1
+            logger.error(f"Job {job.id} failed permanently: {type(e).__name__}: {str(e)}")
+            recorded = await asyncio.to_thread(self.queue.fail, job, str(e) or type(e).__name__, False)
+        except Exception as e:
+            heartbeat.cancel()
+            self.errors += 1
+            logger.error(f"Job {job.id} failed: {str(e)}", exc_info=True)
+            recorded = await asyncio.to_thread(self.queue.fail, job, str(e) or type(e).__name__, True)
+        else:
+            heartbeat.cancel()
+            self.processed += 1
+            recorded = await asyncio.to_thread(self.queue.complete, job, result)
+            if recorded:
+                logger.info(f"Job {job.id} completed")
+        finally:
+            # 루프가 버려져 취소된 경우에도 heartbeat는 멈춤 (_claimed에는 남겨서 ensure_started()가 되돌림)
+            heartbeat.cancel()
+        self._claimed.pop(job.id, None)
+        if not recorded:
+            logger.warning(f"Job {job.id} result ignored: lease was lost and the job was claimed again")
+
+    async def _heartbeat(self, job):
+        """처리 중인 작업의 lease를 lease_seconds의 1/3마다 연장 (느린 타일 작업이 다른 워커에 다시 잡히지 않게)"""
+        interval = self.queue.lease_seconds / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                renewed = await asyncio.to_thread(self.queue.renew, job)
+            except Exception as e:
+                logger.warning(f"Job {job.id} lease renewal failed: {str(e)}")
+                continue
+            if not renewed:
+                logger.warning(f"Job {job.id} lost its lease (another worker may run it again)")
+                return
+
+    async def _maybe_purge(self):
+        now = time.monotonic()
+        if now - self._last_purge < self.purge_interval:
+            return
+        self._last_purge = now
+        removed = await asyncio.to_thread(self.queue.purge_expired)
+        if removed:
+            logger.info(f"Purged {removed} expired job(s)")
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "workers_alive": sum(1 for task in self._tasks if not task.done()),
+            "running": len(self._claimed),
+            "processed": self.processed,
+            "errors": self.errors,
+        }
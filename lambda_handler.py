@@ -1,4 +1,13 @@
 from mangum import Mangum
+from log_config import flush_logs
 from main import app
 
-handler = Mangum(app, lifespan="off")
+_mangum = Mangum(app, lifespan="off")
+
+
+def handler(event, context):
+    # 로그는 background 스레드가 쓰므로, 호출이 끝나고 실행 환경이 freeze되기 전에 큐를 비움
+    try:
+        return _mangum(event, context)
+    finally:
+        flush_logs()
@@ -0,0 +1,201 @@
+"""
+비동기 구조화 로깅 (queue 기반 background handler + 요청당 JSON 요약 + 샘플링된 상세 로그)
+
+- configure_logging(): root logger에는 QueueHandler만 붙이고, 포맷팅과 stream 쓰기는 QueueListener 스레드에서 수행
+  요청 스레드는 record를 큐에 넣기만 하며, 큐가 가득 차면 기다리지 않고 버린 뒤 dropped로 집계
+- 메시지 포맷팅도 listener 스레드에서 수행: logger.debug("... %s", value)처럼 %-style 인자로 넘기면
+  비활성 레벨은 비용이 없고, 활성 레벨도 요청 스레드에서 문자열을 만들지 않음
+  (인자는 로그 호출 이후 변경되지 않는 값만 넘길 것, 비싼 문자열은 Lazy로 감싸기)
+- LOG_FORMAT=json: 한 줄 JSON (CloudWatch Logs Insights에서 필드로 바로 조회), text: 기존 형식
+- request_summary(): 요청당 하나의 요약 record (단계별 시간, 결과 수)
+- DetailSampler: 요청 id 기준으로 LOG_DETAIL_SAMPLE_RATE 비율의 요청만 crack별 상세 debug 로그
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+import zlib
+from datetime import datetime, timezone
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_FORMATS = ("json", "text")
+
+_handler = None
+_listener = None
+_settings = {}
+
+
+class JsonFormatter(logging.Formatter):
+    """record → 한 줄 JSON (extra={"fields": {...}}의 필드를 최상위에 병합)"""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """기존 텍스트 형식 + fields는 JSON으로 뒤에 붙임"""
+
+    def format(self, record):
+        text = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            text = f"{text} {json.dumps(fields, default=str, ensure_ascii=False)}"
+        return text
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # stdlib 구현은 여기서(요청 스레드) msg % args 포맷팅을 하므로 listener 스레드로 미룸
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class Lazy:
+    """str()될 때만 fn(*args)를 실행하는 로그 인자 (예: 신뢰도 리스트 포맷팅)"""
+
+    __slots__ = ("fn", "args")
+
+    def __init__(self, fn, *args):
+        self.fn = fn
+        self.args = args
+
+    def __str__(self):
+        return str(self.fn(*self.args))
+
+    __repr__ = __str__
+
+
+class DetailSampler:
+    """요청 id 해시 기준 샘플링 (같은 요청의 상세 로그는 모든 스레드에서 같은 결정)"""
+
+    def __init__(self, rate: float):
+        self.rate = min(1.0, max(0.0, float(rate)))
+
+    def sampled(self, request_id) -> bool:
+        if self.rate <= 0.0:
+            return False
+        if self.rate >= 1.0:
+            return True
+        return zlib.crc32(str(request_id).encode("utf-8")) / 2 ** 32 < self.rate
+
+
+def configure_logging(level: str = None, fmt: str = None, queue_size: int = None, stream=None):
+    """
+    root logger를 queue 기반 비동기 handler로 교체 (다시 호출하면 이전 listener를 멈추고 새로 설정)
+
+    Args:
+        level: LOG_LEVEL (기본 INFO)
+        fmt: LOG_FORMAT - json / text (기본 json)
+        queue_size: LOG_QUEUE_SIZE - 대기 record 최대 수 (초과분은 버림)
+        stream: 출력 stream (기본 stderr)
+    """
+    global _handler, _listener
+    level = (level or os.environ.get("LOG_LEVEL", "INFO")).upper()
+    fmt = (fmt or os.environ.get("LOG_FORMAT", "json")).lower()
+    if fmt not in LOG_FORMATS:
+        raise ValueError(f"Unknown LOG_FORMAT '{fmt}' (expected one of {', '.join(LOG_FORMATS)})")
+    if queue_size is None:
+        queue_size = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+
+    shutdown_logging()
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter(TEXT_FORMAT))
+    log_queue = queue.Queue(maxsize=max(0, int(queue_size)))
+    _handler = _NonBlockingQueueHandler(log_queue)
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+    _settings.update(level=level, format=fmt, queue_size=queue_size)
+    return _handler
+
+
+def flush_logs(timeout: float = 1.0) -> bool:
+    """
+    큐에 쌓인 record가 모두 쓰일 때까지 최대 timeout초 대기 (Lambda 호출 종료 직전, freeze 전에 호출)
+
+    Returns:
+        True면 모두 쓰임
+    """
+    if _handler is None:
+        return True
+    deadline = time.monotonic() + timeout
+    while _handler.queue.unfinished_tasks:
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.002)
+    return True
+
+
+def shutdown_logging():
+    """listener를 멈추고 남은 record를 모두 씀"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+def logging_stats() -> dict:
+    return {
+        **_settings,
+        "queued": _handler.queue.qsize() if _handler is not None else 0,
+        "dropped": _handler.dropped if _handler is not None else 0,
+    }
+
+
+def request_summary(logger, endpoint: str, request_id, status: int, elapsed: float, timer=None,
+                    level: int = logging.INFO, **fields):
+    """
+    요청 하나의 요약 record (fields 중 None은 생략)
+
+    JSON 형식에서는 event="request", endpoint, request_id, status, duration_ms, stages_ms, cold_start, cache_hit와
+    결과 필드(has_crack, crack_count ...)가 최상위 키로 출력됨
+    """
+    if not logger.isEnabledFor(level):
+        return
+    summary = {
+        "event": "request",
+        "endpoint": endpoint,
+        "request_id": request_id,
+        "status": status,
+        "duration_ms": round(elapsed * 1000, 1),
+    }
+    if timer is not None:
+        summary["stages_ms"] = timer.as_ms()
+        summary["cold_start"] = timer.cold_start
+        summary["cache_hit"] = timer.cache_hit
+    summary.update({key: value for key, value in fields.items() if value is not None})
+    logger.log(level, "%s %s -> %s in %.1fms", endpoint, request_id, status, elapsed * 1000, extra={"fields": summary})
@@ -1,4 +1,8 @@
 import os
+import time
+
+# 🔥 cold start 측정 기준 시각 (모듈 import 시작)
+STARTUP_BEGIN = time.perf_counter()
 
 # 🔥 반드시 YOLO import 전에 설정 (Lambda read-only FS 대응)
 os.environ["YOLO_VERBOSE"] = "False"
@@ -6,23 +10,65 @@ os.environ["YOLO_CONFIG_DIR"] = "/tmp/Ultralytics"
 os.environ["ULTRALYTICS_RUNS_DIR"] = "/tmp/runs"
 os.environ["ULTRALYTICS_CACHE_DIR"] = "/tmp/Ultralytics"
 
-from fastapi import FastAPI, UploadFile, File
-from fastapi.responses import FileResponse, JSONResponse
+# 🔥 컨테이너 CPU 할당량(cgroup / Lambda 메모리) 기준 스레드 수: OMP 계열 환경 변수는 numpy/torch import 전에 설정
+# 우선순위: TORCH_NUM_THREADS 등 환경 변수 > THREAD_TUNING_PATH 튜닝 파일 (python cpu_tuning.py tune) > 자동값
+from cpu_tuning import apply_torch_threads, configure_threads, load_model_with_threads, resolve_thread_settings
+CPU_QUOTA, THREAD_SETTINGS = resolve_thread_settings()
+configure_threads(THREAD_SETTINGS)
+
+from fastapi import FastAPI, UploadFile, File, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+from typing import List
 import numpy as np
-import cv2
 import uuid
+import asyncio
+import functools
+import json
 import logging
-import time
-from datetime import datetime
+from dataclasses import asdict
 
-# 로깅 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+from admission import AdmissionController, AdmissionRejected
+from archive import ARCHIVE_ERRORS, is_archive, iter_archive_images
+from backends import check_backend, check_precision, load_backend_model
+from batching import BatchScheduler
+from compare import (
+    DEFAULT_GROWTH_RATIO,
+    DEFAULT_MAX_FEATURES,
+    DEFAULT_MIN_INLIERS,
+    DEFAULT_MIN_OVERLAP,
+    DEFAULT_TOLERANCE,
+    GROWN,
+    NEW,
+    UNCHANGED,
+    align,
+    build_reference,
+    compare_cracks,
+    extract_features,
 )
+from decode import decode_upload
+from inference import InferenceExecutor
+from job_queue import JobQueue, JobWorkerPool
+from log_config import DetailSampler, Lazy, configure_logging, logging_stats, request_summary
+from mask_encoding import DEFAULT_POLYGON_TOLERANCE, encode_masks, normalize_mask_format
+from metrics import MetricsRegistry, StageTimer
+from model_registry import ModelRegistry, container_memory_limit, letterbox, parse_model_specs
+from postprocess import masks_to_detections
+from prefilter import SKIPPED, Prefilter, load_classifier
+from reference_index import ReferenceIndex
+from render import DEFAULT_QUALITY, draw_detections, encode_image, fit_to_size, media_type, normalize_format, variant_name
+from result_cache import ResultCache, model_identity
+from result_store import ResultStore
+from tiling import make_tiles, mask_patches, merge_detections
+from video import CrackTracker, FrameSampler, InvalidVideoError, VideoTooLargeError, open_video, save_upload
+
+# 🔥 로깅: queue 기반 비동기 handler (LOG_FORMAT=json|text, LOG_LEVEL), 요청마다 JSON 요약 1줄
+# crack별 상세 로그는 DEBUG 레벨에서 LOG_DETAIL_SAMPLE_RATE 비율의 요청만 기록
+configure_logging()
 logger = logging.getLogger(__name__)
+LOG_DETAIL_SAMPLE_RATE = float(os.environ.get("LOG_DETAIL_SAMPLE_RATE", "0.01"))
+detail_sampler = DetailSampler(LOG_DETAIL_SAMPLE_RATE)
 
 app = FastAPI()
 
@@ -40,55 +86,329 @@ logger.info("FastAPI application starting...")
 # Lambda 환경과 로컬 환경 모두 지원
 MODEL_PATH = os.environ.get("MODEL_PATH", "best.pt")
 SAVE_DIR = os.environ.get("SAVE_DIR", "/tmp/result")
+# 🔥 추론 백엔드: pytorch(기본) / onnx / openvino (export 결과는 EXPORT_DIR에 캐시)
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "pytorch").lower()
+EXPORT_DIR = os.environ.get("EXPORT_DIR", "/tmp/exports")
+MODEL_IMGSZ = int(os.environ.get("MODEL_IMGSZ", "640"))
+# 🔥 모델 정밀도: fp32(기본) / int8_dynamic / int8_static (INT8은 onnx 백엔드 전용)
+MODEL_PRECISION = os.environ.get("MODEL_PRECISION", "fp32").lower()
 
 logger.info(f"MODEL_PATH: {MODEL_PATH}")
 logger.info(f"SAVE_DIR: {SAVE_DIR}")
+logger.info(f"INFERENCE_BACKEND: {INFERENCE_BACKEND} ({MODEL_PRECISION})")
+logger.info(f"CPU quota: {CPU_QUOTA}, threads: {THREAD_SETTINGS}")
+check_backend(INFERENCE_BACKEND)
+check_precision(INFERENCE_BACKEND, MODEL_PRECISION)
 
 # 모델 로딩 (Lambda는 /tmp 사용)
 if not os.path.exists(MODEL_PATH):
     logger.warning(f"Model not found at {MODEL_PATH}, trying current directory")
     MODEL_PATH = "best.pt"  # 현재 디렉토리에서 찾기
 
-from ultralytics import YOLO
-
 # 🔥 YOLO가 사용할 디렉토리 명시적으로 생성
 os.makedirs("/tmp/runs", exist_ok=True)
 os.makedirs("/tmp/Ultralytics", exist_ok=True)
 os.makedirs(SAVE_DIR, exist_ok=True)
 
+# 🔥 모델 프로세스 분리 서빙 (python main.py 전용): HTTP_WORKERS > 1 이면 uvicorn 워커 여러 개가
+# 모델 프로세스 MODEL_SERVER_PROCESSES개를 공유 (워커마다 모델을 로딩하지 않음, 프레임은 shared memory로 전달)
+HTTP_WORKERS = int(os.environ.get("HTTP_WORKERS", "1"))
+MODEL_SERVER_PROCESSES = int(os.environ.get("MODEL_SERVER_PROCESSES", "1"))
+MODEL_SERVER_SOCKET_DIR = os.environ.get("MODEL_SERVER_SOCKET_DIR", "/tmp/model_server")
+# 부모 프로세스가 모델 프로세스를 띄운 뒤 설정 (HTTP 워커는 이 중 하나에 연결)
+MODEL_SERVER_SOCKETS = [address for address in os.environ.get("MODEL_SERVER_SOCKETS", "").split(",") if address]
+MODEL_SERVER_ADDRESS = MODEL_SERVER_SOCKETS[os.getpid() % len(MODEL_SERVER_SOCKETS)] if MODEL_SERVER_SOCKETS else None
+
 # 🔥 Lazy Loading: 모델을 전역 변수로 선언만 하고, 첫 요청 시 로딩
 model = None
+MODEL_LOAD_SECONDS = None
+PROCESS_START_TIME = time.time()
 
 def load_model():
     """모델을 지연 로딩하는 함수 (첫 요청 시에만 실행)"""
-    global model
+    global model, MODEL_LOAD_SECONDS
     if model is None:
-        logger.info("Loading YOLO model (lazy loading)...")
-        model_load_start = time.time()
-        model = YOLO(MODEL_PATH)
-        model_load_time = time.time() - model_load_start
+        model_load_start = time.perf_counter()
+        if MODEL_SERVER_ADDRESS:
+            from model_server import RemoteModel
+            logger.info(f"Connecting to model server {MODEL_SERVER_ADDRESS}...")
+            model = RemoteModel(MODEL_SERVER_ADDRESS)
+        else:
+            logger.info("Loading YOLO model (lazy loading)...")
+            apply_torch_threads(THREAD_SETTINGS)
+            model = load_backend_model(
+                MODEL_PATH, INFERENCE_BACKEND, EXPORT_DIR, imgsz=MODEL_IMGSZ, precision=MODEL_PRECISION
+            )
+        model_load_time = time.perf_counter() - model_load_start
+        MODEL_LOAD_SECONDS = model_load_time
         logger.info(f"YOLO model loaded successfully in {model_load_time:.2f} seconds")
     return model
 
+# 🔥 추론 전용 executor: 모델을 소유하고 CPU 작업을 이벤트 루프 밖에서 실행
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", "1"))
+inference_executor = InferenceExecutor(load_model, max_workers=INFERENCE_WORKERS)
+logger.info(f"Inference executor ready with {INFERENCE_WORKERS} worker(s)")
+
+# 🔥 동적 마이크로 배칭: 동시에 들어온 요청을 한 번의 배치 YOLO 호출로 묶음
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", "8"))
+BATCH_MAX_WAIT_MS = float(os.environ.get("BATCH_MAX_WAIT_MS", "15"))
+logger.info(f"Batch scheduler: max_batch_size={BATCH_MAX_SIZE}, max_wait={BATCH_MAX_WAIT_MS}ms")
+
+# 🔥 축소 디코딩 기준 크기 (YOLO 입력 크기). 0이면 항상 원본 해상도로 디코딩
+DECODE_TARGET_SIZE = int(os.environ.get("DECODE_TARGET_SIZE", str(MODEL_IMGSZ)))
+
+# 🔥 고해상도 타일 모드 (?tiled=true 또는 TILED_MODE_DEFAULT=1)
+TILED_MODE_DEFAULT = os.environ.get("TILED_MODE_DEFAULT", "0") == "1"
+TILE_SIZE = int(os.environ.get("TILE_SIZE", str(MODEL_IMGSZ)))
+TILE_OVERLAP = float(os.environ.get("TILE_OVERLAP", "0.2"))
+TILE_BATCH_SIZE = max(1, int(os.environ.get("TILE_BATCH_SIZE", "8")))
+
+# 🔥 ?masks=rle|polygon 응답의 polygon 단순화 허용 오차 (원본 픽셀, 요청별 ?mask_tolerance 로 변경 가능)
+MASK_POLYGON_TOLERANCE = float(os.environ.get("MASK_POLYGON_TOLERANCE", str(DEFAULT_POLYGON_TOLERANCE)))
+
+# 🔥 사전 필터 cascade: 값싼 1단계 점수가 threshold 미만인 사진은 segmentation 생략 (응답 'cascade'에 경로 기록)
+# lowres: 같은 모델을 PREFILTER_IMGSZ로 실행 / classifier: PREFILTER_MODEL_PATH 분류 모델 / off: 사용 안 함
+PREFILTER_MODE = os.environ.get("PREFILTER_MODE", "off").lower()
+PREFILTER_THRESHOLD = float(os.environ.get("PREFILTER_THRESHOLD", "0.1"))
+PREFILTER_IMGSZ = int(os.environ.get("PREFILTER_IMGSZ", "320"))
+PREFILTER_MODEL_PATH = os.environ.get("PREFILTER_MODEL_PATH", "crack_cls.pt")
+prefilter = Prefilter(PREFILTER_MODE, threshold=PREFILTER_THRESHOLD, imgsz=PREFILTER_IMGSZ)
+logger.info(f"Pre-filter: {prefilter.stats()}")
+
+# 🔥 업로드 내용 기반 결과 캐시 (재시도/중복 업로드 시 추론 생략)
+RESULT_CACHE_ENABLED = os.environ.get("RESULT_CACHE_ENABLED", "1") == "1"
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", "1024"))
+RESULT_CACHE_MAX_MB = float(os.environ.get("RESULT_CACHE_MAX_MB", "32"))
+RESULT_CACHE_TTL = float(os.environ.get("RESULT_CACHE_TTL", "3600"))
+RESULT_CACHE_DISK_DIR = os.environ.get("RESULT_CACHE_DISK_DIR") or None
+
+result_cache = None
+if RESULT_CACHE_ENABLED:
+    result_cache = ResultCache(
+        model_identity(MODEL_PATH, INFERENCE_BACKEND, MODEL_PRECISION, MODEL_IMGSZ, DECODE_TARGET_SIZE),
+        max_entries=RESULT_CACHE_MAX_ENTRIES,
+        ttl_seconds=RESULT_CACHE_TTL,
+        disk_dir=RESULT_CACHE_DISK_DIR,
+        max_bytes=int(RESULT_CACHE_MAX_MB * 1024 * 1024),
+    )
+    logger.info(f"Result cache enabled: max_entries={RESULT_CACHE_MAX_ENTRIES}, max={RESULT_CACHE_MAX_MB}MB, ttl={RESULT_CACHE_TTL}s, disk_dir={RESULT_CACHE_DISK_DIR}")
+
+# 🔥 결과 이미지 저장소 (/tmp 용량 제한 + TTL + LRU, 메모리 tier, 비동기 디스크 쓰기)
+RESULT_STORE_MAX_MB = float(os.environ.get("RESULT_STORE_MAX_MB", "256"))
+RESULT_STORE_MEMORY_MB = float(os.environ.get("RESULT_STORE_MEMORY_MB", "64"))
+RESULT_STORE_TTL = float(os.environ.get("RESULT_STORE_TTL", "86400"))
+RESULT_STORE_PENDING_MB = float(os.environ.get("RESULT_STORE_PENDING_MB", "32"))
+
+result_store = ResultStore(
+    SAVE_DIR,
+    max_bytes=int(RESULT_STORE_MAX_MB * 1024 * 1024),
+    ttl_seconds=RESULT_STORE_TTL,
+    memory_max_bytes=int(RESULT_STORE_MEMORY_MB * 1024 * 1024),
+    pending_max_bytes=int(RESULT_STORE_PENDING_MB * 1024 * 1024),
+)
+logger.info(
+    f"Result store: disk budget={RESULT_STORE_MAX_MB}MB, memory={RESULT_STORE_MEMORY_MB}MB, ttl={RESULT_STORE_TTL}s, "
+    f"pending writes={RESULT_STORE_PENDING_MB}MB"
+)
+
+# 🔥 결과 이미지 렌더링 시점
+# eager: /detect-crack에서 바로 그려서 저장 / lazy: 탐지 결과 + 원본 바이트만 저장하고 GET /result 첫 요청 시 렌더링
+RESULT_RENDER_MODE = os.environ.get("RESULT_RENDER_MODE", "eager").lower()
+if RESULT_RENDER_MODE not in ("eager", "lazy"):
+    raise ValueError(f"Unknown RESULT_RENDER_MODE '{RESULT_RENDER_MODE}' (expected eager or lazy)")
+logger.info(f"Result render mode: {RESULT_RENDER_MODE}")
+
+# /detect-crack/batch 요청 하나에서 처리하는 최대 이미지 수
+BATCH_MAX_FILES = int(os.environ.get("BATCH_MAX_FILES", "100"))
+# 아카이브 멤버 하나의 최대 크기 (압축 해제 전 헤더 크기로 검사, 초과 멤버는 항목 오류)
+BATCH_MAX_FILE_MB = float(os.environ.get("BATCH_MAX_FILE_MB", "20"))
+
+# 🔥 admission control: 동시에 파이프라인에 들어가는 요청 수 / 대기열 길이 제한
+# 대기열이 가득 차거나 대기 시간이 초과되면 503, 클라이언트별 대기 한도 초과 시 429 (둘 다 Retry-After 포함)
+ADMISSION_MAX_IN_FLIGHT = int(os.environ.get("ADMISSION_MAX_IN_FLIGHT", "16"))
+ADMISSION_MAX_QUEUE = int(os.environ.get("ADMISSION_MAX_QUEUE", "64"))
+ADMISSION_QUEUE_TIMEOUT = float(os.environ.get("ADMISSION_QUEUE_TIMEOUT", "30"))
+ADMISSION_MAX_QUEUE_PER_CLIENT = int(os.environ.get("ADMISSION_MAX_QUEUE_PER_CLIENT", "0"))
+ADMISSION_RETRY_AFTER = float(os.environ.get("ADMISSION_RETRY_AFTER", "2"))
+# 클라이언트(테넌트) 구분 헤더 - 없으면 모든 요청이 하나의 FIFO 대기열을 공유
+ADMISSION_CLIENT_HEADER = os.environ.get("ADMISSION_CLIENT_HEADER", "X-Client-Id")
+admission = AdmissionController(
+    max_in_flight=ADMISSION_MAX_IN_FLIGHT,
+    max_queue=ADMISSION_MAX_QUEUE,
+    queue_timeout=ADMISSION_QUEUE_TIMEOUT,
+    max_queue_per_client=ADMISSION_MAX_QUEUE_PER_CLIENT,
+    retry_after=ADMISSION_RETRY_AFTER,
+)
+logger.info(
+    f"Admission control: max_in_flight={ADMISSION_MAX_IN_FLIGHT}, max_queue={ADMISSION_MAX_QUEUE}, "
+    f"queue_timeout={ADMISSION_QUEUE_TIMEOUT}s, max_queue_per_client={ADMISSION_MAX_QUEUE_PER_CLIENT}"
+)
+
+# 🔥 비동기 작업 모드 (POST /jobs → GET /jobs/{id}): 동기 요청 타임아웃을 넘는 타일 모드/대형 점검용
+# 작업은 SQLite 파일 큐에 저장되어 프로세스가 재시작되어도 남아 있음
+JOB_DB_PATH = os.environ.get("JOB_DB_PATH", "/tmp/jobs.sqlite3")
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+JOB_RESULT_TTL = float(os.environ.get("JOB_RESULT_TTL", "3600"))
+JOB_LEASE_SECONDS = float(os.environ.get("JOB_LEASE_SECONDS", "300"))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))
+# 업로드 한 건 / 대기 작업 수 상한 (/tmp를 무한정 채우지 않도록)
+JOB_MAX_MB = float(os.environ.get("JOB_MAX_MB", "20"))
+JOB_MAX_QUEUED = int(os.environ.get("JOB_MAX_QUEUED", "100"))
+# 워커는 서빙 이벤트 루프 위의 태스크이고 큐는 인스턴스별 /tmp 파일이므로, 응답 후 freeze되는 Lambda에서는
+# 작업이 진행되지 않고 다른 인스턴스에서는 조회도 안 됨 → auto: Lambda에서는 비활성화 (상시 실행 uvicorn 배포 전용)
+JOBS_ENABLED = os.environ.get("JOBS_ENABLED", "auto").lower()
+if JOBS_ENABLED == "auto":
+    JOBS_ENABLED = not os.environ.get("AWS_LAMBDA_FUNCTION_NAME")
+else:
+    JOBS_ENABLED = JOBS_ENABLED in ("1", "true")
+if os.path.dirname(JOB_DB_PATH):
+    os.makedirs(os.path.dirname(JOB_DB_PATH), exist_ok=True)
+job_queue = JobQueue(
+    JOB_DB_PATH,
+    result_ttl=JOB_RESULT_TTL,
+    lease_seconds=JOB_LEASE_SECONDS,
+    max_attempts=JOB_MAX_ATTEMPTS,
+)
+logger.info(
+    f"Job queue: {JOB_DB_PATH} (enabled={JOBS_ENABLED}, workers={JOB_WORKERS}, result_ttl={JOB_RESULT_TTL}s, "
+    f"max_attempts={JOB_MAX_ATTEMPTS}, max={JOB_MAX_MB}MB, max_queued={JOB_MAX_QUEUED})"
+)
+
+# 🔥 체크인/체크아웃 비교: 체크인 사진(?checkin=<property_id>)의 탐지 결과/마스크/ORB 특징점을 숙소별 인덱스에 저장하고
+# POST /compare 는 체크아웃 사진만 추론해서 저장된 참조와 정렬/대조 (비교 한 번에 추론 한 번)
+REFERENCE_INDEX_PATH = os.environ.get("REFERENCE_INDEX_PATH", "/tmp/checkin_index.sqlite3")
+REFERENCE_INDEX_TTL = float(os.environ.get("REFERENCE_INDEX_TTL", str(30 * 86400)))
+REFERENCE_FEATURES = int(os.environ.get("REFERENCE_FEATURES", str(DEFAULT_MAX_FEATURES)))
+COMPARE_MAX_CANDIDATES = int(os.environ.get("COMPARE_MAX_CANDIDATES", "20"))
+COMPARE_MIN_INLIERS = int(os.environ.get("COMPARE_MIN_INLIERS", str(DEFAULT_MIN_INLIERS)))
+COMPARE_TOLERANCE = float(os.environ.get("COMPARE_TOLERANCE", str(DEFAULT_TOLERANCE)))
+COMPARE_MIN_OVERLAP = float(os.environ.get("COMPARE_MIN_OVERLAP", str(DEFAULT_MIN_OVERLAP)))
+COMPARE_GROWTH_RATIO = float(os.environ.get("COMPARE_GROWTH_RATIO", str(DEFAULT_GROWTH_RATIO)))
+if os.path.dirname(REFERENCE_INDEX_PATH):
+    os.makedirs(os.path.dirname(REFERENCE_INDEX_PATH), exist_ok=True)
+reference_index = ReferenceIndex(REFERENCE_INDEX_PATH, ttl=REFERENCE_INDEX_TTL)
+logger.info(
+    f"Check-in reference index: {REFERENCE_INDEX_PATH} (ttl={REFERENCE_INDEX_TTL}s, features={REFERENCE_FEATURES}, "
+    f"purged {reference_index.purge_expired()} expired)"
+)
+
+# 🔥 점검 영상(POST /detect-crack/video): 장면이 바뀐 프레임만 골라 배치 추론, 같은 crack은 프레임 간 추적으로 하나로 묶음
+VIDEO_MAX_MB = float(os.environ.get("VIDEO_MAX_MB", "500"))
+VIDEO_TMP_DIR = os.environ.get("VIDEO_TMP_DIR", "/tmp/videos")
+VIDEO_CHECK_FPS = float(os.environ.get("VIDEO_CHECK_FPS", "5"))
+VIDEO_HASH_DISTANCE = int(os.environ.get("VIDEO_HASH_DISTANCE", "10"))
+VIDEO_MAX_GAP = float(os.environ.get("VIDEO_MAX_GAP", "2"))
+VIDEO_MAX_FRAMES = int(os.environ.get("VIDEO_MAX_FRAMES", "300"))
+VIDEO_BATCH_SIZE = max(1, int(os.environ.get("VIDEO_BATCH_SIZE", str(BATCH_MAX_SIZE))))
+VIDEO_TRACK_IOU = float(os.environ.get("VIDEO_TRACK_IOU", "0.2"))
+VIDEO_TRACK_MAX_MISSED = int(os.environ.get("VIDEO_TRACK_MAX_MISSED", "2"))
+VIDEO_MIN_TRACK_FRAMES = int(os.environ.get("VIDEO_MIN_TRACK_FRAMES", "1"))
+os.makedirs(VIDEO_TMP_DIR, exist_ok=True)
+
+# 🔥 단계별 지연 시간 / 큐 깊이 / cold start 메트릭 (GET /metrics, Prometheus 텍스트 형식)
+metrics = MetricsRegistry()
+STAGE_SECONDS = metrics.histogram(
+    "fairstay_stage_seconds", "Per-stage processing time of detection requests", ("stage",)
+)
+REQUEST_SECONDS = metrics.histogram(
+    "fairstay_request_seconds", "End-to-end request latency", ("endpoint",)
+)
+REQUESTS_TOTAL = metrics.counter("fairstay_requests_total", "Processed requests", ("endpoint", "status"))
+COLD_START_REQUESTS = metrics.counter(
+    "fairstay_cold_start_requests_total", "Detection requests that waited for the model to load"
+)
+metrics.gauge("fairstay_batch_queue_depth", "Images waiting in the micro-batch queue", lambda: batch_scheduler.stats()["queue_depth"])
+metrics.gauge("fairstay_inference_pending", "Jobs submitted to the inference executor (incl. running)", lambda: inference_executor.pending)
+metrics.gauge("fairstay_inference_active", "Jobs running on inference worker threads", lambda: inference_executor.active)
+metrics.gauge("fairstay_model_loaded", "1 if the model is loaded in this container", lambda: int(model is not None))
+metrics.gauge("fairstay_model_load_seconds", "Time spent loading the model (0 until loaded)", lambda: MODEL_LOAD_SECONDS or 0.0)
+metrics.gauge("fairstay_cold_start", "1 until this container has served its first detection", lambda: int(detections_served == 0))
+metrics.gauge("fairstay_process_start_time_seconds", "Container start time (unix seconds)", lambda: PROCESS_START_TIME)
+ADMISSION_REJECTED = metrics.counter(
+    "fairstay_admission_rejected_total", "Requests rejected by admission control", ("reason",)
+)
+metrics.gauge("fairstay_admission_in_flight", "Requests admitted into the detection pipeline", lambda: admission.in_flight)
+metrics.gauge("fairstay_admission_queue_depth", "Requests waiting for admission", lambda: admission.queue_depth)
+PREFILTER_TOTAL = metrics.counter("fairstay_prefilter_total", "Pre-filter cascade decisions", ("path",))
+metrics.gauge(
+    "fairstay_damage_models_loaded", "Damage-type models currently loaded in the registry",
+    lambda: sum(model_registry.get(name).loaded for name in model_registry.names),
+)
+detections_served = 0
+FIRST_DETECTION_SECONDS = None
+
+
+def response_fields(response):
+    """요약 로그에 넣을 탐지 응답 필드"""
+    if response is None:
+        return {}
+    return {
+        "file_id": response.get("file_id"),
+        "has_crack": response.get("has_crack"),
+        "crack_count": response.get("crack_count"),
+        "confidence": round(response["confidence"], 3) if response.get("confidence") is not None else None,
+        "cascade": (response.get("cascade") or {}).get("path"),
+        "tile_count": (response.get("tiling") or {}).get("tile_count"),
+        "reference_id": response.get("reference_id"),
+    }
+
+
+def observe_request(endpoint, status, elapsed, timer=None, request_id=None, response=None, **fields):
+    """
+    요청 하나의 지연 시간/단계별 시간을 메트릭에 기록하고 요약 로그 1줄 출력
+
+    요약 레벨: 성공 INFO, 4xx/5xx WARNING, 배치 항목(detect-crack/batch-item)은 DEBUG (배치 전체 요약이 따로 있음)
+    """
+    global detections_served
+    REQUESTS_TOTAL.inc(endpoint=endpoint, status=status)
+    REQUEST_SECONDS.observe(elapsed, endpoint=endpoint)
+    if endpoint.endswith("batch-item"):
+        level = logging.DEBUG
+    else:
+        level = logging.WARNING if status >= 400 else logging.INFO
+    request_summary(logger, endpoint, request_id, status, elapsed, timer, level=level, **response_fields(response), **fields)
+    if timer is None:
+        return
+    for stage, seconds in timer.stages.items():
+        STAGE_SECONDS.observe(seconds, stage=stage)
+    if timer.cold_start:
+        COLD_START_REQUESTS.inc()
+    if status == 200:
+        if detections_served == 0:
+            global FIRST_DETECTION_SECONDS
+            FIRST_DETECTION_SECONDS = elapsed
+        detections_served += 1
+
+def admission_key(request: Request) -> str:
+    """admission 대기열을 나누는 클라이언트 키 (헤더가 없으면 공용 대기열)"""
+    if not ADMISSION_CLIENT_HEADER:
+        return ""
+    return request.headers.get(ADMISSION_CLIENT_HEADER, "")
+
+
+def admission_rejected_response(error: AdmissionRejected, content: dict):
+    ADMISSION_REJECTED.inc(reason=error.reason)
+    return JSONResponse(
+        status_code=error.status_code,
+        content={**content, "reason": error.reason},
+        headers={"Retry-After": error.retry_after_header},
+    )
+
 logger.info(f"FastAPI initialized - Model will be loaded on first request")
+logger.info(f"Logging: {logging_stats()}, detail sample rate={LOG_DETAIL_SAMPLE_RATE}")
 logger.info(f"Save directory created/verified: {SAVE_DIR}")
 
-def resize_mask(mask, W, H):
-    mask_uint8 = (mask * 255).astype(np.uint8)
-    return cv2.resize(mask_uint8, (W, H), interpolation=cv2.INTER_NEAREST)
-
 @app.get("/")
 async def root():
     """루트 엔드포인트 - 기본 health check"""
-    logger.info("[GET /] Root endpoint accessed")
+    logger.debug("[GET /] Root endpoint accessed")
     response = {"message": "Welcome to FairStay AI", "status": "ok"}
-    logger.info(f"[GET /] Response: {response}")
     return response
 
 @app.get("/health")
 async def health():
     """백엔드에서 호출하는 health check 엔드포인트"""
-    logger.info("[GET /health] Health check requested")
+    logger.debug("[GET /health] Health check requested")
     try:
         # 모델 로딩 상태 확인 (lazy loading이므로 None일 수 있음)
         model_loaded = model is not None
@@ -97,10 +417,27 @@ async def health():
             "status": "healthy",
             "model_loaded": model_loaded,
             "model_path": MODEL_PATH,
+            "backend": INFERENCE_BACKEND,
+            "precision": MODEL_PRECISION,
+            "model_server": MODEL_SERVER_ADDRESS,
+            "cpu": {"quota": asdict(CPU_QUOTA), "threads": asdict(THREAD_SETTINGS)},
             "save_dir": SAVE_DIR,
+            "inference": inference_executor.stats(),
+            "batching": batch_scheduler.stats(),
+            "result_cache": result_cache.stats() if result_cache is not None else None,
+            "result_store": result_store.stats(),
+            "admission": admission.stats(),
+            "prefilter": {**prefilter.stats(), "batching": prefilter_scheduler.stats()} if prefilter.enabled else None,
+            "jobs": {**job_queue.stats(), **job_workers.stats()},
+            "reference_index": reference_index.stats(),
+            "models": model_registry.stats(),
+            "logging": logging_stats(),
+            "model_load_seconds": round(MODEL_LOAD_SECONDS, 3) if MODEL_LOAD_SECONDS is not None else None,
+            "cold_start": detections_served == 0,
+            "cold_start_ms": cold_start_report(),
             "note": "Model will be loaded on first inference request" if not model_loaded else None
         }
-        logger.info(f"[GET /health] Status: healthy, model_loaded={model_loaded}")
+        logger.debug("[GET /health] Status: healthy, model_loaded=%s", model_loaded)
         return response
     except Exception as e:
         logger.error(f"[GET /health] Exception: {str(e)}", exc_info=True)
@@ -109,127 +446,225 @@ async def health():
             content={"status": "unhealthy", "message": str(e)}
         )
 
-@app.post("/detect-crack")
-async def detect_crack(file: UploadFile = File(None), image: UploadFile = File(None)):
+class InvalidImageError(ValueError):
+    """업로드된 바이트를 이미지로 디코딩할 수 없을 때"""
+
+
+def decode_image(contents, request_id):
     """
-    백엔드 호환성: 'file' 또는 'image' 필드명 모두 지원
+    업로드 바이트를 BGR 이미지로 디코딩 (추론 executor의 워커 스레드에서 실행)
+
+    🔥 큰 JPEG는 모델 입력 크기 기준으로 축소 디코딩 (원본 크기는 DecodedImage에 보관)
     """
-    request_start = time.time()
-    request_id = str(uuid.uuid4())[:8]
-    logger.info(f"[POST /detect-crack] Request {request_id} started at {datetime.now().isoformat()}")
-    
-    # 🔥 첫 요청 시 모델 로딩 (Lazy Loading)
-    current_model = load_model()
-    
-    upload_file = file or image
-    if not upload_file:
-        logger.error(f"[POST /detect-crack] Request {request_id} - No image file provided")
-        return JSONResponse(
-            status_code=400,
-            content={"error": "No image file provided"}
-        )
-    
-    logger.info(f"[POST /detect-crack] Request {request_id} - File received: {upload_file.filename}, Content-Type: {upload_file.content_type}")
-    
-    contents = await upload_file.read()
-    file_size = len(contents)
-    logger.info(f"[POST /detect-crack] Request {request_id} - File size: {file_size} bytes ({file_size/1024:.2f} KB)")
-    
-    nparr = np.frombuffer(contents, np.uint8)
-    img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    decoded = decode_upload(contents, target_size=DECODE_TARGET_SIZE)
 
-    if img is None:
-        logger.error(f"[POST /detect-crack] Request {request_id} - Invalid image file (cv2.imdecode failed)")
-        return JSONResponse(
-            status_code=400,
-            content={"error": "Invalid image file"}
-        )
+    if decoded is None:
+        raise InvalidImageError("Invalid image file")
 
-    H, W = img.shape[:2]
-    logger.info(f"[POST /detect-crack] Request {request_id} - Image dimensions: {W}x{H}")
-    
-    # YOLO 모델 실행
-    inference_start = time.time()
-    logger.info(f"[POST /detect-crack] Request {request_id} - Starting YOLO inference...")
-    
+    H, W = decoded.image.shape[:2]
+    logger.debug(
+        "[POST /detect-crack] Request %s - Image dimensions: %dx%d (decoded %dx%d, 1/%d)",
+        request_id, decoded.original_width, decoded.original_height, W, H, decoded.reduction,
+    )
+    return decoded
+
+
+def predict_batch(images):
+    """이미지 리스트를 한 번의 배치 YOLO 호출로 실행하고 이미지별 Results 반환"""
     # Lambda read-only FS 대응: project와 name을 /tmp로 명시적 지정
-    results = current_model(
-        img, 
+    return inference_executor.predict(
+        images,
         save=False, 
         verbose=False,
         project="/tmp/runs",
         name="predict",
         exist_ok=True
     )
-    
-    inference_time = time.time() - inference_start
-    logger.info(f"[POST /detect-crack] Request {request_id} - YOLO inference completed in {inference_time:.3f}s")
 
+
+def record_inference_speed(timer, results):
+    """
+    Ultralytics Results.speed (이미지당 ms) → preprocess / forward / postprocess 단계 시간
+
+    'inference' 단계(배치 호출 전체 시간)의 세부 항목이며, 차이는 predictor 초기화 등 오버헤드
+    """
+    for r in results:
+        speed = getattr(r, "speed", None) or {}
+        for key, stage in (("preprocess", "preprocess"), ("inference", "forward"), ("postprocess", "postprocess")):
+            if speed.get(key) is not None:
+                timer.add(stage, speed[key] / 1000.0)
+
+
+batch_scheduler = BatchScheduler(
+    inference_executor,
+    predict_batch,
+    max_batch_size=BATCH_MAX_SIZE,
+    max_wait_ms=BATCH_MAX_WAIT_MS,
+)
+
+
+# 1단계 모델: lowres는 같은 모델(같은 executor/lock), classifier는 별도 executor에서 지연 로딩
+if PREFILTER_MODE == "classifier":
+    prefilter_executor = InferenceExecutor(functools.partial(load_classifier, PREFILTER_MODEL_PATH), max_workers=1)
+else:
+    prefilter_executor = inference_executor
+
+
+def predict_prefilter_batch(images):
+    """이미지 리스트 → 이미지별 사전 필터 점수"""
+    results = prefilter_executor.predict(
+        images,
+        save=False,
+        verbose=False,
+        project="/tmp/runs",
+        name="prefilter",
+        exist_ok=True,
+        **prefilter.predict_kwargs(),
+    )
+    return prefilter.scores(results)
+
+
+prefilter_scheduler = BatchScheduler(
+    prefilter_executor,
+    predict_prefilter_batch,
+    max_batch_size=BATCH_MAX_SIZE,
+    max_wait_ms=BATCH_MAX_WAIT_MS,
+)
+
+
+# 🔥 손상 유형별 모델 레지스트리 (POST /detect-damage): 기본 모델(MODEL_PATH)은 'crack', DAMAGE_MODELS로 유형 추가
+# 예: DAMAGE_MODELS=breakage=breakage.pt,stain=stain.pt (백엔드/입력 크기/정밀도는 기본 모델과 같음)
+# 추가 모델은 첫 요청 시 로딩하고, 로딩 전 RSS가 MODEL_MEMORY_LIMIT_MB를 넘게 되거나 MODEL_IDLE_SECONDS 동안
+# 쓰지 않으면 해제 (기본 모델은 항상 유지). MODEL_CONCURRENCY: 동시에 forward 하는 모델 수 (0이면 CPU 할당량 / torch 스레드)
+PRIMARY_DAMAGE_TYPE = "crack"
+DAMAGE_MODELS = parse_model_specs(os.environ.get("DAMAGE_MODELS", ""))
+MODEL_MEMORY_LIMIT_MB = float(os.environ.get("MODEL_MEMORY_LIMIT_MB", "0"))
+MODEL_IDLE_SECONDS = float(os.environ.get("MODEL_IDLE_SECONDS", "900"))
+MODEL_CONCURRENCY = int(os.environ.get("MODEL_CONCURRENCY", "0"))
+if MODEL_MEMORY_LIMIT_MB > 0:
+    model_memory_limit = int(MODEL_MEMORY_LIMIT_MB * 1024 * 1024)
+else:
+    # 컨테이너 메모리 한도의 80% (나머지는 디코딩/결과 저장소 메모리 tier 등)
+    container_limit = container_memory_limit()
+    model_memory_limit = int(container_limit * 0.8) if container_limit else None
+model_registry = ModelRegistry(
+    memory_limit=model_memory_limit,
+    idle_seconds=MODEL_IDLE_SECONDS,
+    concurrency=MODEL_CONCURRENCY or max(1, CPU_QUOTA.threads // THREAD_SETTINGS.torch_threads),
+    max_batch_size=BATCH_MAX_SIZE,
+    max_wait_ms=BATCH_MAX_WAIT_MS,
+    predict_kwargs={"save": False, "verbose": False, "project": "/tmp/runs", "name": "damage", "exist_ok": True},
+)
+model_registry.register(PRIMARY_DAMAGE_TYPE, path=MODEL_PATH, executor=inference_executor, pinned=True)
+for damage_type, damage_model_path in DAMAGE_MODELS:
+    if damage_type == PRIMARY_DAMAGE_TYPE:
+        raise ValueError(f"DAMAGE_MODELS cannot redefine '{PRIMARY_DAMAGE_TYPE}' (set MODEL_PATH instead)")
+    model_registry.register(
+        damage_type,
+        functools.partial(
+            load_model_with_threads,
+            THREAD_SETTINGS,
+            functools.partial(
+                load_backend_model, damage_model_path, INFERENCE_BACKEND, EXPORT_DIR, imgsz=MODEL_IMGSZ,
+                precision=MODEL_PRECISION,
+            ),
+        ),
+        path=damage_model_path,
+    )
+model_memory_limit_mb = model_registry.stats()["memory_limit_mb"]
+logger.info(
+    f"Model registry: {model_registry.names} "
+    f"(memory_limit={'unlimited' if model_memory_limit_mb is None else f'{model_memory_limit_mb}MB'}, "
+    f"idle={MODEL_IDLE_SECONDS}s, concurrency={model_registry.concurrency})"
+)
+
+
+def log_detail(request_id) -> bool:
+    """crack별 상세 debug 로그를 남길 요청인지 (DEBUG 비활성이면 샘플링 계산도 생략)"""
+    return logger.isEnabledFor(logging.DEBUG) and detail_sampler.sampled(request_id)
+
+
+def format_confidences(confidences):
+    return [f"{c:.3f}" for c in confidences]
+
+
+def collect_detections(results, W, H, request_id, mask_format=None, mask_tolerance=MASK_POLYGON_TOLERANCE,
+                       boxed=None):
+    """
+    YOLO Results → 원본 이미지(W x H) 좌표 탐지 리스트
+
+    mask_format("rle" / "polygon")이 있으면 탐지마다 마스크 인코딩과 길이/폭 추정을 추가
+    boxed: 모델 입력이 letterbox()로 만든 Letterbox이면 padding을 잘라낸 마스크 기준으로 계산
+
+    Returns:
+        (detections, has_crack, max_confidence)
+    """
     has_crack = False
     max_confidence = 0.0
-    bounding_boxes = []
+    detections = []
+    detail = log_detail(request_id)
 
     for r in results:
         if r.masks is None:
-            logger.info(f"[POST /detect-crack] Request {request_id} - No masks detected in this result")
+            logger.debug("[POST /detect-crack] Request %s - No masks detected in this result", request_id)
             continue
 
         masks = r.masks.data.cpu().numpy()
+        if boxed is not None:
+            masks = boxed.crop_masks(masks)
         boxes = r.boxes
         
-        logger.info(f"[POST /detect-crack] Request {request_id} - Found {len(masks)} mask(s)")
+        logger.debug("[POST /detect-crack] Request %s - Found %d mask(s)", request_id, len(masks))
         
         if boxes is not None:
             confidences = boxes.conf.cpu().numpy()
-            logger.info(f"[POST /detect-crack] Request {request_id} - Confidence scores: {[f'{c:.3f}' for c in confidences]}")
+            if detail:
+                logger.debug(
+                    "[POST /detect-crack] Request %s - Confidence scores: %s",
+                    request_id, Lazy(format_confidences, confidences),
+                )
         else:
             confidences = [0.0] * len(masks)
-            logger.warning(f"[POST /detect-crack] Request {request_id} - No confidence scores available")
+            logger.warning("[POST /detect-crack] Request %s - No confidence scores available", request_id)
 
-        for i, (mask, conf) in enumerate(zip(masks, confidences)):
+        if len(masks) > 0:
             has_crack = True
-            max_confidence = max(max_confidence, float(conf))
-            
-            mask_resized = resize_mask(mask, W, H)
-            mask_bool = mask_resized > 127
-
-            ys, xs = np.where(mask_bool)
-            if len(xs) == 0:
-                continue
-
-            x_min, x_max = int(xs.min()), int(xs.max())
-            y_min, y_max = int(ys.min()), int(ys.max())
-
-            bbox = {
-                "x": x_min,
-                "y": y_min,
-                "width": x_max - x_min,
-                "height": y_max - y_min
-            }
-            bounding_boxes.append(bbox)
-            logger.info(f"[POST /detect-crack] Request {request_id} - Crack {i+1}: bbox={bbox}, confidence={conf:.3f}")
-
-            cv2.rectangle(img, (x_min, y_min), (x_max, y_max), (0, 0, 255), 3)
-            cv2.putText(
-                img,
-                f"crack {i+1} ({conf:.2f})",
-                (x_min, y_min - 10),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.7,
-                (0, 0, 255),
-                2,
-            )
+            max_confidence = max(max_confidence, float(np.max(confidences)))
+
+        # 🔥 모든 마스크의 bbox를 마스크 해상도에서 한 번에 계산 (원본 해상도 resize 없음)
+        result_detections = masks_to_detections(masks, confidences, W, H)
+        if mask_format:
+            encode_masks(masks, result_detections, W, H, mask_format, mask_tolerance)
+        detections.extend(result_detections)
+
+    return detections, has_crack, max_confidence
 
-    file_id = str(uuid.uuid4())
-    out_path = f"{SAVE_DIR}/{file_id}.jpg"
-    
-    # 이미지 저장
-    save_start = time.time()
-    cv2.imwrite(out_path, img)
-    save_time = time.time() - save_start
-    logger.info(f"[POST /detect-crack] Request {request_id} - Result image saved: {out_path} (took {save_time:.3f}s)")
-    
-    total_time = time.time() - request_start
+
+def mask_entry(det):
+    """?masks= 응답 항목 하나 (bounding_boxes와 같은 순서)"""
+    entry = {
+        "area": det["area"],
+        "length": det["length"],
+        "mean_width": det["mean_width"],
+    }
+    if "rle" in det:
+        entry["rle"] = det["rle"]
+    if "polygons" in det:
+        entry["polygons"] = det["polygons"]
+    return entry
+
+
+def render_response(decoded, detections, has_crack, max_confidence, request_id, contents, render_target_size, timer,
+                    mask_format=None):
+    """
+    결과 이미지 저장 후 백엔드 호환 응답 생성
+
+    bounding box는 원본 이미지 좌표, 결과 이미지는 디코딩된 해상도에 그림
+    lazy 모드에서는 그리지 않고 탐지 결과와 원본 바이트(contents)만 저장 (render_target_size: 렌더링 시 디코딩 기준 크기)
+    mask_format이 있으면 'masks' (crack별 면적/길이/폭 + RLE 또는 polygon) 포함
+    """
+    bounding_boxes = detection_boxes(detections, request_id)
+    file_id = store_result_image(decoded, detections, request_id, contents, render_target_size, timer)
 
     # 백엔드 호환 응답 형식
     response = {
@@ -240,28 +675,1242 @@ async def detect_crack(file: UploadFile = File(None), image: UploadFile = File(N
         "crack_count": len(bounding_boxes),
         "bounding_boxes": bounding_boxes
     }
+    if mask_format:
+        response["mask_format"] = mask_format
+        response["masks"] = [mask_entry(det) for det in detections]
+    return response
+
+
+def detection_boxes(detections, request_id):
+    """탐지 리스트 → 응답의 bounding_boxes (원본 이미지 좌표)"""
+    bounding_boxes = []
+    detail = log_detail(request_id)
+    for det in detections:
+        bbox = {
+            "x": det["x"],
+            "y": det["y"],
+            "width": det["width"],
+            "height": det["height"]
+        }
+        bounding_boxes.append(bbox)
+        if detail:
+            logger.debug(
+                "[POST /detect-crack] Request %s - %s %d: bbox=%s, confidence=%.3f",
+                request_id, det.get("label", "crack").capitalize(), det["index"] + 1, bbox, det["confidence"],
+            )
+    return bounding_boxes
+
+
+def store_result_image(decoded, detections, request_id, contents, render_target_size, timer):
+    """
+    결과 이미지(eager) 또는 lazy 렌더링 재료(탐지 결과 + 원본 바이트)를 저장소에 넣고 file_id 반환
+
+    탐지에 "label"(손상 유형)이 있으면 유형별 이름/색으로 그림
+    """
+    file_id = str(uuid.uuid4())
+    
+    if RESULT_RENDER_MODE == "lazy":
+        record = {
+            "render_target_size": render_target_size,
+            "detections": [
+                {key: det[key] for key in ("index", "x", "y", "width", "height", "confidence", "label") if key in det}
+                for det in detections
+            ],
+        }
+        with timer.stage("store"):
+            result_store.put(f"{file_id}.src", contents)
+            result_store.put(f"{file_id}.json", json.dumps(record).encode("utf-8"))
+        logger.debug("[POST /detect-crack] Request %s - Detections stored for lazy rendering: %s", request_id, file_id)
+    else:
+        # 이미지 인코딩 후 저장소에 등록 (디스크 쓰기는 백그라운드)
+        with timer.stage("draw"):
+            img = draw_detections(decoded.image, detections, decoded.scale_x, decoded.scale_y)
+        with timer.stage("encode"):
+            data = encode_image(img)
+        with timer.stage("store"):
+            result_store.put(variant_name(file_id), data)
+        logger.debug("[POST /detect-crack] Request %s - Result image stored: %s (%d bytes)", request_id, file_id, len(data))
+    return file_id
+
+
+def result_masks(results):
+    """이미지 하나의 Results 리스트 → (N, h, w) 마스크 (탐지가 없으면 None)"""
+    if not results or results[0].masks is None:
+        return None
+    return results[0].masks.data.cpu().numpy()
+
+
+def index_checkin(decoded, results, detections, property_id, filename, request_id, timer):
+    """체크인 사진의 탐지 결과/마스크/특징점을 숙소 인덱스에 저장하고 reference id 반환"""
+    with timer.stage("index"):
+        reference = build_reference(decoded, result_masks(results), detections, REFERENCE_FEATURES)
+        reference_id = reference_index.put(property_id, reference, filename)
+    logger.debug(
+        "[POST /detect-crack] Request %s - Check-in reference %s stored for property %s (%d crack(s), %d keypoint(s))",
+        request_id, reference_id, property_id, len(reference.cracks), len(reference.keypoints),
+    )
+    return reference_id
+
+
+def summarize_detections(decoded, results, request_id, contents, timer,
+                         mask_format=None, mask_tolerance=MASK_POLYGON_TOLERANCE, checkin=None):
+    """
+    마스크 후처리 → 결과 이미지 저장 후 백엔드 호환 응답 생성
+    (추론 executor의 워커 스레드에서 실행)
+
+    checkin: (property_id, filename)이면 체크인 참조로 인덱스에 저장하고 응답에 'reference_id' 포함
+    """
+    with timer.stage("masks"):
+        detections, has_crack, max_confidence = collect_detections(
+            results, decoded.original_width, decoded.original_height, request_id, mask_format, mask_tolerance
+        )
+    response = render_response(
+        decoded, detections, has_crack, max_confidence, request_id, contents, DECODE_TARGET_SIZE, timer, mask_format
+    )
+    if checkin is not None:
+        response["reference_id"] = index_checkin(decoded, results, detections, *checkin, request_id, timer)
+    return response
+
+
+def run_tiled_detection(contents, request_id, timer, mask_format=None, mask_tolerance=MASK_POLYGON_TOLERANCE):
+    """
+    🔥 타일 모드: 원본 해상도로 디코딩 → 겹치는 타일 배치 추론 → 전역 좌표 마스크 기준 타일 경계 병합
+    (추론 executor의 워커 스레드에서 실행)
+
+    mask_format은 "polygon"만 지원 (병합된 crack의 union 마스크에서 원본 해상도 polygon/길이/폭 계산)
+
+    Raises:
+        InvalidImageError: 이미지 디코딩 실패
+    """
+    timings = {}
+    stage_start = time.perf_counter()
+    with timer.stage("decode"):
+        decoded = decode_upload(contents, target_size=0)
+    if decoded is None:
+        raise InvalidImageError("Invalid image file")
+    timings["decode"] = time.perf_counter() - stage_start
+
+    img = decoded.image
+    H, W = img.shape[:2]
+    tiles = make_tiles(W, H, tile_size=TILE_SIZE, overlap=TILE_OVERLAP)
+    logger.debug("[POST /detect-crack] Request %s - Tiled mode: %dx%d image, %d tile(s) of %dpx", request_id, W, H, len(tiles), TILE_SIZE)
+
+    stage_start = time.perf_counter()
+    results = []
+    crops = [img[y0:y1, x0:x1] for (x0, y0, x1, y1) in tiles]
+    for start in range(0, len(crops), TILE_BATCH_SIZE):
+        results.extend(predict_batch(crops[start:start + TILE_BATCH_SIZE]))
+    timings["inference"] = time.perf_counter() - stage_start
+    timer.add("inference", timings["inference"])
+    record_inference_speed(timer, results)
+
+    stage_start = time.perf_counter()
+    tile_detections = []
+    has_crack = False
+    max_confidence = 0.0
+    for tile_index, ((x0, y0, x1, y1), r) in enumerate(zip(tiles, results)):
+        # 마스크 인코딩/길이 추정은 병합된 union 마스크에서 한 번만 계산
+        detections, tile_has_crack, tile_max = collect_detections([r], x1 - x0, y1 - y0, request_id)
+        has_crack = has_crack or tile_has_crack
+        max_confidence = max(max_confidence, tile_max)
+        if detections:
+            mask_patches(r.masks.data.cpu().numpy(), detections, x1 - x0, y1 - y0)
+        for det in detections:
+            det.update(x=det["x"] + x0, y=det["y"] + y0, tile=tile_index)
+            tile_detections.append(det)
+    timings["masks"] = time.perf_counter() - stage_start
+    timer.add("masks", timings["masks"])
+
+    stage_start = time.perf_counter()
+    with timer.stage("merge"):
+        merged = merge_detections(tile_detections, mask_format=mask_format, tolerance=mask_tolerance)
+    timings["merge"] = time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    response = render_response(decoded, merged, has_crack, max_confidence, request_id, contents, 0, timer, mask_format)
+    timings["render"] = time.perf_counter() - stage_start
+
+    response["tiling"] = {
+        "tile_count": len(tiles),
+        "tile_size": TILE_SIZE,
+        "overlap": TILE_OVERLAP,
+        "raw_detections": len(tile_detections),
+        "timings_ms": {stage: round(t * 1000, 1) for stage, t in timings.items()},
+    }
+    logger.debug("[POST /detect-crack] Request %s - Tiled mode timings: %s", request_id, response["tiling"]["timings_ms"])
+    return response
+
+
+def result_image_exists(response):
+    """캐시된 응답의 결과 이미지(또는 lazy 렌더링 재료)가 아직 저장되어 있는지 확인"""
+    file_id = response["file_id"]
+    if result_store.exists(variant_name(file_id)):
+        return True
+    return result_store.exists(f"{file_id}.json") and result_store.exists(f"{file_id}.src")
+
+
+def render_result_image(file_id, size, quality, fmt):
+    """
+    GET /result 요청 크기/품질/형식의 결과 이미지 바이트 (없으면 렌더링 후 저장소에 캐시)
+
+    - lazy 모드 결과: 원본 바이트를 필요한 크기로 축소 디코딩 → bbox 그리기 → 인코딩
+    - eager 모드 결과의 썸네일: 저장된 결과 JPEG를 축소 디코딩 → 재인코딩
+
+    Returns:
+        bytes 또는 None (만료/eviction/존재하지 않는 file_id)
+    """
+    name = variant_name(file_id, size, quality, fmt)
+    data = result_store.get(name)
+    if data is not None:
+        return data
+
+    record = result_store.get(f"{file_id}.json")
+    if record is not None:
+        record = json.loads(record)
+        source = result_store.get(f"{file_id}.src")
+        if source is None:
+            return None
+        target_size = record["render_target_size"]
+        if size > 0:
+            target_size = size if target_size <= 0 else min(size, target_size)
+        decoded = decode_upload(source, target_size=target_size)
+        if decoded is None:
+            return None
+        img = draw_detections(decoded.image, record["detections"], decoded.scale_x, decoded.scale_y)
+    else:
+        base = result_store.get(variant_name(file_id))
+        if base is None:
+            return None
+        decoded = decode_upload(base, target_size=size)
+        if decoded is None:
+            return None
+        img = decoded.image
+
+    render_start = time.perf_counter()
+    data = encode_image(fit_to_size(img, size), fmt, quality)
+    result_store.put(name, data)
+    logger.debug("[GET /result/%s] Rendered %s (%d bytes, encode took %.3fs)", file_id, name, len(data), time.perf_counter() - render_start)
+    return data
+
+
+def parse_mask_options(masks, mask_tolerance, tiled):
+    """
+    ?masks / ?mask_tolerance 쿼리 검증
+
+    Returns:
+        (mask_format 또는 None, mask_tolerance)
+
+    Raises:
+        ValueError: 지원하지 않는 형식 (타일 모드의 RLE 포함)
+    """
+    mask_format = normalize_mask_format(masks)
+    if tiled and mask_format == "rle":
+        raise ValueError("RLE mask output is not supported in tiled mode (use masks=polygon)")
+    if mask_tolerance is None:
+        mask_tolerance = MASK_POLYGON_TOLERANCE
+    return mask_format, mask_tolerance
+
+
+def cache_variant(tiled, mask_format, mask_tolerance, use_prefilter=False):
+    """결과가 달라지는 요청 옵션 → 결과 캐시 key variant (기본 옵션은 빈 문자열)"""
+    parts = []
+    if tiled:
+        parts.append("tiled")
+    if use_prefilter:
+        parts.append(f"prefilter-{prefilter.mode}{prefilter.threshold:g}")
+    if mask_format == "polygon":
+        parts.append(f"polygon{mask_tolerance:g}")
+    elif mask_format:
+        parts.append(mask_format)
+    return "-".join(parts)
+
+
+async def process_image_bytes(contents, request_id, tiled=False, timer=None,
+                              mask_format=None, mask_tolerance=MASK_POLYGON_TOLERANCE, use_prefilter=True,
+                              checkin=None):
+    """
+    이미지 바이트 하나에 대한 전체 탐지 파이프라인
+
+    🔥 decode/후처리/저장은 추론 executor에서, 추론은 배치 스케줄러를 통해 실행
+    첫 요청 시 모델 로딩(Lazy Loading)도 워커 스레드에서 수행됨
+
+    Args:
+        tiled: True면 원본 해상도 타일 추론 (타일 자체가 하나의 배치이므로 배치 스케줄러를 거치지 않음)
+        timer: 단계별 시간을 기록할 StageTimer (Server-Timing / 메트릭용)
+        mask_format: "rle" / "polygon"이면 응답에 crack별 마스크 인코딩 + 면적/길이/폭 포함 (타일 모드는 polygon만)
+        mask_tolerance: polygon 단순화 허용 오차 (원본 픽셀)
+        use_prefilter: False면 PREFILTER_MODE가 켜져 있어도 항상 전체 모델 실행 (타일 모드는 항상 전체 모델)
+        checkin: (property_id, filename)이면 체크인 참조 인덱스에 저장 (타일 모드 미지원, 결과 캐시를 거치지 않음)
+
+    Raises:
+        InvalidImageError: 이미지 디코딩 실패
+    """
+    if timer is None:
+        timer = StageTimer()
+    use_prefilter = use_prefilter and prefilter.enabled and not tiled
+    
+    # 🔥 같은 사진 재업로드/재시도는 캐시된 결과와 기존 file_id를 그대로 반환
+    # (체크인 인덱싱은 저장이 목적이므로 캐시된 응답으로 대신할 수 없음)
+    cache_key = None
+    use_cache = result_cache is not None and checkin is None
+    if use_cache:
+        with timer.stage("cache"):
+            cache_key = await run_in_threadpool(
+                result_cache.make_key, contents, cache_variant(tiled, mask_format, mask_tolerance, use_prefilter)
+            )
+            cached = await run_in_threadpool(result_cache.get, cache_key, result_image_exists)
+        if cached is not None:
+            logger.debug("[POST /detect-crack] Request %s - Result cache hit: file_id=%s", request_id, cached["file_id"])
+            timer.cache_hit = True
+            return cached
+    
+    timer.cold_start = not inference_executor.model_loaded
     
-    logger.info(f"[POST /detect-crack] Request {request_id} - Processing completed in {total_time:.3f}s")
-    logger.info(f"[POST /detect-crack] Request {request_id} - Result: has_crack={has_crack}, crack_count={len(bounding_boxes)}, confidence={max_confidence:.3f}")
-    logger.info(f"[POST /detect-crack] Request {request_id} - Response: file_id={file_id}")
+    if tiled:
+        response = await inference_executor.submit(
+            run_tiled_detection, contents, request_id, timer, mask_format, mask_tolerance
+        )
+        if prefilter.enabled:
+            response["cascade"] = prefilter.bypassed()
+        if use_cache:
+            await run_in_threadpool(result_cache.put, cache_key, response)
+        return response
     
+    decode_start = time.perf_counter()
+    decoded = await inference_executor.submit(decode_image, contents, request_id)
+    timer.add("decode", time.perf_counter() - decode_start)
+    
+    cascade = prefilter.bypassed() if prefilter.enabled else None
+    if use_prefilter:
+        # 🔥 1단계: 값싼 점수가 threshold 미만이면 segmentation 없이 crack 없음으로 응답
+        score, prefilter_timing = await prefilter_scheduler.submit(decoded.image)
+        timer.add("prefilter", prefilter_timing.queue_wait + prefilter_timing.inference)
+        cascade = prefilter.decide(score)
+        PREFILTER_TOTAL.inc(path=cascade["path"])
+        logger.debug(
+            "[POST /detect-crack] Request %s - Pre-filter score %.3f (threshold %s) -> %s",
+            request_id, score, prefilter.threshold, cascade["path"],
+        )
+        if cascade["path"] == SKIPPED:
+            response = await inference_executor.submit(
+                summarize_detections, decoded, [], request_id, contents, timer, mask_format, mask_tolerance, checkin
+            )
+            response["cascade"] = cascade
+            if use_cache:
+                await run_in_threadpool(result_cache.put, cache_key, response)
+            return response
+    
+    # YOLO 모델 실행 (동시 요청과 묶여서 배치로 실행될 수 있음)
+    logger.debug("[POST /detect-crack] Request %s - Starting YOLO inference...", request_id)
+    result, batch_timing = await batch_scheduler.submit(decoded.image)
+    logger.debug(
+        "[POST /detect-crack] Request %s - YOLO inference completed in %.3fs (batch_size=%d, queue_wait=%.1fms)",
+        request_id, batch_timing.inference, batch_timing.batch_size, batch_timing.queue_wait * 1000,
+    )
+    timer.add("queue", batch_timing.queue_wait)
+    timer.add("inference", batch_timing.inference)
+    record_inference_speed(timer, [result])
+    
+    response = await inference_executor.submit(
+        summarize_detections, decoded, [result], request_id, contents, timer, mask_format, mask_tolerance, checkin
+    )
+    if cascade is not None:
+        response["cascade"] = cascade
+    
+    if use_cache:
+        await run_in_threadpool(result_cache.put, cache_key, response)
     return response
 
+
+@app.post("/detect-crack")
+async def detect_crack(
+    request: Request,
+    http_response: Response,
+    file: UploadFile = File(None),
+    image: UploadFile = File(None),
+    tiled: bool = Query(None),
+    masks: str = Query(None),
+    mask_tolerance: float = Query(None, ge=0),
+    use_prefilter: bool = Query(True, alias="prefilter"),
+    checkin_property: str = Query(None, alias="checkin", min_length=1),
+):
+    """
+    백엔드 호환성: 'file' 또는 'image' 필드명 모두 지원
+
+    ?tiled=true: 고해상도 타일 모드 (얇은 crack 탐지용, 응답에 'tiling' 타일 수/단계별 시간 포함)
+
+    ?masks=rle|polygon: crack별 마스크(COCO RLE 또는 단순화된 polygon)와 면적/길이/폭 추정을 'masks'로 포함
+    (?mask_tolerance: polygon 단순화 허용 오차, 원본 픽셀)
+
+    PREFILTER_MODE가 켜져 있으면 'cascade'에 경로(full / skipped)와 점수 포함 (?prefilter=false: 항상 전체 모델 실행)
+
+    ?checkin=<property_id>: 체크인 사진으로 숙소 인덱스에 저장하고 'reference_id' 포함 (POST /compare 의 비교 기준)
+
+    단계별 처리 시간은 Server-Timing 응답 헤더와 GET /metrics 히스토그램으로 제공
+
+    포화 상태면 503(대기열 가득 참/대기 시간 초과) 또는 429(클라이언트별 한도)와 Retry-After 헤더 반환
+    """
+    if tiled is None:
+        tiled = TILED_MODE_DEFAULT
+    request_start = time.perf_counter()
+    timer = StageTimer()
+    request_id = str(uuid.uuid4())[:8]
+    
+    # 🔥 요청당 INFO 로그는 observe_request의 요약 1줄 (단계별 시간, 결과, 오류 사유 포함)
+    try:
+        mask_format, mask_tolerance = parse_mask_options(masks, mask_tolerance, tiled)
+        if tiled and checkin_property:
+            raise ValueError("Check-in indexing is not supported in tiled mode")
+    except ValueError as e:
+        observe_request("detect-crack", 400, time.perf_counter() - request_start, request_id=request_id, error=str(e))
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    
+    upload_file = file or image
+    if not upload_file:
+        observe_request(
+            "detect-crack", 400, time.perf_counter() - request_start, request_id=request_id, error="No image file provided"
+        )
+        return JSONResponse(
+            status_code=400,
+            content={"error": "No image file provided"}
+        )
+    
+    logger.debug(
+        "[POST /detect-crack] Request %s - File received: %s, Content-Type: %s",
+        request_id, upload_file.filename, upload_file.content_type,
+    )
+    
+    file_size = None
+    try:
+        async with admission.admit(admission_key(request)) as waited:
+            timer.add("admission", waited)
+            with timer.stage("read"):
+                contents = await upload_file.read()
+            file_size = len(contents)
+            
+            response = await process_image_bytes(
+                contents, request_id, tiled=tiled, timer=timer,
+                mask_format=mask_format, mask_tolerance=mask_tolerance, use_prefilter=use_prefilter,
+                checkin=(checkin_property, upload_file.filename) if checkin_property else None,
+            )
+    except AdmissionRejected as e:
+        observe_request(
+            "detect-crack", e.status_code, time.perf_counter() - request_start, request_id=request_id,
+            error="Rejected by admission control", reason=e.reason,
+        )
+        return admission_rejected_response(e, {"error": "Server busy, retry later"})
+    except InvalidImageError:
+        observe_request(
+            "detect-crack", 400, time.perf_counter() - request_start, timer, request_id=request_id,
+            error="Invalid image file", bytes=file_size,
+        )
+        return JSONResponse(
+            status_code=400,
+            content={"error": "Invalid image file"},
+            headers={"Server-Timing": timer.server_timing()},
+        )
+    
+    total_time = time.perf_counter() - request_start
+    observe_request(
+        "detect-crack", 200, total_time, timer, request_id=request_id, response=response,
+        bytes=file_size, tiled=tiled, mask_format=mask_format,
+    )
+    http_response.headers["Server-Timing"] = timer.server_timing(total_time)
+    
+    return response
+
+@app.post("/detect-crack/batch")
+async def detect_crack_batch(
+    request: Request,
+    http_response: Response,
+    files: List[UploadFile] = File(None),
+    archive: UploadFile = File(None),
+    masks: str = Query(None),
+    mask_tolerance: float = Query(None, ge=0),
+    use_prefilter: bool = Query(True, alias="prefilter"),
+    checkin_property: str = Query(None, alias="checkin", min_length=1),
+):
+    """
+    다중 이미지 탐지 (체크아웃 점검 사진 20~60장을 한 번에 처리)
+
+    - 'files' 필드를 여러 번 보내거나, zip/tar 아카이브 하나를 'archive' (또는 'files')로 전송
+    - 이미지는 도착 순서대로 디코딩되어 배치 스케줄러를 통해 묶여서 추론됨
+    - 이미지 하나가 실패해도 나머지 결과는 그대로 반환 (해당 항목에 'error' 포함)
+    - admission control은 배치 전체를 요청 하나로 취급 (이미지 단위 동시성은 배치 내부에서 제한)
+    - ?masks=rle|polygon, ?prefilter=false, ?checkin=<property_id> 는 /detect-crack 과 동일
+    """
+    request_start = time.perf_counter()
+    batch_id = str(uuid.uuid4())[:8]
+    
+    try:
+        mask_format, mask_tolerance = parse_mask_options(masks, mask_tolerance, False)
+    except ValueError as e:
+        observe_request("detect-crack/batch", 400, time.perf_counter() - request_start, request_id=batch_id, error=str(e))
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    
+    uploads = list(files or [])
+    if archive is not None:
+        uploads.append(archive)
+    if not uploads:
+        observe_request(
+            "detect-crack/batch", 400, time.perf_counter() - request_start, request_id=batch_id, error="No image files provided"
+        )
+        return JSONResponse(
+            status_code=400,
+            content={"error": "No image files provided"}
+        )
+    
+    try:
+        async with admission.admit(admission_key(request)):
+            results = []
+            tasks = []
+            # 동시에 디코딩된 이미지가 메모리에 쌓이지 않도록 in-flight 이미지 수 제한
+            in_flight = asyncio.Semaphore(max(BATCH_MAX_SIZE, 1) * 2)
+    
+            async def process_item(index, filename, contents):
+                item_request_id = f"{batch_id}-{index}"
+                timer = StageTimer()
+                status = 200
+                response = None
+                try:
+                    response = await process_image_bytes(
+                        contents, item_request_id, timer=timer,
+                        mask_format=mask_format, mask_tolerance=mask_tolerance, use_prefilter=use_prefilter,
+                        checkin=(checkin_property, filename) if checkin_property else None,
+                    )
+                    results[index] = {"filename": filename, **response}
+                except InvalidImageError:
+                    logger.error(f"[POST /detect-crack/batch] Batch {batch_id} - Invalid image file: {filename}")
+                    results[index] = {"filename": filename, "error": "Invalid image file"}
+                    status = 400
+                except Exception as e:
+                    logger.error(f"[POST /detect-crack/batch] Batch {batch_id} - Failed to process {filename}: {str(e)}", exc_info=True)
+                    results[index] = {"filename": filename, "error": str(e)}
+                    status = 500
+                finally:
+                    in_flight.release()
+                    observe_request(
+                        "detect-crack/batch-item", status, timer.total(), timer,
+                        request_id=item_request_id, response=response, filename=filename,
+                    )
+    
+            async def schedule(filename, contents):
+                await in_flight.acquire()
+                results.append(None)
+                tasks.append(asyncio.create_task(process_item(len(results) - 1, filename, contents)))
+    
+            try:
+                for upload in uploads:
+                    if len(results) >= BATCH_MAX_FILES:
+                        logger.warning(f"[POST /detect-crack/batch] Batch {batch_id} - File limit {BATCH_MAX_FILES} reached, ignoring the rest")
+                        break
+
+                    if is_archive(upload.filename, upload.content_type):
+                        logger.debug("[POST /detect-crack/batch] Batch %s - Reading archive: %s", batch_id, upload.filename)
+                        members = iter_archive_images(
+                            upload.file, BATCH_MAX_FILES - len(results), int(BATCH_MAX_FILE_MB * 1024 * 1024)
+                        )
+                        try:
+                            async for name, contents, error in iterate_in_threadpool(members):
+                                if error:
+                                    logger.error(f"[POST /detect-crack/batch] Batch {batch_id} - Skipping {name}: {error}")
+                                    results.append({"filename": name, "error": error})
+                                    continue
+                                await schedule(name, contents)
+                        except ARCHIVE_ERRORS as e:
+                            logger.error(f"[POST /detect-crack/batch] Batch {batch_id} - Invalid archive {upload.filename}: {str(e)}")
+                            results.append({"filename": upload.filename, "error": "Invalid archive file"})
+                        continue
+
+                    contents = await upload.read()
+                    await schedule(upload.filename, contents)
+            finally:
+                # 업로드 읽기 중 예외가 나도 이미 시작한 항목 태스크는 끝까지 기다림
+                await asyncio.gather(*tasks, return_exceptions=True)
+    except AdmissionRejected as e:
+        observe_request(
+            "detect-crack/batch", e.status_code, time.perf_counter() - request_start, request_id=batch_id,
+            error="Rejected by admission control", reason=e.reason,
+        )
+        return admission_rejected_response(e, {"error": "Server busy, retry later"})
+    
+    failed_count = sum(1 for r in results if "error" in r)
+    total_time = time.perf_counter() - request_start
+    observe_request(
+        "detect-crack/batch", 200, total_time, request_id=batch_id,
+        count=len(results),
+        failed_count=failed_count,
+        crack_images=sum(1 for r in results if r.get("has_crack")),
+        crack_count=sum(r.get("crack_count", 0) for r in results),
+    )
+    http_response.headers["Server-Timing"] = f"total;dur={total_time * 1000:.1f}"
+    
+    return {
+        "count": len(results),
+        "failed_count": failed_count,
+        "results": results,
+    }
+
+def prepare_damage_input(contents, request_id, timer):
+    """
+    업로드 하나를 한 번만 디코딩 + letterbox (추론 executor의 워커 스레드에서 실행)
+
+    🔥 모든 손상 유형 모델이 같은 letterbox 배열을 입력으로 받으므로 resize/padding은 모델 수와 무관하게 한 번
+
+    Raises:
+        InvalidImageError: 이미지 디코딩 실패
+    """
+    with timer.stage("decode"):
+        decoded = decode_image(contents, request_id)
+    with timer.stage("letterbox"):
+        boxed = letterbox(decoded.image, MODEL_IMGSZ)
+    return decoded, boxed
+
+
+def summarize_damage(decoded, boxed, results, request_id, contents, timer,
+                     mask_format=None, mask_tolerance=MASK_POLYGON_TOLERANCE):
+    """
+    모델별 결과 → 손상 유형별 탐지 + 모든 유형을 그린 결과 이미지 하나 (추론 executor의 워커 스레드에서 실행)
+
+    results: {손상 유형(모델 이름): 이미지 하나의 Results}
+    """
+    damage_types = {}
+    detections = []
+    for damage_type, result in results.items():
+        with timer.stage("masks"):
+            found, detected, confidence = collect_detections(
+                [result], decoded.original_width, decoded.original_height, request_id, mask_format, mask_tolerance, boxed
+            )
+        for det in found:
+            det["label"] = damage_type
+        detections.extend(found)
+        damage_types[damage_type] = {
+            "detected": detected,
+            "confidence": confidence,
+            "count": len(found),
+            "bounding_boxes": detection_boxes(found, request_id),
+        }
+        if mask_format:
+            damage_types[damage_type]["masks"] = [mask_entry(det) for det in found]
+
+    file_id = store_result_image(decoded, detections, request_id, contents, DECODE_TARGET_SIZE, timer)
+    response = {
+        "file_id": file_id,
+        "image_url": f"/result/{file_id}",
+        "has_damage": any(entry["detected"] for entry in damage_types.values()),
+        "damage_count": len(detections),
+        "damage_types": damage_types,
+    }
+    if mask_format:
+        response["mask_format"] = mask_format
+    return response
+
+
+@app.post("/detect-damage")
+async def detect_damage(
+    request: Request,
+    http_response: Response,
+    file: UploadFile = File(None),
+    image: UploadFile = File(None),
+    models: str = Query(None),
+    masks: str = Query(None),
+    mask_tolerance: float = Query(None, ge=0),
+):
+    """
+    사진 한 장에 여러 손상 유형 모델 실행 - 'file' 또는 'image' 필드
+
+    ?models=crack,stain: 실행할 모델 (기본: 등록된 모든 모델, GET /health 의 'models')
+    - 업로드 읽기/디코딩/letterbox는 한 번만 하고 모델별 추론은 동시에 실행 (MODEL_CONCURRENCY),
+      같은 모델에 동시에 들어온 요청은 모델별 배치로 묶임
+    - 'damage_types'에 유형별 결과 (detected / confidence / count / bounding_boxes, ?masks=rle|polygon 이면 masks)
+    - 결과 이미지(image_url) 하나에 모든 유형을 유형별 색으로 표시, 'models'에 모델별 cold start / 배치 정보
+    - 등록되지 않은 모델 이름은 400
+    """
+    request_start = time.perf_counter()
+    timer = StageTimer()
+    request_id = str(uuid.uuid4())[:8]
+    
+    try:
+        names = model_registry.select(models)
+        mask_format, mask_tolerance = parse_mask_options(masks, mask_tolerance, False)
+    except ValueError as e:
+        observe_request("detect-damage", 400, time.perf_counter() - request_start, request_id=request_id, error=str(e))
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    
+    upload_file = file or image
+    if not upload_file:
+        observe_request(
+            "detect-damage", 400, time.perf_counter() - request_start, request_id=request_id, error="No image file provided"
+        )
+        return JSONResponse(status_code=400, content={"error": "No image file provided"})
+    
+    file_size = None
+    try:
+        async with admission.admit(admission_key(request)) as waited:
+            timer.add("admission", waited)
+            with timer.stage("read"):
+                contents = await upload_file.read()
+            file_size = len(contents)
+            decoded, boxed = await inference_executor.submit(prepare_damage_input, contents, request_id, timer)
+    
+            # 🔥 같은 입력을 모델별 배치 큐에 동시에 넣음 (모델마다 자기 워커 스레드에서 실행)
+            inference_start = time.perf_counter()
+            outputs = await asyncio.gather(*(model_registry.predict(name, boxed.image) for name in names))
+            timer.add("inference", time.perf_counter() - inference_start)
+            model_stats = {}
+            for name, (_, batch_timing, cold_start) in zip(names, outputs):
+                timer.add(f"model-{name}", batch_timing.queue_wait + batch_timing.inference)
+                timer.cold_start = timer.cold_start or cold_start
+                model_stats[name] = {
+                    "cold_start": cold_start,
+                    "batch_size": batch_timing.batch_size,
+                    "queue_ms": round(batch_timing.queue_wait * 1000, 1),
+                    "inference_ms": round(batch_timing.inference * 1000, 1),
+                }
+            results = [result for result, _, _ in outputs]
+            record_inference_speed(timer, results)
+    
+            response = await inference_executor.submit(
+                summarize_damage, decoded, boxed, dict(zip(names, results)), request_id, contents, timer,
+                mask_format, mask_tolerance,
+            )
+            response["models"] = model_stats
+    except AdmissionRejected as e:
+        observe_request(
+            "detect-damage", e.status_code, time.perf_counter() - request_start, request_id=request_id,
+            error="Rejected by admission control", reason=e.reason,
+        )
+        return admission_rejected_response(e, {"error": "Server busy, retry later"})
+    except InvalidImageError:
+        observe_request(
+            "detect-damage", 400, time.perf_counter() - request_start, timer, request_id=request_id,
+            error="Invalid image file", bytes=file_size,
+        )
+        return JSONResponse(
+            status_code=400,
+            content={"error": "Invalid image file"},
+            headers={"Server-Timing": timer.server_timing()},
+        )
+    
+    # 오래 쓰지 않은 추가 모델 해제 (gc.collect가 있으므로 이벤트 루프 밖에서)
+    await run_in_threadpool(model_registry.sweep)
+    
+    total_time = time.perf_counter() - request_start
+    observe_request(
+        "detect-damage", 200, total_time, timer, request_id=request_id, response=response, bytes=file_size,
+        models=",".join(names), has_damage=response["has_damage"], damage_count=response["damage_count"],
+        mask_format=mask_format,
+    )
+    http_response.headers["Server-Timing"] = timer.server_timing(total_time)
+    return response
+
+def load_references(property_id, reference_id=None):
+    """비교 기준 후보: reference_id가 있으면 그 사진만, 없으면 숙소의 최근 참조 COMPARE_MAX_CANDIDATES개"""
+    if reference_id:
+        reference = reference_index.get(property_id, reference_id)
+        return [reference] if reference is not None else []
+    return reference_index.load(property_id, COMPARE_MAX_CANDIDATES)
+
+
+def run_comparison(decoded, results, references, request_id, contents, timer):
+    """
+    체크아웃 사진 추론 결과 → 체크인 참조와 정렬/대조 후 응답 생성
+    (추론 executor의 워커 스레드에서 실행)
+
+    후보가 여럿이면 특징점 매칭만으로(추론 없이) inlier가 가장 많은 참조를 기준으로 선택
+    """
+    size = (decoded.original_width, decoded.original_height)
+    with timer.stage("masks"):
+        detections, has_crack, max_confidence = collect_detections(results, *size, request_id)
+    with timer.stage("align"):
+        keypoints, descriptors = extract_features(decoded.image, decoded.scale_x, decoded.scale_y, REFERENCE_FEATURES)
+        alignments = [align(keypoints, descriptors, size, ref, COMPARE_MIN_INLIERS) for ref in references]
+    best = max(range(len(references)), key=lambda i: (alignments[i].aligned, alignments[i].inliers))
+    reference, alignment = references[best], alignments[best]
+    logger.debug(
+        "[POST /compare] Request %s - Reference %s selected from %d candidate(s): aligned=%s, inliers=%d",
+        request_id, reference.id, len(references), alignment.aligned, alignment.inliers,
+    )
+    with timer.stage("compare"):
+        comparison = compare_cracks(
+            result_masks(results), detections, size, reference, alignment.homography,
+            tolerance=COMPARE_TOLERANCE, min_overlap=COMPARE_MIN_OVERLAP, growth_ratio=COMPARE_GROWTH_RATIO,
+        )
+    response = render_response(
+        decoded, detections, has_crack, max_confidence, request_id, contents, DECODE_TARGET_SIZE, timer
+    )
+    response.update(
+        property_id=reference.property_id,
+        reference_id=reference.id,
+        reference_filename=reference.filename,
+        candidates=len(references),
+        alignment=alignment.as_dict(),
+        has_new_damage=bool(comparison[NEW] or comparison[GROWN]),
+        new_count=len(comparison[NEW]),
+        grown_count=len(comparison[GROWN]),
+        unchanged_count=len(comparison[UNCHANGED]),
+        missing_count=len(comparison["missing"]),
+        **comparison,
+    )
+    return response
+
+
+@app.post("/compare")
+async def compare_checkout(
+    request: Request,
+    http_response: Response,
+    file: UploadFile = File(None),
+    image: UploadFile = File(None),
+    property_id: str = Query(..., min_length=1),
+    reference_id: str = Query(None),
+):
+    """
+    체크아웃 사진을 체크인 사진(?checkin=<property_id>로 인덱싱된 참조)과 비교
+
+    - 추론은 체크아웃 사진 한 번만 실행 (체크인 탐지 결과/마스크/특징점은 인덱스에서 재사용)
+    - ?reference_id 가 없으면 숙소의 최근 체크인 사진 중 특징점이 가장 잘 맞는 사진을 기준으로 선택
+    - 응답: /detect-crack 필드 + 'new' / 'grown' / 'unchanged' (체크아웃 좌표), 'missing' (체크인 좌표),
+      'alignment' (aligned=false면 특징 정렬 실패로 크기 비율만 맞춘 비교), 'has_new_damage'
+    - 숙소에 체크인 참조가 없거나 reference_id를 찾을 수 없으면 404
+    """
+    request_start = time.perf_counter()
+    timer = StageTimer()
+    request_id = str(uuid.uuid4())[:8]
+    
+    upload_file = file or image
+    if not upload_file:
+        observe_request("compare", 400, time.perf_counter() - request_start, request_id=request_id, error="No image file provided")
+        return JSONResponse(status_code=400, content={"error": "No image file provided"})
+    
+    with timer.stage("references"):
+        references = await run_in_threadpool(load_references, property_id, reference_id)
+    if not references:
+        error = "Check-in reference not found" if reference_id else "No check-in references for this property"
+        observe_request("compare", 404, time.perf_counter() - request_start, timer, request_id=request_id, error=error)
+        return JSONResponse(status_code=404, content={"error": error})
+    
+    file_size = None
+    try:
+        async with admission.admit(admission_key(request)) as waited:
+            timer.add("admission", waited)
+            with timer.stage("read"):
+                contents = await upload_file.read()
+            file_size = len(contents)
+            timer.cold_start = not inference_executor.model_loaded
+    
+            decode_start = time.perf_counter()
+            decoded = await inference_executor.submit(decode_image, contents, request_id)
+            timer.add("decode", time.perf_counter() - decode_start)
+    
+            result, batch_timing = await batch_scheduler.submit(decoded.image)
+            timer.add("queue", batch_timing.queue_wait)
+            timer.add("inference", batch_timing.inference)
+            record_inference_speed(timer, [result])
+    
+            response = await inference_executor.submit(
+                run_comparison, decoded, [result], references, request_id, contents, timer
+            )
+    except AdmissionRejected as e:
+        observe_request(
+            "compare", e.status_code, time.perf_counter() - request_start, request_id=request_id,
+            error="Rejected by admission control", reason=e.reason,
+        )
+        return admission_rejected_response(e, {"error": "Server busy, retry later"})
+    except InvalidImageError:
+        observe_request(
+            "compare", 400, time.perf_counter() - request_start, timer, request_id=request_id,
+            error="Invalid image file", bytes=file_size,
+        )
+        return JSONResponse(
+            status_code=400,
+            content={"error": "Invalid image file"},
+            headers={"Server-Timing": timer.server_timing()},
+        )
+    
+    total_time = time.perf_counter() - request_start
+    observe_request(
+        "compare", 200, total_time, timer, request_id=request_id, response=response, bytes=file_size,
+        property_id=property_id, aligned=response["alignment"]["aligned"],
+        new_count=response["new_count"], grown_count=response["grown_count"],
+    )
+    http_response.headers["Server-Timing"] = timer.server_timing(total_time)
+    return response
+
+@app.get("/properties/{property_id}/checkin")
+async def list_checkin_references(property_id: str):
+    """숙소에 인덱싱된 체크인 사진 목록 (최신순)"""
+    references = await run_in_threadpool(reference_index.list, property_id)
+    return {"property_id": property_id, "count": len(references), "references": references}
+
+@app.delete("/properties/{property_id}/checkin")
+async def delete_checkin_references(property_id: str):
+    """숙소의 체크인 참조 전체 삭제 (숙박 종료 후 / 다음 체크인 전)"""
+    deleted = await run_in_threadpool(reference_index.delete_property, property_id)
+    logger.info("[DELETE /properties/%s/checkin] Deleted %d check-in reference(s)", property_id, deleted)
+    return {"property_id": property_id, "deleted": deleted}
+
+def track_video_frames(frames, results, tracker, request_id, timer):
+    """
+    선택 프레임 배치의 추론 결과 → crack 추적 (추론 executor의 워커 스레드에서 실행)
+
+    best 프레임이 바뀐 crack만 해당 프레임에 bbox를 그려 JPEG로 보관 (프레임 자체는 배치가 끝나면 버림)
+    """
+    for (frame_index, timestamp, decoded), result in zip(frames, results):
+        size = (decoded.original_width, decoded.original_height)
+        with timer.stage("masks"):
+            detections, _, _ = collect_detections([result], *size, request_id)
+        with timer.stage("features"):
+            features = extract_features(decoded.image, decoded.scale_x, decoded.scale_y, REFERENCE_FEATURES)
+        with timer.stage("track"):
+            improved = tracker.update(frame_index, timestamp, detections, size, features)
+        for track in improved:
+            with timer.stage("draw"):
+                img = draw_detections(
+                    decoded.image.copy(), [{**track.best, "index": track.id - 1}], decoded.scale_x, decoded.scale_y
+                )
+            with timer.stage("encode"):
+                track.best_image = encode_image(img)
+    logger.debug(
+        "[POST /detect-crack/video] Request %s - Tracked %d frame(s) up to frame %d, %d crack(s) so far",
+        request_id, len(frames), frames[-1][0], len(tracker.tracks()),
+    )
+
+
+async def infer_video_frames(frames, tracker, request_id, timer):
+    """선택 프레임 묶음을 배치 스케줄러로 함께 추론한 뒤 추적"""
+    inference_start = time.perf_counter()
+    outputs = await asyncio.gather(*(batch_scheduler.submit(decoded.image) for _, _, decoded in frames))
+    timer.add("inference", time.perf_counter() - inference_start)
+    results = [result for result, _ in outputs]
+    record_inference_speed(timer, results)
+    await inference_executor.submit(track_video_frames, frames, results, tracker, request_id, timer)
+
+
+def video_response(tracker, sampler, info, timer):
+    """crack별 best 프레임을 결과 저장소에 넣고 응답 생성 (추론 executor의 워커 스레드에서 실행)"""
+    cracks = []
+    for track in tracker.tracks(VIDEO_MIN_TRACK_FRAMES):
+        file_id = str(uuid.uuid4())
+        with timer.stage("store"):
+            result_store.put(variant_name(file_id), track.best_image)
+        best = track.best
+        cracks.append({
+            "crack_id": track.id,
+            "first_seen_s": round(track.first_time, 3),
+            "last_seen_s": round(track.last_time, 3),
+            "frame_count": track.hits,
+            "confidence": best["confidence"],
+            "best_frame": {"frame_index": best["frame_index"], "timestamp_s": best["timestamp_s"]},
+            "bounding_box": {key: best[key] for key in ("x", "y", "width", "height")},
+            "area": best["area"],
+            "file_id": file_id,
+            "image_url": f"/result/{file_id}",
+        })
+    return {
+        "has_crack": bool(cracks),
+        "confidence": max((c["confidence"] for c in cracks), default=0.0),
+        "crack_count": len(cracks),
+        "cracks": cracks,
+        "video": {
+            "fps": round(info.fps, 3),
+            "width": info.width,
+            "height": info.height,
+            "duration_s": round(sampler.frames_read / info.fps, 3),
+            **sampler.stats(),
+            "aligned_frames": tracker.aligned_frames,
+            "unaligned_frames": tracker.unaligned_frames,
+        },
+    }
+
+
+@app.post("/detect-crack/video")
+async def detect_crack_video(
+    request: Request,
+    http_response: Response,
+    file: UploadFile = File(None),
+    video: UploadFile = File(None),
+):
+    """
+    점검 영상(방 하나를 찍은 walkthrough) 탐지 - 'file' 또는 'video' 필드
+
+    - 초당 VIDEO_CHECK_FPS개 프레임만 디코딩하고, 그중 장면이 바뀐 프레임(dHash 거리)만 골라 배치 추론
+    - 프레임 간 카메라 이동(ORB homography)을 보정해서 같은 crack은 하나로 묶고 crack마다 신뢰도가 가장 높은 프레임만 반환
+      ('cracks' 항목마다 처음/마지막으로 보인 시각, best 프레임 bbox, 결과 이미지 image_url)
+    - 'video'에 읽은/검사한/추론한 프레임 수 (VIDEO_MAX_FRAMES를 넘으면 truncated=true)
+    - 메모리는 추론 배치 하나 분량의 프레임 + crack별 best 프레임 JPEG (영상 길이와 무관)
+    """
+    request_start = time.perf_counter()
+    timer = StageTimer()
+    request_id = str(uuid.uuid4())[:8]
+    
+    upload_file = file or video
+    if not upload_file:
+        observe_request(
+            "detect-crack/video", 400, time.perf_counter() - request_start, request_id=request_id, error="No video file provided"
+        )
+        return JSONResponse(status_code=400, content={"error": "No video file provided"})
+    
+    logger.debug(
+        "[POST /detect-crack/video] Request %s - File received: %s, Content-Type: %s",
+        request_id, upload_file.filename, upload_file.content_type,
+    )
+    
+    path = None
+    try:
+        async with admission.admit(admission_key(request)) as waited:
+            timer.add("admission", waited)
+            with timer.stage("read"):
+                path = await run_in_threadpool(
+                    save_upload, upload_file.file, os.path.splitext(upload_file.filename or "")[1],
+                    int(VIDEO_MAX_MB * 1024 * 1024), VIDEO_TMP_DIR,
+                )
+            cap, info = await run_in_threadpool(open_video, path)
+            timer.cold_start = not inference_executor.model_loaded
+            sampler = FrameSampler(
+                check_fps=VIDEO_CHECK_FPS, min_distance=VIDEO_HASH_DISTANCE, max_gap=VIDEO_MAX_GAP,
+                max_frames=VIDEO_MAX_FRAMES, target_size=DECODE_TARGET_SIZE,
+            )
+            tracker = CrackTracker(
+                iou_threshold=VIDEO_TRACK_IOU, max_missed=VIDEO_TRACK_MAX_MISSED, min_inliers=COMPARE_MIN_INLIERS,
+            )
+            try:
+                # 🔥 프레임은 VIDEO_BATCH_SIZE개씩만 모아서 추론 → 메모리가 영상 길이에 비례하지 않음
+                frames = []
+                async for frame in iterate_in_threadpool(sampler.frames(cap, info.fps)):
+                    frames.append(frame)
+                    if len(frames) >= VIDEO_BATCH_SIZE:
+                        await infer_video_frames(frames, tracker, request_id, timer)
+                        frames = []
+                if frames:
+                    await infer_video_frames(frames, tracker, request_id, timer)
+            finally:
+                cap.release()
+                timer.add("decode", sampler.read_seconds)
+            if sampler.frames_read == 0:
+                raise InvalidVideoError("Invalid video file")
+            response = await inference_executor.submit(video_response, tracker, sampler, info, timer)
+    except AdmissionRejected as e:
+        observe_request(
+            "detect-crack/video", e.status_code, time.perf_counter() - request_start, request_id=request_id,
+            error="Rejected by admission control", reason=e.reason,
+        )
+        return admission_rejected_response(e, {"error": "Server busy, retry later"})
+    except (InvalidVideoError, VideoTooLargeError) as e:
+        status = 413 if isinstance(e, VideoTooLargeError) else 400
+        observe_request("detect-crack/video", status, time.perf_counter() - request_start, timer, request_id=request_id, error=str(e))
+        return JSONResponse(status_code=status, content={"error": str(e)})
+    finally:
+        if path is not None:
+            os.unlink(path)
+    
+    total_time = time.perf_counter() - request_start
+    observe_request(
+        "detect-crack/video", 200, total_time, timer, request_id=request_id, response=response,
+        **{key: response["video"][key] for key in ("duration_s", "frames_read", "frames_inferred", "truncated")},
+    )
+    http_response.headers["Server-Timing"] = timer.server_timing(total_time)
+    return response
+
+async def run_job(job):
+    """작업 큐 워커 핸들러 - /detect-crack 과 같은 파이프라인(process_image_bytes)으로 처리"""
+    timer = StageTimer()
+    start = time.perf_counter()
+    status = 200
+    response = None
+    try:
+        response = await process_image_bytes(job.payload, job.id[:8], tiled=job.tiled, timer=timer)
+        return response
+    except InvalidImageError:
+        status = 400
+        raise
+    except Exception:
+        status = 500
+        raise
+    finally:
+        observe_request("jobs", status, time.perf_counter() - start, timer, request_id=job.id, response=response)
+
+
+job_workers = JobWorkerPool(job_queue, run_job, workers=JOB_WORKERS, permanent_errors=(InvalidImageError,))
+metrics.gauge("fairstay_jobs_queued", "Jobs waiting in the persistent job queue", lambda: job_queue.stats()["queued"])
+
+
+def jobs_disabled_response():
+    return JSONResponse(
+        status_code=501,
+        content={"error": "Async jobs are not available in this deployment (long-running server only); "
+                          "use POST /detect-crack"},
+    )
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(
+    file: UploadFile = File(None),
+    image: UploadFile = File(None),
+    tiled: bool = Query(None),
+):
+    """
+    비동기 탐지 작업 생성 - job id를 바로 반환하고 백그라운드 워커가 처리
+
+    'file' 또는 'image' 필드 (POST /detect-crack 과 동일), ?tiled=true 지원.
+    결과는 GET /jobs/{job_id} 로 조회
+
+    - Lambda 등 JOBS_ENABLED가 꺼진 환경: 501
+    - 업로드가 JOB_MAX_MB 초과: 413
+    - 대기 작업이 JOB_MAX_QUEUED 이상: 503 + Retry-After
+    """
+    if not JOBS_ENABLED:
+        return jobs_disabled_response()
+    if tiled is None:
+        tiled = TILED_MODE_DEFAULT
+    upload_file = file or image
+    if not upload_file:
+        logger.error("[POST /jobs] No image file provided")
+        return JSONResponse(status_code=400, content={"error": "No image file provided"})
+    
+    max_bytes = int(JOB_MAX_MB * 1024 * 1024)
+    contents = await upload_file.read(max_bytes + 1)
+    if len(contents) > max_bytes:
+        logger.warning("[POST /jobs] Upload too large: %s (limit %sMB)", upload_file.filename, JOB_MAX_MB)
+        return JSONResponse(status_code=413, content={"error": f"Image exceeds the {JOB_MAX_MB:g}MB job upload limit"})
+
+    queued = (await run_in_threadpool(job_queue.stats))["queued"]
+    if queued >= JOB_MAX_QUEUED:
+        logger.warning("[POST /jobs] Job queue full: %d queued (limit %d)", queued, JOB_MAX_QUEUED)
+        return admission_rejected_response(
+            AdmissionRejected(503, "job_queue_full", ADMISSION_RETRY_AFTER), {"error": "Job queue is full, retry later"}
+        )
+
+    job_id = await run_in_threadpool(job_queue.submit, contents, upload_file.filename, tiled)
+    job_workers.ensure_started()
+    job_workers.notify()
+    logger.info("[POST /jobs] Job %s queued: %s, %d bytes, tiled=%s", job_id, upload_file.filename, len(contents), tiled)
+    
+    return {"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    작업 상태 조회 (queued / running / done / failed)
+
+    done이면 'result'에 POST /detect-crack 과 같은 응답, failed면 'error'에 사유 포함
+    """
+    if not JOBS_ENABLED:
+        return jobs_disabled_response()
+    # 워커가 아직 없거나 이벤트 루프가 바뀐 경우 재시작 (재시작된 컨테이너에 남아 있던 작업 처리)
+    job_workers.ensure_started()
+    job = await run_in_threadpool(job_queue.get, job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": "Job not found or expired"})
+    return job
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus 텍스트 형식 메트릭 (단계별 지연 시간 히스토그램, 큐 깊이, 모델 로딩 시간, cold start)"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/result/{file_id}")
-async def get_result(file_id: str):
-    logger.info(f"[GET /result/{file_id}] Result image requested")
-    path = f"{SAVE_DIR}/{file_id}.jpg"
+async def get_result(
+    file_id: str,
+    size: int = Query(0, ge=0, le=8192),
+    quality: int = Query(DEFAULT_QUALITY, ge=1, le=100),
+    image_format: str = Query("jpeg", alias="format"),
+):
+    """
+    결과 이미지 (size: 긴 변 최대 픽셀, 0이면 원본 / quality: 1-100 / format: jpeg|webp)
+
+    처음 요청된 크기/형식은 렌더링 후 캐시, 이후에는 저장소(메모리 tier 우선)에서 바로 응답
+    """
+    logger.debug("[GET /result/%s] Result image requested (size=%d, quality=%d, format=%s)", file_id, size, quality, image_format)
+    try:
+        fmt = normalize_format(image_format)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
     
-    if not os.path.exists(path):
-        logger.error(f"[GET /result/{file_id}] File not found: {path}")
+    data = await run_in_threadpool(render_result_image, file_id, size, quality, fmt)
+    
+    if data is None:
+        logger.error(f"[GET /result/{file_id}] Result image not found (expired or evicted)")
         return JSONResponse(
             status_code=404,
             content={"error": "Result image not found"}
         )
     
-    file_size = os.path.getsize(path)
-    logger.info(f"[GET /result/{file_id}] Returning image: {path} ({file_size} bytes, {file_size/1024:.2f} KB)")
-    return FileResponse(path)
+    file_size = len(data)
+    logger.debug("[GET /result/%s] Returning image (%d bytes)", file_id, file_size)
+    return Response(content=data, media_type=media_type(fmt))
+
+# 🔥 cold start: 모듈 import(초기화) 완료까지 걸린 시간. ultralytics/torch는 모델 로딩 시점에 import됨
+STARTUP_SECONDS = time.perf_counter() - STARTUP_BEGIN
+logger.info(f"Module initialized in {STARTUP_SECONDS * 1000:.0f}ms")
+
+# 🔥 선택적 모델 warm-up: 모델 로딩 + 더미 추론 1회를 워커 스레드에서 미리 실행
+# Lambda에서는 MODEL_WARMUP_WAIT(초)만큼 import를 기다려 init 단계(부스트된 CPU) 안에서 끝내도록 할 수 있음
+MODEL_WARMUP = os.environ.get("MODEL_WARMUP", "0") == "1"
+MODEL_WARMUP_WAIT = float(os.environ.get("MODEL_WARMUP_WAIT", "0"))
+WARMUP_SECONDS = None
+warmup_future = None
+
+
+def warm_up_model():
+    """모델 로딩 후 더미 이미지 1장 추론 (predictor 초기화/첫 호출 비용을 요청 전에 지불)"""
+    global WARMUP_SECONDS
+    warmup_start = time.perf_counter()
+    predict_batch([np.full((MODEL_IMGSZ, MODEL_IMGSZ, 3), 114, dtype=np.uint8)])
+    WARMUP_SECONDS = time.perf_counter() - warmup_start
+    logger.info(f"Model warm-up completed in {WARMUP_SECONDS:.2f} seconds")
+
+
+def _log_warmup_failure(future):
+    if future.exception() is not None:
+        logger.error(f"Model warm-up failed: {future.exception()}")
+
+
+def cold_start_report():
+    """/health용 cold start 단계별 시간 (ms, 아직 일어나지 않은 단계는 None)"""
+    to_ms = lambda seconds: round(seconds * 1000, 1) if seconds is not None else None
+    return {
+        "startup": to_ms(STARTUP_SECONDS),
+        "model_load": to_ms(MODEL_LOAD_SECONDS),
+        "warmup": to_ms(WARMUP_SECONDS),
+        "first_detection": to_ms(FIRST_DETECTION_SECONDS),
+    }
+
+
+# 모델 프로세스를 띄우는 부모 프로세스(HTTP_WORKERS > 1)는 모델을 로딩하지 않음
+if MODEL_WARMUP and not (__name__ == "__main__" and HTTP_WORKERS > 1):
+    logger.info(f"Starting background model warm-up (wait={MODEL_WARMUP_WAIT}s)")
+    warmup_future = inference_executor.submit_background(warm_up_model)
+    warmup_future.add_done_callback(_log_warmup_failure)
+    if MODEL_WARMUP_WAIT > 0:
+        try:
+            warmup_future.result(timeout=MODEL_WARMUP_WAIT)
+        except Exception:
+            logger.warning("Model warm-up did not finish during init, continuing in the background")
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    import uvicorn
+    # 요청마다 요약 로그가 있으므로 uvicorn access log는 끔
+    if HTTP_WORKERS > 1:
+        from model_server import ModelServerPool
+        # CPU 할당량은 모델 프로세스들이 나눠 씀
+        model_servers = ModelServerPool(
+            functools.partial(
+                load_model_with_threads,
+                THREAD_SETTINGS.split(MODEL_SERVER_PROCESSES),
+                functools.partial(
+                    load_backend_model, MODEL_PATH, INFERENCE_BACKEND, EXPORT_DIR, imgsz=MODEL_IMGSZ,
+                    precision=MODEL_PRECISION,
+                ),
+            ),
+            processes=MODEL_SERVER_PROCESSES,
+            socket_dir=MODEL_SERVER_SOCKET_DIR,
+            max_batch_size=BATCH_MAX_SIZE,
+        )
+        os.environ["MODEL_SERVER_SOCKETS"] = ",".join(model_servers.start())
+        logger.info(f"Starting {HTTP_WORKERS} HTTP worker(s) sharing {MODEL_SERVER_PROCESSES} model server process(es)")
+        try:
+            uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=HTTP_WORKERS, access_log=False)
+        finally:
+            model_servers.stop()
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8000, access_log=False)
\ No newline at end of file
@@ -0,0 +1,212 @@
+"""
+마스크 응답 인코딩 (COCO RLE / 단순화된 polygon) + crack 길이/평균 폭 추정
+
+결과 JPEG 없이도 프론트엔드가 crack 모양을 오버레이하고 면적/길이를 표시할 수 있도록,
+마스크 해상도의 (N, h, w) 텐서를 그대로 사용해 작은 JSON으로 인코딩합니다.
+
+- rle: COCO 압축 RLE 문자열 (pycocotools.mask.decode 로 바로 복원 가능, 마스크 해상도 기준 "size": [h, w])
+- polygon: 외곽선을 cv2.approxPolyDP로 단순화 (tolerance: 원본 픽셀 단위 최대 오차), 원본 좌표의 [x1, y1, x2, y2, ...]
+- 길이/폭: 모든 마스크의 둘레를 4방향 경계 교차 수(Crofton 공식)로 한 번에 계산한 뒤,
+  같은 면적/둘레의 직사각형(길이 L, 폭 t: L * t = area, L + t = perimeter / 2)으로 근사
+"""
+
+import math
+
+import cv2
+import numpy as np
+
+from postprocess import binarize_masks
+
+MASK_FORMATS = ("rle", "polygon")
+DEFAULT_POLYGON_TOLERANCE = 2.0
+
+
+def normalize_mask_format(value):
+    """?masks= 값 정리 (없으면 None, 지원하지 않는 값이면 ValueError)"""
+    if value is None:
+        return None
+    value = value.strip().lower()
+    if value in ("", "none", "0", "false"):
+        return None
+    if value in ("polygons", "poly"):
+        value = "polygon"
+    if value not in MASK_FORMATS:
+        raise ValueError(f"Unknown mask format '{value}' (expected one of {', '.join(MASK_FORMATS)})")
+    return value
+
+
+def _counts_to_string(counts) -> str:
+    """COCO RLE counts → 압축 문자열 (pycocotools rleToString과 동일)"""
+    chars = []
+    for i, x in enumerate(counts):
+        x = int(x)
+        if i > 2:
+            x -= int(counts[i - 2])
+        more = True
+        while more:
+            c = x & 0x1F
+            x >>= 5
+            more = (x != -1) if (c & 0x10) else (x != 0)
+            if more:
+                c |= 0x20
+            chars.append(chr(c + 48))
+    return "".join(chars)
+
+
+def _string_to_counts(s: str):
+    counts = []
+    p = 0
+    while p < len(s):
+        x = 0
+        k = 0
+        more = True
+        while more:
+            c = ord(s[p]) - 48
+            x |= (c & 0x1F) << (5 * k)
+            more = bool(c & 0x20)
+            p += 1
+            k += 1
+            if not more and (c & 0x10):
+                x |= -1 << (5 * k)
+        if len(counts) > 2:
+            x += counts[-2]
+        counts.append(x)
+    return counts
+
+
+def rle_encode(masks):
+    """
+    (N, h, w) 이진 마스크 → COCO RLE 리스트 (column-major, 0부터 시작하는 run 길이)
+
+    run 경계는 모든 마스크에 대해 한 번의 비교로 계산하고, 문자열 변환만 마스크별로 수행
+    """
+    masks = np.asarray(masks, dtype=bool)
+    n, h, w = masks.shape
+    if n == 0:
+        return []
+    flat = masks.transpose(0, 2, 1).reshape(n, h * w)
+    # 각 마스크 앞에 0을 붙여서 첫 run이 항상 0(배경)이 되도록 함
+    padded = np.concatenate([np.zeros((n, 1), dtype=bool), flat], axis=1)
+    mask_idx, pos = np.nonzero(padded[:, 1:] != padded[:, :-1])
+    splits = np.searchsorted(mask_idx, np.arange(1, n))
+
+    encoded = []
+    for boundaries in np.split(pos, splits):
+        edges = np.concatenate([[0], boundaries, [h * w]])
+        counts = np.diff(edges)
+        encoded.append({"size": [h, w], "counts": _counts_to_string(counts.tolist())})
+    return encoded
+
+
+def rle_decode(rle) -> np.ndarray:
+    """COCO RLE → (h, w) bool 마스크 (테스트/클라이언트 참고용)"""
+    h, w = rle["size"]
+    counts = rle["counts"]
+    if isinstance(counts, str):
+        counts = _string_to_counts(counts)
+    values = np.zeros(len(counts), dtype=bool)
+    values[1::2] = True
+    flat = np.repeat(values, counts)
+    return flat.reshape(w, h).T
+
+
+def shape_estimates(masks, areas, W: int, H: int):
+    """
+    원본 해상도(W x H) 기준 마스크별 둘레 / 길이 / 평균 폭 추정 (벡터화)
+
+    Args:
+        masks: (N, h, w) 이진 마스크
+        areas: 길이 N의 원본 해상도 픽셀 면적
+
+    Returns:
+        (perimeters, lengths, widths) 각각 길이 N의 float64 배열
+    """
+    masks = np.asarray(masks, dtype=bool)
+    n, h, w = masks.shape
+    padded = np.pad(masks, ((0, 0), (1, 1), (1, 1)))
+
+    # 4방향(0°, 90°, 45°, 135°) 격자선과 경계의 교차 수
+    horizontal = np.count_nonzero(padded[:, :, 1:] != padded[:, :, :-1], axis=(1, 2))
+    vertical = np.count_nonzero(padded[:, 1:, :] != padded[:, :-1, :], axis=(1, 2))
+    diagonal = (
+        np.count_nonzero(padded[:, 1:, 1:] != padded[:, :-1, :-1], axis=(1, 2))
+        + np.count_nonzero(padded[:, 1:, :-1] != padded[:, :-1, 1:], axis=(1, 2))
+    )
+    # Crofton 공식: 둘레 = (1/2) * Σ_방향 (π/4) * 교차 수 * 격자선 간격
+    perimeters = (math.pi / 8.0) * (horizontal + vertical + diagonal / math.sqrt(2.0))
+    perimeters = perimeters * ((W / w + H / h) / 2.0)
+
+    areas = np.asarray(areas, dtype=np.float64)
+    half = perimeters / 2.0
+    lengths = (half + np.sqrt(np.maximum(half * half - 4.0 * areas, 0.0))) / 2.0
+    widths = np.divide(areas, lengths, out=np.zeros_like(areas), where=lengths > 0)
+    return perimeters, lengths, widths
+
+
+def mask_polygons(mask, scale_x: float, scale_y: float, tolerance: float = DEFAULT_POLYGON_TOLERANCE):
+    """
+    마스크 하나의 외곽선 → 단순화된 polygon 리스트 (원본 좌표, [x1, y1, x2, y2, ...])
+
+    Args:
+        scale_x, scale_y: 마스크 픽셀 → 원본 픽셀 배율
+        tolerance: 단순화 허용 오차 (원본 픽셀)
+    """
+    contours, _ = cv2.findContours(mask.astype(np.uint8), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    epsilon = max(0.0, float(tolerance)) / ((scale_x + scale_y) / 2.0)
+    polygons = []
+    for contour in contours:
+        if epsilon > 0:
+            contour = cv2.approxPolyDP(contour, epsilon, True)
+        points = contour.reshape(-1, 2).astype(np.float64)
+        if len(points) < 3:
+            continue
+        points[:, 0] *= scale_x
+        points[:, 1] *= scale_y
+        polygons.append(np.rint(points).astype(np.int64).reshape(-1).tolist())
+    return polygons
+
+
+def offset_polygons(polygons, dx: int, dy: int):
+    """polygon 좌표 평행 이동 (타일 좌표 → 전체 이미지 좌표)"""
+    shifted = []
+    for polygon in polygons:
+        points = np.asarray(polygon, dtype=np.int64).reshape(-1, 2) + (dx, dy)
+        shifted.append(points.reshape(-1).tolist())
+    return shifted
+
+
+def encode_masks(masks, detections, W: int, H: int, fmt: str, tolerance: float = DEFAULT_POLYGON_TOLERANCE):
+    """
+    masks_to_detections() 결과에 마스크 인코딩과 길이/폭 추정을 추가 (in-place)
+
+    각 탐지에 "perimeter", "length", "mean_width"와 fmt에 따라 "rle" 또는 "polygons"가 추가됨
+
+    Args:
+        masks: masks_to_detections()에 넘긴 것과 같은 (N, h, w) 마스크
+        detections: masks_to_detections() 결과 ("index", "area" 포함)
+    """
+    if not detections:
+        return detections
+    masks = np.asarray(masks)
+    _, h, w = masks.shape
+    indices = np.array([det["index"] for det in detections])
+    selected = binarize_masks(masks[indices])
+    areas = [det["area"] for det in detections]
+
+    # 둘레 계산은 위치와 무관하므로 모든 마스크를 감싸는 영역만 잘라서 계산
+    rows = np.flatnonzero(selected.any(axis=(0, 2)))
+    cols = np.flatnonzero(selected.any(axis=(0, 1)))
+    cropped = selected[:, rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1] if len(rows) else selected
+    perimeters, lengths, widths = shape_estimates(cropped, areas, W * cropped.shape[2] / w, H * cropped.shape[1] / h)
+    for det, perimeter, length, width in zip(detections, perimeters, lengths, widths):
+        det["perimeter"] = round(float(perimeter), 1)
+        det["length"] = round(float(length), 1)
+        det["mean_width"] = round(float(width), 2)
+
+    if fmt == "rle":
+        for det, rle in zip(detections, rle_encode(selected)):
+            det["rle"] = rle
+    elif fmt == "polygon":
+        for det, mask in zip(detections, selected):
+            det["polygons"] = mask_polygons(mask, W / w, H / h, tolerance)
+    return detections
@@ -0,0 +1,178 @@
+"""
+요청 단계별 지연 시간 측정 + Prometheus 텍스트 형식 메트릭
+
+- StageTimer: 요청 하나의 단계별 소요 시간 (업로드 읽기 → decode → 추론 → 후처리 → 저장)
+  이벤트 루프와 추론 워커 스레드를 거쳐 인자로 전달되며, Server-Timing 응답 헤더로 반환
+- MetricsRegistry: 히스토그램/카운터/게이지를 모아 GET /metrics에서 Prometheus 텍스트 형식으로 출력
+  (Lambda 이미지 크기를 늘리지 않도록 prometheus_client 없이 필요한 기능만 구현)
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+# 초 단위 기본 버킷 (5ms ~ 30s)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class StageTimer:
+    """요청 하나의 단계별 소요 시간 (같은 단계를 여러 번 기록하면 합산)"""
+
+    def __init__(self):
+        self.stages = {}
+        self.cold_start = False
+        self.cache_hit = False
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def total(self) -> float:
+        return time.perf_counter() - self._start
+
+    def as_ms(self) -> dict:
+        return {name: round(seconds * 1000, 1) for name, seconds in self.stages.items()}
+
+    def server_timing(self, total: float = None) -> str:
+        """Server-Timing 헤더 값 (예: 'decode;dur=12.3, forward;dur=80.1, total;dur=140.2')"""
+        entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items()]
+        if self.cold_start:
+            entries.append('cold-start;desc="model loaded by this request"')
+        entries.append(f"total;dur={(self.total() if total is None else total) * 1000:.1f}")
+        return ", ".join(entries)
+
+
+def _format_labels(label_names, label_values, extra=None) -> str:
+    pairs = list(zip(label_names, label_values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict):
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, label_names=()):
+        super().__init__(name, documentation, label_names)
+        self._values = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(v)}" for key, v in items]
+
+
+class Gauge(_Metric):
+    """값을 직접 set 하거나, 출력 시점에 함수(fn)로 읽는 게이지"""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, fn=None):
+        super().__init__(name, documentation)
+        self._fn = fn
+        self._value = 0.0
+
+    def set(self, value: float):
+        self._value = float(value)
+
+    def collect(self):
+        value = self._fn() if self._fn is not None else self._value
+        return [f"{self.name} {_format_value(value)}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series = {}   # label key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def collect(self):
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            for bound, count in zip(self.buckets, series):
+                labels = _format_labels(self.label_names, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {series[-2]!r}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, label_names=()) -> Counter:
+        return self._register(Counter(name, documentation, label_names))
+
+    def gauge(self, name, documentation, fn=None) -> Gauge:
+        return self._register(Gauge(name, documentation, fn))
+
+    def histogram(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def render(self) -> str:
+        """Prometheus text exposition format (0.0.4)"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
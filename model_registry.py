@@ -0,0 +1,356 @@
+"""
+손상 유형별 모델 레지스트리 (crack / breakage / stain ...)
+
+사진 한 장에 여러 손상 유형 모델을 실행할 때 업로드 읽기, 디코딩, letterbox 전처리는 한 번만 하고
+모델별 추론만 따로 실행합니다.
+
+- 모델마다 InferenceExecutor(지연 로딩 + 예측 직렬화)와 BatchScheduler(동시 요청 배치)를 하나씩 둠
+  → 서로 다른 모델은 각자의 워커 스레드에서 동시에 실행 (동시에 forward 하는 모델 수는 concurrency로 제한)
+- 메모리: 모델을 로딩하기 전에 현재 RSS + 예상 크기가 memory_limit을 넘으면 예측 중이 아닌 모델을
+  오래 안 쓴 순서로 해제하고, idle_seconds 동안 쓰지 않은 모델도 sweep()에서 해제 (다음 요청에서 다시 로딩)
+  pinned 모델(기본 crack 모델)은 해제하지 않음
+- letterbox(): 긴 변을 모델 입력 크기로 줄이고 stride 배수로 padding한 배열을 모든 모델에 그대로 넘김
+  (Ultralytics의 letterbox는 이미 맞는 크기라 resize 없이 통과)
+"""
+
+import functools
+import gc
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+from batching import BatchScheduler
+from cpu_tuning import CGROUP_ROOT
+from inference import InferenceExecutor
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME_PATTERN = re.compile(r"^[a-z0-9_-]+$")
+LETTERBOX_COLOR = (114, 114, 114)
+# 로딩한 적 없는 모델의 예상 메모리 = 가중치 파일 크기 × 배율 (가중치 + predictor 버퍼)
+WEIGHTS_MEMORY_FACTOR = 2.0
+# cgroup v1은 제한이 없을 때 페이지 카운터 최대값(약 2^63)을 보고함
+_CGROUP_UNLIMITED = 1 << 60
+
+
+class UnknownModelError(ValueError):
+    """레지스트리에 없는 모델 이름"""
+
+
+def parse_model_specs(value: str):
+    """
+    DAMAGE_MODELS 값 파싱: 'breakage=breakage.pt,stain=stain.pt' → [(name, path), ...]
+
+    Raises:
+        ValueError: 형식 오류 / 중복 이름 (이름은 소문자, 숫자, '_', '-')
+    """
+    specs = []
+    for item in (value or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, sep, path = item.partition("=")
+        name, path = name.strip().lower(), path.strip()
+        if not sep or not path or not MODEL_NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid model spec '{item}' (expected name=path, name: a-z, 0-9, '_', '-')")
+        if any(name == existing for existing, _ in specs):
+            raise ValueError(f"Duplicate model name '{name}'")
+        specs.append((name, path))
+    return specs
+
+
+def process_rss():
+    """현재 프로세스 RSS (bytes, /proc이 없는 환경이면 None)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _read_int(path):
+    try:
+        with open(path) as f:
+            value = f.read().strip()
+    except OSError:
+        return None
+    return int(value) if value.isdigit() else None
+
+
+def container_memory_limit(cgroup_root: str = CGROUP_ROOT, env=None):
+    """
+    컨테이너 메모리 한도 (bytes, 제한이 없으면 None)
+
+    AWS_LAMBDA_FUNCTION_MEMORY_SIZE(MB), cgroup v2 memory.max, v1 memory.limit_in_bytes 중 가장 작은 값
+    """
+    env = os.environ if env is None else env
+    limits = []
+    if env.get("AWS_LAMBDA_FUNCTION_MEMORY_SIZE"):
+        limits.append(int(env["AWS_LAMBDA_FUNCTION_MEMORY_SIZE"]) * 1024 * 1024)
+    for path in (os.path.join(cgroup_root, "memory.max"), os.path.join(cgroup_root, "memory", "memory.limit_in_bytes")):
+        value = _read_int(path)   # v2의 "max"는 None
+        if value and value < _CGROUP_UNLIMITED:
+            limits.append(value)
+    return min(limits) if limits else None
+
+
+@dataclass
+class Letterbox:
+    """모델 입력 크기로 맞춘 이미지 (모든 모델이 공유)"""
+    image: np.ndarray        # 긴 변 imgsz, 각 변 stride 배수 (BGR)
+    box: tuple               # image 안에서 원래 이미지가 차지하는 영역 (x0, y0, x1, y1)
+
+    def crop_masks(self, masks):
+        """
+        모델 출력 마스크 (N, mh, mw) 중 원래 이미지 영역만 잘라냄 (padding 제외)
+
+        배치 안에 크기가 다른 이미지가 섞이면 Ultralytics가 image를 정사각형으로 한 번 더 letterbox 하므로,
+        마스크 해상도 안의 image 영역(가운데 정렬)을 먼저 구한 뒤 box를 옮김
+        """
+        masks = np.asarray(masks)
+        if masks.ndim != 3 or len(masks) == 0:
+            return masks
+        h, w = self.image.shape[:2]
+        mh, mw = masks.shape[1:]
+        r = min(mh / h, mw / w)
+        pad_x, pad_y = (mw - w * r) / 2, (mh - h * r) / 2
+        x0, y0, x1, y1 = self.box
+        return masks[
+            :,
+            int(round(pad_y + y0 * r)):int(round(pad_y + y1 * r)),
+            int(round(pad_x + x0 * r)):int(round(pad_x + x1 * r)),
+        ]
+
+
+def letterbox(image, imgsz: int = 640, stride: int = 32) -> Letterbox:
+    """
+    긴 변을 imgsz로 맞추고 각 변을 stride 배수가 되도록 가운데 정렬 padding
+    (Ultralytics PyTorch 모델의 직사각형 letterbox와 같은 모양)
+    """
+    h, w = image.shape[:2]
+    r = imgsz / max(h, w)
+    new_w, new_h = max(1, round(w * r)), max(1, round(h * r))
+    if (new_w, new_h) != (w, h):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    pad_w, pad_h = -new_w % stride, -new_h % stride
+    left, top = pad_w // 2, pad_h // 2
+    if pad_w or pad_h:
+        image = cv2.copyMakeBorder(
+            image, top, pad_h - top, left, pad_w - left, cv2.BORDER_CONSTANT, value=LETTERBOX_COLOR
+        )
+    return Letterbox(image, (left, top, left + new_w, top + new_h))
+
+
+@dataclass
+class RegisteredModel:
+    """레지스트리 항목 하나 (손상 유형 = 모델 이름)"""
+    name: str
+    executor: InferenceExecutor
+    scheduler: BatchScheduler = None
+    path: str = None
+    pinned: bool = False
+    size_bytes: int = 0      # 마지막 로딩에서 잰 RSS 증가량 (0이면 아직 모름)
+    last_used: float = 0.0   # time.monotonic()
+    in_use: int = 0          # 배치 큐에 넣고 결과를 기다리는 요청 수
+    loads: int = 0
+    evictions: int = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self.executor.model_loaded
+
+
+class ModelRegistry:
+    """이름으로 모델을 골라 실행하는 레지스트리 (지연 로딩 + 메모리 기준 해제)"""
+
+    def __init__(self, memory_limit: int = None, idle_seconds: float = 0.0, concurrency: int = 1,
+                 max_batch_size: int = 8, max_wait_ms: float = 15.0, predict_kwargs: dict = None):
+        """
+        Args:
+            memory_limit: 모델 로딩 후 프로세스 RSS 목표 상한 (bytes, None이면 메모리 기준 해제 안 함)
+            idle_seconds: 이 시간 동안 쓰지 않은 모델은 sweep()에서 해제 (0이면 해제 안 함)
+            concurrency: 동시에 forward 하는 모델 수 (torch intra-op 스레드 × concurrency ≤ CPU 할당량 권장)
+            max_batch_size / max_wait_ms: 모델별 BatchScheduler 설정
+            predict_kwargs: 모델 호출 시 넘길 인자 (project/name 등)
+        """
+        self.memory_limit = memory_limit
+        self.idle_seconds = float(idle_seconds)
+        self.concurrency = max(1, int(concurrency))
+        self._max_batch_size = max_batch_size
+        self._max_wait_ms = max_wait_ms
+        self._predict_kwargs = dict(predict_kwargs or {})
+        self._models = {}
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+        self._evict_lock = threading.Lock()
+        self._evictions = 0
+
+    @property
+    def names(self):
+        return list(self._models)
+
+    def register(self, name: str, loader=None, path: str = None, executor: InferenceExecutor = None,
+                 pinned: bool = False) -> RegisteredModel:
+        """
+        Args:
+            loader: 모델 로딩 함수 (첫 예측 시 모델 전용 워커 스레드에서 호출)
+            path: 가중치 경로 (처음 로딩 전 메모리 예상용)
+            executor: 기존 InferenceExecutor 공유 (기본 crack 모델 - 로딩은 executor의 loader가 담당)
+            pinned: True면 메모리 확보 / idle 해제 대상에서 제외
+        """
+        if not MODEL_NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid model name '{name}'")
+        if name in self._models:
+            raise ValueError(f"Model '{name}' is already registered")
+        if executor is None:
+            executor = InferenceExecutor(functools.partial(self._load, name, loader), max_workers=1)
+        entry = RegisteredModel(name, executor, path=path, pinned=pinned)
+        entry.scheduler = BatchScheduler(
+            executor, functools.partial(self._predict, entry),
+            max_batch_size=self._max_batch_size, max_wait_ms=self._max_wait_ms,
+        )
+        self._models[name] = entry
+        return entry
+
+    def get(self, name: str) -> RegisteredModel:
+        entry = self._models.get(name)
+        if entry is None:
+            raise UnknownModelError(f"Unknown model '{name}' (available: {', '.join(self._models)})")
+        return entry
+
+    def select(self, value: str = None):
+        """
+        ?models= 값 → 실행할 모델 이름 리스트 (비어 있으면 등록된 모든 모델, 순서 유지, 중복 제거)
+
+        Raises:
+            UnknownModelError: 등록되지 않은 이름
+        """
+        names = [name.strip().lower() for name in (value or "").split(",") if name.strip()]
+        if not names:
+            return self.names
+        for name in names:
+            self.get(name)
+        return list(dict.fromkeys(names))
+
+    def estimate(self, entry: RegisteredModel) -> int:
+        """모델 로딩에 필요한 예상 메모리 (bytes): 지난 로딩 측정값 > 가중치 파일 크기 기준 > 다른 모델 중 가장 큰 측정값"""
+        if entry.size_bytes:
+            return entry.size_bytes
+        if entry.path and os.path.exists(entry.path):
+            return int(os.path.getsize(entry.path) * WEIGHTS_MEMORY_FACTOR)
+        return max((other.size_bytes for other in self._models.values()), default=0)
+
+    def _load(self, name, loader):
+        """executor의 모델 lock 안(모델 워커 스레드)에서 호출"""
+        entry = self._models[name]
+        self.make_room(self.estimate(entry), exclude=entry)
+        before = process_rss()
+        start = time.perf_counter()
+        model = loader()
+        after = process_rss()
+        if before is not None and after is not None and after > before:
+            entry.size_bytes = after - before
+        entry.loads += 1
+        logger.info(
+            "Model '%s' loaded in %.2fs (~%.0f MB, load #%d)",
+            name, time.perf_counter() - start, entry.size_bytes / (1024 * 1024), entry.loads,
+        )
+        return model
+
+    def _evictable(self, exclude=None):
+        return [
+            entry for entry in self._models.values()
+            if entry is not exclude and not entry.pinned and entry.in_use == 0 and entry.loaded
+        ]
+
+    def _unload(self, entry: RegisteredModel, reason: str) -> bool:
+        # 로딩/예측 중이면 건너뜀 (다른 모델의 lock을 기다리지 않으므로 교착 없음)
+        if not entry.executor.unload(blocking=False):
+            return False
+        gc.collect()
+        entry.evictions += 1
+        self._evictions += 1
+        logger.info("Model '%s' unloaded (%s, ~%.0f MB)", entry.name, reason, entry.size_bytes / (1024 * 1024))
+        return True
+
+    def make_room(self, needed: int, exclude: RegisteredModel = None):
+        """RSS + needed가 memory_limit 이하가 될 때까지 쉬고 있는 모델을 오래 안 쓴 순서로 해제"""
+        if not self.memory_limit:
+            return
+        with self._evict_lock:
+            for entry in sorted(self._evictable(exclude), key=lambda e: e.last_used):
+                rss = process_rss()
+                if rss is None or rss + needed <= self.memory_limit:
+                    return
+                self._unload(entry, "memory")
+            rss = process_rss()
+            if rss is not None and rss + needed > self.memory_limit:
+                logger.warning(
+                    "Loading a model may exceed the memory limit (rss=%.0f MB, needed=%.0f MB, limit=%.0f MB)",
+                    rss / (1024 * 1024), needed / (1024 * 1024), self.memory_limit / (1024 * 1024),
+                )
+
+    def sweep(self, now: float = None) -> int:
+        """idle_seconds 동안 쓰지 않은 모델 해제 (이벤트 루프 밖에서 호출), 해제한 모델 수 반환"""
+        if self.idle_seconds <= 0:
+            return 0
+        now = time.monotonic() if now is None else now
+        with self._evict_lock:
+            return sum(
+                self._unload(entry, "idle")
+                for entry in self._evictable()
+                if now - entry.last_used >= self.idle_seconds
+            )
+
+    def _predict(self, entry: RegisteredModel, images):
+        """배치 하나 실행 (모델 워커 스레드). 로딩은 동시 실행 슬롯 밖에서"""
+        entry.executor.get_model()
+        with self._slots:
+            return entry.executor.predict(images, **self._predict_kwargs)
+
+    async def predict(self, name: str, image):
+        """
+        이미지 하나를 모델 name의 배치 큐에 넣고 결과를 기다림
+
+        Returns:
+            (result, BatchTiming, cold_start) - cold_start: 이 요청이 모델 로딩을 기다렸는지
+        """
+        entry = self.get(name)
+        cold_start = not entry.loaded
+        entry.in_use += 1
+        entry.last_used = time.monotonic()
+        try:
+            result, timing = await entry.scheduler.submit(image)
+        finally:
+            entry.in_use -= 1
+            entry.last_used = time.monotonic()
+        return result, timing, cold_start
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        rss = process_rss()
+        to_mb = lambda value: round(value / (1024 * 1024), 1) if value is not None else None
+        return {
+            "memory_limit_mb": to_mb(self.memory_limit),
+            "rss_mb": to_mb(rss),
+            "idle_seconds": self.idle_seconds,
+            "concurrency": self.concurrency,
+            "evictions": self._evictions,
+            "models": {
+                entry.name: {
+                    "loaded": entry.loaded,
+                    "pinned": entry.pinned,
+                    "size_mb": to_mb(entry.size_bytes) if entry.size_bytes else None,
+                    "loads": entry.loads,
+                    "evictions": entry.evictions,
+                    "idle_s": round(now - entry.last_used, 1) if entry.last_used else None,
+                    "batching": entry.scheduler.stats(),
+                }
+                for entry in self._models.values()
+            },
+        }
@@ -0,0 +1,358 @@
+"""
+모델 프로세스 분리 서빙 (HTTP 워커 여러 개 + 모델 사본 1개)
+
+Lambda가 아닌 배포(python main.py)에서 HTTP_WORKERS > 1 이면 워커마다 YOLO 모델을 로딩하지 않고,
+모델을 소유하는 별도 프로세스(MODEL_SERVER_PROCESSES개)를 띄워 모든 HTTP 워커가 공유합니다.
+
+- HTTP 워커: multipart 파싱 / JPEG 디코딩 / 후처리 / 인코딩 (uvicorn workers)
+- 디코딩된 프레임은 shared memory에 한 번 복사되고, 모델 프로세스는 복사 없이 numpy view로 읽음
+- 요청/결과는 Unix 소켓(multiprocessing.connection)으로 주고받는 작은 메시지
+  (마스크는 postprocess.binarize_masks 기준으로 이진화 후 bit-pack 해서 전송 → 탐지 결과는 로컬 추론과 동일)
+- 모델 프로세스는 여러 워커에서 동시에 들어온 요청을 한 번의 배치 호출로 묶어서 실행
+- RemoteModel은 YOLO 모델과 같은 호출 방식(model(images, **kwargs) → Results 리스트)이라
+  InferenceExecutor / BatchScheduler 코드는 그대로 사용
+"""
+
+import collections
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+from log_config import configure_logging
+from postprocess import binarize_masks
+
+logger = logging.getLogger(__name__)
+
+CONNECT_TIMEOUT = 120.0
+
+
+# ---------------------------------------------------------------------------
+# 모델 프로세스
+# ---------------------------------------------------------------------------
+
+def _attach(name):
+    """다른 프로세스가 만든 shared memory에 연결 (이 프로세스 종료 시 unlink되지 않도록 resource tracker에서 제외)"""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    return shm
+
+
+def _pack_result(r):
+    """Ultralytics Results → 소켓으로 보낼 작은 dict"""
+    packed = {"speed": dict(getattr(r, "speed", None) or {}), "masks": None, "mask_shape": None, "conf": None}
+    if r.masks is not None:
+        masks = binarize_masks(r.masks.data.cpu().numpy())
+        packed["mask_shape"] = masks.shape
+        packed["masks"] = np.packbits(masks, axis=None).tobytes()
+    if r.boxes is not None:
+        packed["conf"] = np.asarray(r.boxes.conf.cpu().numpy(), dtype=np.float32)
+    return packed
+
+
+class _ModelServer:
+    def __init__(self, address, model_loader, max_batch_size):
+        self.address = address
+        self.model_loader = model_loader
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.requests = queue.Queue()
+
+    def serve_forever(self):
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        listener = Listener(self.address, family="AF_UNIX")
+        threading.Thread(target=self._accept_loop, args=(listener,), daemon=True).start()
+
+        load_start = time.time()
+        model = self.model_loader()
+        logger.info(f"Model server {self.address} loaded the model in {time.time() - load_start:.2f}s (pid={os.getpid()})")
+
+        deferred = collections.deque()
+        while True:
+            batch = [deferred.popleft() if deferred else self.requests.get()]
+            kwargs = batch[0][1]["kwargs"]
+            frames = len(batch[0][1]["frames"])
+            # 다른 HTTP 워커에서 이미 도착한 요청을 같은 배치로 묶음
+            # (호출 옵션이 다른 요청, 예: 사전 필터의 저해상도 호출은 다음 배치로)
+            skipped = collections.deque()
+            while frames < self.max_batch_size:
+                if deferred:
+                    item = deferred.popleft()
+                else:
+                    try:
+                        item = self.requests.get_nowait()
+                    except queue.Empty:
+                        break
+                if item[1]["kwargs"] != kwargs:
+                    skipped.append(item)
+                    continue
+                batch.append(item)
+                frames += len(item[1]["frames"])
+            deferred.extendleft(reversed(skipped))
+            self._run_batch(model, batch)
+
+    def _accept_loop(self, listener):
+        while True:
+            conn = listener.accept()
+            threading.Thread(target=self._connection_loop, args=(conn,), daemon=True).start()
+
+    def _connection_loop(self, conn):
+        send_lock = threading.Lock()
+        try:
+            while True:
+                self.requests.put((conn, conn.recv(), send_lock))
+        except (EOFError, OSError):
+            conn.close()
+
+    def _run_batch(self, model, batch):
+        views = []
+        segments = []
+        for _, message, _ in batch:
+            shm = _attach(message["shm"])
+            segments.append(shm)
+            for offset, shape in message["frames"]:
+                views.append(np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=offset))
+
+        frame_count = len(views)
+        try:
+            packed = [_pack_result(r) for r in model(views, **batch[0][1]["kwargs"])]
+            error = None
+        except Exception as e:
+            logger.error(f"Model server batch failed ({frame_count} frame(s)): {str(e)}", exc_info=True)
+            packed = None
+            error = f"{type(e).__name__}: {str(e)}"
+        # Results.orig_img 등이 view를 잡고 있으면 close()가 실패하므로 view를 먼저 모두 해제
+        del views
+        for shm in segments:
+            try:
+                shm.close()
+            except BufferError:
+                logger.warning(f"Shared memory {shm.name} still referenced, leaving it to the garbage collector")
+
+        start = 0
+        for conn, message, send_lock in batch:
+            count = len(message["frames"])
+            reply = {"id": message["id"], "error": error, "batch_size": frame_count}
+            if error is None:
+                reply["results"] = packed[start:start + count]
+            start += count
+            try:
+                with send_lock:
+                    conn.send(reply)
+            except OSError:
+                pass
+
+
+def _serve(address, model_loader, max_batch_size):
+    configure_logging()
+    _ModelServer(address, model_loader, max_batch_size).serve_forever()
+
+
+class ModelServerPool:
+    """
+    모델 프로세스들을 띄우고 죽으면 다시 시작하는 supervisor (HTTP 워커들을 띄우는 부모 프로세스에서 사용)
+
+    model_loader는 spawn된 프로세스로 넘어가므로 pickle 가능해야 함 (모듈 최상위 함수 / functools.partial)
+    """
+
+    def __init__(self, model_loader, processes: int = 1, socket_dir: str = "/tmp/model_server", max_batch_size: int = 8):
+        self.model_loader = model_loader
+        self.max_batch_size = max_batch_size
+        os.makedirs(socket_dir, exist_ok=True)
+        self.addresses = [os.path.join(socket_dir, f"model-{i}.sock") for i in range(max(1, int(processes)))]
+        self._context = multiprocessing.get_context("spawn")
+        self._processes = [None] * len(self.addresses)
+        self._stopped = threading.Event()
+        self.restarts = 0
+
+    def start(self):
+        for i in range(len(self.addresses)):
+            self._start(i)
+        threading.Thread(target=self._supervise, daemon=True).start()
+        return self.addresses
+
+    def _start(self, i):
+        process = self._context.Process(
+            target=_serve,
+            args=(self.addresses[i], self.model_loader, self.max_batch_size),
+            name=f"model-server-{i}",
+            daemon=True,
+        )
+        process.start()
+        self._processes[i] = process
+        logger.info(f"Model server {i} started (pid={process.pid}, socket={self.addresses[i]})")
+
+    def _supervise(self):
+        while not self._stopped.wait(1.0):
+            for i, process in enumerate(self._processes):
+                if process is not None and not process.is_alive():
+                    logger.error(f"Model server {i} exited (code={process.exitcode}), restarting")
+                    self.restarts += 1
+                    self._start(i)
+
+    def stop(self):
+        self._stopped.set()
+        for process in self._processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+                process.join(timeout=5)
+
+
+# ---------------------------------------------------------------------------
+# HTTP 워커 쪽 클라이언트
+# ---------------------------------------------------------------------------
+
+class _Array:
+    """torch.Tensor 대신 .cpu().numpy()만 제공하는 래퍼"""
+
+    def __init__(self, data):
+        self.data = data
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.data
+
+    def __len__(self):
+        return len(self.data)
+
+
+class _Masks:
+    def __init__(self, data):
+        self.data = _Array(data)
+
+
+class _Boxes:
+    def __init__(self, conf):
+        self.conf = _Array(conf)
+
+
+class RemoteResult:
+    """모델 프로세스 결과 (collect_detections가 쓰는 masks.data / boxes.conf / speed만 제공)"""
+
+    def __init__(self, packed):
+        self.speed = packed["speed"]
+        self.masks = None
+        self.boxes = None
+        if packed["masks"] is not None:
+            shape = tuple(packed["mask_shape"])
+            bits = np.unpackbits(np.frombuffer(packed["masks"], dtype=np.uint8), count=int(np.prod(shape)))
+            # 0/1 uint8: binarize_masks() 결과는 float 마스크와 같고 메모리는 1/4
+            self.masks = _Masks(bits.reshape(shape))
+        if packed["conf"] is not None:
+            self.boxes = _Boxes(packed["conf"])
+
+
+class _SegmentPool:
+    """프레임 전송용 shared memory 세그먼트 재사용 (요청마다 생성/삭제하지 않음)"""
+
+    GRANULARITY = 1 << 20
+
+    def __init__(self, max_free: int = 4):
+        self.max_free = max_free
+        self._free = []
+        self._lock = threading.Lock()
+
+    def acquire(self, nbytes):
+        with self._lock:
+            for i, shm in enumerate(self._free):
+                if shm.size >= nbytes:
+                    return self._free.pop(i)
+        size = -(-max(nbytes, 1) // self.GRANULARITY) * self.GRANULARITY
+        return shared_memory.SharedMemory(create=True, size=size)
+
+    def release(self, shm):
+        with self._lock:
+            if len(self._free) < self.max_free:
+                self._free.append(shm)
+                return
+        shm.close()
+        shm.unlink()
+
+    def close(self):
+        with self._lock:
+            free, self._free = self._free, []
+        for shm in free:
+            shm.close()
+            shm.unlink()
+
+
+class RemoteModel:
+    """
+    모델 프로세스에 연결된 YOLO 대용 객체 (HTTP 워커 프로세스에서 사용)
+
+    model(images, **kwargs) → RemoteResult 리스트. 연결이 끊기면 다음 호출에서 다시 연결 (모델 프로세스 재시작 대응)
+    """
+
+    def __init__(self, address: str, connect_timeout: float = CONNECT_TIMEOUT):
+        self.address = address
+        self.connect_timeout = connect_timeout
+        self._conn = None
+        self._lock = threading.Lock()
+        self._segments = _SegmentPool()
+        self._next_id = 0
+        self.last_batch_size = 0
+        self._connect()
+
+    def _connect(self):
+        deadline = time.time() + self.connect_timeout
+        while True:
+            try:
+                self._conn = Client(self.address, family="AF_UNIX")
+                logger.info(f"Connected to model server {self.address}")
+                return
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.time() > deadline:
+                    raise RuntimeError(f"Model server {self.address} is not reachable")
+                time.sleep(0.1)
+
+    def __call__(self, source, **kwargs):
+        images = source if isinstance(source, list) else [source]
+        images = [np.asarray(img, dtype=np.uint8) for img in images]
+        shm = self._segments.acquire(sum(img.nbytes for img in images))
+        try:
+            frames = []
+            offset = 0
+            for img in images:
+                np.copyto(np.ndarray(img.shape, dtype=np.uint8, buffer=shm.buf, offset=offset), img)
+                frames.append((offset, img.shape))
+                offset += img.nbytes
+            with self._lock:
+                self._next_id += 1
+                message = {"id": self._next_id, "shm": shm.name, "frames": frames, "kwargs": kwargs}
+                reply = self._request(message)
+        finally:
+            self._segments.release(shm)
+
+        if reply["error"] is not None:
+            raise RuntimeError(f"Model server error: {reply['error']}")
+        self.last_batch_size = reply["batch_size"]
+        return [RemoteResult(packed) for packed in reply["results"]]
+
+    def _request(self, message):
+        if self._conn is None:
+            self._connect()
+        try:
+            self._conn.send(message)
+            return self._conn.recv()
+        except (EOFError, OSError) as e:
+            # 모델 프로세스 종료 등: 이번 요청은 실패, 다음 요청에서 재연결
+            self._conn.close()
+            self._conn = None
+            raise RuntimeError(f"Lost connection to model server {self.address}: {str(e) or type(e).__name__}")
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        self._segments.close()
@@ -0,0 +1,106 @@
+"""
+마스크 후처리 (벡터화)
+
+마스크마다 원본 해상도(W x H)로 cv2.resize 하지 않고, 마스크 해상도의 (N, h, w) 텐서에서
+모든 마스크의 bounding box / 면적을 한 번에 계산한 뒤 좌표만 원본 스케일로 해석적으로 변환합니다.
+
+결과는 기존 방식(resize_mask → > 127 → np.where)과 픽셀 단위로 동일합니다.
+cv2.resize(INTER_NEAREST)는 출력 좌표 x를 입력 좌표 min(floor(x * src/dst), src - 1)로 매핑하므로,
+이 매핑을 축별로 계산해 두면 원본 크기 버퍼 없이 같은 결과를 얻을 수 있습니다.
+"""
+
+import numpy as np
+
+
+def nearest_source_index(dst_size: int, src_size: int) -> np.ndarray:
+    """cv2.resize(INTER_NEAREST)의 출력 좌표 → 입력 좌표 매핑 (길이 dst_size)"""
+    # OpenCV resizeNN과 같은 부동소수 연산 순서: ifx = 1 / (dst / src)
+    inv_scale = 1.0 / (float(dst_size) / float(src_size))
+    src = np.floor(np.arange(dst_size, dtype=np.float64) * inv_scale).astype(np.int64)
+    return np.minimum(src, src_size - 1)
+
+
+def _axis_mapping(dst_size: int, src_size: int):
+    """
+    축 하나에 대해 입력 좌표별 (출력 첫 좌표, 출력 마지막 좌표, 출력 픽셀 수) 계산
+
+    축소(downscale) 시 어떤 출력 픽셀에도 매핑되지 않는 입력 좌표는 count가 0
+    """
+    src_index = nearest_source_index(dst_size, src_size)
+    coords = np.arange(src_size)
+    first = np.searchsorted(src_index, coords, side="left")
+    last = np.searchsorted(src_index, coords, side="right") - 1
+    count = last - first + 1
+    return first, last, count
+
+
+def binarize_masks(masks) -> np.ndarray:
+    """resize_mask() 후 > 127 과 같은 기준으로 마스크를 이진화 (마스크 해상도에서)"""
+    masks = np.asarray(masks)
+    return (masks * 255).astype(np.uint8) > 127
+
+
+def masks_to_detections(masks, confidences, W: int, H: int):
+    """
+    (N, h, w) 마스크 텐서에서 원본 이미지(W x H) 기준 bbox / 면적을 한 번에 계산
+
+    Args:
+        masks: (N, h, w) 마스크 (0~1 float 또는 bool)
+        confidences: 길이 N의 신뢰도
+        W, H: 원본 이미지 크기
+
+    Returns:
+        list[dict]: 비어 있지 않은 마스크마다
+            {"index", "x", "y", "width", "height", "area", "confidence"}
+            (index는 입력 마스크 순서, width/height는 기존 응답과 같이 max - min)
+    """
+    masks = np.asarray(masks)
+    if masks.ndim != 3 or len(masks) == 0:
+        return []
+
+    _, h, w = masks.shape
+    mask_bool = binarize_masks(masks)
+
+    x_first, x_last, x_count = _axis_mapping(W, w)
+    y_first, y_last, y_count = _axis_mapping(H, h)
+    cols_hit = x_count > 0
+    rows_hit = y_count > 0
+
+    # 업스케일(일반적인 경우)이면 모든 행/열이 출력에 매핑되므로 추가 마스킹 불필요
+    rows_masked = mask_bool if rows_hit.all() else mask_bool & rows_hit[None, :, None]
+    cols_masked = mask_bool if cols_hit.all() else mask_bool & cols_hit[None, None, :]
+    col_any = rows_masked.any(axis=1) & cols_hit[None, :]   # (N, w)
+    row_any = cols_masked.any(axis=2) & rows_hit[None, :]   # (N, h)
+
+    nonempty = col_any.any(axis=1)
+    if not nonempty.any():
+        return []
+
+    c_min = col_any.argmax(axis=1)
+    c_max = w - 1 - col_any[:, ::-1].argmax(axis=1)
+    r_min = row_any.argmax(axis=1)
+    r_max = h - 1 - row_any[:, ::-1].argmax(axis=1)
+
+    x_min = x_first[c_min]
+    x_max = x_last[c_max]
+    y_min = y_first[r_min]
+    y_max = y_last[r_max]
+
+    # 원본 해상도 면적 = Σ mask[r, c] * (행 r의 출력 픽셀 수) * (열 c의 출력 픽셀 수)
+    # (행별 합은 W 이하라 float32로 정확, 전체 합은 float64로 누적)
+    row_areas = mask_bool.astype(np.float32) @ x_count.astype(np.float32)     # (N, h)
+    areas = row_areas.astype(np.float64) @ y_count.astype(np.float64)          # (N,)
+
+    confidences = np.asarray(confidences, dtype=np.float64).reshape(-1)
+    detections = []
+    for i in np.flatnonzero(nonempty):
+        detections.append({
+            "index": int(i),
+            "x": int(x_min[i]),
+            "y": int(y_min[i]),
+            "width": int(x_max[i] - x_min[i]),
+            "height": int(y_max[i] - y_min[i]),
+            "area": int(round(float(areas[i]))),
+            "confidence": float(confidences[i]) if i < len(confidences) else 0.0,
+        })
+    return detections
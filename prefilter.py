@@ -0,0 +1,327 @@
+"""
+사전 필터 cascade (깨끗한 사진은 segmentation 생략)
+
+점검 사진 대부분은 손상이 없으므로, 값싼 1단계로 crack 점수를 먼저 계산하고
+점수가 threshold 이상인 사진만 전체 YOLOv8-seg 모델(2단계)을 실행합니다.
+
+- lowres: 같은 segmentation 모델을 작은 입력 크기(imgsz)로 실행, 점수 = 가장 높은 탐지 신뢰도
+  (max_det=1 이라 마스크 후처리 비용도 거의 없음, 추가 모델 파일 불필요)
+- classifier: 작은 분류 모델(Ultralytics classify, 예: yolov8n-cls)의 crack 클래스 확률
+  (클래스 이름이 crack / damage / defect / positive 중 하나인 클래스)
+
+threshold 튜닝은 라벨이 있는 로컬 폴더로 skip 비율과 잃는 recall을 측정해서 결정합니다.
+
+사용법:
+    # ./labeled/crack/*.jpg, ./labeled/clean/*.jpg (clean / negative / no_crack 폴더 = crack 없음)
+    python prefilter.py evaluate --images ./labeled --mode lowres --imgsz 320
+    python prefilter.py evaluate --images ./labeled --mode classifier --classifier crack_cls.pt --max-recall-lost 0.01
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+PREFILTER_MODES = ("off", "lowres", "classifier")
+FULL = "full"
+SKIPPED = "skipped"
+
+POSITIVE_CLASS_NAMES = ("crack", "cracks", "damage", "damaged", "defect", "positive")
+NEGATIVE_LABELS = ("clean", "negative", "no_crack", "nocrack", "ok", "none")
+# lowres 점수는 threshold와 무관하게 실제 최대 신뢰도를 돌려주도록 아주 낮은 conf로 실행
+SCORE_CONF = 0.001
+DEFAULT_THRESHOLDS = (0.01, 0.02, 0.05, 0.1, 0.15, 0.2, 0.25, 0.3, 0.4, 0.5)
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+def check_prefilter_mode(mode: str):
+    if mode not in PREFILTER_MODES:
+        raise ValueError(f"Unknown PREFILTER_MODE '{mode}' (expected one of {', '.join(PREFILTER_MODES)})")
+
+
+def load_classifier(model_path: str):
+    """분류 모델 로딩 (classifier 모드, 첫 요청 시 추론 워커 스레드에서 호출)"""
+    from ultralytics import YOLO
+
+    return YOLO(model_path, task="classify")
+
+
+def positive_class_index(names) -> int:
+    """
+    분류 모델 클래스 이름 → crack 클래스 index
+
+    이름이 POSITIVE_CLASS_NAMES 중 하나인 클래스, 없으면 2-class 모델에서 NEGATIVE_LABELS가 아닌 쪽
+
+    Raises:
+        ValueError: crack 클래스를 정할 수 없을 때
+    """
+    names = dict(enumerate(names)) if isinstance(names, (list, tuple)) else dict(names)
+    for index, name in names.items():
+        if str(name).lower() in POSITIVE_CLASS_NAMES:
+            return int(index)
+    others = [index for index, name in names.items() if str(name).lower() not in NEGATIVE_LABELS]
+    if len(names) == 2 and len(others) == 1:
+        return int(others[0])
+    raise ValueError(f"Cannot tell which classifier class means crack: {names}")
+
+
+def result_score(result, mode: str) -> float:
+    """1단계 모델 Results 하나 → crack 점수 (0~1)"""
+    if mode == "classifier":
+        probs = result.probs.data.cpu().numpy()
+        return float(probs[positive_class_index(result.names)])
+    if result.boxes is None:
+        return 0.0
+    confidences = result.boxes.conf.cpu().numpy()
+    return float(np.max(confidences)) if len(confidences) else 0.0
+
+
+class Prefilter:
+    """cascade 1단계 설정 + 경로별 통계"""
+
+    def __init__(self, mode: str = "off", threshold: float = 0.1, imgsz: int = 320):
+        """
+        Args:
+            mode: off / lowres / classifier
+            threshold: 점수가 이 값 이상이면 전체 segmentation 실행
+            imgsz: lowres 모드 입력 크기 (classifier 모드는 모델 학습 크기 사용)
+        """
+        check_prefilter_mode(mode)
+        self.mode = mode
+        self.threshold = float(threshold)
+        self.imgsz = int(imgsz)
+        self.full = 0
+        self.skipped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def predict_kwargs(self) -> dict:
+        """1단계 모델 호출 옵션"""
+        if self.mode == "lowres":
+            return {"imgsz": self.imgsz, "conf": SCORE_CONF, "max_det": 1}
+        return {}
+
+    def scores(self, results):
+        return [result_score(r, self.mode) for r in results]
+
+    def decide(self, score: float) -> dict:
+        """점수 → 응답 'cascade' 항목 (path: full / skipped)"""
+        path = FULL if score >= self.threshold else SKIPPED
+        if path == FULL:
+            self.full += 1
+        else:
+            self.skipped += 1
+        return {"path": path, "mode": self.mode, "score": round(float(score), 4), "threshold": self.threshold}
+
+    def bypassed(self) -> dict:
+        """사전 필터를 거치지 않은 요청 (타일 모드, ?prefilter=false)의 'cascade' 항목"""
+        return {"path": FULL, "mode": self.mode, "score": None, "threshold": self.threshold}
+
+    def stats(self) -> dict:
+        total = self.full + self.skipped
+        return {
+            "mode": self.mode,
+            "threshold": self.threshold,
+            "imgsz": self.imgsz if self.mode == "lowres" else None,
+            "full": self.full,
+            "skipped": self.skipped,
+            "skip_rate": round(self.skipped / total, 4) if total else 0.0,
+        }
+
+
+# ---------------------------------------------------------------------------
+# threshold 평가 도구
+# ---------------------------------------------------------------------------
+
+def load_labeled_images(images_dir):
+    """
+    라벨 폴더 → [(상대 경로, JPEG 바이트, crack 여부), ...]
+
+    하위 폴더 이름이 라벨: NEGATIVE_LABELS 중 하나면 crack 없음, 그 외 폴더는 crack 있음
+    """
+    items = []
+    for label_dir in sorted(glob.glob(os.path.join(images_dir, "*"))):
+        if not os.path.isdir(label_dir):
+            continue
+        positive = os.path.basename(label_dir).lower() not in NEGATIVE_LABELS
+        for path in sorted(glob.glob(os.path.join(label_dir, "**", "*"), recursive=True)):
+            if path.lower().endswith(IMAGE_EXTENSIONS):
+                with open(path, "rb") as f:
+                    items.append((os.path.relpath(path, images_dir), f.read(), positive))
+    return items
+
+
+def sweep(scores, labels, full_detected, thresholds):
+    """
+    threshold별 cascade 효과
+
+    Args:
+        scores: 이미지별 1단계 점수
+        labels: 이미지별 라벨 (True = crack 있음)
+        full_detected: 이미지별 전체 모델 탐지 여부 (cascade 없이 실행했을 때)
+
+    Returns:
+        threshold별 dict 리스트
+        - skip_rate: 전체 모델을 건너뛰는 이미지 비율
+        - recall_full / recall_cascade: crack 이미지 중 탐지된 비율 (cascade 없이 / 있을 때)
+        - recall_lost: recall_full - recall_cascade (cascade 때문에 놓치는 crack 이미지 비율)
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    labels = np.asarray(labels, dtype=bool)
+    full_detected = np.asarray(full_detected, dtype=bool)
+    positives = int(labels.sum())
+    recall_full = float((full_detected & labels).sum() / positives) if positives else 1.0
+
+    rows = []
+    for threshold in thresholds:
+        run_full = scores >= threshold
+        detected = full_detected & run_full
+        recall_cascade = float((detected & labels).sum() / positives) if positives else 1.0
+        rows.append({
+            "threshold": float(threshold),
+            "skip_rate": round(float(1.0 - run_full.mean()), 4) if len(scores) else 0.0,
+            "recall_full": round(recall_full, 4),
+            "recall_cascade": round(recall_cascade, 4),
+            "recall_lost": round(recall_full - recall_cascade, 4),
+            "missed_images": int((full_detected & labels & ~run_full).sum()),
+            "false_positives_avoided": int((full_detected & ~labels & ~run_full).sum()),
+        })
+    return rows
+
+
+def recommend_threshold(rows, max_recall_lost):
+    """recall 손실 예산 안에서 skip 비율이 가장 높은 행 (없으면 None)"""
+    allowed = [row for row in rows if row["recall_lost"] <= max_recall_lost]
+    if not allowed:
+        return None
+    return max(allowed, key=lambda row: (row["skip_rate"], -row["threshold"]))
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - start
+
+
+def evaluate(args):
+    from backends import load_backend_model
+    from decode import decode_upload
+
+    items = load_labeled_images(args.images)
+    if not items:
+        print(f"No labeled images found under {args.images} (expected <label>/<image> folders)", file=sys.stderr)
+        return 1
+
+    prefilter = Prefilter(args.mode, imgsz=args.imgsz)
+    if not prefilter.enabled:
+        print("--mode must be lowres or classifier", file=sys.stderr)
+        return 1
+    model = load_backend_model(args.model, args.backend, args.export_dir, imgsz=args.model_imgsz)
+    stage1 = load_classifier(args.classifier) if args.mode == "classifier" else model
+    kwargs = {"save": False, "verbose": False}
+
+    scores, labels, full_detected, prefilter_times, full_times = [], [], [], [], []
+    warmed = False
+    for name, data, positive in items:
+        decoded = decode_upload(data, target_size=args.model_imgsz)
+        if decoded is None:
+            print(f"  skipping undecodable image {name}", file=sys.stderr)
+            continue
+        if not warmed:
+            # warm-up (첫 호출의 초기화 비용 제외)
+            stage1(decoded.image, **kwargs, **prefilter.predict_kwargs())
+            model(decoded.image, **kwargs, conf=args.conf)
+            warmed = True
+        results, prefilter_time = _timed(lambda: stage1(decoded.image, **kwargs, **prefilter.predict_kwargs()))
+        full_results, full_time = _timed(lambda: model(decoded.image, **kwargs, conf=args.conf))
+        r = full_results[0]
+        scores.append(prefilter.scores(results)[0])
+        labels.append(positive)
+        full_detected.append(r.masks is not None and len(r.masks.data) > 0)
+        prefilter_times.append(prefilter_time)
+        full_times.append(full_time)
+
+    thresholds = [float(t) for t in args.thresholds.split(",")] if args.thresholds else list(DEFAULT_THRESHOLDS)
+    rows = sweep(scores, labels, full_detected, thresholds)
+    prefilter_ms = float(np.mean(prefilter_times)) * 1000.0
+    full_ms = float(np.mean(full_times)) * 1000.0
+    for row in rows:
+        # cascade 적용 시 이미지당 평균 모델 시간 = 1단계 + (1 - skip 비율) x 전체 모델
+        row["est_model_ms"] = round(prefilter_ms + (1.0 - row["skip_rate"]) * full_ms, 2)
+
+    print(
+        f"{len(scores)} image(s) ({sum(labels)} crack / {len(labels) - sum(labels)} clean), mode={args.mode}, "
+        f"prefilter {prefilter_ms:.1f}ms vs full {full_ms:.1f}ms per image\n"
+    )
+    header = f"{'threshold':>9} {'skip':>7} {'recall':>7} {'cascade':>8} {'lost':>7} {'missed':>7} {'model(ms)':>10}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['threshold']:>9.3f} {row['skip_rate']:>7.1%} {row['recall_full']:>7.3f} {row['recall_cascade']:>8.3f} "
+            f"{row['recall_lost']:>7.3f} {row['missed_images']:>7d} {row['est_model_ms']:>10.1f}"
+        )
+
+    recommended = recommend_threshold(rows, args.max_recall_lost)
+    if recommended is None:
+        print(f"\nNo threshold keeps recall_lost <= {args.max_recall_lost}")
+    else:
+        print(
+            f"\nRecommended PREFILTER_THRESHOLD={recommended['threshold']:g} "
+            f"(skip {recommended['skip_rate']:.1%}, recall lost {recommended['recall_lost']:.3f})"
+        )
+
+    if args.output:
+        report = {
+            "mode": args.mode,
+            "images": len(scores),
+            "positives": int(sum(labels)),
+            "prefilter_ms": round(prefilter_ms, 2),
+            "full_ms": round(full_ms, 2),
+            "thresholds": rows,
+            "recommended": recommended,
+            "scores": [
+                {"score": round(s, 4), "label": bool(l), "full_detected": bool(d)}
+                for s, l, d in zip(scores, labels, full_detected)
+            ],
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-filter cascade tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    evaluate_parser = subparsers.add_parser("evaluate", help="skip rate / recall lost per threshold on a labeled folder")
+    evaluate_parser.add_argument("--images", required=True, help="folder with <label>/<image> subfolders (clean/ = no crack)")
+    evaluate_parser.add_argument("--mode", default=os.environ.get("PREFILTER_MODE", "lowres"), choices=PREFILTER_MODES[1:])
+    evaluate_parser.add_argument("--model", default=os.environ.get("MODEL_PATH", "best.pt"))
+    evaluate_parser.add_argument("--backend", default=os.environ.get("INFERENCE_BACKEND", "pytorch"))
+    evaluate_parser.add_argument("--export-dir", default=os.environ.get("EXPORT_DIR", "/tmp/exports"))
+    evaluate_parser.add_argument("--model-imgsz", type=int, default=int(os.environ.get("MODEL_IMGSZ", "640")))
+    evaluate_parser.add_argument("--classifier", default=os.environ.get("PREFILTER_MODEL_PATH", "crack_cls.pt"))
+    evaluate_parser.add_argument("--imgsz", type=int, default=int(os.environ.get("PREFILTER_IMGSZ", "320")), help="lowres input size")
+    evaluate_parser.add_argument("--conf", type=float, default=0.25, help="full model confidence threshold")
+    evaluate_parser.add_argument("--thresholds", help="comma separated thresholds to sweep")
+    evaluate_parser.add_argument("--max-recall-lost", type=float, default=0.01)
+    evaluate_parser.add_argument("--output", help="write JSON report to this path")
+    args = parser.parse_args()
+
+    os.environ.setdefault("YOLO_VERBOSE", "False")
+    os.environ.setdefault("YOLO_CONFIG_DIR", "/tmp/Ultralytics")
+    if args.command == "evaluate":
+        return evaluate(args)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""
+INT8 양자화 모델 생성 / 정확도 회귀 검사 도구 (ONNX Runtime)
+
+Lambda는 메모리 크기에 비례해 CPU가 할당되므로, INT8 모델로 메모리와 지연 시간을 줄이면 비용이 직접 줄어듭니다.
+다만 crack recall이 조용히 떨어지면 안 되므로 FP32 대비 일치도 검사(evaluate)를 통과한 모델만 배포합니다.
+
+- dynamic: 가중치만 INT8로 양자화 (보정 데이터 불필요, 서비스 첫 로딩 시 자동 생성 가능)
+- static:  로컬 샘플 이미지 폴더로 activation 범위를 보정 (더 빠르지만 calibrate 단계 필요)
+
+결과는 EXPORT_DIR 캐시 디렉토리에 best_int8_dynamic.onnx / best_int8_static.onnx 로 저장되며,
+서비스는 INFERENCE_BACKEND=onnx, MODEL_PRECISION=int8_dynamic|int8_static 으로 선택합니다.
+
+사용법:
+    # 1) 보정 (static)
+    python quantize.py calibrate --model best.pt --calib-dir ./calib_images --mode static
+    # 2) FP32 대비 일치도 검사 (기준 미달 시 exit code 1)
+    python quantize.py evaluate --model best.pt --images ./eval_images --mode static --min-recall 0.95
+"""
+
+import argparse
+import glob
+import logging
+import os
+import sys
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PRECISIONS = ("fp32", "int8_dynamic", "int8_static")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+def check_quantization_available():
+    try:
+        import onnxruntime.quantization  # noqa: F401
+    except ImportError:
+        raise RuntimeError("INT8 quantization requires the 'onnxruntime' and 'onnx' packages")
+
+
+def quantized_path(fp32_onnx_path: str, mode: str) -> str:
+    stem, _ = os.path.splitext(fp32_onnx_path)
+    return f"{stem}_int8_{mode}.onnx"
+
+
+def letterbox(img, imgsz: int):
+    """Ultralytics LetterBox(auto=False)와 같은 정사각 letterbox (회색 114 패딩)"""
+    h, w = img.shape[:2]
+    r = min(imgsz / h, imgsz / w)
+    new_w, new_h = int(round(w * r)), int(round(h * r))
+    if (new_w, new_h) != (w, h):
+        img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    dw, dh = (imgsz - new_w) / 2, (imgsz - new_h) / 2
+    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+    return cv2.copyMakeBorder(img, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+
+
+def to_model_input(img, imgsz: int) -> np.ndarray:
+    """BGR 이미지 → (1, 3, imgsz, imgsz) float32 RGB 텐서 (모델 전처리와 동일)"""
+    boxed = letterbox(img, imgsz)
+    chw = boxed[:, :, ::-1].transpose(2, 0, 1)
+    return np.ascontiguousarray(chw, dtype=np.float32)[None] / 255.0
+
+
+def iter_image_paths(images_dir: str, limit: int = 0):
+    paths = [p for p in sorted(glob.glob(os.path.join(images_dir, "*"))) if p.lower().endswith(IMAGE_EXTENSIONS)]
+    return paths[:limit] if limit > 0 else paths
+
+
+def _calibration_reader(input_name: str, paths, imgsz: int):
+    from onnxruntime.quantization import CalibrationDataReader
+
+    class FolderCalibrationReader(CalibrationDataReader):
+        """로컬 이미지 폴더를 한 장씩 읽어 보정 입력으로 제공 (전체를 메모리에 올리지 않음)"""
+
+        def __init__(self):
+            self._paths = iter(paths)
+
+        def get_next(self):
+            for path in self._paths:
+                img = cv2.imread(path, cv2.IMREAD_COLOR)
+                if img is not None:
+                    return {input_name: to_model_input(img, imgsz)}
+                logger.warning(f"Skipping unreadable calibration image: {path}")
+            return None
+
+    return FolderCalibrationReader()
+
+
+def quantize_onnx(fp32_onnx_path: str, mode: str, calib_dir: str = None, imgsz: int = 640, max_images: int = 200) -> str:
+    """
+    FP32 ONNX 모델을 INT8로 양자화
+
+    Returns:
+        양자화된 .onnx 경로 (Ultralytics 메타데이터 유지)
+    """
+    if mode not in ("dynamic", "static"):
+        raise ValueError(f"Unknown quantization mode '{mode}' (expected dynamic or static)")
+    if mode == "static":
+        # 모델 전처리 전에 보정 데이터부터 확인 (없으면 바로 실패)
+        if not calib_dir:
+            raise ValueError("Static INT8 quantization requires a calibration image folder (--calib-dir)")
+        paths = iter_image_paths(calib_dir, max_images)
+        if not paths:
+            raise ValueError(f"No calibration images found in {calib_dir}")
+
+    check_quantization_available()
+    import onnx
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_dynamic, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    output_path = quantized_path(fp32_onnx_path, mode)
+    preprocessed = f"{os.path.splitext(fp32_onnx_path)[0]}_preprocessed.onnx"
+    tmp_output = f"{output_path}.tmp.onnx"
+    try:
+        quant_pre_process(fp32_onnx_path, preprocessed, skip_symbolic_shape=True)
+
+        if mode == "dynamic":
+            # ORT CPU ConvInteger 커널은 uint8 가중치만 지원
+            quantize_dynamic(preprocessed, tmp_output, weight_type=QuantType.QUInt8)
+        else:
+            input_name = onnx.load(preprocessed, load_external_data=False).graph.input[0].name
+            logger.info(f"Calibrating static INT8 model with {len(paths)} image(s) from {calib_dir}...")
+            quantize_static(
+                preprocessed,
+                tmp_output,
+                _calibration_reader(input_name, paths, imgsz),
+                quant_format=QuantFormat.QDQ,
+                per_channel=True,
+                activation_type=QuantType.QUInt8,
+                weight_type=QuantType.QInt8,
+            )
+
+        os.replace(tmp_output, output_path)
+    finally:
+        for path in (preprocessed, tmp_output):
+            if os.path.exists(path):
+                os.remove(path)
+
+    fp32_size = os.path.getsize(fp32_onnx_path) / 1024 / 1024
+    int8_size = os.path.getsize(output_path) / 1024 / 1024
+    logger.info(f"INT8 ({mode}) model written: {output_path} ({fp32_size:.1f} MB -> {int8_size:.1f} MB)")
+    return output_path
+
+
+def resolve_quantized_model(fp32_onnx_path: str, precision: str, imgsz: int = 640) -> str:
+    """
+    서비스 시작 시 precision에 맞는 ONNX 경로 반환
+
+    int8_dynamic은 없으면 바로 생성해서 캐시, int8_static은 calibrate 단계로 미리 만들어 두어야 함
+    """
+    if precision == "fp32":
+        return fp32_onnx_path
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown model precision '{precision}' (expected one of {', '.join(PRECISIONS)})")
+
+    mode = precision.split("_", 1)[1]
+    path = quantized_path(fp32_onnx_path, mode)
+    if os.path.exists(path):
+        logger.info(f"Using cached INT8 ({mode}) model: {path}")
+        return path
+    if mode == "static":
+        raise RuntimeError(
+            f"Static INT8 model not found at {path}. "
+            f"Run 'python quantize.py calibrate --mode static --calib-dir <images>' first."
+        )
+    return quantize_onnx(fp32_onnx_path, mode, imgsz=imgsz)
+
+
+def _fp32_onnx(args) -> str:
+    from backends import export_model
+    return export_model(args.model, "onnx", args.export_dir, imgsz=args.imgsz)
+
+
+def cmd_calibrate(args) -> int:
+    fp32_path = _fp32_onnx(args)
+    output = quantize_onnx(fp32_path, args.mode, calib_dir=args.calib_dir, imgsz=args.imgsz, max_images=args.max_images)
+    print(output)
+    return 0
+
+
+def accuracy_gate(result: dict, min_recall: float, min_f1: float, min_mask_iou: float,
+                  min_reference_detections: int = 1):
+    """
+    compare_backends.agreement() 결과를 기준값과 비교
+
+    기준값과 같으면 통과, 일치한 탐지가 없어 mask IoU가 None이면 mask IoU 기준은 건너뜀
+    FP32 기준 탐지가 min_reference_detections 보다 적으면 crack recall을 확인할 수 없으므로 실패
+
+    Returns:
+        기준 미달 항목 설명 리스트 (비어 있으면 통과)
+    """
+    failures = []
+    if result["reference_detections"] < max(1, min_reference_detections):
+        failures.append(
+            f"reference detections {result['reference_detections']} < {max(1, min_reference_detections)} "
+            f"(recall not measurable, use --images with crack photos)"
+        )
+    if result["recall"] < min_recall:
+        failures.append(f"recall {result['recall']:.3f} < {min_recall:.3f}")
+    if result["f1"] < min_f1:
+        failures.append(f"f1 {result['f1']:.3f} < {min_f1:.3f}")
+    if result["mean_mask_iou"] is not None and result["mean_mask_iou"] < min_mask_iou:
+        failures.append(f"mask IoU {result['mean_mask_iou']:.3f} < {min_mask_iou:.3f}")
+    return failures
+
+
+def cmd_evaluate(args) -> int:
+    """FP32 대비 INT8 탐지 일치도 검사. 기준 미달이면 1 반환 (CI 게이트)"""
+    from ultralytics import YOLO
+    from backends import load_backend_model
+    from compare_backends import agreement, benchmark_model, latency_summary, load_image_set
+
+    images = load_image_set(args.images, args.synthetic)
+    if not images:
+        print("No images found", file=sys.stderr)
+        return 1
+
+    fp32_path = _fp32_onnx(args)
+    int8_path = quantized_path(fp32_path, args.mode)
+    if not os.path.exists(int8_path):
+        print(f"INT8 model not found: {int8_path} (run 'quantize.py calibrate' first)", file=sys.stderr)
+        return 1
+
+    reference = load_backend_model(args.model, args.reference, args.export_dir, imgsz=args.imgsz)
+    candidate = YOLO(int8_path, task="segment")
+
+    ref_outputs, ref_latencies = benchmark_model(reference, images, args.runs, args.conf, args.imgsz)
+    int8_outputs, int8_latencies = benchmark_model(candidate, images, args.runs, args.conf, args.imgsz)
+    result = agreement(ref_outputs, int8_outputs, args.iou_threshold)
+
+    print(f"Reference ({args.reference} fp32): {latency_summary(ref_latencies)}")
+    print(f"INT8 ({args.mode}):            {latency_summary(int8_latencies)}")
+    print(f"Model size: {os.path.getsize(fp32_path) / 1024 / 1024:.1f} MB -> {os.path.getsize(int8_path) / 1024 / 1024:.1f} MB")
+    print(f"Agreement: {result}")
+
+    failures = accuracy_gate(result, args.min_recall, args.min_f1, args.min_mask_iou, args.min_reference_detections)
+    if failures:
+        print(f"❌ INT8 accuracy regression: {', '.join(failures)}")
+        return 1
+    print("✅ INT8 model passed the accuracy gate")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="INT8 quantization tools for best.pt")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_common(p):
+        p.add_argument("--model", default=os.environ.get("MODEL_PATH", "best.pt"))
+        p.add_argument("--mode", choices=["dynamic", "static"], default="static")
+        p.add_argument("--imgsz", type=int, default=int(os.environ.get("MODEL_IMGSZ", "640")))
+        p.add_argument("--export-dir", default=os.environ.get("EXPORT_DIR", "/tmp/exports"))
+
+    calib = subparsers.add_parser("calibrate", help="create an INT8 model (static mode calibrates on a local image folder)")
+    add_common(calib)
+    calib.add_argument("--calib-dir", help="folder with representative sample images")
+    calib.add_argument("--max-images", type=int, default=200)
+    calib.set_defaults(func=cmd_calibrate)
+
+    evaluate = subparsers.add_parser("evaluate", help="compare INT8 detections against the FP32 model")
+    add_common(evaluate)
+    evaluate.add_argument("--reference", choices=["pytorch", "onnx"], default="pytorch")
+    # 합성 이미지에는 FP32 모델이 crack을 거의 찾지 못하므로 기본값으로 쓰지 않음 (명시적으로만)
+    image_source = evaluate.add_mutually_exclusive_group(required=True)
+    image_source.add_argument("--images", help="folder with evaluation images (real crack photos)")
+    image_source.add_argument("--synthetic", type=int, default=0, help="number of synthetic images (smoke test only)")
+    evaluate.add_argument("--runs", type=int, default=1)
+    evaluate.add_argument("--conf", type=float, default=0.25)
+    evaluate.add_argument("--iou-threshold", type=float, default=0.5)
+    evaluate.add_argument("--min-recall", type=float, default=0.95)
+    evaluate.add_argument("--min-f1", type=float, default=0.9)
+    evaluate.add_argument("--min-mask-iou", type=float, default=0.8)
+    evaluate.add_argument("--min-reference-detections", type=int, default=1,
+                          help="fail when the FP32 reference finds fewer cracks than this")
+    evaluate.set_defaults(func=cmd_evaluate)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
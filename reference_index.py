@@ -0,0 +1,175 @@
+"""
+체크인 사진 참조 인덱스 (숙소별, SQLite 기반 로컬 인덱스)
+
+체크인 사진을 처음 분석할 때(POST /detect-crack?checkin=<property_id>) 탐지 결과를 다시 계산하지 않아도 되도록
+사진 하나당 다음을 저장합니다:
+
+- crack별 bbox / 신뢰도 / 면적과 마스크 해상도의 COCO RLE (수백 바이트 수준)
+- 정렬용 ORB keypoint(원본 좌표, float32)와 descriptor(32바이트) - 1000개 기준 약 40KB
+
+체크아웃 비교(POST /compare)는 새 사진만 추론하고 여기 저장된 참조와 정렬/비교합니다.
+저장 기간은 ttl (체크인 → 체크아웃 사이 기간보다 길게), 숙박이 끝나면 DELETE로 숙소 단위 삭제.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+
+import numpy as np
+
+DESCRIPTOR_BYTES = 32
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkin_photos (
+    id TEXT PRIMARY KEY,
+    property_id TEXT NOT NULL,
+    filename TEXT,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    cracks TEXT NOT NULL,
+    keypoints BLOB NOT NULL,
+    descriptors BLOB NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS checkin_photos_property ON checkin_photos (property_id, created_at);
+"""
+
+
+@dataclass
+class Reference:
+    """체크인 사진 하나의 비교용 요약"""
+    width: int                 # 원본 이미지 너비
+    height: int                # 원본 이미지 높이
+    keypoints: np.ndarray      # (N, 2) float32, 원본 좌표
+    descriptors: np.ndarray    # (N, 32) uint8, ORB descriptor
+    cracks: list = field(default_factory=list)  # {"x", "y", "width", "height", "confidence", "area", "rle"}
+    id: str = None
+    property_id: str = None
+    filename: str = None
+    created_at: float = None
+
+
+class ReferenceIndex:
+    """숙소별 체크인 사진 참조 저장소 (thread-safe)"""
+
+    def __init__(self, path: str, ttl: float = 30 * 86400.0):
+        """
+        Args:
+            path: SQLite 파일 경로 (":memory:" 이면 프로세스 안에서만 유지)
+            ttl: 참조 보관 시간 (초, 0 이하면 만료 없음)
+        """
+        self.path = path
+        self.ttl = float(ttl)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+
+    def _cutoff(self) -> float:
+        return time.time() - self.ttl if self.ttl > 0 else float("-inf")
+
+    def put(self, property_id: str, reference: Reference, filename: str = None) -> str:
+        """참조 저장 후 reference id 반환"""
+        reference_id = uuid.uuid4().hex
+        keypoints = np.ascontiguousarray(reference.keypoints, dtype=np.float32).reshape(-1, 2)
+        descriptors = np.ascontiguousarray(reference.descriptors, dtype=np.uint8).reshape(-1, DESCRIPTOR_BYTES)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO checkin_photos (id, property_id, filename, width, height, cracks, keypoints, descriptors, "
+                "created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    reference_id, property_id, filename, int(reference.width), int(reference.height),
+                    json.dumps(reference.cracks), sqlite3.Binary(keypoints.tobytes()),
+                    sqlite3.Binary(descriptors.tobytes()), time.time(),
+                ),
+            )
+        return reference_id
+
+    @staticmethod
+    def _reference(row) -> Reference:
+        return Reference(
+            width=row["width"],
+            height=row["height"],
+            keypoints=np.frombuffer(row["keypoints"], dtype=np.float32).reshape(-1, 2),
+            descriptors=np.frombuffer(row["descriptors"], dtype=np.uint8).reshape(-1, DESCRIPTOR_BYTES),
+            cracks=json.loads(row["cracks"]),
+            id=row["id"],
+            property_id=row["property_id"],
+            filename=row["filename"],
+            created_at=row["created_at"],
+        )
+
+    def get(self, property_id: str, reference_id: str):
+        """참조 하나 (없거나 만료되었거나 다른 숙소의 참조면 None)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM checkin_photos WHERE id = ? AND property_id = ? AND created_at >= ?",
+                (reference_id, property_id, self._cutoff()),
+            ).fetchone()
+        return self._reference(row) if row is not None else None
+
+    def load(self, property_id: str, limit: int = 20):
+        """숙소의 최근 참조 최대 limit개 (비교 후보, 최신순)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM checkin_photos WHERE property_id = ? AND created_at >= ? "
+                "ORDER BY created_at DESC LIMIT ?",
+                (property_id, self._cutoff(), max(1, int(limit))),
+            ).fetchall()
+        return [self._reference(row) for row in rows]
+
+    def list(self, property_id: str):
+        """숙소의 참조 목록 (keypoint/마스크 없이 요약만, 최신순)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, filename, width, height, cracks, created_at FROM checkin_photos "
+                "WHERE property_id = ? AND created_at >= ? ORDER BY created_at DESC",
+                (property_id, self._cutoff()),
+            ).fetchall()
+        return [
+            {
+                "reference_id": row["id"],
+                "filename": row["filename"],
+                "width": row["width"],
+                "height": row["height"],
+                "crack_count": len(json.loads(row["cracks"])),
+                "created_at": row["created_at"],
+            }
+            for row in rows
+        ]
+
+    def delete_property(self, property_id: str) -> int:
+        """숙소의 참조 전체 삭제 (숙박 종료 후), 삭제한 수 반환"""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM checkin_photos WHERE property_id = ?", (property_id,))
+        return cursor.rowcount
+
+    def purge_expired(self) -> int:
+        """ttl이 지난 참조 삭제, 삭제한 수 반환"""
+        if self.ttl <= 0:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM checkin_photos WHERE created_at < ?", (self._cutoff(),))
+        return cursor.rowcount
+
+    def stats(self) -> dict:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) AS n, COUNT(DISTINCT property_id) AS properties FROM checkin_photos"
+            ).fetchone()
+        return {
+            "path": self.path,
+            "ttl_s": self.ttl,
+            "references": row["n"],
+            "properties": row["properties"],
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
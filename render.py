@@ -0,0 +1,98 @@
+"""
+결과 이미지 렌더링 (탐지 bbox 그리기 / 크기 조정 / JPEG·WebP 인코딩)
+
+RESULT_RENDER_MODE=lazy이면 /detect-crack 시점에는 탐지 결과와 원본 바이트만 저장하고,
+GET /result/{file_id}로 처음 요청될 때 그려서 인코딩한 뒤 저장소에 캐시합니다.
+썸네일(size/quality/format 쿼리)도 같은 경로로 만들어 4000px 원본을 보내지 않게 합니다.
+"""
+
+import zlib
+
+import cv2
+
+RENDER_FORMATS = {
+    "jpeg": (".jpg", "image/jpeg", cv2.IMWRITE_JPEG_QUALITY),
+    "webp": (".webp", "image/webp", cv2.IMWRITE_WEBP_QUALITY),
+}
+DEFAULT_FORMAT = "jpeg"
+DEFAULT_QUALITY = 95    # cv2.imwrite 기본 JPEG 품질
+
+# 손상 유형별 bbox 색 (BGR): crack은 기존 빨강, 나머지 유형은 이름으로 고른 고정 색
+DEFAULT_LABEL = "crack"
+LABEL_COLORS = {DEFAULT_LABEL: (0, 0, 255)}
+PALETTE = ((255, 128, 0), (0, 200, 0), (255, 0, 255), (0, 200, 255), (255, 255, 0), (128, 0, 255))
+
+
+def normalize_format(fmt: str) -> str:
+    fmt = (fmt or DEFAULT_FORMAT).lower()
+    if fmt == "jpg":
+        fmt = "jpeg"
+    if fmt not in RENDER_FORMATS:
+        raise ValueError(f"Unsupported image format '{fmt}' (expected one of {', '.join(RENDER_FORMATS)})")
+    return fmt
+
+
+def media_type(fmt: str) -> str:
+    return RENDER_FORMATS[fmt][1]
+
+
+def variant_name(file_id: str, size: int = 0, quality: int = DEFAULT_QUALITY, fmt: str = DEFAULT_FORMAT) -> str:
+    """
+    저장소 항목 이름. 기본 변형(원본 크기, 기본 품질, JPEG)은 '{file_id}.jpg'
+    """
+    ext = RENDER_FORMATS[fmt][0]
+    if size <= 0 and quality == DEFAULT_QUALITY and fmt == DEFAULT_FORMAT:
+        return f"{file_id}{ext}"
+    return f"{file_id}_s{size}_q{quality}{ext}"
+
+
+def label_color(label: str):
+    """손상 유형 → bbox 색 (프로세스가 달라도 같은 색)"""
+    if label in LABEL_COLORS:
+        return LABEL_COLORS[label]
+    return PALETTE[zlib.crc32(label.encode("utf-8")) % len(PALETTE)]
+
+
+def draw_detections(img, detections, scale_x: float = 1.0, scale_y: float = 1.0):
+    """
+    원본 좌표 detections({"index", "x", "y", "width", "height", "confidence"})를 img 위에 그림 (in-place)
+
+    scale_x/scale_y: 원본 좌표 / img 좌표 비율 (축소 디코딩된 이미지)
+    탐지에 "label"(손상 유형)이 있으면 유형 이름과 유형별 색으로 표시 (없으면 crack)
+    """
+    for det in detections:
+        i, conf = det["index"], det["confidence"]
+        label = det.get("label", DEFAULT_LABEL)
+        color = label_color(label)
+        x_min, y_min = int(det["x"] / scale_x), int(det["y"] / scale_y)
+        x_max = int((det["x"] + det["width"]) / scale_x)
+        y_max = int((det["y"] + det["height"]) / scale_y)
+
+        cv2.rectangle(img, (x_min, y_min), (x_max, y_max), color, 3)
+        cv2.putText(
+            img,
+            f"{label} {i+1} ({conf:.2f})",
+            (x_min, y_min - 10),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.7,
+            color,
+            2,
+        )
+    return img
+
+
+def fit_to_size(img, size: int):
+    """긴 변이 size를 넘으면 비율 유지 축소 (0이면 그대로)"""
+    h, w = img.shape[:2]
+    if size <= 0 or max(h, w) <= size:
+        return img
+    r = size / max(h, w)
+    return cv2.resize(img, (max(1, round(w * r)), max(1, round(h * r))), interpolation=cv2.INTER_AREA)
+
+
+def encode_image(img, fmt: str = DEFAULT_FORMAT, quality: int = DEFAULT_QUALITY) -> bytes:
+    ext, _, quality_flag = RENDER_FORMATS[fmt]
+    ok, encoded = cv2.imencode(ext, img, [quality_flag, int(quality)])
+    if not ok:
+        raise RuntimeError(f"Failed to encode result image as {fmt}")
+    return encoded.tobytes()
@@ -0,0 +1,194 @@
+"""
+업로드 내용 기반(content-addressed) 탐지 결과 캐시
+
+모바일 클라이언트의 재시도/같은 사진 재업로드 시 decode와 추론을 다시 하지 않고
+저장된 탐지 JSON과 기존 file_id를 그대로 반환합니다.
+
+- 키: sha256(업로드 바이트) + 모델 식별자(모델 파일/디코딩 설정 등)
+- 메모리 tier: LRU + 최대 항목 수 / 최대 바이트 + TTL
+- 디스크 tier(선택): /tmp 아래 JSON 파일 (warm 컨테이너 재시작/메모리 eviction 대비)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def model_identity(model_path: str, *extra) -> str:
+    """모델 파일 경로/크기/수정 시각 + 추가 설정값으로 모델 식별자 생성"""
+    try:
+        stat = os.stat(model_path)
+        parts = [os.path.abspath(model_path), str(stat.st_size), str(int(stat.st_mtime))]
+    except OSError:
+        parts = [model_path]
+    parts.extend(str(x) for x in extra)
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+class ResultCache:
+    """메모리 LRU + 선택적 디스크 tier 결과 캐시 (thread-safe)"""
+
+    def __init__(self, identity: str, max_entries: int = 1024, ttl_seconds: float = 3600.0, disk_dir: str = None,
+                 max_bytes: int = 32 * 1024 * 1024):
+        """
+        Args:
+            identity: 모델 식별자 (model_identity 결과). 키에 포함되어 모델이 바뀌면 자동으로 miss
+            max_entries: 메모리 tier 최대 항목 수
+            ttl_seconds: 항목 유효 시간 (초)
+            disk_dir: 디스크 tier 디렉토리 (None이면 메모리만 사용)
+            max_bytes: 메모리 tier에 보관하는 응답 JSON 총 크기 (polygon 마스크 응답은 항목 하나가 수백 KB)
+        """
+        self.identity = identity
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(0, int(max_bytes))
+        self.ttl = float(ttl_seconds)
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()   # key -> (stored_at, json 문자열)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def make_key(self, contents: bytes, variant: str = "") -> str:
+        """variant: 같은 업로드라도 결과가 달라지는 처리 모드 (예: 타일 모드)"""
+        digest = hashlib.sha256(contents).hexdigest()
+        if variant:
+            return f"{self.identity}-{variant}-{digest}"
+        return f"{self.identity}-{digest}"
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl > 0 and (time.time() - stored_at) > self.ttl
+
+    def get(self, key: str, is_valid=None):
+        """
+        캐시 조회. 디스크 tier에서 찾으면 메모리 tier로 승격.
+
+        Args:
+            is_valid: 저장된 응답을 받아 아직 쓸 수 있는지 판단하는 함수 (예: 결과 이미지 존재 여부)
+
+        Returns:
+            저장된 응답 dict (매번 새 객체) 또는 None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, payload = entry
+                if self._expired(stored_at):
+                    self._remove_memory(key)
+                    entry = None
+                else:
+                    self._entries.move_to_end(key)
+
+        source = "memory"
+        if entry is None and self.disk_dir:
+            entry = self._read_disk(key)
+            source = "disk"
+
+        if entry is not None:
+            stored_at, payload = entry
+            response = json.loads(payload)
+            if is_valid is None or is_valid(response):
+                with self._lock:
+                    self.hits += 1
+                    if source == "memory":
+                        self.memory_hits += 1
+                    else:
+                        self.disk_hits += 1
+                        self._store_memory(key, stored_at, payload)
+                return response
+            self.invalidate(key)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, response: dict):
+        payload = json.dumps(response)
+        stored_at = time.time()
+        with self._lock:
+            self._store_memory(key, stored_at, payload)
+        if self.disk_dir:
+            self._write_disk(key, payload)
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._remove_memory(key)
+        if self.disk_dir:
+            try:
+                os.remove(self._disk_path(key))
+            except OSError:
+                pass
+
+    def _store_memory(self, key, stored_at, payload):
+        # self._lock을 잡은 상태에서 호출
+        self._remove_memory(key)
+        if len(payload) > self.max_bytes:
+            # 혼자서 한도를 넘는 응답은 메모리에 두지 않음 (디스크 tier에는 저장)
+            return
+        self._entries[key] = (stored_at, payload)
+        self._bytes += len(payload)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    def _remove_memory(self, key):
+        # self._lock을 잡은 상태에서 호출
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
+
+    def _read_disk(self, key):
+        path = self._disk_path(key)
+        try:
+            stored_at = os.path.getmtime(path)
+            if self._expired(stored_at):
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return stored_at, f.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, key, payload):
+        path = self._disk_path(key)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write result cache entry to disk: {str(e)}")
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "disk_dir": self.disk_dir,
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
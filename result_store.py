@@ -0,0 +1,278 @@
+"""
+결과 이미지 저장소 (용량 제한 + TTL + LRU eviction)
+
+warm Lambda 컨테이너에서 요청마다 /tmp/result에 JPEG가 쌓여 ephemeral 스토리지가 가득 차는 것을 막습니다.
+
+- 메모리 tier: 최근 결과 이미지 바이트 (GET /result/{file_id}는 가능하면 메모리에서 바로 응답)
+- 디스크 tier: SAVE_DIR 아래 파일, 전체 바이트 예산(max_bytes)을 넘으면 가장 오래 안 쓴 것부터 삭제
+- 디스크 쓰기는 백그라운드 스레드 하나에서 비동기로 수행 (/detect-crack 지연 시간에 포함되지 않음)
+  쓰기가 끝나기 전 조회는 대기 중인 바이트로 응답
+  대기 중인 바이트가 pending_max_bytes를 넘으면 put()이 직접 디스크에 써서 메모리 사용량을 제한 (backpressure)
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class ResultStore:
+    """메모리 LRU + 용량 제한 디스크 tier 결과 이미지 저장소 (thread-safe)"""
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl_seconds: float = 86400.0,
+        memory_max_bytes: int = 64 * 1024 * 1024,
+        async_writes: bool = True,
+        pending_max_bytes: int = 32 * 1024 * 1024,
+    ):
+        """
+        Args:
+            directory: 디스크 tier 디렉토리 (SAVE_DIR)
+            max_bytes: 디스크 tier 최대 바이트 (0 이하면 디스크에 저장하지 않음)
+            ttl_seconds: 항목 유효 시간 (초, 0 이하면 무제한)
+            memory_max_bytes: 메모리 tier 최대 바이트 (0 이하면 메모리 tier 비활성화)
+            async_writes: False면 put()이 디스크 쓰기를 끝낸 뒤 반환
+            pending_max_bytes: 비동기 쓰기 대기 최대 바이트, 넘으면 put()에서 동기로 씀 (0 이하면 무제한)
+        """
+        self.directory = directory
+        self.max_bytes = int(max_bytes)
+        self.ttl = float(ttl_seconds)
+        self.memory_max_bytes = int(memory_max_bytes)
+        self.pending_max_bytes = int(pending_max_bytes)
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()    # name -> (stored_at, bytes)
+        self._memory_bytes = 0
+        self._disk = OrderedDict()      # name -> (stored_at, size)
+        self._disk_bytes = 0
+        self._pending = {}              # 디스크 쓰기 대기 중: name -> (stored_at, bytes)
+        self._pending_bytes = 0
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="result-store") if async_writes else None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.write_errors = 0
+        self.sync_writes = 0
+
+        if self.max_bytes > 0:
+            os.makedirs(self.directory, exist_ok=True)
+            self._load_index()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl > 0 and (time.time() - stored_at) > self.ttl
+
+    def _load_index(self):
+        """컨테이너 재사용 시 기존 파일을 수정 시각 순으로 인덱싱 (예산 초과분은 바로 정리)"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+        entries.sort()
+        with self._lock:
+            for stored_at, name, size in entries:
+                self._disk[name] = (stored_at, size)
+                self._disk_bytes += size
+            removed = self._evict_disk()
+        self._remove_files(removed)
+
+    def put(self, name: str, data: bytes):
+        """결과 이미지 저장 (메모리 tier에 즉시 반영, 디스크 쓰기는 백그라운드)"""
+        stored_at = time.time()
+        synchronous = self._writer is None
+        with self._lock:
+            self._store_memory(name, stored_at, data)
+            if self.max_bytes > 0:
+                # 🔥 디스크가 느려 쓰기 대기 바이트가 한도를 넘으면 이 호출에서 직접 씀 (대기열이 무한히 자라지 않음)
+                if not synchronous and 0 < self.pending_max_bytes < self._pending_bytes + len(data):
+                    synchronous = True
+                    self.sync_writes += 1
+                self._drop_pending(name)
+                self._pending[name] = (stored_at, data)
+                self._pending_bytes += len(data)
+
+        if self.max_bytes <= 0:
+            return
+        if synchronous:
+            self._write_disk(name, stored_at, data)
+        else:
+            self._writer.submit(self._write_disk, name, stored_at, data)
+
+    def get(self, name: str):
+        """
+        결과 이미지 바이트 조회 (메모리 → 쓰기 대기 → 디스크 순, 디스크에서 찾으면 메모리로 승격)
+
+        Returns:
+            bytes 또는 None
+        """
+        expired_file = False
+        with self._lock:
+            entry = self._memory.get(name)
+            if entry is not None:
+                if self._expired(entry[0]):
+                    self._drop_memory(name)
+                    self.expirations += 1
+                else:
+                    self._memory.move_to_end(name)
+                    if name in self._disk:
+                        self._disk.move_to_end(name)
+                    self.memory_hits += 1
+                    return entry[1]
+
+            pending = self._pending.get(name)
+            if pending is not None and not self._expired(pending[0]):
+                self.memory_hits += 1
+                return pending[1]
+
+            disk_entry = self._disk.get(name)
+            if disk_entry is None:
+                self.misses += 1
+                return None
+            if self._expired(disk_entry[0]):
+                self._drop_disk(name)
+                self.expirations += 1
+                self.misses += 1
+                expired_file = True
+
+        if expired_file:
+            self._remove_files([name])
+            return None
+
+        try:
+            with open(self._path(name), "rb") as f:
+                data = f.read()
+        except OSError:
+            with self._lock:
+                self._drop_disk(name)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.disk_hits += 1
+            if name in self._disk:
+                self._disk.move_to_end(name)
+            self._store_memory(name, disk_entry[0], data)
+        return data
+
+    def exists(self, name: str) -> bool:
+        with self._lock:
+            for index in (self._memory, self._pending, self._disk):
+                entry = index.get(name)
+                if entry is not None and not self._expired(entry[0]):
+                    return True
+        return False
+
+    def flush(self):
+        """대기 중인 디스크 쓰기가 모두 끝날 때까지 대기"""
+        if self._writer is not None:
+            self._writer.submit(lambda: None).result()
+
+    def shutdown(self):
+        if self._writer is not None:
+            self._writer.shutdown(wait=True)
+
+    def _store_memory(self, name, stored_at, data):
+        # self._lock을 잡은 상태에서 호출
+        if self.memory_max_bytes <= 0 or len(data) > self.memory_max_bytes:
+            return
+        self._drop_memory(name)
+        self._memory[name] = (stored_at, data)
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.memory_max_bytes:
+            _, (_, evicted) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _drop_memory(self, name):
+        entry = self._memory.pop(name, None)
+        if entry is not None:
+            self._memory_bytes -= len(entry[1])
+
+    def _drop_pending(self, name):
+        entry = self._pending.pop(name, None)
+        if entry is not None:
+            self._pending_bytes -= len(entry[1])
+
+    def _drop_disk(self, name):
+        entry = self._disk.pop(name, None)
+        if entry is not None:
+            self._disk_bytes -= entry[1]
+
+    def _evict_disk(self):
+        """예산 초과/만료 항목을 인덱스에서 제거하고 삭제할 파일 이름 반환 (self._lock 잡은 상태)"""
+        removed = [name for name, (stored_at, _) in self._disk.items() if self._expired(stored_at)]
+        for name in removed:
+            self._drop_disk(name)
+            self._drop_memory(name)
+            self.expirations += 1
+        while self._disk_bytes > self.max_bytes and self._disk:
+            name, (_, size) = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            self._drop_memory(name)
+            self.evictions += 1
+            removed.append(name)
+        return removed
+
+    def _remove_files(self, names):
+        for name in names:
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                pass
+
+    def _write_disk(self, name, stored_at, data):
+        path = self._path(name)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write result image {name}: {str(e)}")
+            with self._lock:
+                self.write_errors += 1
+                self._drop_pending(name)
+            return
+
+        with self._lock:
+            self._drop_pending(name)
+            self._drop_disk(name)
+            self._disk[name] = (stored_at, len(data))
+            self._disk_bytes += len(data)
+            removed = self._evict_disk()
+        if removed:
+            logger.info(f"Result store evicted {len(removed)} image(s) (disk usage {self._disk_bytes} / {self.max_bytes} bytes)")
+        self._remove_files(removed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "memory_max_bytes": self.memory_max_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+                "disk_max_bytes": self.max_bytes,
+                "pending_writes": len(self._pending),
+                "pending_bytes": self._pending_bytes,
+                "pending_max_bytes": self.pending_max_bytes,
+                "sync_writes": self.sync_writes,
+                "ttl_seconds": self.ttl,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "write_errors": self.write_errors,
+            }
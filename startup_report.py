@@ -0,0 +1,123 @@
+"""
+cold start 분석 도구 (python -X importtime 리포트)
+
+새 Python 프로세스에서 모듈(기본: lambda_handler)을 import 하면서 -X importtime 출력을 수집해
+패키지별 / 모듈별 import 시간을 표로 보여줍니다. --model 을 주면 같은 프로세스에서
+모델 로딩 + 더미 추론(main.warm_up_model)까지 측정해 첫 요청 전까지의 전체 시간을 나눠 봅니다.
+
+사용법:
+    python startup_report.py
+    python startup_report.py --module main --top 15
+    python startup_report.py --model --json startup.json
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+report = {{"import_s": imported - start}}
+if {with_model}:
+    import main
+    main.warm_up_model()
+    report["model_load_s"] = main.MODEL_LOAD_SECONDS
+    report["warmup_s"] = main.WARMUP_SECONDS
+print("STARTUP_REPORT " + json.dumps(report), file=sys.stderr)
+"""
+
+
+def parse_importtime(stderr: str):
+    """
+    -X importtime 출력 파싱
+
+    Returns:
+        [(module, self_us, cumulative_us, depth), ...] (import 순서)
+    """
+    entries = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            depth = (len(indent) - 1) // 2
+            entries.append((name, int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def package_totals(entries) -> dict:
+    """최상위 패키지별 self 시간 합계 (us) - 각 모듈 시간이 한 번씩만 더해짐"""
+    totals = {}
+    for name, self_us, _, _ in entries:
+        package = name.split(".")[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return totals
+
+
+def run_probe(module: str, with_model: bool):
+    env = dict(os.environ)
+    code = PROBE.format(module=module, with_model=bool(with_model))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Import of {module} failed:\n{proc.stderr[-2000:]}")
+
+    report = {}
+    for line in proc.stderr.splitlines():
+        if line.startswith("STARTUP_REPORT "):
+            report = json.loads(line[len("STARTUP_REPORT "):])
+    return parse_importtime(proc.stderr), report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show where cold start time goes (python -X importtime report)")
+    parser.add_argument("--module", default="lambda_handler", help="module to import (default: lambda_handler)")
+    parser.add_argument("--top", type=int, default=10, help="rows per table")
+    parser.add_argument("--model", action="store_true", help="also measure model load + one dummy inference")
+    parser.add_argument("--json", help="write the report to this JSON file")
+    args = parser.parse_args()
+
+    entries, report = run_probe(args.module, args.model)
+    packages = sorted(package_totals(entries).items(), key=lambda kv: -kv[1])
+    top_level = sorted((e for e in entries if e[3] == 0), key=lambda e: -e[2])
+
+    print(f"Import of '{args.module}': {report['import_s'] * 1000:.0f} ms ({len(entries)} modules)")
+    if args.model:
+        print(
+            f"Model load: {report['model_load_s'] * 1000:.0f} ms, "
+            f"warm-up total (load + first inference): {report['warmup_s'] * 1000:.0f} ms"
+        )
+
+    print(f"\n{'package':<28} {'self total(ms)':>15}")
+    print("-" * 44)
+    for package, self_us in packages[:args.top]:
+        print(f"{package:<28} {self_us / 1000:>15.1f}")
+
+    print(f"\n{'top-level import':<28} {'cumulative(ms)':>15}")
+    print("-" * 44)
+    for name, _, cumulative_us, _ in top_level[:args.top]:
+        print(f"{name:<28} {cumulative_us / 1000:>15.1f}")
+
+    if args.json:
+        report["packages_ms"] = {package: round(us / 1000, 2) for package, us in packages}
+        report["top_level_ms"] = {name: round(cum / 1000, 2) for name, _, cum, _ in top_level}
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
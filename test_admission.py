@@ -0,0 +1,125 @@
+"""
+admission control(admission.AdmissionController) 검증 테스트
+
+실행:
+    python -m pytest -q test_admission.py
+"""
+
+import asyncio
+
+import pytest
+
+from admission import AdmissionController, AdmissionRejected
+
+
+async def hold(controller, key, order, release_event):
+    async with controller.admit(key):
+        order.append(key)
+        await release_event.wait()
+
+
+def test_rejects_when_queue_is_full():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=5)
+        gate = asyncio.Event()
+        order = []
+        first = asyncio.create_task(hold(controller, "a", order, gate))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(hold(controller, "a", order, gate))
+        await asyncio.sleep(0)
+        assert controller.in_flight == 1 and controller.queue_depth == 1
+
+        with pytest.raises(AdmissionRejected) as exc:
+            async with controller.admit("b"):
+                pass
+        assert exc.value.status_code == 503 and exc.value.reason == "queue_full"
+        assert exc.value.retry_after_header == "2"
+
+        gate.set()
+        await asyncio.gather(first, second)
+        assert controller.in_flight == 0 and controller.queue_depth == 0
+        assert controller.stats()["admitted"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_queue_wait_timeout_returns_503():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout=0.05)
+        gate = asyncio.Event()
+        holder = asyncio.create_task(hold(controller, "a", [], gate))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as exc:
+            async with controller.admit("b"):
+                pass
+        assert exc.value.status_code == 503 and exc.value.reason == "timeout"
+        assert controller.queue_depth == 0
+        gate.set()
+        await holder
+        assert controller.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_per_client_limit_returns_429():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=10, max_queue_per_client=1)
+        gate = asyncio.Event()
+        tasks = [asyncio.create_task(hold(controller, "bulk", [], gate)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as exc:
+            async with controller.admit("bulk"):
+                pass
+        assert exc.value.status_code == 429
+        # 다른 클라이언트는 여전히 대기열에 들어갈 수 있음
+        other = asyncio.create_task(hold(controller, "other", [], gate))
+        await asyncio.sleep(0)
+        assert controller.queue_depth == 2
+        gate.set()
+        await asyncio.gather(*tasks, other)
+
+    asyncio.run(scenario())
+
+
+def test_round_robin_between_clients():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=10)
+        order = []
+
+        async def job(key, i):
+            async with controller.admit(key):
+                order.append(key)
+                await asyncio.sleep(0)
+
+        first_gate = asyncio.Event()
+        first = asyncio.create_task(hold(controller, "bulk", order, first_gate))
+        await asyncio.sleep(0)
+        tasks = [asyncio.create_task(job("bulk", i)) for i in range(3)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(job("small", 0)))
+        await asyncio.sleep(0)
+        first_gate.set()
+        await asyncio.gather(first, *tasks)
+        # 대량 업로드(bulk) 뒤에 온 small 요청이 bulk 대기열 전체를 기다리지 않음
+        assert order[:3] == ["bulk", "bulk", "small"]
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_is_removed():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=4)
+        gate = asyncio.Event()
+        holder = asyncio.create_task(hold(controller, "a", [], gate))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(hold(controller, "b", [], gate))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert controller.queue_depth == 0
+        gate.set()
+        await holder
+        assert controller.in_flight == 0
+
+    asyncio.run(scenario())
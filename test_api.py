@@ -1,12 +1,20 @@
 """
 FairStay AI API 테스트 스크립트
 모든 엔드포인트를 테스트하고 응답 구조를 검증합니다.
+
+--load 모드: 비동기 HTTP 클라이언트(httpx)로 동시 요청 부하를 걸어
+지연 시간 분포, 에러율, cold/warm 차이를 측정합니다.
 """
 
+import argparse
+import asyncio
+import csv
+import random
 import requests
 import json
 import os
 import sys
+import time
 from io import BytesIO
 from PIL import Image
 import numpy as np
@@ -46,26 +54,27 @@ def print_info(text: str):
     print(f"{YELLOW}ℹ️  {text}{RESET}")
 
 
-def create_test_image(with_pattern: bool = False) -> BytesIO:
+def create_test_image(with_pattern: bool = False, size: int = 512) -> BytesIO:
     """
     테스트용 이미지 생성
     
     Args:
         with_pattern: True면 crack 패턴 유사 이미지, False면 단순 이미지
+        size: 이미지 한 변 크기 (픽셀)
     
     Returns:
         BytesIO: 이미지 바이트 스트림
     """
     if with_pattern:
         # Crack 패턴 유사 이미지 생성 (검은 배경에 흰 선)
-        img_array = np.zeros((512, 512, 3), dtype=np.uint8)
+        img_array = np.zeros((size, size, 3), dtype=np.uint8)
         # 대각선 crack 패턴
-        for i in range(0, 512, 2):
+        for i in range(0, size, 2):
             img_array[i:i+5, i:i+5] = [255, 255, 255]
         img = Image.fromarray(img_array)
     else:
         # 단순 회색 이미지
-        img = Image.new('RGB', (512, 512), color=(128, 128, 128))
+        img = Image.new('RGB', (size, size), color=(128, 128, 128))
     
     img_bytes = BytesIO()
     img.save(img_bytes, format='JPEG')
@@ -241,7 +250,18 @@ def test_get_result_image(file_id: str):
                 with open(output_path, 'wb') as f:
                     f.write(response.content)
                 print_info(f"Saved result image to: {output_path}")
-                
+
+                # 썸네일 변형 (size/quality/format 쿼리)
+                thumb = requests.get(
+                    f"{BASE_URL}/result/{file_id}",
+                    params={"size": 320, "quality": 70, "format": "webp"},
+                    timeout=30,
+                )
+                if thumb.status_code != 200 or thumb.headers.get('Content-Type') != 'image/webp':
+                    print_error(f"Thumbnail request failed: {thumb.status_code} {thumb.headers.get('Content-Type')}")
+                    return False
+                print_success(f"Thumbnail retrieved ({len(thumb.content)} bytes, webp)")
+
                 return True
             else:
                 print_error(f"Expected image content type, got {response.headers.get('Content-Type')}")
@@ -312,6 +332,149 @@ def test_missing_file():
         return False
 
 
+def test_detect_crack_batch():
+    """다중 이미지 탐지 테스트 (POST /detect-crack/batch) - 잘못된 이미지 1장 포함"""
+    print_header("Test 8: Detect Crack Batch (POST /detect-crack/batch)")
+    
+    try:
+        files = [
+            ('files', ('batch_crack.jpg', create_test_image(with_pattern=True), 'image/jpeg')),
+            ('files', ('batch_plain.jpg', create_test_image(with_pattern=False), 'image/jpeg')),
+            ('files', ('batch_fake.jpg', BytesIO(b"This is not an image file"), 'image/jpeg')),
+        ]
+        
+        print_info("Sending POST request with 3 files (1 invalid)...")
+        response = requests.post(
+            f"{BASE_URL}/detect-crack/batch",
+            files=files,
+            timeout=120
+        )
+        
+        print_info(f"Status Code: {response.status_code}")
+        print_info(f"Response: {json.dumps(response.json(), indent=2)}")
+        
+        if response.status_code == 200:
+            data = response.json()
+            items = data.get("results", [])
+            
+            if len(items) != 3:
+                print_error(f"Expected 3 results, got {len(items)}")
+                return False
+            
+            required_fields = ["file_id", "image_url", "has_crack", "confidence", "crack_count", "bounding_boxes"]
+            for item in items[:2]:
+                missing_fields = [field for field in required_fields if field not in item]
+                if missing_fields:
+                    print_error(f"Missing required fields in {item.get('filename')}: {missing_fields}")
+                    return False
+            
+            if "error" not in items[2]:
+                print_error("Invalid image should be reported as a per-item error")
+                return False
+            
+            print_success(f"Batch processed successfully ({data.get('failed_count')} failed as expected)")
+            return True
+        else:
+            print_error(f"Expected status 200, got {response.status_code}")
+            return False
+    
+    except Exception as e:
+        print_error(f"Request failed: {str(e)}")
+        return False
+
+
+def test_async_job():
+    """비동기 작업 테스트 (POST /jobs → GET /jobs/{job_id} polling)"""
+    print_header("Test 9: Async Job (POST /jobs, GET /jobs/{job_id})")
+    
+    try:
+        files = {'file': ('job_crack.jpg', create_test_image(with_pattern=True), 'image/jpeg')}
+        
+        print_info("Sending POST request to /jobs...")
+        response = requests.post(f"{BASE_URL}/jobs", files=files, timeout=30)
+        print_info(f"Status Code: {response.status_code}")
+        
+        if response.status_code != 202:
+            print_error(f"Expected status 202, got {response.status_code}")
+            return False
+        
+        job_id = response.json().get("job_id")
+        print_info(f"Job ID: {job_id}")
+        
+        deadline = time.time() + 120
+        while time.time() < deadline:
+            status = requests.get(f"{BASE_URL}/jobs/{job_id}", timeout=30).json()
+            if status.get("status") in ("done", "failed"):
+                break
+            time.sleep(1)
+        else:
+            print_error("Job did not finish within 120s")
+            return False
+        
+        print_info(f"Response: {json.dumps(status, indent=2)}")
+        if status["status"] != "done":
+            print_error(f"Job failed: {status.get('error')}")
+            return False
+        
+        required_fields = ["file_id", "image_url", "has_crack", "confidence", "crack_count", "bounding_boxes"]
+        missing_fields = [field for field in required_fields if field not in status.get("result", {})]
+        if missing_fields:
+            print_error(f"Missing required fields in job result: {missing_fields}")
+            return False
+        
+        print_success(f"Job completed after {status.get('attempts')} attempt(s)")
+        return True
+    
+    except Exception as e:
+        print_error(f"Request failed: {str(e)}")
+        return False
+
+
+def test_detect_damage():
+    """다중 손상 유형 탐지 테스트 (POST /detect-damage) - 등록된 모든 모델 결과가 유형별로 묶여 오는지"""
+    print_header("Test 10: Detect Damage (POST /detect-damage)")
+    
+    try:
+        models = list(requests.get(f"{BASE_URL}/health", timeout=30).json().get("models", {}).get("models", {}))
+        print_info(f"Registered models: {models}")
+        
+        files = {'file': ('damage.jpg', create_test_image(with_pattern=True), 'image/jpeg')}
+        response = requests.post(f"{BASE_URL}/detect-damage", files=files, timeout=120)
+        print_info(f"Status Code: {response.status_code}")
+        print_info(f"Response: {json.dumps(response.json(), indent=2)}")
+        
+        if response.status_code != 200:
+            print_error(f"Expected status 200, got {response.status_code}")
+            return False
+        
+        data = response.json()
+        required_fields = ["file_id", "image_url", "has_damage", "damage_count", "damage_types", "models"]
+        missing_fields = [field for field in required_fields if field not in data]
+        if missing_fields:
+            print_error(f"Missing required fields: {missing_fields}")
+            return False
+        
+        if sorted(data["damage_types"]) != sorted(models):
+            print_error(f"Expected results for {models}, got {list(data['damage_types'])}")
+            return False
+        
+        unknown = requests.post(
+            f"{BASE_URL}/detect-damage?models=unknown-model",
+            files={'file': ('damage.jpg', create_test_image(), 'image/jpeg')},
+            timeout=30,
+        )
+        if unknown.status_code != 400:
+            print_error(f"Unknown model should return 400, got {unknown.status_code}")
+            return False
+        
+        print_success(f"Damage detected by {len(models)} model(s): {data['damage_count']} region(s)")
+        return True
+    
+    except Exception as e:
+        print_error(f"Request failed: {str(e)}")
+        return False
+
+
 def run_all_tests():
     """모든 테스트 실행"""
     print(f"\n{BOLD}🚀 FairStay AI API Testing Suite{RESET}")
@@ -349,6 +512,15 @@ def run_all_tests():
     # Test 7: Missing file
     results.append(("Missing File", test_missing_file()))
     
+    # Test 8: Batch detection
+    results.append(("Detect Crack Batch", test_detect_crack_batch()))
+    
+    # Test 9: Async job
+    results.append(("Async Job", test_async_job()))
+    
+    # Test 10: Multi-model damage detection
+    results.append(("Detect Damage", test_detect_damage()))
+    
     # 결과 요약
     print_header("Test Results Summary")
     
@@ -369,13 +541,195 @@ def run_all_tests():
         return 1
 
 
-if __name__ == "__main__":
-    # 사용법 출력
-    if len(sys.argv) > 1:
-        if sys.argv[1] in ["-h", "--help"]:
-            print(f"""
-Usage: python test_api.py [SERVER_URL]
+# ---------------------------------------------------------------------------
+# 부하 테스트 모드 (--load)
+# ---------------------------------------------------------------------------
 
+def parse_image_mix(spec: str):
+    """
+    이미지 구성 파싱: 'plain@512,pattern@512,pattern@2048' → [(kind, size), ...]
+    매 요청마다 균등하게 하나를 고름 (같은 항목을 여러 번 쓰면 비중 증가)
+    """
+    mix = []
+    for item in spec.split(","):
+        kind, _, size = item.strip().partition("@")
+        if kind not in ("plain", "pattern"):
+            raise ValueError(f"Unknown image kind '{kind}' (expected plain or pattern)")
+        mix.append((kind, int(size or 512)))
+    return mix
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    return float(np.percentile(np.asarray(values, dtype=np.float64), q))
+
+
+def is_cold_response(headers) -> bool:
+    """서버가 모델을 로딩한 요청이면 Server-Timing 헤더에 cold-start 항목이 포함됨"""
+    return "cold-start" in headers.get("server-timing", "")
+
+
+async def run_load_test(base_url, concurrency, rate, duration, image_mix, timeout, unique=False, endpoint="/detect-crack"):
+    """
+    비동기 부하 생성
+
+    - rate > 0: 초당 rate개 요청을 일정 간격으로 보냄 (open loop, 동시 요청은 concurrency로 제한)
+    - rate = 0: concurrency개 워커가 응답을 받자마자 다음 요청을 보냄 (closed loop)
+    - unique: JPEG 끝에 요청 번호를 덧붙여 서버 결과 캐시를 우회 (디코딩 결과는 동일)
+
+    Returns:
+        요청별 기록 리스트 (dict)
+    """
+    try:
+        import httpx
+    except ImportError:
+        print_error("Load testing requires httpx (pip install httpx)")
+        raise SystemExit(1)
+
+    images = {(kind, size): create_test_image(with_pattern=(kind == "pattern"), size=size).getvalue() for kind, size in image_mix}
+    records = []
+    in_flight = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    test_start = time.perf_counter()
+
+    async def send(client, seq):
+        kind, size = random.choice(image_mix)
+        record = {"seq": seq, "image": f"{kind}@{size}", "status": None, "error": "", "cold": False}
+        data = images[(kind, size)]
+        if unique:
+            data += f"load-{seq}".encode()
+        start = time.perf_counter()
+        record["start_s"] = round(start - test_start, 3)
+        try:
+            response = await client.post(
+                f"{base_url}{endpoint}",
+                files={"file": (f"load_{seq}.jpg", data, "image/jpeg")},
+            )
+            record["status"] = response.status_code
+            record["cold"] = is_cold_response(response.headers)
+            if response.status_code != 200:
+                record["error"] = f"HTTP {response.status_code}"
+        except httpx.HTTPError as e:
+            record["error"] = type(e).__name__
+        record["latency_ms"] = round((time.perf_counter() - start) * 1000.0, 1)
+        records.append(record)
+
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        tasks = []
+        seq = 0
+        if rate > 0:
+            interval = 1.0 / rate
+            while time.perf_counter() - test_start < duration:
+                await in_flight.acquire()
+                task = asyncio.create_task(send(client, seq))
+                task.add_done_callback(lambda _: in_flight.release())
+                tasks.append(task)
+                seq += 1
+                next_at = test_start + seq * interval
+                await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+        else:
+            counter = iter(range(10 ** 9))
+
+            async def worker():
+                while time.perf_counter() - test_start < duration:
+                    await send(client, next(counter))
+
+            tasks = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        await asyncio.gather(*tasks)
+
+    records.sort(key=lambda r: r["seq"])
+    return records
+
+
+def summarize_load(records, elapsed):
+    """전체 / warm / cold 별 요청 수, 에러율, 지연 시간 퍼센타일"""
+    groups = {
+        "all": records,
+        "warm": [r for r in records if not r["cold"]],
+        "cold": [r for r in records if r["cold"]],
+    }
+    summary = {}
+    for name, group in groups.items():
+        ok_latencies = [r["latency_ms"] for r in group if not r["error"]]
+        errors = sum(1 for r in group if r["error"])
+        summary[name] = {
+            "requests": len(group),
+            "errors": errors,
+            "error_rate": errors / len(group) if group else 0.0,
+            "rps": len(group) / elapsed if elapsed > 0 else 0.0,
+            "p50": percentile(ok_latencies, 50),
+            "p95": percentile(ok_latencies, 95),
+            "p99": percentile(ok_latencies, 99),
+            "max": max(ok_latencies) if ok_latencies else None,
+        }
+    return summary
+
+
+def print_load_summary(summary, records):
+    print_header("Load Test Summary")
+    fmt = lambda v: "-" if v is None else f"{v:.1f}"
+    header = f"{'group':<6} {'reqs':>6} {'errors':>7} {'err%':>6} {'req/s':>7} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'max(ms)':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, row in summary.items():
+        if name != "all" and row["requests"] == 0:
+            continue
+        print(
+            f"{name:<6} {row['requests']:>6} {row['errors']:>7} {row['error_rate'] * 100:>6.1f} {row['rps']:>7.2f} "
+            f"{fmt(row['p50']):>9} {fmt(row['p95']):>9} {fmt(row['p99']):>9} {fmt(row['max']):>9}"
+        )
+
+    statuses = {}
+    for r in records:
+        key = r["error"] or str(r["status"])
+        statuses[key] = statuses.get(key, 0) + 1
+    print_info(f"Responses: {', '.join(f'{k}={v}' for k, v in sorted(statuses.items()))}")
+
+
+def write_load_csv(records, path):
+    fields = ["seq", "start_s", "image", "status", "latency_ms", "cold", "error"]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for r in records:
+            writer.writerow({k: r.get(k) for k in fields})
+    print_info(f"Per-request results written to {path}")
+
+
+def run_load_mode(args):
+    """부하 테스트 실행 → 요약 출력 → CSV 저장. 에러율이 기준을 넘으면 1 반환"""
+    image_mix = parse_image_mix(args.mix)
+    print(f"\n{BOLD}🔥 FairStay AI Load Test{RESET}")
+    print(f"{BOLD}Target: {BASE_URL}{RESET}")
+    print_info(
+        f"concurrency={args.concurrency}, rate={args.rate or 'max'} req/s, duration={args.duration}s, "
+        f"mix={', '.join(f'{k}@{s}' for k, s in image_mix)}"
+    )
+
+    start = time.perf_counter()
+    records = asyncio.run(
+        run_load_test(BASE_URL, args.concurrency, args.rate, args.duration, image_mix, args.timeout, unique=args.unique)
+    )
+    elapsed = time.perf_counter() - start
+
+    summary = summarize_load(records, elapsed)
+    print_load_summary(summary, records)
+    if args.csv:
+        write_load_csv(records, args.csv)
+
+    if summary["all"]["error_rate"] > args.max_error_rate:
+        print(f"{RED}{BOLD}⚠️  Error rate {summary['all']['error_rate'] * 100:.1f}% exceeds {args.max_error_rate * 100:.1f}%{RESET}\n")
+        return 1
+    print(f"{GREEN}{BOLD}🎉 Load test finished{RESET}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="FairStay AI API tests and load generator",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
 Examples:
   # Test local server
   python test_api.py
@@ -387,10 +741,31 @@ Examples:
   # Or use environment variable
   export AI_SERVER_URL=https://abc123.lambda-url.ap-northeast-2.on.aws
   python test_api.py
-""")
-            sys.exit(0)
-        else:
-            BASE_URL = sys.argv[1].rstrip('/')
+  
+  # Load test: 50 concurrent requests for 60s, mixed image sizes, CSV export
+  python test_api.py --load --concurrency 50 --duration 60 --mix plain@512,pattern@512,pattern@2048 --unique --csv load.csv
+  
+  # Load test at a fixed arrival rate (10 req/s)
+  python test_api.py --load --rate 10 --duration 30
+""",
+    )
+    parser.add_argument("server_url", nargs="?", help="server URL (default: $AI_SERVER_URL or http://localhost:8000)")
+    parser.add_argument("--load", action="store_true", help="run the async load test instead of the API tests")
+    parser.add_argument("--concurrency", type=int, default=10, help="max in-flight requests")
+    parser.add_argument("--rate", type=float, default=0.0, help="requests per second (0 = as fast as concurrency allows)")
+    parser.add_argument("--duration", type=float, default=30.0, help="test duration in seconds")
+    parser.add_argument("--mix", default="plain@512,pattern@512", help="image mix: kind@size list (kind: plain|pattern)")
+    parser.add_argument("--unique", action="store_true", help="make every upload unique so the server result cache is bypassed")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout in seconds")
+    parser.add_argument("--csv", help="write per-request results to this CSV file")
+    parser.add_argument("--max-error-rate", type=float, default=0.0, help="exit 1 if the load test error rate exceeds this")
+    args = parser.parse_args()
+    
+    if args.server_url:
+        BASE_URL = args.server_url.rstrip('/')
     
-    exit_code = run_all_tests()
+    if args.load:
+        exit_code = run_load_mode(args)
+    else:
+        exit_code = run_all_tests()
     sys.exit(exit_code)
@@ -0,0 +1,196 @@
+"""
+다중 이미지 업로드(archive) / POST /detect-crack/batch 검증 테스트
+
+엔드포인트 테스트는 서버를 띄우지 않고 TestClient + benchmark stub 모델로 실행합니다.
+
+실행:
+    python -m pytest -q test_archive.py
+"""
+
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from archive import is_archive, iter_archive_images
+from benchmark import StubSegModel, synthetic_image
+
+
+def make_zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for name, data in members:
+            if name.endswith("/"):
+                zf.writestr(zipfile.ZipInfo(name), b"")
+            else:
+                zf.writestr(name, data)
+    return buffer.getvalue()
+
+
+def make_tar(members, mode="w:gz"):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode=mode) as tf:
+        for name, data in members:
+            info = tarfile.TarInfo(name)
+            if name.endswith("/"):
+                info.type = tarfile.DIRTYPE
+                tf.addfile(info)
+            else:
+                info.size = len(data)
+                tf.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+MEMBERS = [
+    ("rooms/", b""),
+    ("rooms/101/wall.jpg", b"a"),
+    ("rooms/101/.DS_Store", b"junk"),
+    ("__MACOSX/rooms/101/._wall.jpg", b"junk"),
+    ("rooms/102/ceiling.jpg", b"b"),
+    ("floor.png", b"c"),
+]
+
+
+@pytest.mark.parametrize("build", [make_zip, make_tar, lambda m: make_tar(m, "w")])
+def test_iter_archive_images_skips_dirs_and_metadata(build):
+    data = build(MEMBERS)
+    assert list(iter_archive_images(io.BytesIO(data), max_files=10)) == [
+        ("rooms/101/wall.jpg", b"a", None), ("rooms/102/ceiling.jpg", b"b", None), ("floor.png", b"c", None),
+    ]
+    assert [name for name, _, _ in iter_archive_images(io.BytesIO(data), max_files=2)] == [
+        "rooms/101/wall.jpg", "rooms/102/ceiling.jpg",
+    ]
+
+
+def make_zip_deflated(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members:
+            zf.writestr(name, data)
+    return buffer.getvalue()
+
+
+def corrupt_member(data, name, length=64):
+    """zip 멤버 하나의 압축 데이터 앞부분을 덮어씀 (중앙 디렉토리는 정상)"""
+    data = bytearray(data)
+    with zipfile.ZipFile(io.BytesIO(bytes(data))) as zf:
+        info = zf.getinfo(name)
+    start = info.header_offset + 30 + len(info.filename) + len(info.extra)
+    length = min(length, info.compress_size)
+    data[start:start + length] = b"\xff" * length
+    return bytes(data)
+
+
+def test_iter_archive_images_reports_corrupt_member_and_continues():
+    data = corrupt_member(make_zip_deflated([("a.jpg", b"a" * 1000), ("b.jpg", b"b" * 1000), ("c.jpg", b"c" * 1000)]),
+                          "b.jpg")
+    items = list(iter_archive_images(io.BytesIO(data), max_files=10))
+    assert [(name, data is not None) for name, data, _ in items] == [("a.jpg", True), ("b.jpg", False), ("c.jpg", True)]
+    assert items[1][2].startswith("Corrupt archive member")
+
+
+@pytest.mark.parametrize("build", [make_zip_deflated, make_tar])
+def test_iter_archive_images_skips_oversized_member_without_reading_it(build):
+    # 잘 압축되는 큰 멤버 (zip bomb 흉내): 헤더 크기로 거르고 나머지는 계속 읽음
+    data = build([("bomb.jpg", b"\0" * (4 * 1024 * 1024)), ("ok.jpg", b"ok")])
+    items = list(iter_archive_images(io.BytesIO(data), max_files=10, max_bytes=1024 * 1024))
+    assert items[0][0] == "bomb.jpg" and items[0][1] is None and "1MB per-file limit" in items[0][2]
+    assert items[1] == ("ok.jpg", b"ok", None)
+
+
+def test_iter_archive_images_rejects_corrupt_archive():
+    with pytest.raises(tarfile.TarError):
+        list(iter_archive_images(io.BytesIO(b"this is not an archive"), max_files=10))
+
+
+def test_is_archive():
+    assert is_archive("photos.ZIP", None) and is_archive("photos.tar.gz", "application/octet-stream")
+    assert is_archive("upload", "application/zip")
+    assert not is_archive("wall.jpg", "image/jpeg")
+
+
+@pytest.fixture(scope="module")
+def client():
+    main = pytest.importorskip("main")
+    from fastapi.testclient import TestClient
+
+    main.inference_executor.set_model(StubSegModel(cracks_per_image=1))
+    with TestClient(main.app) as client:
+        client.main = main
+        yield client
+
+
+def image(seed):
+    return synthetic_image(320, 240, 1, seed=seed)
+
+
+def post_batch(client, files):
+    response = client.post("/detect-crack/batch", files=files)
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.parametrize("filename,build", [("photos.zip", make_zip), ("photos.tar.gz", make_tar)])
+def test_batch_extracts_archive_with_nested_paths(client, filename, build):
+    data = build([("room1/", b""), ("room1/wall.jpg", image(1)), ("room1/bath/tile.jpg", image(2)),
+                  ("__MACOSX/room1/._wall.jpg", b"junk")])
+    body = post_batch(client, [("archive", (filename, data, "application/octet-stream"))])
+
+    assert body["count"] == 2 and body["failed_count"] == 0
+    assert [r["filename"] for r in body["results"]] == ["room1/wall.jpg", "room1/bath/tile.jpg"]
+    assert all(r["has_crack"] and r["image_url"] == f"/result/{r['file_id']}" for r in body["results"])
+
+
+def test_batch_reports_invalid_image_next_to_successes(client):
+    archive = make_zip([("a.jpg", image(3)), ("broken.jpg", b"not an image"), ("b.jpg", image(4))])
+    body = post_batch(client, [
+        ("files", ("single.jpg", image(5), "image/jpeg")),
+        ("files", ("photos.zip", archive, "application/zip")),
+    ])
+
+    assert body["count"] == 4 and body["failed_count"] == 1
+    assert [r["filename"] for r in body["results"]] == ["single.jpg", "a.jpg", "broken.jpg", "b.jpg"]
+    assert body["results"][2] == {"filename": "broken.jpg", "error": "Invalid image file"}
+    assert all("file_id" in r for i, r in enumerate(body["results"]) if i != 2)
+
+
+def test_batch_reports_corrupt_archive(client):
+    body = post_batch(client, [
+        ("files", ("ok.jpg", image(6), "image/jpeg")),
+        ("files", ("photos.zip", b"PK\x03\x04 truncated", "application/zip")),
+    ])
+
+    assert body["count"] == 2 and body["failed_count"] == 1
+    assert body["results"][1] == {"filename": "photos.zip", "error": "Invalid archive file"}
+
+
+def test_batch_reports_corrupt_and_oversized_members_per_item(client, monkeypatch):
+    monkeypatch.setattr(client.main, "BATCH_MAX_FILE_MB", 0.5)
+    data = make_zip_deflated([("a.jpg", image(7)), ("b.jpg", image(8)), ("big.jpg", b"\0" * 1024 * 1024),
+                              ("c.jpg", image(9))])
+    body = post_batch(client, [("archive", ("photos.zip", corrupt_member(data, "b.jpg"), "application/zip"))])
+
+    assert body["count"] == 4 and body["failed_count"] == 2
+    assert [r["filename"] for r in body["results"]] == ["a.jpg", "b.jpg", "big.jpg", "c.jpg"]
+    assert body["results"][1]["error"].startswith("Corrupt archive member")
+    assert "per-file limit" in body["results"][2]["error"]
+    assert "file_id" in body["results"][0] and "file_id" in body["results"][3]
+
+
+def test_batch_stops_at_file_limit(client, monkeypatch):
+    monkeypatch.setattr(client.main, "BATCH_MAX_FILES", 3)
+    archive = make_tar([(f"img{i}.jpg", image(10 + i)) for i in range(4)])
+    body = post_batch(client, [
+        ("files", ("first.jpg", image(9), "image/jpeg")),
+        ("files", ("photos.tar.gz", archive, "application/gzip")),
+        ("files", ("late.jpg", image(20), "image/jpeg")),
+    ])
+
+    assert body["count"] == 3
+    assert [r["filename"] for r in body["results"]] == ["first.jpg", "img0.jpg", "img1.jpg"]
+
+
+def test_batch_without_files_is_rejected(client):
+    response = client.post("/detect-crack/batch", data={"note": "empty"})
+    assert response.status_code == 400
@@ -0,0 +1,141 @@
+"""
+추론 백엔드 선택 / export 캐시(backends) 검증 테스트
+
+실행:
+    python -m pytest -q test_backends.py
+"""
+
+import os
+
+import pytest
+
+import backends
+from backends import check_backend, export_cache_dir, export_model, resolve_model_path
+
+
+class FakeYOLO:
+    """export()가 가중치 옆에 .onnx 파일을 만드는 가짜 Ultralytics YOLO"""
+
+    exports = []
+    fail = False
+
+    def __init__(self, path, task=None):
+        self.path = path
+
+    def export(self, format, imgsz, dynamic, **kwargs):
+        FakeYOLO.exports.append((self.path, format, imgsz, dynamic))
+        if FakeYOLO.fail:
+            raise RuntimeError("export crashed")
+        output = os.path.splitext(self.path)[0] + ".onnx"
+        with open(output, "wb") as f:
+            f.write(b"onnx")
+        return output
+
+
+@pytest.fixture
+def fake_yolo(monkeypatch):
+    FakeYOLO.exports = []
+    FakeYOLO.fail = False
+    monkeypatch.setattr("ultralytics.YOLO", FakeYOLO)
+    return FakeYOLO
+
+
+@pytest.fixture
+def weights(tmp_path):
+    path = tmp_path / "code" / "best.pt"
+    path.parent.mkdir()
+    path.write_bytes(b"weights-v1")
+    return str(path)
+
+
+def work_dirs(export_dir):
+    return [name for name in os.listdir(export_dir) if name.startswith("export-")]
+
+
+def test_check_backend(monkeypatch):
+    check_backend("pytorch")
+    with pytest.raises(ValueError, match="Unknown inference backend"):
+        check_backend("tensorrt")
+
+    monkeypatch.setattr(backends.importlib.util, "find_spec", lambda name: None)
+    check_backend("pytorch")
+    with pytest.raises(RuntimeError, match="requires the 'openvino' package"):
+        check_backend("openvino")
+
+
+def test_resolve_model_path_passthrough(monkeypatch, tmp_path):
+    monkeypatch.setattr(backends.importlib.util, "find_spec", lambda name: object())
+    monkeypatch.setattr(backends, "export_model", lambda *args, **kwargs: pytest.fail("should not export"))
+
+    assert resolve_model_path("best.pt", "pytorch", str(tmp_path)) == "best.pt"
+    # 이미 export된 파일은 그대로 사용
+    assert resolve_model_path("/opt/best.onnx", "onnx", str(tmp_path)) == "/opt/best.onnx"
+    assert resolve_model_path("/opt/best_openvino_model", "openvino", str(tmp_path)) == "/opt/best_openvino_model"
+    with pytest.raises(ValueError):
+        resolve_model_path("best.pt", "pytorch", str(tmp_path), precision="int8_dynamic")
+
+
+def test_export_cache_key(weights, tmp_path):
+    export_dir = str(tmp_path / "exports")
+    key = export_cache_dir(weights, "onnx", export_dir, 640)
+    assert os.path.basename(key) == f"best-{backends.weights_digest(weights)}-onnx-640"
+
+    assert export_cache_dir(weights, "openvino", export_dir, 640) != key
+    assert export_cache_dir(weights, "onnx", export_dir, 320) != key
+    with open(weights, "wb") as f:
+        f.write(b"weights-v2")
+    assert export_cache_dir(weights, "onnx", export_dir, 640) != key
+
+
+def test_export_moves_result_atomically_and_hits_cache(monkeypatch, fake_yolo, weights, tmp_path):
+    export_dir = str(tmp_path / "exports")
+    replaced = []
+    real_replace = os.replace
+
+    def recording_replace(src, dst):
+        replaced.append((src, dst))
+        real_replace(src, dst)
+
+    monkeypatch.setattr(backends.os, "replace", recording_replace)
+
+    artifact = export_model(weights, "onnx", export_dir, imgsz=320)
+    cache_dir = export_cache_dir(weights, "onnx", export_dir, 320)
+    assert artifact == os.path.join(cache_dir, "best.onnx") and os.path.exists(artifact)
+
+    # 임시 디렉토리에서 export → 캐시 디렉토리로 한 번에 이동 (read-only 코드 디렉토리는 건드리지 않음)
+    (src, dst), = replaced
+    assert os.path.dirname(src) == export_dir and os.path.basename(src).startswith("export-") and dst == cache_dir
+    assert fake_yolo.exports == [(os.path.join(src, "best.pt"), "onnx", 320, True)]
+    assert os.listdir(cache_dir) == ["best.onnx"]
+    assert os.listdir(os.path.dirname(weights)) == ["best.pt"]
+
+    # 두 번째 호출은 캐시 사용
+    assert export_model(weights, "onnx", export_dir, imgsz=320) == artifact
+    assert len(fake_yolo.exports) == 1 and work_dirs(export_dir) == []
+
+
+def test_export_failure_cleans_up_temp_dir(fake_yolo, weights, tmp_path):
+    export_dir = str(tmp_path / "exports")
+    fake_yolo.fail = True
+
+    with pytest.raises(RuntimeError, match="export crashed"):
+        export_model(weights, "onnx", export_dir)
+
+    assert os.listdir(export_dir) == []
+
+
+def test_export_race_uses_other_process_result(monkeypatch, fake_yolo, weights, tmp_path):
+    export_dir = str(tmp_path / "exports")
+    cache_dir = export_cache_dir(weights, "onnx", export_dir, 640)
+
+    def lose_race(src, dst):
+        # 다른 프로세스가 먼저 같은 캐시 디렉토리를 만든 경우
+        os.makedirs(dst)
+        with open(os.path.join(dst, "best.onnx"), "wb") as f:
+            f.write(b"other")
+        raise OSError("Directory not empty")
+
+    monkeypatch.setattr(backends.os, "replace", lose_race)
+
+    assert export_model(weights, "onnx", export_dir) == os.path.join(cache_dir, "best.onnx")
+    assert work_dirs(export_dir) == []
@@ -0,0 +1,138 @@
+"""
+동적 마이크로 배칭 스케줄러(batching.BatchScheduler) 검증 테스트
+
+실행:
+    python -m pytest -q test_batching.py
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from batching import BatchScheduler
+from inference import InferenceExecutor
+
+
+@pytest.fixture
+def executor():
+    executor = InferenceExecutor(lambda: None)
+    yield executor
+    executor.shutdown()
+
+
+def make_scheduler(executor, predict_fn=None, **kwargs):
+    calls = []
+
+    def default_predict(images):
+        calls.append(list(images))
+        return [f"result-{image}" for image in images]
+
+    return BatchScheduler(executor, predict_fn or default_predict, **kwargs), calls
+
+
+def test_idle_request_runs_immediately_as_batch_of_one(executor):
+    scheduler, calls = make_scheduler(executor, max_batch_size=8, max_wait_ms=1000)
+
+    start = time.perf_counter()
+    result, timing = asyncio.run(scheduler.submit("a"))
+
+    assert result == "result-a" and calls == [["a"]]
+    assert timing.batch_size == 1
+    assert time.perf_counter() - start < 0.5 and timing.queue_wait < 0.5
+
+
+async def warm_up(scheduler):
+    """직전 도착이 있어야 다음 요청이 idle fast path를 타지 않고 배치를 기다림"""
+    await scheduler.submit("warm-up")
+
+
+def test_flushes_as_soon_as_batch_is_full(executor):
+    scheduler, calls = make_scheduler(executor, max_batch_size=4, max_wait_ms=5000)
+
+    async def scenario():
+        await warm_up(scheduler)
+        start = time.perf_counter()
+        outputs = await asyncio.gather(*(scheduler.submit(i) for i in range(4)))
+        return outputs, time.perf_counter() - start
+
+    outputs, elapsed = asyncio.run(scenario())
+
+    assert elapsed < 1.0
+    assert calls[1:] == [[0, 1, 2, 3]]
+    assert [result for result, _ in outputs] == [f"result-{i}" for i in range(4)]
+    assert [timing.batch_size for _, timing in outputs] == [4, 4, 4, 4]
+
+
+def test_flushes_partial_batch_after_max_wait(executor):
+    scheduler, calls = make_scheduler(executor, max_batch_size=8, max_wait_ms=50)
+
+    async def scenario():
+        await warm_up(scheduler)
+        start = time.perf_counter()
+        outputs = await asyncio.gather(scheduler.submit("a"), scheduler.submit("b"))
+        return outputs, time.perf_counter() - start
+
+    outputs, elapsed = asyncio.run(scenario())
+
+    assert 0.04 <= elapsed < 1.0
+    assert calls[1:] == [["a", "b"]]
+    assert [timing.batch_size for _, timing in outputs] == [2, 2]
+
+
+def test_exception_is_fanned_out_to_every_request_in_batch(executor):
+    def failing_predict(images):
+        raise RuntimeError("model exploded")
+
+    scheduler, _ = make_scheduler(executor, failing_predict, max_batch_size=3, max_wait_ms=5000)
+
+    async def scenario():
+        return await asyncio.gather(*(scheduler.submit(i) for i in range(3)), return_exceptions=True)
+
+    outputs = asyncio.run(scenario())
+
+    assert len(outputs) == 3
+    assert all(isinstance(e, RuntimeError) and str(e) == "model exploded" for e in outputs)
+    assert scheduler.queue_depth == 0
+
+
+def test_missing_results_fail_remaining_requests_instead_of_hanging(executor):
+    def short_predict(images):
+        return [f"result-{image}" for image in images[:-1]]
+
+    scheduler, _ = make_scheduler(executor, short_predict, max_batch_size=3, max_wait_ms=5000)
+
+    async def scenario():
+        submits = asyncio.gather(*(scheduler.submit(i) for i in range(3)), return_exceptions=True)
+        return await asyncio.wait_for(submits, timeout=5)
+
+    outputs = asyncio.run(scenario())
+
+    assert [result for result, _ in outputs[:2]] == ["result-0", "result-1"]
+    assert isinstance(outputs[2], RuntimeError)
+
+
+def test_records_per_request_queue_wait_and_batch_size(executor):
+    def slow_predict(images):
+        time.sleep(0.02)
+        return list(images)
+
+    scheduler, _ = make_scheduler(executor, slow_predict, max_batch_size=2, max_wait_ms=5000)
+
+    async def scenario():
+        await warm_up(scheduler)
+        first = asyncio.ensure_future(scheduler.submit("a"))
+        await asyncio.sleep(0.03)
+        second = await scheduler.submit("b")
+        return await first, second
+
+    (_, first), (_, second) = asyncio.run(scenario())
+
+    # a는 b가 도착해서 배치가 찰 때까지 기다렸고, b는 바로 실행
+    assert first.batch_size == second.batch_size == 2
+    assert first.queue_wait >= 0.025 and second.queue_wait < first.queue_wait
+    assert first.inference >= 0.02 and first.inference == second.inference
+
+    stats = scheduler.stats()
+    assert stats["batches"] == 2 and stats["requests"] == 3
+    assert stats["max_observed_batch_size"] == 2
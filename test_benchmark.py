@@ -0,0 +1,47 @@
+"""
+벤치마크 도구(benchmark) 검증 테스트 - stub 모델 결정성 / 기준 비교
+
+실행:
+    python -m pytest -q test_benchmark.py
+"""
+
+import numpy as np
+
+from benchmark import StubSegModel, compare_to_baseline, parse_server_timing, synthetic_image
+from postprocess import masks_to_detections
+
+
+def test_stub_model_is_deterministic_and_postprocessable():
+    img = np.zeros((3024, 4032, 3), dtype=np.uint8)
+    model = StubSegModel(cracks_per_image=3, imgsz=640)
+    first, second = model([img, img])
+    assert first.masks.data.numpy().shape == (3, 480, 640)
+    assert np.array_equal(first.masks.data.numpy(), second.masks.data.numpy())
+
+    masks = first.masks.data.cpu().numpy()
+    detections = masks_to_detections(masks, first.boxes.conf.cpu().numpy(), 4032, 3024)
+    assert len(detections) == 3
+    assert all(0 <= d["x"] < 4032 and d["width"] > 0 for d in detections)
+
+
+def test_stub_model_without_cracks_returns_no_masks():
+    (result,) = StubSegModel(cracks_per_image=0)(np.zeros((480, 640, 3), dtype=np.uint8))
+    assert result.masks is None
+
+
+def test_synthetic_image_is_reproducible():
+    assert synthetic_image(320, 240, 2, seed=1) == synthetic_image(320, 240, 2, seed=1)
+    assert synthetic_image(320, 240, 2, seed=1) != synthetic_image(320, 240, 2, seed=2)
+
+
+def test_parse_server_timing():
+    header = 'decode;dur=12.5, cold-start;desc="model loaded by this request", total;dur=100.0'
+    assert parse_server_timing(header) == {"decode": 12.5, "total": 100.0}
+
+
+def test_compare_to_baseline_flags_regressions():
+    baseline = {"scenarios": {"a": {"latency_ms": {"p95": 100.0}}, "b": {"latency_ms": {"p95": 100.0}}}}
+    report = {"scenarios": {"a": {"latency_ms": {"p95": 110.0}}, "b": {"latency_ms": {"p95": 150.0}}, "c": {"latency_ms": {"p95": 1.0}}}}
+    comparison, regressions = compare_to_baseline(report, baseline, max_regression=0.2)
+    assert set(comparison) == {"a", "b"}
+    assert len(regressions) == 1 and regressions[0].startswith("b:")
@@ -0,0 +1,107 @@
+"""
+체크인 ↔ 체크아웃 비교(compare) 검증 테스트
+
+실행:
+    python -m pytest -q test_compare.py
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from compare import GROWN, NEW, UNCHANGED, align, compare_cracks, extract_features, scale_homography
+from mask_encoding import rle_encode
+from postprocess import masks_to_detections
+from reference_index import Reference
+
+W, H = 640, 480
+
+
+def _scene(seed=0):
+    """특징점이 충분한 합성 실내 사진 (색이 다른 사각형들)"""
+    rng = np.random.default_rng(seed)
+    img = np.full((H, W, 3), 190, dtype=np.uint8)
+    for _ in range(150):
+        x, y = (int(v) for v in rng.integers(0, [W, H]))
+        w, h = (int(v) for v in rng.integers(8, 45, 2))
+        cv2.rectangle(img, (x, y), (x + w, y + h), tuple(int(c) for c in rng.integers(0, 256, 3)), -1)
+    return img
+
+
+def _line_mask(p0, p1, thickness=3):
+    mask = np.zeros((H, W), dtype=np.float32)
+    cv2.line(mask, p0, p1, 1.0, thickness)
+    return mask
+
+
+def _reference_with(masks, keypoints=None, descriptors=None):
+    masks = np.stack(masks)
+    detections = masks_to_detections(masks, [0.9] * len(masks), W, H)
+    cracks = [
+        {**{key: det[key] for key in ("x", "y", "width", "height", "area", "confidence")}, "rle": rle}
+        for det, rle in zip(detections, rle_encode(masks > 0.5))
+    ]
+    if keypoints is None:
+        keypoints, descriptors = np.zeros((0, 2), np.float32), np.zeros((0, 32), np.uint8)
+    return Reference(W, H, keypoints, descriptors, cracks)
+
+
+def test_align_recovers_camera_shift():
+    checkin = _scene()
+    shift = np.array([[0.96, 0.02, 25.0], [-0.02, 0.97, 14.0], [2e-5, 0.0, 1.0]])
+    checkout = cv2.warpPerspective(checkin, shift, (W, H))
+
+    reference = Reference(W, H, *extract_features(checkin))
+    alignment = align(*extract_features(checkout), (W, H), reference)
+    assert alignment.aligned and alignment.inliers >= 50
+
+    # 체크아웃 → 체크인 변환이므로 shift의 역변환과 같아야 함
+    point = np.array([[[320.0, 240.0]]], dtype=np.float32)
+    moved = cv2.perspectiveTransform(point, shift)
+    back = cv2.perspectiveTransform(moved, alignment.homography)
+    assert np.abs(back - point).max() < 2.0
+
+
+def test_align_falls_back_to_scaling_for_unrelated_photos():
+    reference = Reference(W * 2, H * 2, *extract_features(_scene(0)))
+    alignment = align(*extract_features(_scene(1)), (W, H), reference)
+    assert not alignment.aligned
+    assert np.allclose(alignment.homography, scale_homography((W, H), (W * 2, H * 2)))
+
+
+def test_cracks_are_classified_as_new_grown_unchanged_and_missing():
+    old_a = _line_mask((50, 50), (200, 60))
+    old_b = _line_mask((300, 300), (360, 300))
+    repaired = _line_mask((500, 80), (600, 120))
+    reference = _reference_with([old_a, old_b, repaired])
+
+    # 체크아웃 사진은 카메라가 (10, 5)만큼 움직인 상태: 체크아웃 좌표 = 체크인 좌표 - (10, 5)
+    move = np.array([[1.0, 0.0, 10.0], [0.0, 1.0, 5.0], [0.0, 0.0, 1.0]])
+    masks = np.stack([
+        _line_mask((40, 45), (190, 55)),      # old_a 그대로
+        _line_mask((290, 295), (450, 295)),   # old_b가 길어짐
+        _line_mask((100, 400), (200, 420)),   # 새 crack
+    ])
+    detections = masks_to_detections(masks, [0.8, 0.7, 0.6], W, H)
+
+    result = compare_cracks(masks, detections, (W, H), reference, move)
+    assert [c["reference_cracks"] for c in result[UNCHANGED]] == [[0]]
+    assert len(result[GROWN]) == 1 and result[GROWN][0]["reference_cracks"] == [1]
+    assert result[GROWN][0]["growth"] > 1.5
+    assert len(result[NEW]) == 1 and result[NEW][0]["overlap"] == 0.0
+    assert [c["reference_crack"] for c in result["missing"]] == [2]
+
+    # 체크아웃 사진에 crack이 없으면 참조 crack은 모두 missing, 화면 밖 참조는 out_of_view
+    away = np.array([[1.0, 0.0, 2000.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+    assert compare_cracks(None, [], (W, H), reference, away)["out_of_view"] == 3
+    assert len(compare_cracks(None, [], (W, H), reference, np.eye(3))["missing"]) == 3
+
+
+@pytest.mark.parametrize("tolerance", [0.005, 0.02])
+def test_small_misalignment_within_tolerance_is_unchanged(tolerance):
+    reference = _reference_with([_line_mask((100, 100), (300, 200))])
+    nudge = np.array([[1.0, 0.0, 2.0], [0.0, 1.0, 2.0], [0.0, 0.0, 1.0]])
+    masks = _line_mask((98, 98), (298, 198))[None]
+    detections = masks_to_detections(masks, [0.9], W, H)
+    result = compare_cracks(masks, detections, (W, H), reference, nudge, tolerance=tolerance)
+    assert len(result[UNCHANGED]) == 1 and not result[NEW] and not result["missing"]
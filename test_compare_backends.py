@@ -0,0 +1,78 @@
+"""
+백엔드 비교 스크립트(compare_backends) 매칭 / 일치도 계산 검증 테스트
+
+실행:
+    python -m pytest -q test_compare_backends.py
+"""
+
+import numpy as np
+import pytest
+
+from compare_backends import agreement, bbox_iou, match_detections
+
+
+def box(x, y, w, h, confidence=0.9, index=0):
+    return {"index": index, "x": x, "y": y, "width": w, "height": h, "confidence": confidence}
+
+
+def test_bbox_iou():
+    assert bbox_iou(box(0, 0, 10, 10), box(0, 0, 10, 10)) == 1.0
+    assert bbox_iou(box(0, 0, 10, 10), box(5, 0, 10, 10)) == pytest.approx(50 / 150)
+    assert bbox_iou(box(0, 0, 10, 10), box(10, 0, 10, 10)) == 0.0
+    # 폭/높이 0인 bbox는 완전히 같을 때만 일치
+    assert bbox_iou(box(3, 3, 0, 0), box(3, 3, 0, 0)) == 1.0
+    assert bbox_iou(box(3, 3, 0, 0), box(4, 3, 0, 0)) == 0.0
+
+
+def test_match_detections_is_greedy_by_confidence():
+    reference = [box(0, 0, 10, 10, confidence=0.5), box(2, 0, 10, 10, confidence=0.9)]
+    candidate = [box(1, 0, 10, 10)]
+    # 신뢰도가 높은 기준 탐지가 먼저 후보를 가져감
+    assert [(ri, ci) for ri, ci, _ in match_detections(reference, candidate)] == [(1, 0)]
+
+
+def test_match_detections_threshold_boundary():
+    reference = [box(0, 0, 10, 10)]
+    candidate = [box(5, 0, 10, 10)]     # IoU = 1/3
+    iou = bbox_iou(reference[0], candidate[0])
+    assert match_detections(reference, candidate, iou_threshold=iou) == [(0, 0, iou)]
+    assert match_detections(reference, candidate, iou_threshold=iou + 1e-9) == []
+
+
+def test_match_detections_empty_inputs():
+    assert match_detections([], [box(0, 0, 10, 10)]) == []
+    assert match_detections([box(0, 0, 10, 10)], []) == []
+
+
+def masks_for(*detections, shape=(32, 32)):
+    masks = np.zeros((len(detections), *shape), dtype=bool)
+    for i, det in enumerate(detections):
+        masks[i, det["y"]:det["y"] + det["height"], det["x"]:det["x"] + det["width"]] = True
+    return masks
+
+
+def test_agreement_counts_matches_across_images():
+    image_a = [box(0, 0, 10, 10, index=0), box(20, 20, 8, 8, index=1)]
+    image_b = [box(4, 4, 10, 10, index=0)]
+    reference = [(image_a, masks_for(*image_a)), (image_b, masks_for(*image_b))]
+    candidate = [(image_a[:1], masks_for(image_a[0])), (image_b + [box(20, 0, 5, 5, index=1)],
+                                                          masks_for(image_b[0], box(20, 0, 5, 5)))]
+
+    result = agreement(reference, candidate)
+    assert (result["reference_detections"], result["candidate_detections"], result["matched"]) == (3, 3, 2)
+    assert result["recall"] == result["precision"] == result["f1"] == round(2 / 3, 4)
+    assert result["mean_bbox_iou"] == result["mean_mask_iou"] == 1.0
+
+
+def test_agreement_empty_reference_and_no_match():
+    empty = ([], np.zeros((0, 32, 32), dtype=bool))
+    assert agreement([empty], [empty]) == {
+        "reference_detections": 0, "candidate_detections": 0, "matched": 0,
+        "recall": 1.0, "precision": 1.0, "f1": 1.0, "mean_bbox_iou": None, "mean_mask_iou": None,
+    }
+
+    det = box(0, 0, 10, 10)
+    other = box(20, 20, 10, 10)
+    result = agreement([([det], masks_for(det))], [([other], masks_for(other))])
+    assert (result["matched"], result["recall"], result["precision"], result["f1"]) == (0, 0.0, 0.0, 0.0)
+    assert result["mean_mask_iou"] is None
@@ -0,0 +1,96 @@
+"""
+CPU 할당량 감지 / 스레드 설정(cpu_tuning) 검증 테스트
+
+실행:
+    python -m pytest -q test_cpu_tuning.py
+"""
+
+import json
+
+import pytest
+
+from cpu_tuning import (
+    CpuQuota,
+    ThreadSettings,
+    best_setting,
+    candidate_settings,
+    cgroup_cpu_limit,
+    detect_cpu_quota,
+    lambda_cpu_limit,
+    resolve_thread_settings,
+)
+
+
+def _cgroup_v2(tmp_path, value):
+    (tmp_path / "cpu.max").write_text(value + "\n")
+    return str(tmp_path)
+
+
+def _cgroup_v1(tmp_path, quota, period=100000):
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text(f"{quota}\n")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text(f"{period}\n")
+    return str(tmp_path)
+
+
+def test_cgroup_limits_v1_and_v2(tmp_path):
+    assert cgroup_cpu_limit(_cgroup_v2(tmp_path, "150000 100000")) == 1.5
+    assert cgroup_cpu_limit(_cgroup_v2(tmp_path, "max 100000")) is None
+    v1 = tmp_path / "v1"
+    v1.mkdir()
+    assert cgroup_cpu_limit(_cgroup_v1(v1, 200000)) == 2.0
+    unlimited = tmp_path / "unlimited"
+    unlimited.mkdir()
+    assert cgroup_cpu_limit(_cgroup_v1(unlimited, -1)) is None
+    assert cgroup_cpu_limit(str(tmp_path / "missing")) is None
+
+
+def test_lambda_memory_maps_to_vcpus():
+    assert lambda_cpu_limit({}) is None
+    assert lambda_cpu_limit({"AWS_LAMBDA_FUNCTION_MEMORY_SIZE": "3008"}) == pytest.approx(1.70, abs=0.01)
+    # 최대 메모리(10GB)는 6 vCPU
+    assert round(lambda_cpu_limit({"AWS_LAMBDA_FUNCTION_MEMORY_SIZE": "10240"})) == 6
+
+
+def test_smallest_limit_wins(tmp_path, monkeypatch):
+    monkeypatch.setattr("cpu_tuning.affinity_cpus", lambda: 16)
+    quota = detect_cpu_quota(_cgroup_v2(tmp_path, "400000 100000"), {"AWS_LAMBDA_FUNCTION_MEMORY_SIZE": "3008"})
+    assert (quota.source, quota.threads) == ("lambda", 2)
+    assert detect_cpu_quota(str(tmp_path), {}).source == "cgroup"
+    assert detect_cpu_quota(str(tmp_path / "none"), {}).threads == 16
+
+
+def test_tuning_file_and_env_overrides(tmp_path, monkeypatch):
+    monkeypatch.setattr("cpu_tuning.affinity_cpus", lambda: 4)
+    cgroup = str(tmp_path / "none")
+    path = tmp_path / "tuning.json"
+
+    _, settings = resolve_thread_settings(str(path), {}, cgroup)
+    assert (settings.torch_threads, settings.torch_interop_threads, settings.source) == (4, 1, "auto")
+
+    path.write_text(json.dumps({"threads": 4, "settings": {"torch_threads": 3, "torch_interop_threads": 2, "cv2_threads": 1}}))
+    _, settings = resolve_thread_settings(str(path), {}, cgroup)
+    assert (settings.torch_threads, settings.cv2_threads, settings.source) == (3, 1, "tuned")
+
+    # 환경 변수는 항목별로 튜닝 파일보다 우선
+    _, settings = resolve_thread_settings(str(path), {"CV2_NUM_THREADS": "2"}, cgroup)
+    assert (settings.torch_threads, settings.cv2_threads, settings.source) == (3, 2, "env")
+
+    # 다른 할당량(Lambda 메모리 변경 등)에서 튜닝한 파일은 무시
+    _, settings = resolve_thread_settings(str(path), {"AWS_LAMBDA_FUNCTION_MEMORY_SIZE": "1769"}, cgroup)
+    assert (settings.torch_threads, settings.source) == (1, "auto")
+
+
+def test_candidates_stay_within_quota_and_best_is_picked():
+    candidates = candidate_settings(CpuQuota(cpus=4, threads=4, source="cgroup", host_cpus=64))
+    assert max(c.torch_threads for c in candidates) == 4 and {c.torch_interop_threads for c in candidates} == {1, 2}
+    assert len(candidate_settings(CpuQuota(cpus=1, threads=1, source="lambda", host_cpus=2))) == 1
+
+    measurements = [
+        {"torch_threads": 4, "latency_ms": 120.0, "throughput_ms_per_image": 80.0},
+        {"torch_threads": 2, "latency_ms": 150.0, "throughput_ms_per_image": 60.0},
+        {"torch_threads": 1, "latency_ms": None, "throughput_ms_per_image": None},
+    ]
+    assert best_setting(measurements, "latency")["torch_threads"] == 4
+    assert best_setting(measurements, "throughput")["torch_threads"] == 2
+    assert ThreadSettings(4, 1, 4).split(3).torch_threads == 1
@@ -0,0 +1,76 @@
+"""
+축소 디코딩(decode.decode_upload) 검증 테스트
+
+실행:
+    python -m pytest -q test_decode.py
+"""
+
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from decode import choose_reduction, decode_upload, read_jpeg_header
+
+
+def make_jpeg(width, height, orientation=None) -> bytes:
+    img = Image.fromarray(np.random.randint(0, 255, (height, width, 3), dtype=np.uint8))
+    buf = BytesIO()
+    if orientation is None:
+        img.save(buf, format="JPEG")
+    else:
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        img.save(buf, format="JPEG", exif=exif)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize("orientation", [None, 1, 3, 6, 8])
+def test_read_jpeg_header(orientation):
+    header = read_jpeg_header(make_jpeg(403, 301, orientation))
+    assert (header.width, header.height) == (403, 301)
+    assert header.orientation == (orientation or 1)
+
+
+def test_read_jpeg_header_rejects_non_jpeg():
+    assert read_jpeg_header(b"This is not an image file") is None
+    buf = BytesIO()
+    Image.new("RGB", (10, 10)).save(buf, format="PNG")
+    assert read_jpeg_header(buf.getvalue()) is None
+
+
+def test_choose_reduction():
+    assert choose_reduction(4000, 3000, 640) == 4
+    assert choose_reduction(5120, 3840, 640) == 8
+    assert choose_reduction(1280, 960, 640) == 2
+    assert choose_reduction(1000, 800, 640) == 1
+    assert choose_reduction(4000, 3000, 0) == 1
+
+
+@pytest.mark.parametrize("orientation, expected_size", [
+    (None, (2600, 1400)),
+    (3, (2600, 1400)),
+    (6, (1400, 2600)),   # 90도 회전 → 가로/세로 교체
+    (8, (1400, 2600)),
+])
+def test_decode_upload_reports_original_size(orientation, expected_size):
+    decoded = decode_upload(make_jpeg(2600, 1400, orientation), target_size=640)
+
+    assert decoded.reduction == 4
+    assert (decoded.original_width, decoded.original_height) == expected_size
+    h, w = decoded.image.shape[:2]
+    assert (w > h) == (expected_size[0] > expected_size[1])
+    assert decoded.scale_x == pytest.approx(4.0, rel=0.01)
+    assert decoded.scale_y == pytest.approx(4.0, rel=0.01)
+
+
+def test_decode_upload_full_resolution_when_disabled():
+    decoded = decode_upload(make_jpeg(2600, 1400), target_size=0)
+    assert decoded.reduction == 1
+    assert decoded.image.shape[:2] == (1400, 2600)
+    assert decoded.scale_x == 1.0
+
+
+def test_decode_upload_invalid():
+    assert decode_upload(b"This is not an image file") is None
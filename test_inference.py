@@ -0,0 +1,181 @@
+"""
+추론 전용 executor(inference.InferenceExecutor) 검증 테스트
+
+실행:
+    python -m pytest -q test_inference.py
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from inference import InferenceExecutor
+
+
+class CountingLoader:
+    """호출 횟수를 세고, 로딩에 시간이 걸리는 것처럼 잠깐 멈추는 model_loader"""
+
+    def __init__(self, model_factory=object, delay=0.05):
+        self.calls = 0
+        self.model_factory = model_factory
+        self.delay = delay
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.model_factory()
+
+
+class ConcurrencyProbe:
+    """동시에 실행 중인 호출 수의 최댓값을 기록하는 가짜 모델"""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, source, **kwargs):
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.delay)
+        with self._lock:
+            self.running -= 1
+        return source, kwargs
+
+
+@pytest.fixture
+def make_executor():
+    executors = []
+
+    def factory(*args, **kwargs):
+        executor = InferenceExecutor(*args, **kwargs)
+        executors.append(executor)
+        return executor
+
+    yield factory
+    for executor in executors:
+        executor.shutdown()
+
+
+def test_concurrent_get_model_loads_once(make_executor):
+    loader = CountingLoader()
+    executor = make_executor(loader, max_workers=8)
+
+    futures = [executor.submit_background(executor.get_model) for _ in range(8)]
+    models = [future.result(timeout=5) for future in futures]
+
+    assert loader.calls == 1
+    assert all(model is models[0] for model in models)
+    assert executor.model_loaded
+
+
+def test_predict_is_serialized_under_model_lock(make_executor):
+    probe = ConcurrencyProbe()
+    executor = make_executor(lambda: probe, max_workers=4)
+
+    futures = [executor.submit_background(executor.predict, i, conf=0.5) for i in range(6)]
+    outputs = [future.result(timeout=5) for future in futures]
+
+    assert outputs == [(i, {"conf": 0.5}) for i in range(6)]
+    assert probe.max_running == 1
+
+
+def test_submit_runs_on_worker_thread_and_propagates_errors(make_executor):
+    executor = make_executor(lambda: None, max_workers=2)
+
+    def work(x, y=0):
+        assert executor.active == 1
+        return threading.current_thread().name, x + y
+
+    def fail():
+        raise ValueError("bad input")
+
+    async def scenario():
+        name, total = await executor.submit(work, 2, y=3)
+        with pytest.raises(ValueError, match="bad input"):
+            await executor.submit(fail)
+        return name, total
+
+    name, total = asyncio.run(scenario())
+
+    assert name.startswith("inference") and total == 5
+    assert executor.stats() == {"workers": 2, "pending": 0, "active": 0}
+
+
+def test_submit_reports_pending_while_waiting(make_executor):
+    executor = make_executor(lambda: None, max_workers=1)
+    release = threading.Event()
+
+    async def scenario():
+        tasks = [asyncio.ensure_future(executor.submit(release.wait, 5)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        pending, active = executor.pending, executor.active
+        release.set()
+        await asyncio.gather(*tasks)
+        return pending, active
+
+    assert asyncio.run(scenario()) == (3, 1)
+    assert executor.pending == 0
+
+
+def test_submit_background_works_without_event_loop(make_executor):
+    loader = CountingLoader()
+    executor = make_executor(loader)
+
+    # import 시점 warm-up처럼 이벤트 루프 없이 모델 로딩
+    future = executor.submit_background(executor.get_model)
+    assert future.result(timeout=5) is not None
+    assert loader.calls == 1 and executor.active == 0
+
+
+def test_unload_non_blocking_skips_while_predict_runs(make_executor):
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking_model(source, **kwargs):
+        started.set()
+        release.wait(5)
+        return source
+
+    loader = CountingLoader(lambda: blocking_model, delay=0)
+    executor = make_executor(loader)
+
+    future = executor.submit_background(executor.predict, "image")
+    assert started.wait(5)
+
+    # 예측 중에는 기다리지 않고 포기 (모델 유지)
+    assert executor.unload(blocking=False) is False
+    assert executor.model_loaded
+
+    release.set()
+    assert future.result(timeout=5) == "image"
+    assert executor.unload(blocking=False) is True
+    assert not executor.model_loaded
+    assert executor.unload() is False
+
+    # 다음 예측에서 다시 지연 로딩
+    assert executor.submit_background(executor.predict, "again").result(timeout=5) == "again"
+    assert loader.calls == 2
+
+
+def test_blocking_unload_waits_for_running_predict(make_executor):
+    started = threading.Event()
+    finished = threading.Event()
+
+    def slow_model(source, **kwargs):
+        started.set()
+        time.sleep(0.1)
+        finished.set()
+        return source
+
+    executor = make_executor(lambda: slow_model)
+    future = executor.submit_background(executor.predict, "image")
+    assert started.wait(5)
+
+    assert executor.unload() is True
+    assert finished.is_set() and future.result(timeout=5) == "image"
+    assert not executor.model_loaded
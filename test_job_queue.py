@@ -0,0 +1,223 @@
+"""
+비동기 작업 큐(job_queue.JobQueue / JobWorkerPool) 검증 테스트
+
+실행:
+    python -m pytest -q test_job_queue.py
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from job_queue import JobQueue, JobWorkerPool
+
+
+def test_submit_claim_complete_survives_reopen(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    queue = JobQueue(path)
+    job_id = queue.submit(b"jpeg-bytes", filename="a.jpg", tiled=True)
+    assert queue.get(job_id)["status"] == "queued"
+    queue.close()
+
+    # 프로세스 재시작 후에도 작업이 남아 있음
+    queue = JobQueue(path)
+    job = queue.claim()
+    assert job.id == job_id and job.payload == b"jpeg-bytes" and job.tiled and job.attempts == 1
+    assert queue.claim() is None
+    assert queue.get(job_id)["status"] == "running"
+
+    queue.complete(job, {"has_crack": True, "crack_count": 2})
+    status = queue.get(job_id)
+    assert status["status"] == "done" and status["result"]["crack_count"] == 2
+    assert queue.stats()["done"] == 1
+
+
+def test_failed_job_is_retried_until_max_attempts(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), max_attempts=2)
+    job_id = queue.submit(b"x")
+
+    queue.fail(queue.claim(), "boom")
+    assert queue.get(job_id)["status"] == "queued"
+    job = queue.claim()
+    assert job.attempts == 2
+    queue.fail(job, "boom again")
+    status = queue.get(job_id)
+    assert status["status"] == "failed" and status["error"] == "boom again"
+    assert queue.claim() is None
+
+
+def test_expired_lease_is_reclaimed_after_worker_crash(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), lease_seconds=0.05, max_attempts=2)
+    job_id = queue.submit(b"x")
+    assert queue.claim().attempts == 1
+    assert queue.claim() is None  # lease 유지 중
+
+    time.sleep(0.1)
+    job = queue.claim()
+    assert job.id == job_id and job.attempts == 2
+
+    # 두 번째 워커도 죽으면 재시도 소진 → failed
+    time.sleep(0.1)
+    assert queue.claim() is None
+    assert queue.get(job_id)["status"] == "failed"
+
+
+def test_stale_worker_cannot_overwrite_reclaimed_job(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), lease_seconds=0.05, max_attempts=3)
+    job_id = queue.submit(b"x")
+    stale = queue.claim()
+
+    # A의 lease가 만료되어 B가 다시 꺼내서 끝냄
+    time.sleep(0.1)
+    current = queue.claim()
+    assert current.id == job_id and current.lease != stale.lease
+    assert queue.complete(current, {"ok": True})
+
+    # 늦게 돌아온 A의 기록/연장은 모두 무시됨
+    assert not queue.fail(stale, "late failure", retry=True)
+    assert not queue.complete(stale, {"ok": False})
+    assert not queue.renew(stale)
+    status = queue.get(job_id)
+    assert status["status"] == "done" and status["result"] == {"ok": True} and status["error"] is None
+    assert queue.claim() is None
+
+
+def test_renew_keeps_lease_alive(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), lease_seconds=0.1)
+    queue.submit(b"x")
+    job = queue.claim()
+    for _ in range(3):
+        time.sleep(0.05)
+        assert queue.renew(job)
+    assert queue.claim() is None
+
+
+def test_heartbeat_prevents_double_processing_of_slow_job(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), lease_seconds=0.1)
+    calls = []
+
+    async def slow_handler(job):
+        calls.append(job.id)
+        await asyncio.sleep(0.4)    # lease_seconds의 4배
+        return {"ok": True}
+
+    async def scenario():
+        pool = JobWorkerPool(queue, slow_handler, workers=2, poll_interval=0.01)
+        job_id = queue.submit(b"x")
+        pool.ensure_started()
+        for _ in range(200):
+            if queue.get(job_id)["status"] == "done":
+                break
+            await asyncio.sleep(0.01)
+        for task in pool._tasks:
+            task.cancel()
+        return job_id
+
+    job_id = asyncio.run(scenario())
+    status = queue.get(job_id)
+    assert status["status"] == "done" and status["attempts"] == 1
+    assert len(calls) == 1
+
+
+def test_finished_jobs_expire_after_ttl(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), result_ttl=0.05)
+    job_id = queue.submit(b"x")
+    queue.complete(queue.claim(), {"ok": True})
+    assert queue.get(job_id) is not None
+    time.sleep(0.1)
+    assert queue.get(job_id) is None
+    assert queue.purge_expired() == 1
+
+
+def test_worker_pool_runs_handler_and_records_permanent_errors(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+
+    async def handler(job):
+        if job.payload == b"bad":
+            raise ValueError("Invalid image file")
+        return {"size": len(job.payload)}
+
+    async def scenario():
+        pool = JobWorkerPool(queue, handler, workers=2, poll_interval=0.01, permanent_errors=(ValueError,))
+        good = queue.submit(b"good")
+        bad = queue.submit(b"bad")
+        pool.ensure_started()
+        pool.notify()
+        for _ in range(200):
+            if queue.get(good)["status"] == "done" and queue.get(bad)["status"] == "failed":
+                break
+            await asyncio.sleep(0.01)
+        for task in pool._tasks:
+            task.cancel()
+        return good, bad, pool.stats()
+
+    good, bad, stats = asyncio.run(scenario())
+    assert queue.get(good)["result"] == {"size": 4}
+    assert queue.get(bad)["attempts"] == 1  # 영구 오류는 재시도하지 않음
+    assert stats["processed"] == 1 and stats["errors"] == 1
+
+
+def test_restart_on_new_event_loop_requeues_abandoned_jobs(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), lease_seconds=300)
+    calls = []
+
+    async def handler(job):
+        calls.append(job.id)
+        if len(calls) == 1:
+            await asyncio.Event().wait()    # 첫 루프에서는 끝나지 않음
+        return {"ok": True}
+
+    pool = JobWorkerPool(queue, handler, workers=1, poll_interval=0.01)
+    job_id = queue.submit(b"x")
+
+    async def first_loop():
+        pool.ensure_started()
+        for _ in range(200):
+            if calls:
+                break
+            await asyncio.sleep(0.01)
+
+    # 루프가 끝나면 워커와 처리 중이던 작업이 함께 버려짐
+    asyncio.run(first_loop())
+    assert queue.get(job_id)["status"] == "running" and pool.stats()["running"] == 1
+
+    async def second_loop():
+        pool.ensure_started()
+        for _ in range(200):
+            if queue.get(job_id)["status"] == "done":
+                break
+            await asyncio.sleep(0.01)
+        for task in pool._tasks:
+            task.cancel()
+
+    # lease(300초)를 기다리지 않고 새 루프의 워커가 바로 다시 처리
+    asyncio.run(second_loop())
+    status = queue.get(job_id)
+    assert status["status"] == "done" and status["attempts"] == 1
+    assert calls == [job_id, job_id] and pool.stats()["running"] == 0
+
+
+def test_jobs_api_limits(monkeypatch, tmp_path):
+    main = pytest.importorskip("main")
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(main, "JOBS_ENABLED", True)
+    monkeypatch.setattr(main, "job_queue", JobQueue(str(tmp_path / "jobs.sqlite3")))
+    upload = {"file": ("wall.jpg", b"x" * 2048, "image/jpeg")}
+
+    with TestClient(main.app) as client:
+        monkeypatch.setattr(main, "JOB_MAX_MB", 1 / 1024)
+        response = client.post("/jobs", files=upload)
+        assert response.status_code == 413
+
+        monkeypatch.setattr(main, "JOB_MAX_MB", 1)
+        monkeypatch.setattr(main, "JOB_MAX_QUEUED", 0)
+        response = client.post("/jobs", files=upload)
+        assert response.status_code == 503 and int(response.headers["Retry-After"]) >= 1
+        assert main.job_queue.stats()["queued"] == 0
+
+        # Lambda처럼 작업 API가 꺼진 배포
+        monkeypatch.setattr(main, "JOBS_ENABLED", False)
+        assert client.post("/jobs", files=upload).status_code == 501
+        assert client.get("/jobs/abc").status_code == 501
@@ -0,0 +1,108 @@
+"""
+비동기 구조화 로깅(log_config) 검증 테스트
+
+실행:
+    python -m pytest -q test_log_config.py
+"""
+
+import io
+import json
+import logging
+import threading
+import time
+
+import pytest
+
+from log_config import (
+    DetailSampler,
+    Lazy,
+    configure_logging,
+    flush_logs,
+    logging_stats,
+    request_summary,
+    shutdown_logging,
+)
+from metrics import StageTimer
+
+
+@pytest.fixture
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    shutdown_logging()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_json_records_are_formatted_on_the_listener_thread(restore_root_logger):
+    stream = io.StringIO()
+    configure_logging(level="INFO", fmt="json", stream=stream)
+    logger = logging.getLogger("test_log_config")
+    formatted_on = []
+
+    def describe(value):
+        formatted_on.append(threading.current_thread().name)
+        return f"value={value}"
+
+    logger.info("hello %s", Lazy(describe, 42), extra={"fields": {"request_id": "abc"}})
+    # 비활성 레벨은 포맷팅 함수가 호출되지 않음
+    logger.debug("hidden %s", Lazy(describe, 0))
+    assert flush_logs()
+
+    lines = stream.getvalue().strip().splitlines()
+    assert len(lines) == 1
+    entry = json.loads(lines[0])
+    assert entry["message"] == "hello value=42" and entry["request_id"] == "abc" and entry["level"] == "INFO"
+    assert formatted_on and formatted_on[0] != threading.current_thread().name
+
+
+def test_full_queue_drops_records_instead_of_blocking(restore_root_logger):
+    release = threading.Event()
+
+    class BlockingStream(io.StringIO):
+        def write(self, text):
+            release.wait(5)
+            return super().write(text)
+
+    configure_logging(level="INFO", fmt="text", queue_size=2, stream=BlockingStream())
+    logger = logging.getLogger("test_log_config")
+    start = time.perf_counter()
+    for i in range(50):
+        logger.info("record %d", i)
+    assert time.perf_counter() - start < 1.0
+    assert logging_stats()["dropped"] >= 40
+    release.set()
+    assert flush_logs(timeout=5)
+
+
+def test_request_summary_is_one_structured_record(restore_root_logger):
+    stream = io.StringIO()
+    configure_logging(level="INFO", fmt="json", stream=stream)
+    timer = StageTimer()
+    timer.add("decode", 0.012)
+    timer.cache_hit = True
+    request_summary(
+        logging.getLogger("main"), "detect-crack", "r1", 200, 0.05, timer, crack_count=2, file_id=None
+    )
+    # DEBUG 요약(배치 항목 등)은 INFO 레벨에서 출력되지 않음
+    request_summary(logging.getLogger("main"), "detect-crack/batch-item", "r1-0", 200, 0.01, level=logging.DEBUG)
+    flush_logs()
+
+    lines = stream.getvalue().strip().splitlines()
+    assert len(lines) == 1
+    entry = json.loads(lines[0])
+    assert entry["event"] == "request" and entry["status"] == 200 and entry["duration_ms"] == 50.0
+    assert entry["stages_ms"] == {"decode": 12.0} and entry["cache_hit"] is True
+    assert entry["crack_count"] == 2 and "file_id" not in entry
+
+
+def test_detail_sampler_is_deterministic_per_request():
+    assert not DetailSampler(0).sampled("a") and DetailSampler(1).sampled("a")
+    sampler = DetailSampler(0.25)
+    decisions = [sampler.sampled(f"req-{i}") for i in range(4000)]
+    assert 0.2 < sum(decisions) / len(decisions) < 0.3
+    assert decisions == [sampler.sampled(f"req-{i}") for i in range(4000)]
@@ -0,0 +1,89 @@
+"""
+마스크 응답 인코딩(mask_encoding) 검증 테스트
+
+실행:
+    python -m pytest -q test_mask_encoding.py
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from mask_encoding import (
+    encode_masks,
+    mask_polygons,
+    normalize_mask_format,
+    rle_decode,
+    rle_encode,
+    shape_estimates,
+)
+
+
+def line_mask(h, w, p0, p1, thickness):
+    mask = np.zeros((h, w), dtype=np.uint8)
+    cv2.line(mask, p0, p1, 1, thickness)
+    return mask.astype(bool)
+
+
+def test_normalize_mask_format():
+    assert normalize_mask_format(None) is None
+    assert normalize_mask_format("none") is None
+    assert normalize_mask_format("RLE") == "rle"
+    assert normalize_mask_format("polygons") == "polygon"
+    with pytest.raises(ValueError):
+        normalize_mask_format("png")
+
+
+def test_rle_matches_coco_string_format():
+    # column-major: 0, 1, 1, 1 → counts [1, 3] → "13" (pycocotools와 같은 문자열)
+    mask = np.array([[[0, 1], [1, 1]]], dtype=bool)
+    assert rle_encode(mask) == [{"size": [2, 2], "counts": "13"}]
+
+
+def test_rle_round_trip_for_several_masks():
+    rng = np.random.default_rng(0)
+    masks = np.stack([
+        line_mask(120, 160, (5, 5), (150, 100), 3),
+        rng.random((120, 160)) > 0.7,
+        np.zeros((120, 160), dtype=bool),
+        np.ones((120, 160), dtype=bool),
+    ])
+    for mask, rle in zip(masks, rle_encode(masks)):
+        assert rle["size"] == [120, 160]
+        assert np.array_equal(rle_decode(rle), mask)
+
+
+@pytest.mark.parametrize("p0,p1", [((10, 40), (150, 40)), ((10, 10), (130, 130))])
+def test_length_estimate_is_orientation_robust(p0, p1):
+    mask = line_mask(160, 160, p0, p1, 5)
+    true_length = (np.hypot(p1[0] - p0[0], p1[1] - p0[1]) + 5) * 4  # 마스크 1픽셀 = 원본 4x4
+    area = mask.sum() * 16
+    _, lengths, widths = shape_estimates(mask[None], [area], 640, 640)
+    assert lengths[0] == pytest.approx(true_length, rel=0.12)
+    assert widths[0] == pytest.approx(area / true_length, rel=0.15)
+
+
+def test_polygon_tolerance_reduces_points_and_scales_to_original():
+    mask = line_mask(100, 100, (10, 10), (90, 60), 4) | line_mask(100, 100, (90, 60), (20, 90), 4)
+    fine = mask_polygons(mask, 4.0, 3.0, tolerance=0.5)
+    coarse = mask_polygons(mask, 4.0, 3.0, tolerance=12.0)
+    assert len(fine) == len(coarse) == 1
+    assert 6 <= len(coarse[0]) < len(fine[0])
+    xs, ys = np.array(fine[0][0::2]), np.array(fine[0][1::2])
+    assert xs.max() <= 400 and ys.max() <= 300 and xs.max() > 300
+
+
+def test_encode_masks_adds_fields_for_selected_detections():
+    masks = np.stack([
+        np.zeros((80, 80), dtype=np.float32),
+        line_mask(80, 80, (5, 40), (75, 40), 3).astype(np.float32),
+    ])
+    detections = [{"index": 1, "area": int(masks[1].sum()) * 4}]
+    encode_masks(masks, detections, 160, 160, "rle")
+    det = detections[0]
+    assert np.array_equal(rle_decode(det["rle"]), masks[1] > 0.5)
+    assert det["length"] == pytest.approx(2 * 73, rel=0.15)
+    assert det["mean_width"] == pytest.approx(detections[0]["area"] / (2 * 73), rel=0.15)
+
+    encode_masks(masks, detections, 160, 160, "polygon", tolerance=1.0)
+    assert len(detections[0]["polygons"]) == 1
@@ -0,0 +1,49 @@
+"""
+단계별 시간 측정 / Prometheus 메트릭(metrics) 검증 테스트
+
+실행:
+    python -m pytest -q test_metrics.py
+"""
+
+from metrics import MetricsRegistry, StageTimer
+
+
+def test_stage_timer_accumulates_and_formats_server_timing():
+    timer = StageTimer()
+    timer.add("decode", 0.010)
+    timer.add("decode", 0.005)
+    with timer.stage("forward"):
+        pass
+    timer.cold_start = True
+
+    header = timer.server_timing(total=0.1)
+    assert header.startswith("decode;dur=15.0, forward;dur=")
+    assert 'cold-start;desc="model loaded by this request"' in header
+    assert header.endswith("total;dur=100.0")
+    assert timer.as_ms()["decode"] == 15.0
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    hist = registry.histogram("stage_seconds", "help", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        hist.observe(value, stage="decode")
+
+    text = registry.render()
+    assert 'stage_seconds_bucket{stage="decode",le="0.1"} 1' in text
+    assert 'stage_seconds_bucket{stage="decode",le="1"} 2' in text
+    assert 'stage_seconds_bucket{stage="decode",le="+Inf"} 3' in text
+    assert 'stage_seconds_count{stage="decode"} 3' in text
+    assert "# TYPE stage_seconds histogram" in text
+
+
+def test_counter_and_gauge_render():
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "help", ("endpoint", "status"))
+    counter.inc(endpoint="detect-crack", status=200)
+    counter.inc(endpoint="detect-crack", status=200)
+    registry.gauge("queue_depth", "help", lambda: 3)
+
+    text = registry.render()
+    assert 'requests_total{endpoint="detect-crack",status="200"} 2' in text
+    assert "queue_depth 3" in text
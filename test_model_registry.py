@@ -0,0 +1,129 @@
+"""
+손상 유형별 모델 레지스트리(model_registry) 검증 테스트
+
+실행:
+    python -m pytest -q test_model_registry.py
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from benchmark import StubSegModel
+from model_registry import (
+    ModelRegistry,
+    UnknownModelError,
+    container_memory_limit,
+    letterbox,
+    parse_model_specs,
+)
+from postprocess import masks_to_detections
+
+
+def test_parse_model_specs():
+    assert parse_model_specs("") == []
+    assert parse_model_specs("Breakage=breakage.pt, stain=/opt/stain.onnx") == [
+        ("breakage", "breakage.pt"), ("stain", "/opt/stain.onnx"),
+    ]
+    for value in ("stain", "stain=", "bad name=x.pt", "stain=a.pt,stain=b.pt"):
+        with pytest.raises(ValueError):
+            parse_model_specs(value)
+
+
+def test_letterbox_matches_ultralytics_rect_shape_and_crops_back():
+    image = np.zeros((200, 300, 3), dtype=np.uint8)
+    boxed = letterbox(image, 640)
+    # 640x427 → 각 변 32 배수로 padding (Ultralytics도 같은 모양이라 다시 resize하지 않음)
+    assert boxed.image.shape == (448, 640, 3) and boxed.box == (0, 10, 640, 437)
+
+    # 원본 (300x200) 좌표 (60, 40) ~ (119, 79) 영역의 마스크
+    expected = masks_to_detections(_block((200, 300), 60, 40, 120, 80), [0.9], 300, 200)
+    for shape, pad_y in (((448, 640), 0), ((640, 640), 96)):
+        # 배치에 크기가 다른 이미지가 섞이면 Ultralytics가 정사각형으로 한 번 더 padding
+        mask = _block(shape, 128, 10 + pad_y + 85, 256, 10 + pad_y + 171)
+        found = masks_to_detections(boxed.crop_masks(mask), [0.9], 300, 200)
+        assert len(found) == 1
+        for key in ("x", "y", "width", "height"):
+            assert abs(found[0][key] - expected[0][key]) <= 1
+
+
+def _block(shape, x0, y0, x1, y1):
+    mask = np.zeros((1, *shape), dtype=np.float32)
+    mask[0, y0:y1, x0:x1] = 1.0
+    return mask
+
+
+def test_container_memory_limit(tmp_path):
+    assert container_memory_limit(str(tmp_path), {}) is None
+    (tmp_path / "memory.max").write_text("max\n")
+    assert container_memory_limit(str(tmp_path), {}) is None
+    (tmp_path / "memory.max").write_text(f"{2 * 1024 ** 3}\n")
+    assert container_memory_limit(str(tmp_path), {}) == 2 * 1024 ** 3
+    assert container_memory_limit(str(tmp_path), {"AWS_LAMBDA_FUNCTION_MEMORY_SIZE": "1024"}) == 1024 ** 3
+
+
+def _registry(monkeypatch, **kwargs):
+    """모델을 로딩할 때마다 가짜 RSS가 100MB씩 늘고, 해제하면 줄어드는 레지스트리"""
+    rss = {"value": 100}
+    monkeypatch.setattr("model_registry.process_rss", lambda: rss["value"] * 1024 * 1024)
+    registry = ModelRegistry(**kwargs)
+
+    def loader(name):
+        rss["value"] += 100
+        return StubSegModel(cracks_per_image=1, seed=len(name))
+
+    for name in ("crack", "breakage", "stain"):
+        entry = registry.register(name, lambda name=name: loader(name), pinned=name == "crack")
+        unload = entry.executor.unload
+
+        def tracked_unload(blocking=True, unload=unload):
+            released = unload(blocking)
+            rss["value"] -= 100 * released
+            return released
+
+        entry.executor.unload = tracked_unload
+    return registry, rss
+
+
+def test_models_load_lazily_and_evict_idle_ones_under_memory_limit(monkeypatch):
+    registry, rss = _registry(monkeypatch, memory_limit=350 * 1024 * 1024)
+    image = np.zeros((64, 64, 3), dtype=np.uint8)
+
+    async def run(names):
+        return await asyncio.gather(*(registry.predict(name, image) for name in names))
+
+    outputs = asyncio.run(run(["crack", "breakage"]))
+    assert [cold for _, _, cold in outputs] == [True, True]
+    assert registry.get("breakage").size_bytes == 100 * 1024 * 1024 and not registry.get("stain").loaded
+
+    # stain 로딩 전 RSS(300MB) + 예상(100MB) > 350MB → 쉬고 있는 breakage 해제 (crack은 pinned)
+    asyncio.run(run(["stain"]))
+    assert [registry.get(name).loaded for name in registry.names] == [True, False, True]
+    assert registry.get("breakage").evictions == 1 and rss["value"] == 300
+
+    # 다시 요청하면 지연 로딩 (이번에는 stain이 해제됨)
+    (_, _, cold), = asyncio.run(run(["breakage"]))
+    assert cold and registry.get("breakage").loads == 2 and not registry.get("stain").loaded
+
+
+def test_sweep_unloads_models_idle_longer_than_limit(monkeypatch):
+    registry, _ = _registry(monkeypatch, idle_seconds=60)
+    image = np.zeros((64, 64, 3), dtype=np.uint8)
+    for name in registry.names:
+        asyncio.run(registry.predict(name, image))
+    registry.get("stain").last_used -= 120
+    registry.get("crack").last_used -= 120
+
+    assert registry.sweep() == 1
+    assert [registry.get(name).loaded for name in registry.names] == [True, True, False]
+
+
+def test_select_validates_names():
+    registry = ModelRegistry()
+    for name in ("crack", "stain"):
+        registry.register(name, StubSegModel)
+    assert registry.select(None) == ["crack", "stain"]
+    assert registry.select("Stain, crack,stain") == ["stain", "crack"]
+    with pytest.raises(UnknownModelError):
+        registry.select("crack,mold")
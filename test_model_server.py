@@ -0,0 +1,125 @@
+"""
+모델 프로세스 분리 서빙(model_server) 검증 테스트
+
+실행:
+    python -m pytest -q test_model_server.py
+"""
+
+import os
+import signal
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from model_server import ModelServerPool, RemoteModel
+from postprocess import binarize_masks
+
+
+class _Array:
+    def __init__(self, data):
+        self.data = data
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.data
+
+
+class _EchoResult:
+    def __init__(self, img, imgsz):
+        self.masks = type("Masks", (), {"data": _Array((img[None, :, :, 0] / 255.0).astype(np.float32))})()
+        self.boxes = type("Boxes", (), {"conf": _Array(np.array([img.mean() / 255.0], dtype=np.float32))})()
+        self.speed = {"preprocess": 0.0, "inference": float(imgsz), "postprocess": 0.0}
+
+
+class EchoModel:
+    """프레임 픽셀을 그대로 마스크로 돌려주는 모델 (shared memory 전송 검증용)"""
+
+    def __call__(self, source, **kwargs):
+        if kwargs.get("fail"):
+            raise ValueError("requested failure")
+        time.sleep(kwargs.get("sleep", 0))
+        return [_EchoResult(img, kwargs.get("imgsz", 1)) for img in source]
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    pool = ModelServerPool(EchoModel, socket_dir=str(tmp_path_factory.mktemp("sockets")))
+    address = pool.start()[0]
+    yield pool, address
+    pool.stop()
+
+
+def test_frames_round_trip_through_shared_memory(server):
+    _, address = server
+    model = RemoteModel(address, connect_timeout=60)
+    rng = np.random.default_rng(0)
+    big = rng.integers(0, 256, (240, 320, 3), dtype=np.uint8)
+    # 타일처럼 연속되지 않은 view도 전송 가능
+    frames = [big, big[10:110, 50:250], rng.integers(0, 256, (64, 48, 3), dtype=np.uint8)]
+
+    results = model(frames)
+    assert len(results) == 3
+    for frame, r in zip(frames, results):
+        expected = binarize_masks((frame[None, :, :, 0] / 255.0).astype(np.float32))
+        assert np.array_equal(binarize_masks(r.masks.data.cpu().numpy()), expected)
+        assert r.boxes.conf.cpu().numpy()[0] == pytest.approx(frame.mean() / 255.0, rel=1e-5)
+        assert r.speed["inference"] == 1.0
+    model.close()
+
+
+def test_requests_with_different_options_are_not_batched_together(server):
+    _, address = server
+    models = [RemoteModel(address, connect_timeout=60) for _ in range(5)]
+    frame = [np.zeros((8, 8, 3), dtype=np.uint8)]
+    outputs = {}
+
+    def call(i):
+        kwargs = {"sleep": 0.3} if i == 0 else {"imgsz": 320 if i % 2 else 640}
+        outputs[i] = (kwargs.get("imgsz", 1), models[i](frame, **kwargs)[0].speed["inference"], models[i].last_batch_size)
+
+    # 첫 요청이 모델을 잡고 있는 동안 옵션이 다른 요청들이 대기열에 쌓임
+    threads = [threading.Thread(target=call, args=(0,))]
+    threads[0].start()
+    time.sleep(0.1)
+    threads += [threading.Thread(target=call, args=(i,)) for i in range(1, 5)]
+    for thread in threads[1:]:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for model in models:
+        model.close()
+
+    for requested, used, batch_size in outputs.values():
+        assert used == requested
+    assert outputs[1][2] == 2 and outputs[2][2] == 2
+
+
+def test_model_error_is_raised_in_client(server):
+    _, address = server
+    model = RemoteModel(address, connect_timeout=60)
+    with pytest.raises(RuntimeError, match="requested failure"):
+        model([np.zeros((8, 8, 3), dtype=np.uint8)], fail=True)
+    # 연결은 유지되어 다음 요청은 정상 처리
+    assert len(model([np.zeros((8, 8, 3), dtype=np.uint8)])) == 1
+    model.close()
+
+
+def test_client_reconnects_after_model_server_restart(server):
+    pool, address = server
+    model = RemoteModel(address, connect_timeout=60)
+    model([np.zeros((8, 8, 3), dtype=np.uint8)])
+
+    os.kill(pool._processes[0].pid, signal.SIGKILL)
+    with pytest.raises(RuntimeError, match="Lost connection"):
+        model([np.zeros((8, 8, 3), dtype=np.uint8)])
+
+    deadline = time.time() + 30
+    while pool.restarts == 0 and time.time() < deadline:
+        time.sleep(0.1)
+    assert pool.restarts == 1
+    assert len(model([np.zeros((8, 8, 3), dtype=np.uint8)])) == 1
+    model.close()
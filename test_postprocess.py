@@ -0,0 +1,102 @@
+"""
+벡터화 마스크 후처리(postprocess.masks_to_detections) 검증 테스트
+
+기존 방식(마스크마다 resize_mask → > 127 → np.where)과 bbox / 면적이 픽셀 단위로 같은지 확인합니다.
+
+실행:
+    python -m pytest -q test_postprocess.py
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from postprocess import masks_to_detections, nearest_source_index
+
+
+def resize_mask(mask, W, H):
+    # 벡터화 이전 main.py의 resize_mask 구현 그대로
+    mask_uint8 = (mask * 255).astype(np.uint8)
+    return cv2.resize(mask_uint8, (W, H), interpolation=cv2.INTER_NEAREST)
+
+
+def reference_detections(masks, confidences, W, H):
+    """기존 main.detect_crack 루프와 같은 방식의 기준 결과"""
+    detections = []
+    for i, (mask, conf) in enumerate(zip(masks, confidences)):
+        mask_bool = resize_mask(mask, W, H) > 127
+        ys, xs = np.where(mask_bool)
+        if len(xs) == 0:
+            continue
+        x_min, x_max = int(xs.min()), int(xs.max())
+        y_min, y_max = int(ys.min()), int(ys.max())
+        detections.append({
+            "index": i,
+            "x": x_min,
+            "y": y_min,
+            "width": x_max - x_min,
+            "height": y_max - y_min,
+            "area": int(mask_bool.sum()),
+            "confidence": float(conf),
+        })
+    return detections
+
+
+def make_masks(n, h, w, seed):
+    """얇은 crack 형태 + 임의 블롭 + 빈 마스크 + soft 값 마스크 생성"""
+    rng = np.random.default_rng(seed)
+    masks = np.zeros((n, h, w), dtype=np.float32)
+    for i in range(n):
+        kind = i % 4
+        if kind == 0:
+            # 얇은 대각선 crack
+            x0, y0 = rng.integers(0, w), rng.integers(0, h)
+            x1, y1 = rng.integers(0, w), rng.integers(0, h)
+            canvas = np.zeros((h, w), dtype=np.uint8)
+            cv2.line(canvas, (int(x0), int(y0)), (int(x1), int(y1)), 1, 1)
+            masks[i] = canvas
+        elif kind == 1:
+            # 임의 블롭
+            masks[i] = (rng.random((h, w)) > 0.995).astype(np.float32)
+        elif kind == 2:
+            # 빈 마스크 (bbox에서 제외되어야 함)
+            pass
+        else:
+            # 0~1 사이 soft 값 (임계값 경계 포함)
+            masks[i] = rng.random((h, w)).astype(np.float32) * (rng.random((h, w)) > 0.999)
+            masks[i, 0, 0] = 128 / 255.0
+            masks[i, -1, -1] = 127.9 / 255.0
+    return masks
+
+
+@pytest.mark.parametrize("mask_shape, image_size", [
+    ((160, 160), (640, 640)),      # 정수배 업스케일
+    ((480, 640), (4000, 3000)),    # 일반 휴대폰 사진 (비정수배)
+    ((640, 480), (3024, 4032)),    # 세로 사진
+    ((384, 640), (1920, 1080)),
+    ((640, 640), (500, 333)),      # 다운스케일 (일부 행/열이 출력에 매핑되지 않음)
+    ((97, 131), (131, 97)),
+    ((1, 1), (7, 5)),
+])
+def test_matches_resize_mask(mask_shape, image_size):
+    h, w = mask_shape
+    W, H = image_size
+    masks = make_masks(8, h, w, seed=h * 31 + W)
+    confidences = np.linspace(0.3, 0.9, len(masks))
+
+    expected = reference_detections(masks, confidences, W, H)
+    actual = masks_to_detections(masks, confidences, W, H)
+
+    assert actual == expected
+
+
+def test_nearest_source_index_matches_cv2():
+    for src, dst in [(160, 640), (480, 3000), (640, 4032), (640, 333), (7, 7)]:
+        probe = np.arange(src, dtype=np.float32).reshape(1, src)
+        resized = cv2.resize(probe, (dst, 1), interpolation=cv2.INTER_NEAREST)
+        assert np.array_equal(resized[0].astype(np.int64), nearest_source_index(dst, src))
+
+
+def test_empty_input():
+    assert masks_to_detections(np.zeros((0, 160, 160), dtype=np.float32), [], 640, 640) == []
+    assert masks_to_detections(np.zeros((3, 160, 160), dtype=np.float32), [0.5] * 3, 640, 640) == []
@@ -0,0 +1,95 @@
+"""
+사전 필터 cascade(prefilter) 검증 테스트
+
+실행:
+    python -m pytest -q test_prefilter.py
+"""
+
+import numpy as np
+import pytest
+
+from prefilter import (
+    FULL,
+    SKIPPED,
+    Prefilter,
+    load_labeled_images,
+    positive_class_index,
+    recommend_threshold,
+    result_score,
+    sweep,
+)
+
+
+class _Array:
+    def __init__(self, data):
+        self.data = np.asarray(data, dtype=np.float32)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.data
+
+
+class _SegResult:
+    def __init__(self, confidences):
+        self.boxes = type("Boxes", (), {"conf": _Array(confidences)})()
+
+
+class _ClsResult:
+    def __init__(self, probs, names):
+        self.probs = type("Probs", (), {"data": _Array(probs)})()
+        self.names = names
+
+
+def test_scores_from_segmentation_and_classifier_results():
+    assert result_score(_SegResult([0.2, 0.7]), "lowres") == pytest.approx(0.7)
+    assert result_score(_SegResult([]), "lowres") == 0.0
+    assert result_score(_ClsResult([0.9, 0.1], {0: "crack", 1: "clean"}), "classifier") == pytest.approx(0.9)
+    # 이름이 crack이 아니어도 2-class 모델이면 clean이 아닌 쪽
+    assert positive_class_index({0: "clean", 1: "scratch"}) == 1
+    with pytest.raises(ValueError):
+        positive_class_index({0: "a", 1: "b", 2: "c"})
+
+
+def test_decide_routes_by_threshold_and_counts_paths():
+    prefilter = Prefilter("lowres", threshold=0.3, imgsz=256)
+    assert prefilter.predict_kwargs()["imgsz"] == 256
+    assert prefilter.decide(0.31)["path"] == FULL
+    skipped = prefilter.decide(0.05)
+    assert skipped["path"] == SKIPPED and skipped["score"] == 0.05
+    assert prefilter.stats()["skip_rate"] == 0.5
+    assert prefilter.bypassed()["score"] is None
+    assert not Prefilter("off").enabled
+    with pytest.raises(ValueError):
+        Prefilter("bogus")
+
+
+def test_sweep_reports_skip_rate_and_recall_lost():
+    scores = [0.9, 0.4, 0.05, 0.02, 0.01, 0.6]
+    labels = [True, True, True, False, False, False]
+    full_detected = [True, True, False, False, True, True]
+    rows = {row["threshold"]: row for row in sweep(scores, labels, full_detected, [0.03, 0.5])}
+
+    assert rows[0.03]["skip_rate"] == pytest.approx(2 / 6, abs=1e-4)
+    assert rows[0.03]["recall_full"] == pytest.approx(2 / 3, abs=1e-4)
+    assert rows[0.03]["recall_lost"] == 0.0
+    assert rows[0.03]["false_positives_avoided"] == 1
+    # 0.4점짜리 crack 이미지는 0.5에서 건너뛰므로 recall 손실
+    assert rows[0.5]["missed_images"] == 1
+    assert rows[0.5]["recall_lost"] == pytest.approx(1 / 3, abs=1e-4)
+
+    assert recommend_threshold(list(rows.values()), 0.01)["threshold"] == 0.03
+    assert recommend_threshold(list(rows.values()), 0.5)["threshold"] == 0.5
+
+
+def test_labeled_folder_uses_subfolder_names(tmp_path):
+    for label in ("crack", "clean"):
+        (tmp_path / label).mkdir()
+        (tmp_path / label / "a.jpg").write_bytes(b"jpeg")
+    (tmp_path / "notes.txt").write_text("ignored")
+    items = load_labeled_images(str(tmp_path))
+    assert sorted((name, positive) for name, _, positive in items) == [
+        ("clean/a.jpg", False),
+        ("crack/a.jpg", True),
+    ]
@@ -0,0 +1,169 @@
+"""
+INT8 양자화 도구(quantize) 정확도 게이트 / 모델 경로 검증 테스트
+
+실행:
+    python -m pytest -q test_quantize.py
+"""
+
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import quantize
+from compare_backends import agreement
+from quantize import accuracy_gate, quantize_onnx, quantized_path, resolve_quantized_model
+
+
+def run(*boxes):
+    """(x, y, w, h) bbox들을 꽉 채운 마스크를 가진 이미지 한 장의 (detections, masks)"""
+    masks = np.zeros((len(boxes), 64, 64), dtype=bool)
+    detections = []
+    for i, (x, y, w, h) in enumerate(boxes):
+        masks[i, y:y + h, x:x + w] = True
+        detections.append({"index": i, "x": x, "y": y, "width": w, "height": h, "confidence": 0.9 - 0.1 * i})
+    return detections, masks
+
+
+def gate(result):
+    return accuracy_gate(result, min_recall=0.95, min_f1=0.9, min_mask_iou=0.8)
+
+
+def test_gate_passes_identical_detections():
+    reference = [run((0, 0, 10, 10), (20, 20, 10, 10)), run((5, 5, 30, 4))]
+    assert gate(agreement(reference, reference)) == []
+
+
+def test_gate_fails_on_missed_cracks():
+    reference = [run((0, 0, 10, 10), (20, 20, 10, 10)), run((5, 5, 30, 4))]
+    candidate = [run((0, 0, 10, 10)), run()]
+    result = agreement(reference, candidate)
+
+    assert result["recall"] == round(1 / 3, 4)
+    failures = gate(result)
+    assert [f.split()[0] for f in failures] == ["recall", "f1"]
+
+
+def test_gate_fails_on_mask_iou_only():
+    # bbox는 같지만 후보 마스크가 절반만 채워짐
+    detections, masks = run((0, 0, 20, 20))
+    half = masks.copy()
+    half[0, :, 10:] = False
+    result = agreement([(detections, masks)], [(detections, half)])
+
+    assert result["recall"] == 1.0 and result["mean_mask_iou"] == 0.5
+    assert [f.split()[0] for f in gate(result)] == ["mask"]
+
+
+def test_gate_fails_when_reference_finds_nothing():
+    # FP32가 아무것도 못 찾으면 recall을 확인할 수 없으므로 후보도 비어 있어도 실패
+    result = agreement([run(), run()], [run(), run()])
+    assert result["recall"] == 1.0 and result["mean_mask_iou"] is None
+    assert [f.split()[0] for f in gate(result)] == ["reference"]
+
+    result = agreement([run()], [run((0, 0, 10, 10))])
+    assert result["recall"] == 1.0 and result["precision"] == 0.0
+    assert [f.split()[0] for f in gate(result)] == ["reference", "f1"]
+
+
+def test_gate_min_reference_detections_floor():
+    reference = [run((0, 0, 10, 10)), run((5, 5, 30, 4))]
+    result = agreement(reference, reference)
+    assert accuracy_gate(result, 0.95, 0.9, 0.8, min_reference_detections=2) == []
+    assert [f.split()[0] for f in accuracy_gate(result, 0.95, 0.9, 0.8, min_reference_detections=3)] == ["reference"]
+
+
+def test_gate_with_no_matches():
+    result = agreement([run((0, 0, 10, 10))], [run((40, 40, 10, 10))])
+    assert result["matched"] == 0 and result["mean_mask_iou"] is None
+    assert [f.split()[0] for f in gate(result)] == ["recall", "f1"]
+
+
+def test_gate_threshold_boundary_passes():
+    result = {"reference_detections": 1, "recall": 0.95, "f1": 0.9, "mean_mask_iou": 0.8}
+    assert gate(result) == []
+    assert [f.split()[0] for f in gate({**result, "recall": 0.9499})] == ["recall"]
+    assert [f.split()[0] for f in gate({**result, "mean_mask_iou": 0.7999})] == ["mask"]
+
+
+def test_cmd_evaluate_exit_code_follows_gate(monkeypatch, tmp_path):
+    fp32 = tmp_path / "best.onnx"
+    fp32.write_bytes(b"fp32")
+    int8 = tmp_path / "best_int8_static.onnx"
+
+    reference = [run((0, 0, 10, 10)), run((5, 5, 30, 4))]
+    outputs = {}
+    monkeypatch.setattr(quantize, "_fp32_onnx", lambda args: str(fp32))
+    monkeypatch.setattr("compare_backends.load_image_set", lambda *args: [("a.jpg", b""), ("b.jpg", b"")])
+    monkeypatch.setattr("backends.load_backend_model", lambda *args, **kwargs: "reference")
+    monkeypatch.setattr("ultralytics.YOLO", lambda path, task=None: "candidate")
+    monkeypatch.setattr("compare_backends.benchmark_model", lambda model, *args: (outputs[model], [0.01]))
+
+    args = SimpleNamespace(
+        images=None, synthetic=2, mode="static", model="best.pt", reference="pytorch", export_dir=str(tmp_path),
+        imgsz=640, runs=1, conf=0.25, iou_threshold=0.5, min_recall=0.95, min_f1=0.9, min_mask_iou=0.8,
+        min_reference_detections=1,
+    )
+
+    # INT8 모델이 없으면 실패
+    assert quantize.cmd_evaluate(args) == 1
+
+    int8.write_bytes(b"int8")
+    outputs.update(reference=reference, candidate=reference)
+    assert quantize.cmd_evaluate(args) == 0
+
+    outputs["candidate"] = [run((0, 0, 10, 10)), run()]
+    assert quantize.cmd_evaluate(args) == 1
+
+    # FP32가 아무것도 못 찾은 이미지 세트는 통과시키지 않음
+    outputs.update(reference=[run(), run()], candidate=[run(), run()])
+    assert quantize.cmd_evaluate(args) == 1
+
+
+def test_evaluate_requires_explicit_image_source(monkeypatch):
+    monkeypatch.setattr(quantize, "cmd_evaluate", lambda args: (args.images, args.synthetic))
+    monkeypatch.setattr("sys.argv", ["quantize.py", "evaluate"])
+    with pytest.raises(SystemExit):
+        quantize.main()
+
+    monkeypatch.setattr("sys.argv", ["quantize.py", "evaluate", "--images", "./eval"])
+    assert quantize.main() == ("./eval", 0)
+    monkeypatch.setattr("sys.argv", ["quantize.py", "evaluate", "--synthetic", "5"])
+    assert quantize.main() == (None, 5)
+
+
+def test_quantized_path():
+    assert quantized_path("/tmp/exports/best_abc.onnx", "dynamic") == "/tmp/exports/best_abc_int8_dynamic.onnx"
+    assert quantized_path("best.onnx", "static") == "best_int8_static.onnx"
+
+
+def test_static_quantization_without_calibration_data_raises(tmp_path):
+    fp32 = str(tmp_path / "best.onnx")
+    with pytest.raises(ValueError, match="calibration image folder"):
+        quantize_onnx(fp32, "static")
+    with pytest.raises(ValueError, match="No calibration images"):
+        quantize_onnx(fp32, "static", calib_dir=str(tmp_path))
+    with pytest.raises(ValueError, match="Unknown quantization mode"):
+        quantize_onnx(fp32, "int4")
+
+
+def test_resolve_quantized_model(monkeypatch, tmp_path):
+    fp32 = str(tmp_path / "best.onnx")
+    assert resolve_quantized_model(fp32, "fp32") == fp32
+    with pytest.raises(ValueError):
+        resolve_quantized_model(fp32, "int4")
+
+    # static은 calibrate 단계로 미리 만들어 둬야 함
+    with pytest.raises(RuntimeError, match="calibrate"):
+        resolve_quantized_model(fp32, "int8_static")
+    static = quantized_path(fp32, "static")
+    open(static, "wb").close()
+    assert resolve_quantized_model(fp32, "int8_static") == static
+
+    # dynamic은 없으면 바로 생성
+    created = []
+    monkeypatch.setattr(quantize, "quantize_onnx", lambda path, mode, imgsz: created.append((path, mode, imgsz)) or "new")
+    assert resolve_quantized_model(fp32, "int8_dynamic", imgsz=320) == "new"
+    assert created == [(fp32, "dynamic", 320)]
+    assert not os.path.exists(quantized_path(fp32, "dynamic"))
@@ -0,0 +1,57 @@
+"""
+체크인 참조 인덱스(reference_index) 검증 테스트
+
+실행:
+    python -m pytest -q test_reference_index.py
+"""
+
+import time
+
+import numpy as np
+
+from reference_index import Reference, ReferenceIndex
+
+
+def _reference(n_keypoints=5):
+    rng = np.random.default_rng(0)
+    return Reference(
+        width=1200,
+        height=900,
+        keypoints=rng.uniform(0, 900, (n_keypoints, 2)).astype(np.float32),
+        descriptors=rng.integers(0, 256, (n_keypoints, 32), dtype=np.uint8),
+        cracks=[{"x": 1, "y": 2, "width": 3, "height": 4, "area": 5, "confidence": 0.9,
+                 "rle": {"size": [4, 4], "counts": "02"}}],
+    )
+
+
+def test_references_round_trip_per_property(tmp_path):
+    index = ReferenceIndex(str(tmp_path / "index.sqlite3"))
+    original = _reference()
+    first = index.put("P1", original, "room.jpg")
+    index.put("P1", _reference(0), "hall.jpg")
+    index.put("P2", _reference(), "other.jpg")
+
+    loaded = index.get("P1", first)
+    assert np.array_equal(loaded.keypoints, original.keypoints)
+    assert np.array_equal(loaded.descriptors, original.descriptors)
+    assert loaded.cracks == original.cracks and (loaded.width, loaded.height) == (1200, 900)
+    # 다른 숙소의 id로는 조회되지 않음
+    assert index.get("P2", first) is None
+
+    assert [r.filename for r in index.load("P1")] == ["hall.jpg", "room.jpg"]
+    assert index.load("P1")[0].descriptors.shape == (0, 32)
+    assert [r["crack_count"] for r in index.list("P1")] == [1, 1]
+    assert index.stats()["references"] == 3 and index.stats()["properties"] == 2
+
+    assert index.delete_property("P1") == 2
+    assert index.load("P1") == [] and len(index.load("P2")) == 1
+    index.close()
+
+
+def test_expired_references_are_hidden_and_purged(tmp_path):
+    index = ReferenceIndex(str(tmp_path / "index.sqlite3"), ttl=0.05)
+    reference_id = index.put("P1", _reference(), "room.jpg")
+    time.sleep(0.1)
+    assert index.get("P1", reference_id) is None and index.list("P1") == []
+    assert index.purge_expired() == 1
+    index.close()
@@ -0,0 +1,60 @@
+"""
+결과 이미지 렌더링(render) 검증 테스트
+
+실행:
+    python -m pytest -q test_render.py
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from render import DEFAULT_QUALITY, draw_detections, encode_image, fit_to_size, label_color, normalize_format, variant_name
+
+
+def test_variant_name_default_matches_legacy_file_name():
+    assert variant_name("abc") == "abc.jpg"
+    assert variant_name("abc", size=320, quality=70, fmt="webp") == "abc_s320_q70.webp"
+    assert variant_name("abc", quality=DEFAULT_QUALITY - 1) != variant_name("abc")
+
+
+def test_normalize_format():
+    assert normalize_format("JPG") == "jpeg"
+    assert normalize_format(None) == "jpeg"
+    with pytest.raises(ValueError):
+        normalize_format("gif")
+
+
+@pytest.mark.parametrize("shape,size,expected", [
+    ((3024, 4032, 3), 320, (240, 320)),
+    ((4032, 3024, 3), 320, (320, 240)),
+    ((200, 100, 3), 320, (200, 100)),
+    ((200, 100, 3), 0, (200, 100)),
+])
+def test_fit_to_size(shape, size, expected):
+    assert fit_to_size(np.zeros(shape, dtype=np.uint8), size).shape[:2] == expected
+
+
+def test_draw_detections_scales_to_decoded_image():
+    img = np.zeros((100, 100, 3), dtype=np.uint8)
+    det = {"index": 0, "x": 40, "y": 40, "width": 80, "height": 80, "confidence": 0.9}
+    draw_detections(img, [det], scale_x=2.0, scale_y=2.0)
+    # 원본 (40, 40)-(120, 120) → 1/2 축소 이미지 (20, 20)-(60, 60)
+    assert tuple(img[40, 20]) == (0, 0, 255)
+    assert tuple(img[40, 60]) == (0, 0, 255)
+    assert tuple(img[40, 40]) == (0, 0, 0)
+
+
+def test_damage_types_get_their_own_colors():
+    img = np.zeros((100, 100, 3), dtype=np.uint8)
+    det = {"index": 0, "x": 10, "y": 40, "width": 50, "height": 50, "confidence": 0.8, "label": "stain"}
+    draw_detections(img, [det])
+    assert tuple(img[60, 10]) == label_color("stain") != label_color("crack") == (0, 0, 255)
+
+
+@pytest.mark.parametrize("fmt", ["jpeg", "webp"])
+def test_encode_image_round_trip(fmt):
+    img = np.full((64, 48, 3), 128, dtype=np.uint8)
+    data = encode_image(img, fmt, 80)
+    decoded = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    assert decoded.shape == img.shape
@@ -0,0 +1,136 @@
+"""
+업로드 내용 기반 결과 캐시(result_cache.ResultCache) 검증 테스트
+
+실행:
+    python -m pytest -q test_result_cache.py
+"""
+
+import json
+
+import pytest
+
+from result_cache import ResultCache, model_identity
+
+
+def response(file_id, **extra):
+    return {"file_id": file_id, "has_crack": True, "bounding_boxes": [], **extra}
+
+
+def test_lru_evicts_least_recently_used_entry():
+    cache = ResultCache("model", max_entries=2)
+    for name in ("a", "b"):
+        cache.put(name, response(name))
+    assert cache.get("a") is not None      # a를 최근 사용으로
+    cache.put("c", response("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a")["file_id"] == "a" and cache.get("c")["file_id"] == "c"
+    assert cache.stats()["entries"] == 2 and cache.evictions == 1
+
+
+def test_lru_evicts_by_total_bytes():
+    size = len(json.dumps(response("a", pad="x" * 100)))
+    cache = ResultCache("model", max_entries=100, max_bytes=2 * size + 10)
+    for name in ("a", "b", "c"):
+        cache.put(name, response(name, pad="x" * 100))
+
+    assert cache.get("a") is None and cache.get("b") is not None and cache.get("c") is not None
+    assert cache.stats()["bytes"] == 2 * size and cache.evictions == 1
+
+    # 혼자서 한도를 넘는 응답은 메모리에 넣지 않고 기존 항목도 밀어내지 않음
+    cache.put("huge", response("huge", pad="x" * 1000))
+    assert cache.get("huge") is None and cache.get("b") is not None
+    assert cache.stats()["bytes"] == 2 * size
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = {"value": 1000.0}
+    monkeypatch.setattr("result_cache.time.time", lambda: now["value"])
+    cache = ResultCache("model", ttl_seconds=60)
+    cache.put("a", response("a"))
+
+    now["value"] += 59
+    assert cache.get("a") is not None
+    now["value"] += 2
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0 and cache.stats()["bytes"] == 0
+
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    first = ResultCache("model", disk_dir=str(tmp_path))
+    first.put(first.make_key(b"photo"), response("a"))
+
+    second = ResultCache("model", disk_dir=str(tmp_path))
+    key = second.make_key(b"photo")
+    assert second.get(key)["file_id"] == "a"
+    assert second.disk_hits == 1
+
+    # 디스크에서 찾은 항목은 메모리 tier로 승격
+    assert second.get(key) is not None and second.memory_hits == 1
+
+    # 모델이 바뀌면 같은 디스크 디렉토리라도 miss
+    assert ResultCache("other-model", disk_dir=str(tmp_path)).get(ResultCache("other-model").make_key(b"photo")) is None
+
+
+def test_invalid_entry_is_dropped_from_both_tiers(tmp_path):
+    cache = ResultCache("model", disk_dir=str(tmp_path))
+    cache.put("a", response("a"))
+
+    assert cache.get("a", is_valid=lambda r: False) is None
+    assert cache.get("a") is None and list(tmp_path.iterdir()) == []
+
+
+def test_variant_keys_do_not_collide():
+    cache = ResultCache("model")
+    variants = ["", "tiled", "polygon2", "tiled-polygon2", "prefilter-edge0.02", "rle"]
+    keys = [cache.make_key(b"photo", variant) for variant in variants]
+    assert len(set(keys)) == len(variants)
+
+    for key, variant in zip(keys, variants):
+        cache.put(key, response(variant or "default"))
+    assert [cache.get(key)["file_id"] for key in keys] == [variant or "default" for variant in variants]
+
+    assert cache.make_key(b"photo") != cache.make_key(b"other photo")
+    assert model_identity("missing.pt", "onnx") != model_identity("missing.pt", "pytorch")
+
+
+def test_get_returns_copy_caller_can_mutate():
+    cache = ResultCache("model")
+    cache.put("a", response("a", bounding_boxes=[{"x": 1}]))
+
+    first = cache.get("a")
+    first["file_id"] = "changed"
+    first["bounding_boxes"][0]["x"] = 99
+
+    assert cache.get("a") == response("a", bounding_boxes=[{"x": 1}])
+
+
+def test_stats_count_hits_and_misses():
+    cache = ResultCache("model")
+    assert cache.get("a") is None
+    cache.put("a", response("a"))
+    cache.get("a")
+    cache.get("a")
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["memory_hits"], stats["misses"]) == (2, 2, 1)
+    assert stats["hit_rate"] == round(2 / 3, 4)
+
+
+def test_health_reports_cache_counters(monkeypatch):
+    main = pytest.importorskip("main")
+    from fastapi.testclient import TestClient
+
+    from benchmark import StubSegModel, synthetic_image
+
+    monkeypatch.setattr(main, "result_cache", ResultCache("test-model"))
+    main.inference_executor.set_model(StubSegModel(cracks_per_image=1))
+    upload = {"file": ("wall.jpg", synthetic_image(320, 240, 1), "image/jpeg")}
+
+    with TestClient(main.app) as client:
+        first = client.post("/detect-crack", files=upload).json()
+        second = client.post("/detect-crack", files=upload).json()
+        stats = client.get("/health").json()["result_cache"]
+
+    assert second["file_id"] == first["file_id"]
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
@@ -0,0 +1,86 @@
+"""
+결과 이미지 저장소(result_store.ResultStore) 검증 테스트
+
+실행:
+    python -m pytest -q test_result_store.py
+"""
+
+import os
+import threading
+import time
+
+from result_store import ResultStore
+
+
+def test_put_get_serves_from_memory_then_disk(tmp_path):
+    store = ResultStore(str(tmp_path), max_bytes=1000, memory_max_bytes=100)
+    store.put("a.jpg", b"x" * 60)
+    assert store.get("a.jpg") == b"x" * 60
+    store.flush()
+    assert (tmp_path / "a.jpg").read_bytes() == b"x" * 60
+
+    # a는 메모리에서 밀려나고 디스크에서 다시 읽어 승격
+    store.put("b.jpg", b"y" * 60)
+    store.flush()
+    assert store.get("a.jpg") == b"x" * 60
+    stats = store.stats()
+    assert stats["disk_hits"] == 1 and stats["memory_hits"] == 1
+
+
+def test_disk_budget_evicts_least_recently_used(tmp_path):
+    store = ResultStore(str(tmp_path), max_bytes=250, memory_max_bytes=0, async_writes=False)
+    for name in ("a.jpg", "b.jpg"):
+        store.put(name, b"0" * 100)
+    store.get("a.jpg")
+    store.put("c.jpg", b"0" * 100)
+
+    assert sorted(os.listdir(tmp_path)) == ["a.jpg", "c.jpg"]
+    assert store.get("b.jpg") is None
+    assert store.stats()["disk_bytes"] == 200
+    assert store.stats()["evictions"] == 1
+
+
+def test_ttl_expires_entries(tmp_path):
+    store = ResultStore(str(tmp_path), max_bytes=1000, ttl_seconds=0.05, async_writes=False)
+    store.put("a.jpg", b"data")
+    assert store.exists("a.jpg")
+    time.sleep(0.1)
+    assert not store.exists("a.jpg")
+    assert store.get("a.jpg") is None
+    assert not (tmp_path / "a.jpg").exists()
+
+
+def test_existing_files_are_indexed_and_trimmed(tmp_path):
+    for i, name in enumerate(("old.jpg", "mid.jpg", "new.jpg")):
+        path = tmp_path / name
+        path.write_bytes(b"0" * 100)
+        os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+
+    store = ResultStore(str(tmp_path), max_bytes=200, memory_max_bytes=0)
+    assert sorted(os.listdir(tmp_path)) == ["mid.jpg", "new.jpg"]
+    assert store.get("new.jpg") == b"0" * 100
+
+
+def test_pending_writes_fall_back_to_sync_above_limit(tmp_path):
+    store = ResultStore(str(tmp_path), max_bytes=10000, memory_max_bytes=0, pending_max_bytes=250)
+    # 디스크가 멈춘 것처럼 백그라운드 writer를 막아 둠
+    release = threading.Event()
+    store._writer.submit(release.wait, 5)
+
+    for name in ("a.jpg", "b.jpg"):
+        store.put(name, b"0" * 100)
+    assert store.stats()["pending_bytes"] == 200 and store.stats()["sync_writes"] == 0
+
+    # 한도를 넘는 쓰기는 put() 안에서 바로 디스크에 씀
+    store.put("c.jpg", b"0" * 100)
+    assert (tmp_path / "c.jpg").read_bytes() == b"0" * 100
+    assert not (tmp_path / "a.jpg").exists()
+    stats = store.stats()
+    assert stats["pending_bytes"] == 200 and stats["pending_writes"] == 2 and stats["sync_writes"] == 1
+    assert store.get("a.jpg") == b"0" * 100
+
+    release.set()
+    store.flush()
+    stats = store.stats()
+    assert stats["pending_bytes"] == 0 and stats["disk_bytes"] == 300
+    assert sorted(os.listdir(tmp_path)) == ["a.jpg", "b.jpg", "c.jpg"]
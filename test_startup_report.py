@@ -0,0 +1,84 @@
+"""
+cold start 분석 도구(startup_report) 파싱 / GET /health cold_start_ms 검증 테스트
+
+실행:
+    python -m pytest -q test_startup_report.py
+"""
+
+import pytest
+
+from benchmark import StubSegModel, synthetic_image
+from startup_report import package_totals, parse_importtime
+
+# python -X importtime -c "import main" 출력 일부 (import 사이에 섞인 일반 stderr 줄 포함)
+IMPORTTIME_SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       136 |        136 |   _io
+import time:       305 |        828 | _frozen_importlib_external
+import time:        43 |         43 |     _codecs
+import time:       306 |        348 |   codecs
+import time:       556 |       1343 | encodings
+import time:      2210 |       2210 |       numpy._utils
+import time:      4100 |       6310 |     numpy.core
+import time:     12000 |      18310 |   numpy
+INFO:main:Inference executor ready with 1 worker(s)
+import time:      1500 |       1500 |   fastapi.routing
+import time:       800 |      20610 | main
+"""
+
+
+def test_parse_importtime():
+    entries = parse_importtime(IMPORTTIME_SAMPLE)
+
+    assert len(entries) == 10
+    assert entries[0] == ("_io", 136, 136, 1)
+    assert entries[2] == ("_codecs", 43, 43, 2)
+    assert entries[5] == ("numpy._utils", 2210, 2210, 3)
+    assert entries[-1] == ("main", 800, 20610, 0)
+    assert [name for name, _, _, depth in entries if depth == 0] == ["_frozen_importlib_external", "encodings", "main"]
+
+
+def test_parse_importtime_ignores_other_output():
+    assert parse_importtime("") == []
+    assert parse_importtime("Traceback (most recent call last):\nSTARTUP_REPORT {}\n") == []
+
+
+def test_package_totals_counts_self_time_once():
+    totals = package_totals(parse_importtime(IMPORTTIME_SAMPLE))
+
+    # cumulative가 아니라 self 시간 합계 -> 중첩 import를 두 번 세지 않음
+    assert totals["numpy"] == 2210 + 4100 + 12000
+    assert totals["fastapi"] == 1500
+    assert totals["main"] == 800
+    assert sum(totals.values()) == sum(self_us for _, self_us, _, _ in parse_importtime(IMPORTTIME_SAMPLE))
+
+
+def test_health_reports_cold_start_stages(monkeypatch):
+    main = pytest.importorskip("main")
+    from fastapi.testclient import TestClient
+
+    # 실제 load_model 경로를 타도록 모델을 내리고 로더만 stub으로 교체
+    monkeypatch.setattr(main, "model", None)
+    monkeypatch.setattr(main, "MODEL_SERVER_ADDRESS", None)
+    monkeypatch.setattr(main, "MODEL_LOAD_SECONDS", None)
+    monkeypatch.setattr(main, "FIRST_DETECTION_SECONDS", None)
+    monkeypatch.setattr(main, "detections_served", 0)
+    monkeypatch.setattr(main, "load_backend_model", lambda *args, **kwargs: StubSegModel(cracks_per_image=1))
+    main.inference_executor.unload()
+
+    with TestClient(main.app) as client:
+        report = client.get("/health").json()["cold_start_ms"]
+        assert report["startup"] == round(main.STARTUP_SECONDS * 1000, 1) and report["startup"] > 0
+        assert report["model_load"] is None and report["first_detection"] is None
+
+        response = client.post("/detect-crack", files={"file": ("wall.jpg", synthetic_image(320, 240, 1), "image/jpeg")})
+        assert response.status_code == 200
+
+        report = client.get("/health").json()["cold_start_ms"]
+        assert report["model_load"] is not None and report["model_load"] >= 0
+        assert report["first_detection"] >= report["model_load"]
+
+        # 두 번째 요청은 first_detection을 덮어쓰지 않음
+        first = report["first_detection"]
+        client.post("/detect-crack", files={"file": ("wall.jpg", synthetic_image(320, 240, 1, seed=1), "image/jpeg")})
+        assert client.get("/health").json()["cold_start_ms"]["first_detection"] == first
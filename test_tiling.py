@@ -0,0 +1,130 @@
+"""
+타일 추론 유틸리티(tiling) 검증 테스트
+
+실행:
+    python -m pytest -q test_tiling.py
+"""
+
+import numpy as np
+import pytest
+
+from mask_encoding import encode_masks
+from postprocess import masks_to_detections
+from tiling import make_tiles, mask_patches, merge_detections
+
+
+@pytest.mark.parametrize("W,H", [(640, 480), (4032, 3024), (1000, 641), (3024, 4032)])
+def test_make_tiles_covers_image(W, H):
+    tiles = make_tiles(W, H, tile_size=640, overlap=0.2)
+    covered = np.zeros((H, W), dtype=bool)
+    for x0, y0, x1, y1 in tiles:
+        assert 0 <= x0 < x1 <= W and 0 <= y0 < y1 <= H
+        assert x1 - x0 == min(640, W) and y1 - y0 == min(640, H)
+        covered[y0:y1, x0:x1] = True
+    assert covered.all()
+
+
+def test_make_tiles_small_image_is_single_tile():
+    assert make_tiles(320, 200, tile_size=640) == [(0, 0, 320, 200)]
+
+
+def pieces(canvas, tiles, conf=0.5):
+    """전역 마스크(canvas)를 타일별로 잘라 run_tiled_detection과 같은 방식으로 만든 타일 탐지 (전역 좌표)"""
+    detections = []
+    for tile, (x0, y0, x1, y1) in enumerate(tiles):
+        crop = canvas[None, y0:y1, x0:x1].astype(np.float32)
+        found = mask_patches(crop, masks_to_detections(crop, [conf], x1 - x0, y1 - y0), x1 - x0, y1 - y0)
+        for d in found:
+            d.update(x=d["x"] + x0, y=d["y"] + y0, tile=tile)
+            detections.append(d)
+    return detections
+
+
+def det(x, y, w, h, tile, conf=0.5):
+    """bbox를 꽉 채운 마스크 패치를 가진 탐지"""
+    mask = np.ones((h + 1, w + 1), dtype=bool)
+    return {"x": x, "y": y, "width": w, "height": h, "tile": tile, "confidence": conf,
+            "area": mask.size, "mask": mask}
+
+
+def test_mask_patches_match_detection_area():
+    masks = np.zeros((1, 160, 160), dtype=np.float32)
+    masks[0, 40:44, 10:90] = 1.0
+    found = mask_patches(masks, masks_to_detections(masks, [0.9], 640, 640), 640, 640)
+    assert found[0]["mask"].shape == (found[0]["height"] + 1, found[0]["width"] + 1)
+    assert int(found[0]["mask"].sum()) == found[0]["area"]
+
+
+def test_merge_joins_crack_cut_at_tile_border_without_double_counting():
+    canvas = np.zeros((200, 1000), dtype=bool)
+    canvas[100:110, 300:800] = True
+    tiles = [(0, 0, 640, 200), (512, 0, 1000, 200)]
+    detections = pieces(canvas, tiles)
+    assert len(detections) == 2
+
+    merged = merge_detections(detections)
+    assert len(merged) == 1
+    m = merged[0]
+    assert (m["x"], m["y"], m["width"], m["height"]) == (300, 100, 499, 9)
+    # 겹침 영역(512~639)은 한 번만 셈
+    assert m["area"] == int(canvas.sum())
+    assert m["tiles"] == [0, 1]
+    assert "mask" not in m
+
+
+def test_merge_keeps_parallel_cracks_on_either_side_of_seam():
+    # 두 crack이 타일 경계 양쪽에서 2px 간격으로 나란히 있어도 마스크가 겹치지 않으면 합치지 않음
+    merged = merge_detections([
+        det(400, 100, 111, 3, tile=0, conf=0.6),
+        det(513, 100, 200, 3, tile=1, conf=0.8),
+        det(400, 106, 300, 3, tile=1, conf=0.7),
+    ])
+    assert len(merged) == 3
+
+
+def test_merge_ignores_bbox_overlap_without_mask_overlap():
+    # 대각선 crack의 bbox 안에 들어오지만 마스크는 떨어져 있는 crack
+    canvas = np.zeros((400, 400), dtype=bool)
+    for i in range(300):
+        canvas[50 + i, 50 + i:54 + i] = True
+    other = np.zeros_like(canvas)
+    other[250:254, 60:140] = True
+    detections = pieces(canvas, [(0, 0, 400, 400)], conf=0.9) + pieces(other, [(0, 0, 400, 400)])
+    detections[1]["tile"] = 1
+    assert len(merge_detections(detections)) == 2
+
+
+def test_merge_keeps_separate_cracks_in_same_tile():
+    merged = merge_detections([det(0, 0, 50, 50, tile=0), det(20, 20, 50, 50, tile=0)])
+    assert len(merged) == 2
+
+
+def test_merge_is_transitive_and_sorted_by_confidence():
+    merged = merge_detections([
+        det(0, 0, 100, 10, tile=0, conf=0.3),
+        det(90, 0, 100, 10, tile=1, conf=0.4),
+        det(180, 0, 100, 10, tile=2, conf=0.9),
+        det(1000, 1000, 10, 10, tile=2, conf=0.5),
+    ])
+    assert [m["confidence"] for m in merged] == [0.9, 0.5]
+    assert merged[0]["tiles"] == [0, 1, 2]
+    assert merged[0]["area"] == 281 * 11
+    assert [m["index"] for m in merged] == [0, 1]
+
+
+def test_merged_measurements_match_full_frame():
+    # 4032x3024 사진의 1008x302 crack: 여러 타일의 겹침 영역에 걸쳐도 전체 프레임 결과와 같아야 함
+    W, H = 4032, 3024
+    canvas = np.zeros((H, W), dtype=bool)
+    canvas[1400:1702, 1500:2508] = True
+    full = masks_to_detections(canvas[None].astype(np.float32), [0.9], W, H)
+    encode_masks(canvas[None], full, W, H, "polygon", tolerance=0)
+
+    detections = pieces(canvas, make_tiles(W, H, tile_size=640, overlap=0.2))
+    assert len(detections) > 4
+    merged = merge_detections(detections, mask_format="polygon", tolerance=0)
+    assert len(merged) == 1
+    m = merged[0]
+    for key in ("x", "y", "width", "height", "area", "perimeter", "length", "mean_width"):
+        assert m[key] == full[0][key], key
+    assert m["polygons"] == full[0]["polygons"]
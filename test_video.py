@@ -0,0 +1,98 @@
+"""
+점검 영상 처리(video) 검증 테스트
+
+실행:
+    python -m pytest -q test_video.py
+"""
+
+import io
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from compare import extract_features
+from video import CrackTracker, FrameSampler, VideoTooLargeError, dhash, hamming, open_video, save_upload
+
+W, H = 320, 240
+
+
+def _world(width=900, seed=0):
+    rng = np.random.default_rng(seed)
+    img = np.full((H, width, 3), 185, dtype=np.uint8)
+    for _ in range(width // 3):
+        x, y = (int(v) for v in rng.integers(0, [width, H]))
+        w, h = (int(v) for v in rng.integers(6, 30, 2))
+        cv2.rectangle(img, (x, y), (x + w, y + h), tuple(int(c) for c in rng.integers(0, 256, 3)), -1)
+    return img
+
+
+def _write_video(path, frames, fps=10):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (W, H))
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+
+
+def test_sampler_skips_near_identical_frames(tmp_path):
+    world = _world()
+    # 3초 정지 → 2초 동안 오른쪽으로 이동 (10fps)
+    frames = [world[:, :W]] * 30 + [world[:, x:x + W] for x in range(20, 420, 20)]
+    path = tmp_path / "walk.avi"
+    _write_video(path, frames)
+
+    cap, info = open_video(str(path))
+    sampler = FrameSampler(check_fps=10, min_distance=10, max_gap=2.0, target_size=160)
+    selected = list(sampler.frames(cap, info.fps))
+    cap.release()
+
+    assert sampler.frames_read == len(frames) and not sampler.truncated
+    indexes = [index for index, _, _ in selected]
+    # 정지 구간은 처음 프레임 + max_gap(2초)마다 한 장
+    assert indexes[:2] == [0, 20] and all(index >= 30 for index in indexes[2:])
+    assert len(selected) < len(frames) // 2
+    decoded = selected[0][2]
+    assert max(decoded.image.shape[:2]) == 160 and (decoded.original_width, decoded.original_height) == (W, H)
+
+    cap, info = open_video(str(path))
+    limited = FrameSampler(check_fps=10, max_frames=3)
+    assert len(list(limited.frames(cap, info.fps))) == 3 and limited.truncated
+    cap.release()
+
+
+def test_dhash_distance_tracks_scene_change():
+    world = _world()
+    same = dhash(world[:, :W])
+    assert hamming(same, dhash(cv2.GaussianBlur(world[:, :W], (3, 3), 0))) < 10
+    assert hamming(same, dhash(world[:, 400:400 + W])) >= 10
+
+
+def test_tracker_merges_the_same_crack_across_a_camera_pan():
+    world = _world()
+    tracker = CrackTracker(iou_threshold=0.3)
+    crack = np.array([450, 100, 520, 140])   # 월드 좌표 crack bbox
+    for i, x in enumerate((300, 330, 360, 390)):
+        frame = world[:, x:x + W]
+        detections = [{
+            "index": 0, "x": int(crack[0] - x), "y": int(crack[1]), "width": 70, "height": 40,
+            "area": 300, "confidence": (0.5, 0.9, 0.7, 0.6)[i],
+        }]
+        if i == 3:
+            # 다른 위치의 새 crack
+            detections.append({"index": 1, "x": 10, "y": 10, "width": 30, "height": 30, "area": 50, "confidence": 0.4})
+        tracker.update(i * 10, i / 3, detections, (W, H), extract_features(frame))
+
+    tracks = tracker.tracks()
+    assert len(tracks) == 2 and tracker.aligned_frames == 3
+    first = tracks[0]
+    assert first.hits == 4 and first.best["confidence"] == 0.9 and first.best["frame_index"] == 10
+    assert len(tracker.tracks(min_hits=2)) == 1
+
+
+def test_save_upload_enforces_size_limit(tmp_path):
+    path = save_upload(io.BytesIO(b"x" * 10), ".mp4", max_bytes=100, directory=str(tmp_path))
+    assert path.endswith(".mp4") and os.path.getsize(path) == 10
+    with pytest.raises(VideoTooLargeError):
+        save_upload(io.BytesIO(b"x" * (3 * 1024 * 1024)), max_bytes=1024 * 1024, directory=str(tmp_path))
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
@@ -0,0 +1,157 @@
+"""
+고해상도 타일 추론 유틸리티
+
+12MP 사진 전체를 640px로 줄이면 얇은 hairline crack이 사라지므로,
+원본 해상도 이미지를 겹치는 타일로 나눠 배치 추론한 뒤 타일 경계에서 잘린 crack을 다시 합칩니다.
+
+- make_tiles: 겹침(overlap)을 두고 이미지를 덮는 타일 좌표 생성 (마지막 타일은 가장자리에 맞춤)
+- mask_patches: 타일 마스크에서 탐지별 bbox 패치를 잘라 둠 (전역 좌표 비교/병합용)
+- merge_detections: 서로 다른 타일에서 나온 마스크가 전역 좌표에서 겹치면 같은 crack으로 보고 마스크 union
+"""
+
+import numpy as np
+
+from mask_encoding import DEFAULT_POLYGON_TOLERANCE, mask_polygons, offset_polygons, shape_estimates
+from postprocess import binarize_masks, nearest_source_index
+
+
+def _tile_starts(length: int, tile: int, stride: int):
+    if length <= tile:
+        return [0]
+    starts = list(range(0, length - tile, stride))
+    starts.append(length - tile)
+    return starts
+
+
+def make_tiles(W: int, H: int, tile_size: int = 640, overlap: float = 0.2):
+    """
+    이미지를 덮는 겹치는 타일 좌표 리스트
+
+    Returns:
+        [(x0, y0, x1, y1), ...] (x1, y1은 exclusive)
+    """
+    tile_size = max(32, int(tile_size))
+    overlap = min(max(float(overlap), 0.0), 0.9)
+    stride = max(1, int(tile_size * (1.0 - overlap)))
+
+    tiles = []
+    for y0 in _tile_starts(H, tile_size, stride):
+        for x0 in _tile_starts(W, tile_size, stride):
+            tiles.append((x0, y0, min(x0 + tile_size, W), min(y0 + tile_size, H)))
+    return tiles
+
+
+def mask_patches(masks, detections, tile_w: int, tile_h: int):
+    """
+    타일 마스크 (N, h, w) → 탐지마다 bbox 크기의 타일 해상도 bool 패치 det["mask"] (in-place, 좌표 이동 전에 호출)
+
+    masks_to_detections와 같은 nearest 매핑을 쓰므로 패치의 True 픽셀 수는 det["area"]와 같음
+    """
+    if not detections:
+        return detections
+    masks = np.asarray(masks)
+    _, h, w = masks.shape
+    cols = nearest_source_index(tile_w, w)
+    rows = nearest_source_index(tile_h, h)
+    for det in detections:
+        patch_rows = rows[det["y"]:det["y"] + det["height"] + 1]
+        patch_cols = cols[det["x"]:det["x"] + det["width"] + 1]
+        det["mask"] = binarize_masks(masks[det["index"]][np.ix_(patch_rows, patch_cols)])
+    return detections
+
+
+def _mask_overlap(a, b):
+    """두 탐지 패치(전역 좌표)의 bbox 교차 영역 안에서 (겹친 픽셀 수, a 픽셀 수, b 픽셀 수)"""
+    x0, y0 = max(a["x"], b["x"]), max(a["y"], b["y"])
+    x1 = min(a["x"] + a["width"], b["x"] + b["width"]) + 1
+    y1 = min(a["y"] + a["height"], b["y"] + b["height"]) + 1
+    if x1 <= x0 or y1 <= y0:
+        return 0, 0, 0
+    pa = a["mask"][y0 - a["y"]:y1 - a["y"], x0 - a["x"]:x1 - a["x"]]
+    pb = b["mask"][y0 - b["y"]:y1 - b["y"], x0 - b["x"]:x1 - b["x"]]
+    return int(np.count_nonzero(pa & pb)), int(np.count_nonzero(pa)), int(np.count_nonzero(pb))
+
+
+def union_mask(members):
+    """같은 crack으로 묶인 탐지 패치들의 전역 좌표 union → (x0, y0, bool 마스크)"""
+    x0 = min(d["x"] for d in members)
+    y0 = min(d["y"] for d in members)
+    x1 = max(d["x"] + d["width"] for d in members)
+    y1 = max(d["y"] + d["height"] for d in members)
+    union = np.zeros((y1 - y0 + 1, x1 - x0 + 1), dtype=bool)
+    for d in members:
+        h, w = d["mask"].shape
+        union[d["y"] - y0:d["y"] - y0 + h, d["x"] - x0:d["x"] - x0 + w] |= d["mask"]
+    return x0, y0, union
+
+
+def merge_detections(detections, min_overlap: float = 0.3, mask_format=None,
+                     tolerance: float = DEFAULT_POLYGON_TOLERANCE):
+    """
+    타일별 탐지 결과를 전역 좌표 마스크 기준으로 병합
+
+    - 다른 타일에서 나온 두 탐지의 마스크가 bbox 교차 영역에서 실제로 겹치고, 겹친 픽셀이 그 영역 안
+      작은 쪽 마스크의 min_overlap 이상이면 같은 crack (겹침 영역 중복 + 경계에서 잘린 조각)
+      → 타일 경계 양쪽의 나란한 crack처럼 bbox만 가까운 탐지는 합치지 않음
+    - 같은 타일 안의 탐지는 모델이 이미 구분한 서로 다른 crack이므로 직접 비교하지 않음
+    - 병합된 crack의 bbox / 면적은 조각 마스크를 전역 좌표에 합친 union 마스크 기준 (겹침 영역은 한 번만 셈),
+      신뢰도는 최대값
+    - mask_format="polygon"이면 길이/폭 추정과 polygon도 union 마스크에서 계산 (조각별 값을 더하지 않음)
+
+    Args:
+        detections: {"x", "y", "width", "height", "confidence", "tile", "mask"} 리스트
+            (전역 좌표, mask는 mask_patches()로 만든 bbox 크기 패치)
+        mask_format: None 또는 "polygon"
+        tolerance: polygon 단순화 허용 오차 (원본 픽셀)
+
+    Returns:
+        병합된 탐지 리스트 (신뢰도 내림차순, mask 패치는 제외)
+    """
+    n = len(detections)
+    parent = list(range(n))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i in range(n):
+        for j in range(i + 1, n):
+            if detections[i]["tile"] == detections[j]["tile"]:
+                continue
+            overlap, count_i, count_j = _mask_overlap(detections[i], detections[j])
+            if overlap and overlap >= min_overlap * min(count_i, count_j):
+                ri, rj = find(i), find(j)
+                if ri != rj:
+                    parent[rj] = ri
+
+    groups = {}
+    for i in range(n):
+        groups.setdefault(find(i), []).append(detections[i])
+
+    merged = []
+    for members in groups.values():
+        x0, y0, union = union_mask(members)
+        merged.append({
+            "x": x0,
+            "y": y0,
+            "width": union.shape[1] - 1,
+            "height": union.shape[0] - 1,
+            "confidence": max(d["confidence"] for d in members),
+            "area": int(np.count_nonzero(union)),
+            "tiles": sorted({d["tile"] for d in members}),
+        })
+        if mask_format:
+            entry = merged[-1]
+            h, w = union.shape
+            (perimeter,), (length,), (width,) = shape_estimates(union[None], [entry["area"]], w, h)
+            entry["perimeter"] = round(float(perimeter), 1)
+            entry["length"] = round(float(length), 1)
+            entry["mean_width"] = round(float(width), 2)
+            entry["polygons"] = offset_polygons(mask_polygons(union, 1.0, 1.0, tolerance), x0, y0)
+
+    merged.sort(key=lambda d: -d["confidence"])
+    for i, det in enumerate(merged):
+        det["index"] = i
+    return merged
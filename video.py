@@ -0,0 +1,311 @@
+"""
+점검 영상(walkthrough) 처리: 적응형 프레임 샘플링 + 프레임 간 crack 추적/중복 제거
+
+- FrameSampler: VideoCapture로 영상을 순서대로 읽으면서 check_fps 간격의 프레임만 디코딩 (나머지는 grab만)
+  마지막으로 고른 프레임과 dHash(64bit) 해밍 거리가 min_distance 이상이거나 max_gap초가 지났을 때만 선택
+  → 카메라가 멈춰 있거나 천천히 움직이는 구간의 거의 같은 프레임은 추론하지 않음
+- CrackTracker: 연속한 선택 프레임 사이 ORB homography로 이전 bbox를 현재 프레임 좌표로 옮긴 뒤
+  IoU로 같은 crack을 묶고, crack마다 신뢰도가 가장 높은 프레임만 남김
+- 메모리: 들고 있는 프레임은 추론 배치 하나 + crack별 best 프레임 JPEG 뿐 (영상 길이와 무관)
+"""
+
+import os
+import tempfile
+import time
+from dataclasses import dataclass, field
+
+import cv2
+import numpy as np
+
+from compare import align
+from decode import DecodedImage
+from reference_index import Reference
+from render import fit_to_size
+
+DEFAULT_FPS = 30.0
+HASH_SIZE = 8
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".m4v", ".avi", ".mkv", ".webm")
+
+
+class InvalidVideoError(ValueError):
+    """업로드된 파일을 영상으로 열 수 없을 때"""
+
+
+class VideoTooLargeError(ValueError):
+    """업로드 크기가 제한을 넘을 때"""
+
+
+def dhash(image) -> int:
+    """difference hash: (HASH_SIZE+1) x HASH_SIZE 흑백 축소 이미지의 가로 밝기 변화 64bit"""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    small = cv2.resize(gray, (HASH_SIZE + 1, HASH_SIZE), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def save_upload(fileobj, suffix: str = "", max_bytes: int = 0, directory: str = None) -> str:
+    """
+    업로드 스트림을 청크 단위로 임시 파일에 저장 (VideoCapture는 파일 경로가 필요)
+
+    Raises:
+        VideoTooLargeError: max_bytes(0이면 제한 없음)를 넘음 (임시 파일은 삭제)
+    """
+    handle = tempfile.NamedTemporaryFile(suffix=suffix, dir=directory, delete=False)
+    written = 0
+    try:
+        with handle:
+            while True:
+                chunk = fileobj.read(1024 * 1024)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if max_bytes and written > max_bytes:
+                    raise VideoTooLargeError(f"Video exceeds {max_bytes // (1024 * 1024)} MB")
+                handle.write(chunk)
+    except BaseException:
+        os.unlink(handle.name)
+        raise
+    return handle.name
+
+
+@dataclass
+class VideoInfo:
+    fps: float
+    frame_count: int     # 컨테이너에 기록된 프레임 수 (없거나 부정확할 수 있음)
+    width: int
+    height: int
+
+
+def open_video(path: str):
+    """
+    Returns:
+        (cv2.VideoCapture, VideoInfo)
+
+    Raises:
+        InvalidVideoError: 열 수 없는 파일
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        cap.release()
+        raise InvalidVideoError("Invalid video file")
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    info = VideoInfo(
+        fps=fps if fps and np.isfinite(fps) and fps > 0 else DEFAULT_FPS,
+        frame_count=max(0, int(cap.get(cv2.CAP_PROP_FRAME_COUNT))),
+        width=int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        height=int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+    )
+    return cap, info
+
+
+class FrameSampler:
+    """추론할 프레임 고르기 (영상 하나당 하나, 통계는 응답의 'video' 항목)"""
+
+    def __init__(self, check_fps: float = 5.0, min_distance: int = 10, max_gap: float = 2.0,
+                 max_frames: int = 300, target_size: int = 640):
+        """
+        Args:
+            check_fps: 초당 디코딩/해시 비교할 프레임 수 (0이면 모든 프레임)
+            min_distance: 마지막 선택 프레임과의 dHash 해밍 거리가 이 값 이상이면 선택 (0~64)
+            max_gap: 장면 변화가 없어도 이 시간(초)이 지나면 선택 (천천히 이동할 때 구간 누락 방지)
+            max_frames: 선택 프레임 최대 수 (초과하면 나머지는 읽지 않고 truncated)
+            target_size: 선택 프레임 긴 변 크기 (모델 입력 크기 기준 축소, 원본 좌표는 DecodedImage에 보관)
+        """
+        self.check_fps = float(check_fps)
+        self.min_distance = int(min_distance)
+        self.max_gap = float(max_gap)
+        self.max_frames = max(1, int(max_frames))
+        self.target_size = int(target_size)
+        self.frames_read = 0
+        self.checked = 0
+        self.selected = 0
+        self.truncated = False
+        self.read_seconds = 0.0
+        self._last_hash = None
+        self._last_time = None
+
+    def select(self, image, timestamp: float) -> bool:
+        """검사 프레임 하나를 추론할지 결정"""
+        self.checked += 1
+        frame_hash = dhash(image)
+        if (
+            self._last_hash is not None
+            and hamming(frame_hash, self._last_hash) < self.min_distance
+            and timestamp - self._last_time < self.max_gap
+        ):
+            return False
+        self._last_hash, self._last_time = frame_hash, timestamp
+        self.selected += 1
+        return True
+
+    def frames(self, cap, fps: float):
+        """
+        선택된 프레임을 순서대로 yield: (frame_index, timestamp_s, DecodedImage)
+
+        한 번에 프레임 하나만 디코딩하므로 영상 길이와 무관하게 메모리 일정
+        """
+        step = max(1, int(round(fps / self.check_fps))) if self.check_fps > 0 else 1
+        index = -1
+        while True:
+            start = time.perf_counter()
+            if not cap.grab():
+                self.read_seconds += time.perf_counter() - start
+                return
+            index += 1
+            self.frames_read = index + 1
+            if index % step:
+                self.read_seconds += time.perf_counter() - start
+                continue
+            ok, frame = cap.retrieve()
+            if not ok:
+                self.read_seconds += time.perf_counter() - start
+                return
+            image = fit_to_size(frame, self.target_size)
+            timestamp = index / fps
+            chosen = self.select(image, timestamp)
+            self.read_seconds += time.perf_counter() - start
+            if not chosen:
+                continue
+            yield index, timestamp, DecodedImage(image, frame.shape[1], frame.shape[0])
+            if self.selected >= self.max_frames:
+                # 남은 프레임이 있는지만 확인
+                self.truncated = cap.grab()
+                return
+
+    def stats(self) -> dict:
+        return {
+            "frames_read": self.frames_read,
+            "frames_checked": self.checked,
+            "frames_inferred": self.selected,
+            "truncated": self.truncated,
+        }
+
+
+def _project_box(box, homography):
+    """(x0, y0, x1, y1)을 homography로 옮긴 뒤 외접 사각형"""
+    x0, y0, x1, y1 = box
+    corners = np.array([[[x0, y0]], [[x1, y0]], [[x1, y1]], [[x0, y1]]], dtype=np.float32)
+    moved = cv2.perspectiveTransform(corners, homography).reshape(-1, 2)
+    return np.concatenate([moved.min(axis=0), moved.max(axis=0)])
+
+
+def _iou(a, b) -> float:
+    iw = min(a[2], b[2]) - max(a[0], b[0])
+    ih = min(a[3], b[3]) - max(a[1], b[1])
+    if iw <= 0 or ih <= 0:
+        return 0.0
+    inter = iw * ih
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _det_box(det):
+    return np.array([det["x"], det["y"], det["x"] + det["width"], det["y"] + det["height"]], dtype=np.float32)
+
+
+@dataclass
+class Track:
+    """영상 안에서 같은 crack으로 묶인 탐지들"""
+    id: int
+    box: np.ndarray          # 가장 최근 프레임 좌표로 옮긴 bbox (x0, y0, x1, y1)
+    first_frame: int
+    first_time: float
+    last_frame: int
+    last_time: float
+    best: dict               # 신뢰도가 가장 높은 탐지 + frame_index / timestamp_s
+    hits: int = 1
+    missed: int = 0
+    best_image: bytes = field(default=None, repr=False)
+
+
+class CrackTracker:
+    """선택 프레임 순서대로 탐지를 넣으면 같은 crack끼리 묶음"""
+
+    def __init__(self, iou_threshold: float = 0.2, max_missed: int = 2, min_inliers: int = 15):
+        """
+        Args:
+            iou_threshold: 이전 프레임에서 옮겨 온 bbox와 IoU가 이 값 이상이면 같은 crack
+            max_missed: 연속으로 이 수의 선택 프레임에서 보이지 않으면 추적 종료
+            min_inliers: 프레임 간 정렬 성공으로 보는 최소 inlier 수 (실패하면 bbox를 그대로 둠)
+        """
+        self.iou_threshold = float(iou_threshold)
+        self.max_missed = int(max_missed)
+        self.min_inliers = int(min_inliers)
+        self.aligned_frames = 0
+        self.unaligned_frames = 0
+        self._tracks = []
+        self._previous = None
+
+    def _advance(self, features, size):
+        """이전 선택 프레임 → 현재 프레임 카메라 이동만큼 진행 중인 track bbox 이동"""
+        keypoints, descriptors = features
+        if self._previous is not None:
+            alignment = align(keypoints, descriptors, size, self._previous, self.min_inliers)
+            if alignment.aligned:
+                self.aligned_frames += 1
+                to_current = np.linalg.inv(alignment.homography)
+                for track in self._active():
+                    track.box = _project_box(track.box, to_current)
+            else:
+                self.unaligned_frames += 1
+        self._previous = Reference(size[0], size[1], keypoints, descriptors)
+
+    def _active(self):
+        return [track for track in self._tracks if track.missed <= self.max_missed]
+
+    def update(self, frame_index: int, timestamp: float, detections, size=None, features=None):
+        """
+        선택 프레임 하나의 탐지(원본 좌표) 반영
+
+        Args:
+            size: 프레임 원본 (W, H)
+            features: extract_features() 결과 (None이면 카메라 이동 보정 없이 IoU만 사용)
+
+        Returns:
+            list[Track]: 이 프레임이 best가 된 track (best 프레임 이미지를 새로 저장해야 함)
+        """
+        if features is not None:
+            self._advance(features, size)
+        active = self._active()
+        boxes = [_det_box(det) for det in detections]
+        pairs = sorted(
+            ((_iou(track.box, box), t, d) for t, track in enumerate(active) for d, box in enumerate(boxes)),
+            key=lambda pair: -pair[0],
+        )
+        matched_tracks, matched_dets = set(), {}
+        for iou, t, d in pairs:
+            if iou < self.iou_threshold:
+                break
+            if t in matched_tracks or d in matched_dets:
+                continue
+            matched_tracks.add(t)
+            matched_dets[d] = active[t]
+
+        improved = []
+        for d, det in enumerate(detections):
+            best = {**det, "frame_index": frame_index, "timestamp_s": round(timestamp, 3)}
+            track = matched_dets.get(d)
+            if track is None:
+                track = Track(len(self._tracks) + 1, boxes[d], frame_index, timestamp, frame_index, timestamp, best)
+                self._tracks.append(track)
+                improved.append(track)
+                continue
+            track.box = boxes[d]
+            track.last_frame, track.last_time = frame_index, timestamp
+            track.hits += 1
+            track.missed = 0
+            if det["confidence"] > track.best["confidence"]:
+                track.best = best
+                improved.append(track)
+        for t, track in enumerate(active):
+            if t not in matched_tracks:
+                track.missed += 1
+        return improved
+
+    def tracks(self, min_hits: int = 1):
+        """min_hits개 이상의 선택 프레임에서 보인 crack (처음 보인 순서)"""
+        return [track for track in self._tracks if track.hits >= min_hits]